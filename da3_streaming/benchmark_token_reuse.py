@@ -0,0 +1,161 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark overlap-token reuse on the chunk schedule of DA3-Streaming.
+
+Runs the chunks of a sequence without reuse and with each reuse mode, and reports the
+wall time, the backbone FLOPs skipped and the drift of depth, confidence and poses
+relative to the run without reuse.
+
+    python benchmark_token_reuse.py --image_dir ./path_of_images --max_frames 300
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+import numpy as np
+import torch
+from loop_utils.config_utils import load_config
+
+from depth_anything_3.api import DepthAnything3
+from depth_anything_3.model.utils.token_cache import OverlapTokenCache
+
+
+def chunk_indices(num_frames, chunk_size, overlap):
+    if num_frames <= chunk_size:
+        return [(0, num_frames)]
+    step = chunk_size - overlap
+    num_chunks = (num_frames - overlap + step - 1) // step
+    return [(i * step, min(i * step + chunk_size, num_frames)) for i in range(num_chunks)]
+
+
+def run_chunks(model, img_list, chunks, mode, ref_view_strategy, dtype):
+    token_cache = OverlapTokenCache(mode) if mode != "none" else None
+    predictions = []
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start_time = time.perf_counter()
+    for k, (start, end) in enumerate(chunks):
+        if token_cache is not None:
+            keep = range(chunks[k + 1][0], end) if k + 1 < len(chunks) else []
+            token_cache.set_frames(range(start, end), keep)
+        with torch.no_grad(), torch.cuda.amp.autocast(dtype=dtype):
+            predictions.append(
+                model.inference(
+                    img_list[start:end],
+                    ref_view_strategy=ref_view_strategy,
+                    token_cache=token_cache,
+                )
+            )
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    elapsed = time.perf_counter() - start_time
+    stats = token_cache.get_stats() if token_cache is not None else None
+    return predictions, elapsed, stats
+
+
+def rotation_angle_deg(r1, r2):
+    r1, r2 = r1.astype(np.float64), r2.astype(np.float64)
+    cos = (np.trace(r1 @ r2.transpose(0, 2, 1), axis1=1, axis2=2) - 1.0) / 2.0
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def drift(predictions, reference):
+    """Relative depth / confidence error and pose error against the reference run."""
+    depth_err, conf_err, rot_err, trans_err = [], [], [], []
+    for pred, ref in zip(predictions, reference):
+        depth_err.append(np.abs(pred.depth - ref.depth) / np.maximum(ref.depth, 1e-6))
+        conf_err.append(np.abs(pred.conf - ref.conf) / np.maximum(np.abs(ref.conf), 1e-6))
+        rot_err.append(rotation_angle_deg(pred.extrinsics[:, :3, :3], ref.extrinsics[:, :3, :3]))
+        scale = np.linalg.norm(ref.extrinsics[:, :3, 3], axis=-1).mean() + 1e-6
+        trans_err.append(
+            np.linalg.norm(pred.extrinsics[:, :3, 3] - ref.extrinsics[:, :3, 3], axis=-1) / scale
+        )
+    depth_err = np.concatenate([e.ravel() for e in depth_err])
+    conf_err = np.concatenate([e.ravel() for e in conf_err])
+    return {
+        "depth_rel_mean": float(depth_err.mean()),
+        "depth_rel_p99": float(np.percentile(depth_err, 99)),
+        "conf_rel_mean": float(conf_err.mean()),
+        "rot_err_deg_max": float(np.concatenate(rot_err).max()),
+        "trans_rel_err_max": float(np.concatenate(trans_err).max()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DA3-Streaming overlap-token reuse benchmark")
+    parser.add_argument("--image_dir", type=str, required=True, help="Image path")
+    parser.add_argument(
+        "--config", type=str, default="./configs/base_config.yaml", help="Config path"
+    )
+    parser.add_argument("--max_frames", type=int, default=300, help="Frames to benchmark on")
+    parser.add_argument("--modes", type=str, default="prefix,local", help="Reuse modes to test")
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    img_list = sorted(
+        glob.glob(os.path.join(args.image_dir, "*.jpg"))
+        + glob.glob(os.path.join(args.image_dir, "*.png"))
+    )[: args.max_frames]
+    chunks = chunk_indices(
+        len(img_list), config["Model"]["chunk_size"], config["Model"]["overlap"]
+    )
+    ref_view_strategy = config["Model"]["ref_view_strategy"]
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    dtype = (
+        torch.bfloat16
+        if torch.cuda.is_available() and torch.cuda.get_device_capability()[0] >= 8
+        else torch.float16
+    )
+
+    with open(config["Weights"]["DA3_CONFIG"]) as f:
+        model = DepthAnything3.from_weights_file(config["Weights"]["DA3"], **json.load(f))
+    model = model.to(device)
+
+    print(f"{len(img_list)} frames, {len(chunks)} chunks")
+    # Warm-up on the first chunk so that the timings exclude one-off setup costs
+    run_chunks(model, img_list, chunks[:1], "none", ref_view_strategy, dtype)
+
+    reference, base_time, _ = run_chunks(
+        model, img_list, chunks, "none", ref_view_strategy, dtype
+    )
+    report = {"none": {"time": base_time}}
+    for mode in args.modes.split(","):
+        predictions, elapsed, stats = run_chunks(
+            model, img_list, chunks, mode, ref_view_strategy, dtype
+        )
+        report[mode] = {"time": elapsed, **stats, **drift(predictions, reference)}
+
+    print(
+        f"{'mode':<8} {'time (s)':>9} {'speedup':>8} {'saved TFLOPs':>13} {'saved %':>8} "
+        f"{'depth err':>10} {'depth p99':>10} {'rot err':>9} {'trans err':>10}"
+    )
+    for mode, row in report.items():
+        if mode == "none":
+            print(f"{mode:<8} {row['time']:>9.2f} {1.0:>8.2f}")
+            continue
+        print(
+            f"{mode:<8} {row['time']:>9.2f} {base_time / row['time']:>8.2f} "
+            f"{row['saved_flops'] / 1e12:>13.2f} {row['saved_fraction'] * 100:>8.1f} "
+            f"{row['depth_rel_mean']:>10.2e} {row['depth_rel_p99']:>10.2e} "
+            f"{row['rot_err_deg_max']:>9.3f} {row['trans_rel_err_max']:>10.2e}"
+        )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -21,15 +21,14 @@ import json
 import os
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 import torch
-from loop_utils.alignment_torch import (
-    apply_sim3_direct_torch,
-    depth_to_point_cloud_optimized_torch,
-)
+from loop_utils.alignment_torch import apply_sim3_direct_torch
+from loop_utils.chunk_store import ChunkStore
 from loop_utils.config_utils import load_config
 from loop_utils.loop_detector import LoopDetector
 from loop_utils.sim3loop import Sim3LoopOptimizer
@@ -37,78 +36,25 @@ from loop_utils.sim3utils import (
     accumulate_sim3_transforms,
     compute_sim3_ab,
     merge_ply_files,
+    ply_to_glb,
+    ply_to_tiles,
     precompute_scale_chunks_with_depth,
     process_loop_list,
     save_confident_pointcloud_batch,
     warmup_numba,
     weighted_align_point_maps,
 )
-from safetensors.torch import load_file
+from loop_utils.stage_timer import StageTimer
 
 from depth_anything_3.api import DepthAnything3
+from depth_anything_3.model.utils.token_cache import OverlapTokenCache
+from depth_anything_3.utils.io.input_processor import PreprocessCache
+from depth_anything_3.utils.io.prefetcher import PrefetchLoader
+from depth_anything_3.utils.unprojection import depth_to_world_points
 
 matplotlib.use("Agg")
 
 
-def depth_to_point_cloud_vectorized(depth, intrinsics, extrinsics, device=None):
-    """
-    depth: [N, H, W] numpy array or torch tensor
-    intrinsics: [N, 3, 3] numpy array or torch tensor
-    extrinsics: [N, 3, 4] (w2c) numpy array or torch tensor
-    Returns: point_cloud_world: [N, H, W, 3] same type as input
-    """
-    input_is_numpy = False
-    if isinstance(depth, np.ndarray):
-        input_is_numpy = True
-
-        depth_tensor = torch.tensor(depth, dtype=torch.float32)
-        intrinsics_tensor = torch.tensor(intrinsics, dtype=torch.float32)
-        extrinsics_tensor = torch.tensor(extrinsics, dtype=torch.float32)
-
-        if device is not None:
-            depth_tensor = depth_tensor.to(device)
-            intrinsics_tensor = intrinsics_tensor.to(device)
-            extrinsics_tensor = extrinsics_tensor.to(device)
-    else:
-        depth_tensor = depth
-        intrinsics_tensor = intrinsics
-        extrinsics_tensor = extrinsics
-
-    if device is not None:
-        depth_tensor = depth_tensor.to(device)
-        intrinsics_tensor = intrinsics_tensor.to(device)
-        extrinsics_tensor = extrinsics_tensor.to(device)
-
-    # main logic
-
-    N, H, W = depth_tensor.shape
-
-    device = depth_tensor.device
-
-    u = torch.arange(W, device=device).float().view(1, 1, W, 1).expand(N, H, W, 1)
-    v = torch.arange(H, device=device).float().view(1, H, 1, 1).expand(N, H, W, 1)
-    ones = torch.ones((N, H, W, 1), device=device)
-    pixel_coords = torch.cat([u, v, ones], dim=-1)
-
-    intrinsics_inv = torch.inverse(intrinsics_tensor)  # [N, 3, 3]
-    camera_coords = torch.einsum("nij,nhwj->nhwi", intrinsics_inv, pixel_coords)
-    camera_coords = camera_coords * depth_tensor.unsqueeze(-1)
-    camera_coords_homo = torch.cat([camera_coords, ones], dim=-1)
-
-    extrinsics_4x4 = torch.zeros(N, 4, 4, device=device)
-    extrinsics_4x4[:, :3, :4] = extrinsics_tensor
-    extrinsics_4x4[:, 3, 3] = 1.0
-
-    c2w = torch.inverse(extrinsics_4x4)
-    world_coords_homo = torch.einsum("nij,nhwj->nhwi", c2w, camera_coords_homo)
-    point_cloud_world = world_coords_homo[..., :3]
-
-    if input_is_numpy:
-        point_cloud_world = point_cloud_world.cpu().numpy()
-
-    return point_cloud_world
-
-
 def remove_duplicates(data_list):
     """
     data_list: [(67, (3386, 3406), 48, (2435, 2455)), ...]
@@ -152,28 +98,43 @@ class DA3_Streaming:
         self.result_aligned_dir = os.path.join(save_dir, "_tmp_results_aligned")
         self.result_loop_dir = os.path.join(save_dir, "_tmp_results_loop")
         self.result_output_dir = os.path.join(save_dir, "results_output")
+        self.preprocess_cache_dir = os.path.join(save_dir, "_tmp_preprocess_cache")
         self.pcd_dir = os.path.join(save_dir, "pcd")
         os.makedirs(self.result_unaligned_dir, exist_ok=True)
         os.makedirs(self.result_aligned_dir, exist_ok=True)
         os.makedirs(self.result_loop_dir, exist_ok=True)
         os.makedirs(self.pcd_dir, exist_ok=True)
+        self.unaligned_store = ChunkStore(self.result_unaligned_dir)
+        self.aligned_store = ChunkStore(self.result_aligned_dir)
+        self.loop_store = ChunkStore(self.result_loop_dir)
 
         self.all_camera_poses = []
         self.all_camera_intrinsics = []
 
         self.delete_temp_files = self.config["Model"]["delete_temp_files"]
+        self.stage_timer = StageTimer()
 
         print("Loading model...")
 
         with open(self.config["Weights"]["DA3_CONFIG"]) as f:
             config = json.load(f)
-        self.model = DepthAnything3(**config)
-        weight = load_file(self.config["Weights"]["DA3"])
-        self.model.load_state_dict(weight, strict=False)
-
-        self.model.eval()
+        self.model = DepthAnything3.from_weights_file(self.config["Weights"]["DA3"], **config)
         self.model = self.model.to(self.device)
 
+        # Overlapping and loop chunks share frames; preprocess each frame only once
+        cache_mb = self.config["Model"].get("preprocess_cache_mb", 0)
+        if cache_mb > 0:
+            spill_mb = self.config["Model"].get("preprocess_cache_spill_mb", 0)
+            self.model.input_processor.cache = PreprocessCache(
+                max_bytes=int(cache_mb * 1024**2),
+                spill_dir=self.preprocess_cache_dir if spill_mb > 0 else None,
+                max_spill_bytes=int(spill_mb * 1024**2),
+            )
+
+        # Per-view backbone tokens of the overlap frames are carried to the next chunk
+        reuse_mode = self.config["Model"].get("overlap_token_reuse", "none")
+        self.token_cache = OverlapTokenCache(reuse_mode) if reuse_mode != "none" else None
+
         self.skyseg_session = None
 
         self.chunk_indices = None  # [(begin_idx, end_idx), ...]
@@ -225,7 +186,7 @@ class DA3_Streaming:
             print(f"{global_idx}, ", end="")
 
             image = predictions.processed_images[local_idx]  # [H, W, 3] uint8
-            depth = predictions.depth[local_idx]  # [H, W] float32
+            depth = predictions.depth[local_idx] * s  # [H, W] float32
             conf = predictions.conf[local_idx]  # [H, W] float32
             intrinsics = predictions.intrinsics[local_idx]  # [3, 3] float32
 
@@ -250,7 +211,9 @@ class DA3_Streaming:
                 )
         print("")
 
-    def process_single_chunk(self, range_1, chunk_idx=None, range_2=None, is_loop=False):
+    def process_single_chunk(
+        self, range_1, chunk_idx=None, range_2=None, is_loop=False, prepared=None
+    ):
         start_idx, end_idx = range_1
         chunk_image_paths = self.img_list[start_idx:end_idx]
         if range_2 is not None:
@@ -264,13 +227,30 @@ class DA3_Streaming:
             "ref_view_strategy" if not is_loop else "ref_view_strategy_loop"
         ]
 
+        token_cache = None
+        if self.token_cache is not None and not is_loop and range_2 is None:
+            token_cache = self.token_cache
+            next_chunk = (
+                self.chunk_indices[chunk_idx + 1]
+                if chunk_idx + 1 < len(self.chunk_indices)
+                else None
+            )
+            token_cache.set_frames(
+                range(*range_1), range(next_chunk[0], range_1[1]) if next_chunk else []
+            )
+
         torch.cuda.empty_cache()
         with torch.no_grad():
             with torch.cuda.amp.autocast(dtype=self.dtype):
                 images = chunk_image_paths
                 # images: ['xxx.png', 'xxx.png', ...]
 
-                predictions = self.model.inference(images, ref_view_strategy=ref_view_strategy)
+                predictions = self.model.inference(
+                    images,
+                    ref_view_strategy=ref_view_strategy,
+                    prepared=prepared,
+                    token_cache=token_cache,
+                )
 
                 predictions.depth = np.squeeze(predictions.depth)
                 predictions.conf -= 1.0
@@ -284,15 +264,13 @@ class DA3_Streaming:
 
         # Save predictions to disk instead of keeping in memory
         if is_loop:
-            save_dir = self.result_loop_dir
-            filename = f"loop_{range_1[0]}_{range_1[1]}_{range_2[0]}_{range_2[1]}.npy"
+            store = self.loop_store
+            name = f"loop_{range_1[0]}_{range_1[1]}_{range_2[0]}_{range_2[1]}"
         else:
             if chunk_idx is None:
                 raise ValueError("chunk_idx must be provided when is_loop is False")
-            save_dir = self.result_unaligned_dir
-            filename = f"chunk_{chunk_idx}.npy"
-
-        save_path = os.path.join(save_dir, filename)
+            store = self.unaligned_store
+            name = f"chunk_{chunk_idx}"
 
         if not is_loop and range_2 is None:
             extrinsics = predictions.extrinsics
@@ -301,7 +279,7 @@ class DA3_Streaming:
             self.all_camera_poses.append((chunk_range, extrinsics))
             self.all_camera_intrinsics.append((chunk_range, intrinsics))
 
-        np.save(save_path, predictions)
+        store.save_prediction(name, predictions)
 
         return predictions
 
@@ -363,6 +341,45 @@ class DA3_Streaming:
 
         return s, R, t
 
+    def align_adjacent_chunks(self, chunk_data1, chunk_data2):
+        """Sim(3) mapping chunk 2 onto chunk 1, estimated on their overlap frames."""
+        # Only the overlap frames take part in the alignment
+        point_map1 = depth_to_world_points(
+            chunk_data1.depth[-self.overlap :],
+            chunk_data1.intrinsics[-self.overlap :],
+            chunk_data1.extrinsics[-self.overlap :],
+        )
+        point_map2 = depth_to_world_points(
+            chunk_data2.depth[: self.overlap],
+            chunk_data2.intrinsics[: self.overlap],
+            chunk_data2.extrinsics[: self.overlap],
+        )
+        conf1 = chunk_data1.conf[-self.overlap :]
+        conf2 = chunk_data2.conf[: self.overlap]
+
+        if self.config["Model"]["align_method"] == "scale+se3":
+            chunk1_depth = np.squeeze(chunk_data1.depth[-self.overlap :])
+            chunk2_depth = np.squeeze(chunk_data2.depth[: self.overlap])
+            chunk1_depth_conf = np.squeeze(chunk_data1.conf[-self.overlap :])
+            chunk2_depth_conf = np.squeeze(chunk_data2.conf[: self.overlap])
+        else:
+            chunk1_depth = None
+            chunk2_depth = None
+            chunk1_depth_conf = None
+            chunk2_depth_conf = None
+
+        s, R, t = self.align_2pcds(
+            point_map1,
+            conf1,
+            point_map2,
+            conf2,
+            chunk1_depth,
+            chunk2_depth,
+            chunk1_depth_conf,
+            chunk2_depth_conf,
+        )
+        return s, R, t
+
     def get_loop_sim3_from_loop_predict(self, loop_predict_list):
         loop_sim3_list = []
         for item in loop_predict_list:
@@ -371,7 +388,7 @@ class DA3_Streaming:
             chunk_a_range = item[0][1]
             chunk_b_range = item[0][3]
 
-            point_map_loop_org = depth_to_point_cloud_vectorized(
+            point_map_loop_org = depth_to_world_points(
                 item[1].depth, item[1].intrinsics, item[1].extrinsics
             )
 
@@ -393,22 +410,20 @@ class DA3_Streaming:
             print(self.chunk_indices[chunk_idx_a])
             print(chunk_a_range)
             print(chunk_a_rela_begin, chunk_a_rela_end)
-            chunk_data_a = np.load(
-                os.path.join(self.result_unaligned_dir, f"chunk_{chunk_idx_a}.npy"),
-                allow_pickle=True,
-            ).item()
-
-            point_map_a = depth_to_point_cloud_vectorized(
-                chunk_data_a.depth, chunk_data_a.intrinsics, chunk_data_a.extrinsics
+            # Only the frames matching the loop chunk are read from disk
+            chunk_data_a = self.unaligned_store.load(f"chunk_{chunk_idx_a}")
+            depth_a = chunk_data_a.frames("depth", chunk_a_rela_begin, chunk_a_rela_end)
+            conf_a = chunk_data_a.frames("conf", chunk_a_rela_begin, chunk_a_rela_end)
+
+            point_map_a = depth_to_world_points(
+                depth_a,
+                chunk_data_a.frames("intrinsics", chunk_a_rela_begin, chunk_a_rela_end),
+                chunk_data_a.frames("extrinsics", chunk_a_rela_begin, chunk_a_rela_end),
             )
-            point_map_a = point_map_a[chunk_a_rela_begin:chunk_a_rela_end]
-            conf_a = chunk_data_a.conf[chunk_a_rela_begin:chunk_a_rela_end]
 
             if self.config["Model"]["align_method"] == "scale+se3":
-                chunk_a_depth = np.squeeze(chunk_data_a.depth[chunk_a_rela_begin:chunk_a_rela_end])
-                chunk_a_depth_conf = np.squeeze(
-                    chunk_data_a.conf[chunk_a_rela_begin:chunk_a_rela_end]
-                )
+                chunk_a_depth = np.squeeze(depth_a)
+                chunk_a_depth_conf = np.squeeze(conf_a)
                 chunk_a_loop_depth = np.squeeze(item[1].depth[chunk_a_s:chunk_a_e])
                 chunk_a_loop_depth_conf = np.squeeze(item[1].conf[chunk_a_s:chunk_a_e])
             else:
@@ -435,22 +450,20 @@ class DA3_Streaming:
             print(self.chunk_indices[chunk_idx_b])
             print(chunk_b_range)
             print(chunk_b_rela_begin, chunk_b_rela_end)
-            chunk_data_b = np.load(
-                os.path.join(self.result_unaligned_dir, f"chunk_{chunk_idx_b}.npy"),
-                allow_pickle=True,
-            ).item()
-
-            point_map_b = depth_to_point_cloud_vectorized(
-                chunk_data_b.depth, chunk_data_b.intrinsics, chunk_data_b.extrinsics
+            # Only the frames matching the loop chunk are read from disk
+            chunk_data_b = self.unaligned_store.load(f"chunk_{chunk_idx_b}")
+            depth_b = chunk_data_b.frames("depth", chunk_b_rela_begin, chunk_b_rela_end)
+            conf_b = chunk_data_b.frames("conf", chunk_b_rela_begin, chunk_b_rela_end)
+
+            point_map_b = depth_to_world_points(
+                depth_b,
+                chunk_data_b.frames("intrinsics", chunk_b_rela_begin, chunk_b_rela_end),
+                chunk_data_b.frames("extrinsics", chunk_b_rela_begin, chunk_b_rela_end),
             )
-            point_map_b = point_map_b[chunk_b_rela_begin:chunk_b_rela_end]
-            conf_b = chunk_data_b.conf[chunk_b_rela_begin:chunk_b_rela_end]
 
             if self.config["Model"]["align_method"] == "scale+se3":
-                chunk_b_depth = np.squeeze(chunk_data_b.depth[chunk_b_rela_begin:chunk_b_rela_end])
-                chunk_b_depth_conf = np.squeeze(
-                    chunk_data_b.conf[chunk_b_rela_begin:chunk_b_rela_end]
-                )
+                chunk_b_depth = np.squeeze(depth_b)
+                chunk_b_depth_conf = np.squeeze(conf_b)
                 chunk_b_loop_depth = np.squeeze(item[1].depth[chunk_b_s:chunk_b_e])
                 chunk_b_loop_depth_conf = np.squeeze(item[1].conf[chunk_b_s:chunk_b_e])
             else:
@@ -520,6 +533,18 @@ class DA3_Streaming:
         plt.savefig(save_path, dpi=300, bbox_inches="tight")
         plt.close()
 
+    def print_preprocess_cache_stats(self):
+        cache = self.model.input_processor.cache
+        if cache is None:
+            return
+        stats = cache.get_stats()
+        print(
+            f"Preprocess cache: {stats['hits']} hits, {stats['spill_hits']} spill hits, "
+            f"{stats['misses']} misses ({stats['hit_rate'] * 100:.0f}% hit rate), "
+            f"{stats['memory_bytes'] / 1024**2:.0f} MiB in memory, "
+            f"{stats['spill_bytes'] / 1024**2:.0f} MiB spilled"
+        )
+
     def process_long_sequence(self):
         if self.overlap >= self.chunk_size:
             raise ValueError(
@@ -534,60 +559,84 @@ class DA3_Streaming:
                 chunks of size {self.chunk_size} with {self.overlap} overlap"
         )
 
+        # Decode and upload the next chunks while the current one runs
+        loader = PrefetchLoader(
+            (self.img_list[start:end] for start, end in self.chunk_indices),
+            self.model.input_processor,
+            self.device,
+            prefetch=self.config["Model"].get("prefetch_chunks", 2),
+        )
+
+        # Pairwise alignment runs in order on one worker thread while the next chunks are
+        # inferred; exports (unprojection, PLY, npz) run on a small thread pool. Without
+        # loop closure a chunk's final Sim(3) is known once it is aligned, so its export
+        # starts right away; otherwise exports wait for the loop optimisation.
+        timer = self.stage_timer
+        pipelined_export = not self.loop_enable
+        align_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="da3-align")
+        export_executor = ThreadPoolExecutor(
+            max_workers=self.config["Model"].get("export_workers", 2),
+            thread_name_prefix="da3-export",
+        )
+        align_futures, export_futures = [], []
+        cumulative_sim3 = [(1.0, np.eye(3), np.zeros(3))]
+
+        def align_job(chunk_idx, chunk_data1, chunk_data2):
+            print(f"Aligning {chunk_idx-1} and {chunk_idx} (Total {len(self.chunk_indices)-1})")
+            with timer.stage("align"):
+                s, R, t = self.align_adjacent_chunks(chunk_data1, chunk_data2)
+            if pipelined_export:
+                cumulative = accumulate_sim3_transforms([cumulative_sim3[-1], (s, R, t)])[-1]
+                cumulative_sim3.append(cumulative)
+                export_futures.append(
+                    export_executor.submit(self.apply_alignment, chunk_idx, *cumulative_sim3[-1])
+                )
+            return s, R, t
+
         pre_predictions = None
-        for chunk_idx in range(len(self.chunk_indices)):
+        for chunk_idx, prepared in enumerate(loader):
             print(f"[Progress]: {chunk_idx}/{len(self.chunk_indices)}")
-            cur_predictions = self.process_single_chunk(
-                self.chunk_indices[chunk_idx], chunk_idx=chunk_idx
-            )
-            torch.cuda.empty_cache()
-
-            if chunk_idx > 0:
-                print(
-                    f"Aligning {chunk_idx-1} and {chunk_idx} (Total {len(self.chunk_indices)-1})"
+            with timer.stage("inference"):
+                cur_predictions = self.process_single_chunk(
+                    self.chunk_indices[chunk_idx], chunk_idx=chunk_idx, prepared=prepared
                 )
-                chunk_data1 = pre_predictions
-                chunk_data2 = cur_predictions
+            torch.cuda.empty_cache()
 
-                point_map1 = depth_to_point_cloud_vectorized(
-                    chunk_data1.depth, chunk_data1.intrinsics, chunk_data1.extrinsics
+            if chunk_idx == 0 and pipelined_export:
+                export_futures.append(
+                    export_executor.submit(self.apply_alignment, 0, 1.0, np.eye(3), np.zeros(3))
                 )
-                point_map2 = depth_to_point_cloud_vectorized(
-                    chunk_data2.depth, chunk_data2.intrinsics, chunk_data2.extrinsics
+            if chunk_idx > 0:
+                # Bound the number of chunk pairs held in memory by pending alignments
+                if len(align_futures) >= 2:
+                    align_futures[-2].result()
+                align_futures.append(
+                    align_executor.submit(
+                        align_job, chunk_idx, pre_predictions, cur_predictions
+                    )
                 )
 
-                point_map1 = point_map1[-self.overlap :]
-                point_map2 = point_map2[: self.overlap]
-                conf1 = chunk_data1.conf[-self.overlap :]
-                conf2 = chunk_data2.conf[: self.overlap]
+            pre_predictions = cur_predictions
 
-                if self.config["Model"]["align_method"] == "scale+se3":
-                    chunk1_depth = np.squeeze(chunk_data1.depth[-self.overlap :])
-                    chunk2_depth = np.squeeze(chunk_data2.depth[: self.overlap])
-                    chunk1_depth_conf = np.squeeze(chunk_data1.conf[-self.overlap :])
-                    chunk2_depth_conf = np.squeeze(chunk_data2.conf[: self.overlap])
-                else:
-                    chunk1_depth = None
-                    chunk2_depth = None
-                    chunk1_depth_conf = None
-                    chunk2_depth_conf = None
-
-                s, R, t = self.align_2pcds(
-                    point_map1,
-                    conf1,
-                    point_map2,
-                    conf2,
-                    chunk1_depth,
-                    chunk2_depth,
-                    chunk1_depth_conf,
-                    chunk2_depth_conf,
-                )
-                self.sim3_list.append((s, R, t))
+        pre_predictions = cur_predictions = None
+        self.sim3_list = [future.result() for future in align_futures]
+        align_executor.shutdown()
 
-            pre_predictions = cur_predictions
+        loader.log_stats()
+        self.print_preprocess_cache_stats()
+        if self.token_cache is not None:
+            stats = self.token_cache.get_stats()
+            print(
+                f"Overlap token reuse ({self.token_cache.mode}): {stats['reused_frames']}/"
+                f"{stats['frames']} frames reused, saved {stats['saved_flops'] / 1e12:.1f} of "
+                f"{stats['backbone_flops'] / 1e12:.1f} backbone TFLOPs "
+                f"({stats['saved_fraction'] * 100:.1f}%)"
+            )
+            self.token_cache.reset()
 
         if self.loop_enable:
-            self.loop_list = self.get_loop_pairs()
+            with timer.stage("loop_detection"):
+                self.loop_list = self.get_loop_pairs()
             del self.loop_detector  # Save GPU Memory
 
             torch.cuda.empty_cache()
@@ -602,14 +651,19 @@ class DA3_Streaming:
             print(loop_results)
             # return e.g. (31, (1574, 1594), 2, (129, 149))
             for item in loop_results:
-                single_chunk_predictions = self.process_single_chunk(
-                    item[1], range_2=item[3], is_loop=True
-                )
+                with timer.stage("loop_inference"):
+                    single_chunk_predictions = self.process_single_chunk(
+                        item[1], range_2=item[3], is_loop=True
+                    )
 
                 self.loop_predict_list.append((item, single_chunk_predictions))
                 print(item)
 
-            self.loop_sim3_list = self.get_loop_sim3_from_loop_predict(self.loop_predict_list)
+            self.print_preprocess_cache_stats()
+            with timer.stage("loop_align"):
+                self.loop_sim3_list = self.get_loop_sim3_from_loop_predict(
+                    self.loop_predict_list
+                )
 
             input_abs_poses = self.loop_optimizer.sequential_to_absolute_poses(
                 self.sim3_list
@@ -625,78 +679,75 @@ class DA3_Streaming:
 
         print("Apply alignment")
         self.sim3_list = accumulate_sim3_transforms(self.sim3_list)
-        for chunk_idx in range(len(self.chunk_indices) - 1):
-            print(f"Applying {chunk_idx+1} -> {chunk_idx} (Total {len(self.chunk_indices)-1})")
-            s, R, t = self.sim3_list[chunk_idx]
+        if not pipelined_export:
+            for chunk_idx in range(len(self.chunk_indices)):
+                if chunk_idx == 0:
+                    s, R, t = 1.0, np.eye(3), np.zeros(3)
+                else:
+                    s, R, t = self.sim3_list[chunk_idx - 1]
+                export_futures.append(
+                    export_executor.submit(self.apply_alignment, chunk_idx, s, R, t)
+                )
+        for future in export_futures:
+            future.result()
+        export_executor.shutdown()
 
-            chunk_data = np.load(
-                os.path.join(self.result_unaligned_dir, f"chunk_{chunk_idx+1}.npy"),
-                allow_pickle=True,
-            ).item()
+        self.save_camera_poses()
 
-            aligned_chunk_data = {}
+        self.stage_timer.report()
+        print("Done.")
 
-            aligned_chunk_data["world_points"] = depth_to_point_cloud_optimized_torch(
-                chunk_data.depth, chunk_data.intrinsics, chunk_data.extrinsics
-            )
-            aligned_chunk_data["world_points"] = apply_sim3_direct_torch(
-                aligned_chunk_data["world_points"], s, R, t
-            )
+    def apply_alignment(self, chunk_idx, s, R, t, frame_batch=16):
+        """
+        Move a chunk into the frame of chunk 0 and write its aligned point cloud.
 
-            aligned_chunk_data["conf"] = chunk_data.conf
-            aligned_chunk_data["images"] = chunk_data.processed_images
-
-            aligned_path = os.path.join(self.result_aligned_dir, f"chunk_{chunk_idx+1}.npy")
-            np.save(aligned_path, aligned_chunk_data)
-
-            if chunk_idx == 0:
-                chunk_data_first = np.load(
-                    os.path.join(self.result_unaligned_dir, "chunk_0.npy"), allow_pickle=True
-                ).item()
-                np.save(os.path.join(self.result_aligned_dir, "chunk_0.npy"), chunk_data_first)
-                points_first = depth_to_point_cloud_vectorized(
-                    chunk_data_first.depth,
-                    chunk_data_first.intrinsics,
-                    chunk_data_first.extrinsics,
-                )
-                colors_first = chunk_data_first.processed_images
-                confs_first = chunk_data_first.conf
-                ply_path_first = os.path.join(self.pcd_dir, "0_pcd.ply")
-                save_confident_pointcloud_batch(
-                    points=points_first,  # shape: (H, W, 3)
-                    colors=colors_first,  # shape: (H, W, 3)
-                    confs=confs_first,  # shape: (H, W)
-                    output_path=ply_path_first,
-                    conf_threshold=np.mean(confs_first)
-                    * self.config["Model"]["Pointcloud_Save"]["conf_threshold_coef"],
-                    sample_ratio=self.config["Model"]["Pointcloud_Save"]["sample_ratio"],
+        Frames are streamed from the unaligned store in batches of ``frame_batch``; world
+        points, confidences and colours go to a memmapped chunk of the aligned store, from
+        which the PLY writer reads one frame at a time.
+        """
+        chunk_data = self.unaligned_store.load(f"chunk_{chunk_idx}")
+        n, h, w = chunk_data.depth.shape
+        aligned = self.aligned_store.create(
+            f"chunk_{chunk_idx}",
+            {
+                "world_points": ((n, h, w, 3), np.float32),
+                "conf": ((n, h, w), chunk_data.conf.dtype),
+                "images": ((n, h, w, 3), np.uint8),
+            },
+            meta={"s": float(s), "R": np.asarray(R).tolist(), "t": np.asarray(t).tolist()},
+        )
+        with self.stage_timer.stage("unproject"):
+            for begin in range(0, n, frame_batch):
+                end = min(begin + frame_batch, n)
+                world_points = depth_to_world_points(
+                    chunk_data.frames("depth", begin, end),
+                    chunk_data.frames("intrinsics", begin, end),
+                    chunk_data.frames("extrinsics", begin, end),
                 )
-                if self.config["Model"]["save_depth_conf_result"]:
-                    predictions = chunk_data_first
-                    self.save_depth_conf_result(predictions, 0, 1, np.eye(3), np.array([0, 0, 0]))
-
-            points = aligned_chunk_data["world_points"].reshape(-1, 3)
-            colors = (aligned_chunk_data["images"].reshape(-1, 3)).astype(np.uint8)
-            confs = aligned_chunk_data["conf"].reshape(-1)
-            ply_path = os.path.join(self.pcd_dir, f"{chunk_idx+1}_pcd.ply")
+                if chunk_idx > 0:
+                    world_points = apply_sim3_direct_torch(world_points, s, R, t)
+                aligned["world_points"][begin:end] = world_points
+                aligned["conf"][begin:end] = chunk_data.conf[begin:end]
+                aligned["images"][begin:end] = chunk_data.processed_images[begin:end]
+            self.aligned_store.commit(f"chunk_{chunk_idx}")
+
+        with self.stage_timer.stage("ply"):
+            confs = aligned["conf"]
+            ply_path = os.path.join(self.pcd_dir, f"{chunk_idx}_pcd.ply")
             save_confident_pointcloud_batch(
-                points=points,  # shape: (H, W, 3)
-                colors=colors,  # shape: (H, W, 3)
-                confs=confs,  # shape: (H, W)
+                points=aligned["world_points"],  # shape: (N, H, W, 3)
+                colors=aligned["images"],  # shape: (N, H, W, 3)
+                confs=confs,  # shape: (N, H, W)
                 output_path=ply_path,
                 conf_threshold=np.mean(confs)
                 * self.config["Model"]["Pointcloud_Save"]["conf_threshold_coef"],
                 sample_ratio=self.config["Model"]["Pointcloud_Save"]["sample_ratio"],
+                voxel_size=self.config["Model"]["Pointcloud_Save"].get("voxel_size", 0.0),
             )
 
-            if self.config["Model"]["save_depth_conf_result"]:
-                predictions = chunk_data
-                predictions.depth *= s
-                self.save_depth_conf_result(predictions, chunk_idx + 1, s, R, t)
-
-        self.save_camera_poses()
-
-        print("Done.")
+        if self.config["Model"]["save_depth_conf_result"]:
+            with self.stage_timer.stage("depth_conf_npz"):
+                self.save_depth_conf_result(chunk_data, chunk_idx, s, R, t)
 
     def run(self):
         print(f"Loading images from {self.img_dir}...")
@@ -829,31 +880,16 @@ class DA3_Streaming:
         ~35 GiB for 2700-frame KITTI 05,
         or ~5 GiB for 300-frame short seq.
         """
+        if self.model.input_processor.cache is not None:
+            self.model.input_processor.cache.clear()
+
         if not self.delete_temp_files:
             return
 
         total_space = 0
-
-        print(f"Deleting the temp files under {self.result_unaligned_dir}")
-        for filename in os.listdir(self.result_unaligned_dir):
-            file_path = os.path.join(self.result_unaligned_dir, filename)
-            if os.path.isfile(file_path):
-                total_space += os.path.getsize(file_path)
-                os.remove(file_path)
-
-        print(f"Deleting the temp files under {self.result_aligned_dir}")
-        for filename in os.listdir(self.result_aligned_dir):
-            file_path = os.path.join(self.result_aligned_dir, filename)
-            if os.path.isfile(file_path):
-                total_space += os.path.getsize(file_path)
-                os.remove(file_path)
-
-        print(f"Deleting the temp files under {self.result_loop_dir}")
-        for filename in os.listdir(self.result_loop_dir):
-            file_path = os.path.join(self.result_loop_dir, filename)
-            if os.path.isfile(file_path):
-                total_space += os.path.getsize(file_path)
-                os.remove(file_path)
+        for store in (self.unaligned_store, self.aligned_store, self.loop_store):
+            print(f"Deleting the temp files under {store.root}")
+            total_space += store.clear()
         print("Deleting temp files done.")
 
         print(f"Saved disk space: {total_space/1024/1024/1024:.4f} GiB")
@@ -922,6 +958,14 @@ if __name__ == "__main__":
     all_ply_path = os.path.join(save_dir, "pcd/combined_pcd.ply")
     input_dir = os.path.join(save_dir, "pcd")
     print("Saving all the point clouds")
-    merge_ply_files(input_dir, all_ply_path)
+    merge_ply_files(
+        input_dir,
+        all_ply_path,
+        voxel_size=config["Model"]["Pointcloud_Save"].get("voxel_size", 0.0),
+    )
+    if config["Model"]["Pointcloud_Save"].get("export_glb", False):
+        ply_to_glb(all_ply_path, os.path.join(save_dir, "pcd/combined_pcd.glb"))
+    if config["Model"]["Pointcloud_Save"].get("export_tiles", False):
+        ply_to_tiles(all_ply_path, os.path.join(save_dir, "pcd/tiles"))
     print("DA3-Streaming done.")
     sys.exit()
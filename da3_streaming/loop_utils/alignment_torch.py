@@ -253,60 +253,6 @@ def apply_sim3_direct_torch(point_maps, s, R, t, device=None):
     return transformed
 
 
-def depth_to_point_cloud_optimized_torch(depth, intrinsics, extrinsics, device=None):
-
-    input_is_numpy = isinstance(depth, np.ndarray)
-
-    if input_is_numpy:
-        depth_tensor = torch.from_numpy(depth).float()
-        intrinsics_tensor = torch.from_numpy(intrinsics).float()
-        extrinsics_tensor = torch.from_numpy(extrinsics).float()
-    else:
-        depth_tensor = depth
-        intrinsics_tensor = intrinsics
-        extrinsics_tensor = extrinsics
-
-    if device is not None:
-        depth_tensor = depth_tensor.to(device)
-        intrinsics_tensor = intrinsics_tensor.to(device)
-        extrinsics_tensor = extrinsics_tensor.to(device)
-
-    N, H, W = depth_tensor.shape
-    device = depth_tensor.device
-
-    u = torch.arange(W, device=device, dtype=torch.float32).view(1, 1, W)
-    v = torch.arange(H, device=device, dtype=torch.float32).view(1, H, 1)
-
-    u_expanded = u.expand(N, H, W)
-    v_expanded = v.expand(N, H, W)
-
-    ones = torch.ones((N, H, W), device=device)
-    pixel_coords = torch.stack([u_expanded, v_expanded, ones], dim=-1)  # [N, H, W, 3]
-
-    intrinsics_inv = torch.inverse(intrinsics_tensor)  # [N, 3, 3]
-
-    camera_coords = torch.einsum("nij,nhwj->nhwi", intrinsics_inv, pixel_coords)
-
-    camera_coords = camera_coords * depth_tensor.unsqueeze(-1)  # [N, H, W, 3]
-
-    camera_coords_homo = torch.cat(
-        [camera_coords, torch.ones((N, H, W, 1), device=device)], dim=-1
-    )
-
-    extrinsics_4x4 = torch.zeros(N, 4, 4, device=device)
-    extrinsics_4x4[:, :3, :4] = extrinsics_tensor
-    extrinsics_4x4[:, 3, 3] = 1.0
-
-    c2w = torch.inverse(extrinsics_4x4)  # [N, 4, 4]
-
-    world_coords_homo = torch.einsum("nij,nhwj->nhwi", c2w, camera_coords_homo)
-    point_cloud_world = world_coords_homo[..., :3]  # [N, H, W, 3]
-
-    if input_is_numpy:
-        return point_cloud_world.cpu().numpy()
-    return point_cloud_world
-
-
 def warmup_torch():
 
     print("\nWarming up PyTorch alignment...")
@@ -0,0 +1,182 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Columnar on-disk store for per-chunk predictions.
+
+Each chunk is a directory holding one raw array file per field (depth, conf, images,
+...) and a ``manifest.json`` with their dtypes and shapes. Fields are read back through
+``np.memmap``, so consumers only page in the frames they touch instead of unpickling
+whole chunks.
+
+    store = ChunkStore("/tmp/chunks")
+    store.save_prediction("chunk_0", prediction)
+    chunk = store.load("chunk_0")
+    depth = chunk.frames("depth", 10, 20)  # (10, H, W), read from disk
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+
+PREDICTION_FIELDS = ("depth", "conf", "processed_images", "extrinsics", "intrinsics")
+MANIFEST = "manifest.json"
+
+
+class StoredChunk:
+    """Read-only view of a stored chunk; fields are available as memmapped attributes."""
+
+    def __init__(self, arrays, meta):
+        self._arrays = arrays
+        self.meta = meta
+
+    def __getattr__(self, name):
+        arrays = self.__dict__.get("_arrays", {})
+        if name in arrays:
+            return arrays[name]
+        raise AttributeError(name)
+
+    def __contains__(self, name):
+        return name in self._arrays
+
+    def keys(self):
+        return self._arrays.keys()
+
+    def __len__(self):
+        return len(next(iter(self._arrays.values())))
+
+    def frames(self, name, start=0, end=None):
+        """In-memory copy of frames ``start:end`` of a field."""
+        return np.array(self._arrays[name][start:end])
+
+
+class ChunkStore:
+    """
+    Directory of chunks stored as raw arrays plus a JSON manifest.
+
+    Args:
+        root: Directory holding one sub-directory per chunk
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # Chunks allocated by create() and not committed yet: name -> (memmaps, fields, meta)
+        self._pending = {}
+
+    def _dir(self, name):
+        return os.path.join(self.root, name)
+
+    def _write_manifest(self, name, fields, meta):
+        manifest = {"fields": fields, "meta": meta or {}}
+        tmp_path = os.path.join(self._dir(name), MANIFEST + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(self._dir(name), MANIFEST))
+
+    def save(self, name, arrays, meta=None):
+        """Write a chunk from a dict of arrays (None values are skipped)."""
+        os.makedirs(self._dir(name), exist_ok=True)
+        fields = {}
+        for key, array in arrays.items():
+            if array is None:
+                continue
+            array = np.ascontiguousarray(array)
+            array.tofile(os.path.join(self._dir(name), f"{key}.bin"))
+            fields[key] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+        # Written last, so a chunk without a manifest is known to be incomplete
+        self._write_manifest(name, fields, meta)
+
+    def save_prediction(self, name, prediction, meta=None):
+        """Write the fields of a Prediction used by the streaming pipeline."""
+        self.save(
+            name, {key: getattr(prediction, key, None) for key in PREDICTION_FIELDS}, meta
+        )
+
+    def create(self, name, specs, meta=None):
+        """
+        Allocate a chunk to be filled in place.
+
+        Args:
+            name: Chunk name
+            specs: Mapping field -> (shape, dtype)
+            meta: Optional JSON-serialisable metadata
+
+        Returns:
+            Dict of writable memmaps; call :meth:`commit` once they are filled
+        """
+        os.makedirs(self._dir(name), exist_ok=True)
+        # A stale manifest would mark the chunk complete while it is being refilled
+        if self.exists(name):
+            os.remove(os.path.join(self._dir(name), MANIFEST))
+        arrays, fields = {}, {}
+        for key, (shape, dtype) in specs.items():
+            dtype = np.dtype(dtype)
+            arrays[key] = np.memmap(
+                os.path.join(self._dir(name), f"{key}.bin"),
+                dtype=dtype,
+                mode="w+",
+                shape=tuple(shape),
+            )
+            fields[key] = {"dtype": dtype.str, "shape": list(shape)}
+        self._pending[name] = (arrays, fields, meta)
+        return arrays
+
+    def commit(self, name):
+        """Flush the memmaps of a chunk allocated by :meth:`create`, then write its manifest."""
+        arrays, fields, meta = self._pending.pop(name)
+        for array in arrays.values():
+            array.flush()
+        self._write_manifest(name, fields, meta)
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self._dir(name), MANIFEST))
+
+    def load(self, name, keys=None):
+        """Open a chunk; fields are read-only memmaps."""
+        with open(os.path.join(self._dir(name), MANIFEST)) as f:
+            manifest = json.load(f)
+        arrays = {}
+        for key, field in manifest["fields"].items():
+            if keys is not None and key not in keys:
+                continue
+            shape = tuple(field["shape"])
+            if 0 in shape:
+                arrays[key] = np.empty(shape, dtype=field["dtype"])
+                continue
+            arrays[key] = np.memmap(
+                os.path.join(self._dir(name), f"{key}.bin"),
+                dtype=np.dtype(field["dtype"]),
+                mode="r",
+                shape=shape,
+            )
+        return StoredChunk(arrays, manifest["meta"])
+
+    def nbytes(self):
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in filenames)
+        return total
+
+    def clear(self):
+        """Delete all chunks; returns the number of bytes freed."""
+        total = self.nbytes()
+        for name in os.listdir(self.root):
+            path = self._dir(name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        return total
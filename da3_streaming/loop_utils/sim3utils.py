@@ -24,6 +24,10 @@ from loop_utils.alignment_triton import robust_weighted_estimate_sim3_triton
 from numba import njit
 from sklearn.linear_model import LinearRegression, RANSACRegressor
 
+from depth_anything_3.utils.export.stream_writers import StreamingGLBWriter, StreamingPLYWriter
+from depth_anything_3.utils.export.tiles import build_octree_tiles
+from depth_anything_3.utils.voxel_grid import VoxelGridReducer
+
 
 def accumulate_sim3_transforms(transforms):
     """
@@ -235,7 +239,14 @@ def save_confident_pointcloud(
 
 
 def save_confident_pointcloud_batch(
-    points, colors, confs, output_path, conf_threshold, sample_ratio=1.0, batch_size=1000000
+    points,
+    colors,
+    confs,
+    output_path,
+    conf_threshold,
+    sample_ratio=1.0,
+    batch_size=1000000,
+    voxel_size=None,
 ):
     """
     - points: np.ndarray,  (b, H, W, 3) / (N, 3)
@@ -243,8 +254,12 @@ def save_confident_pointcloud_batch(
     - confs: np.ndarray,  (b, H, W) / (N,)
     - output_path: str
     - conf_threshold: float,
-    - sample_ratio: float (0 < sample_ratio <= 1.0)
+    - sample_ratio: float (0 < sample_ratio <= 1.0), ignored when voxel_size is set
     - batch_size: int
+    - voxel_size: float, optional; merge confident points into voxels of this size
+      (confidence-weighted centroids, mean colours) instead of random sampling; the
+      per-voxel weights and point counts are saved next to the PLY (voxel_stats_path)
+      so merge_ply_files can weight the centroids
     """
     if points.ndim == 2:
         b = 1
@@ -256,21 +271,24 @@ def save_confident_pointcloud_batch(
     else:
         raise ValueError("Unsupported points dimension. Must be 2 (N,3) or 4 (b,H,W,3)")
 
-    total_valid = 0
-    for i in range(b):
-        cfs = confs[i].reshape(-1)
-        total_valid += np.count_nonzero((cfs >= conf_threshold) & (cfs > 1e-5))
-
-    num_samples = int(total_valid * sample_ratio) if sample_ratio < 1.0 else total_valid
-
-    if num_samples == 0:
-        save_ply(np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.uint8), output_path)
+    if voxel_size:
+        reducer = VoxelGridReducer(voxel_size, chunk_size=batch_size)
+        for i in range(b):
+            cfs = confs[i].reshape(-1).astype(np.float32)
+            mask = (cfs >= conf_threshold) & (cfs > 1e-5)
+            reducer.add(
+                points[i].reshape(-1, 3)[mask].astype(np.float32),
+                colors[i].reshape(-1, 3)[mask].astype(np.uint8),
+                cfs[mask],
+            )
+        grid = reducer.result()
+        save_ply(grid.points, grid.colors, output_path)
+        np.savez(voxel_stats_path(output_path), weights=grid.weights, counts=grid.counts)
         return
 
-    if sample_ratio == 1.0:
-        with open(output_path, "wb") as f:
-            write_ply_header(f, num_samples)
-
+    if sample_ratio >= 1.0:
+        # Single pass; the vertex count is patched into the header on close
+        with StreamingPLYWriter(output_path) as writer:
             for i in range(b):
                 pts = points[i].reshape(-1, 3).astype(np.float32)
                 cls = colors[i].reshape(-1, 3).astype(np.uint8)
@@ -281,45 +299,54 @@ def save_confident_pointcloud_batch(
                 valid_cls = cls[mask]
 
                 for j in range(0, len(valid_pts), batch_size):
-                    batch_pts = valid_pts[j : j + batch_size]
-                    batch_cls = valid_cls[j : j + batch_size]
-                    write_ply_batch(f, batch_pts, batch_cls)
+                    writer.write(valid_pts[j : j + batch_size], valid_cls[j : j + batch_size])
+        return
 
-    else:
-        reservoir_pts = np.zeros((num_samples, 3), dtype=np.float32)
-        reservoir_clr = np.zeros((num_samples, 3), dtype=np.uint8)
-        count = 0
+    total_valid = 0
+    for i in range(b):
+        cfs = confs[i].reshape(-1)
+        total_valid += np.count_nonzero((cfs >= conf_threshold) & (cfs > 1e-5))
 
-        for i in range(b):
-            pts = points[i].reshape(-1, 3).astype(np.float32)
-            cls = colors[i].reshape(-1, 3).astype(np.uint8)
-            cfs = confs[i].reshape(-1).astype(np.float32)
+    num_samples = int(total_valid * sample_ratio)
 
-            mask = (cfs >= conf_threshold) & (cfs > 1e-5)
-            valid_pts = pts[mask]
-            valid_cls = cls[mask]
-            n_valid = len(valid_pts)
+    if num_samples == 0:
+        save_ply(np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.uint8), output_path)
+        return
 
-            if count < num_samples:
-                fill_count = min(num_samples - count, n_valid)
+    reservoir_pts = np.zeros((num_samples, 3), dtype=np.float32)
+    reservoir_clr = np.zeros((num_samples, 3), dtype=np.uint8)
+    count = 0
 
-                reservoir_pts[count : count + fill_count] = valid_pts[:fill_count]
-                reservoir_clr[count : count + fill_count] = valid_cls[:fill_count]
-                count += fill_count
+    for i in range(b):
+        pts = points[i].reshape(-1, 3).astype(np.float32)
+        cls = colors[i].reshape(-1, 3).astype(np.uint8)
+        cfs = confs[i].reshape(-1).astype(np.float32)
+
+        mask = (cfs >= conf_threshold) & (cfs > 1e-5)
+        valid_pts = pts[mask]
+        valid_cls = cls[mask]
+        n_valid = len(valid_pts)
+
+        if count < num_samples:
+            fill_count = min(num_samples - count, n_valid)
+
+            reservoir_pts[count : count + fill_count] = valid_pts[:fill_count]
+            reservoir_clr[count : count + fill_count] = valid_cls[:fill_count]
+            count += fill_count
 
-                if fill_count < n_valid:
-                    remaining_pts = valid_pts[fill_count:]
-                    remaining_cls = valid_cls[fill_count:]
+            if fill_count < n_valid:
+                remaining_pts = valid_pts[fill_count:]
+                remaining_cls = valid_cls[fill_count:]
 
-                    count, reservoir_pts, reservoir_clr = optimized_vectorized_reservoir_sampling(
-                        remaining_pts, remaining_cls, count, reservoir_pts, reservoir_clr
-                    )
-            else:
                 count, reservoir_pts, reservoir_clr = optimized_vectorized_reservoir_sampling(
-                    valid_pts, valid_cls, count, reservoir_pts, reservoir_clr
+                    remaining_pts, remaining_cls, count, reservoir_pts, reservoir_clr
                 )
+        else:
+            count, reservoir_pts, reservoir_clr = optimized_vectorized_reservoir_sampling(
+                valid_pts, valid_cls, count, reservoir_pts, reservoir_clr
+            )
 
-        save_ply(reservoir_pts, reservoir_clr, output_path)
+    save_ply(reservoir_pts, reservoir_clr, output_path)
 
 
 """ The following function is deprecated"""
@@ -543,13 +570,35 @@ def compute_sim3_ab(S_a, S_b):
     return (s_ab, R_ab, T_ab)
 
 
-def merge_ply_files(input_dir, output_path):
+def read_ply_vertices(path):
+    """Memory-map the vertices of a PLY written by save_ply / write_ply_batch."""
+    with open(path, "rb") as f:
+        while not f.readline().startswith(b"end_header"):
+            pass
+        offset = f.tell()
+    # Same record layout as write_ply_batch
+    dtype = np.dtype([("xyz", "<f4", (3,)), ("rgb", "u1", (3,))])
+    if os.path.getsize(path) == offset:
+        return np.zeros((0,), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset)
+
+
+def voxel_stats_path(ply_path):
+    """Path of the per-voxel weights and counts saved next to a voxelised PLY"""
+    return os.path.splitext(ply_path)[0] + "_voxels.npz"
+
+
+def merge_ply_files(input_dir, output_path, voxel_size=None, batch_size=1000000):
     """
     Merge all PLY files in a directory into one file (without loading into memory)
 
     Args:
     - input_dir: Input directory containing multiple '{idx}_pcd.ply' files
     - output_path: Output file path (e.g., 'combined.ply')
+    - voxel_size: Optional; merge points of all files into voxels of this size, which
+      removes the duplicates of surfaces seen by several chunks. Points of voxelised
+      files are weighted by the confidence and point count of their voxel
+    - batch_size: Vertices copied per step
     """
 
     print("Merging PLY files...")
@@ -560,49 +609,69 @@ def merge_ply_files(input_dir, output_path):
         print("No PLY files found")
         return
 
-    idx_file = 0
-    len(input_files)
-
-    total_vertices = 0
-    for file in input_files:  # Count total vertices
-        with open(file, "rb") as f:
-            for line in f:
-                if line.startswith(b"element vertex"):
-                    vertex_count = int(line.split()[-1])
-                    total_vertices += vertex_count
-                elif line.startswith(b"end_header"):
-                    break
-
-    with open(output_path, "wb") as out_f:
-        # Write new header
-        out_f.write(b"ply\n")
-        out_f.write(b"format binary_little_endian 1.0\n")
-        out_f.write(f"element vertex {total_vertices}\n".encode())
-        out_f.write(b"property float x\n")
-        out_f.write(b"property float y\n")
-        out_f.write(b"property float z\n")
-        out_f.write(b"property uchar red\n")
-        out_f.write(b"property uchar green\n")
-        out_f.write(b"property uchar blue\n")
-        out_f.write(b"end_header\n")
-
+    if voxel_size:
+        reducer = VoxelGridReducer(voxel_size)
         for file in input_files:
+            vertices = read_ply_vertices(file)
+            weights = counts = None
+            if os.path.exists(voxel_stats_path(file)):
+                with np.load(voxel_stats_path(file)) as stats:
+                    weights, counts = stats["weights"], stats["counts"]
+            reducer.add(vertices["xyz"], vertices["rgb"], weights, counts)
+        grid = reducer.result()
+        save_ply(grid.points, grid.colors, output_path)
+        print(f"Merge completed! {reducer.num_points} points -> {len(grid.points)} voxels")
+        print(f"Output file: {output_path}")
+        return
+
+    # Vertices are copied in batches; the total count is patched into the header on close
+    with StreamingPLYWriter(output_path) as writer:
+        for idx_file, file in enumerate(input_files):
             print(f"Processing {idx_file}/{len(input_files)}: {file}")
-            idx_file += 1
-            with open(file, "rb") as in_f:
-                # Skip the head
-                in_header = True
-                while in_header:
-                    line = in_f.readline()
-                    if line.startswith(b"end_header"):
-                        in_header = False
-                data = in_f.read()
-                out_f.write(data)
+            vertices = read_ply_vertices(file)
+            for j in range(0, len(vertices), batch_size):
+                batch = vertices[j : j + batch_size]
+                writer.write(batch["xyz"], batch["rgb"])
+    total_vertices = writer.count
 
     print(f"Merge completed! Total points: {total_vertices}")
     print(f"Output file: {output_path}")
 
 
+def ply_to_glb(ply_path, glb_path, quantize=True, batch_size=1000000):
+    """
+    Convert a PLY written by save_ply / merge_ply_files to a GLB point cloud, batch by batch
+
+    Args:
+    - ply_path: Input PLY path
+    - glb_path: Output GLB path
+    - quantize: Store positions as int16 (KHR_mesh_quantization)
+    - batch_size: Vertices converted per step (and per GLB mesh)
+    """
+    vertices = read_ply_vertices(ply_path)
+    with StreamingGLBWriter(glb_path, quantize=quantize, chunk_size=batch_size) as writer:
+        for j in range(0, len(vertices), batch_size):
+            batch = vertices[j : j + batch_size]
+            writer.write_points(batch["xyz"], batch["rgb"])
+    print(f"GLB saved to {glb_path} ({writer.num_points} points)")
+
+
+def ply_to_tiles(ply_path, tiles_dir, max_points_per_tile=100000):
+    """
+    Convert a PLY written by save_ply / merge_ply_files to LOD octree tiles
+
+    Args:
+    - ply_path: Input PLY path
+    - tiles_dir: Output directory for index.json and the GLB tiles
+    - max_points_per_tile: Octree nodes with at most this many points become leaves
+    """
+    vertices = read_ply_vertices(ply_path)
+    index = build_octree_tiles(
+        vertices["xyz"], vertices["rgb"], tiles_dir, max_points_per_tile=max_points_per_tile
+    )
+    print(f"Tiles saved to {tiles_dir} ({len(index['nodes'])} tiles, {index['levels']} levels)")
+
+
 def weighted_estimate_se3(source_points, target_points, weights):
     """
     source_points:  (Nx3)
@@ -0,0 +1,59 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Thread-safe accumulator of per-stage wall times.
+
+    Stages running on worker threads overlap with each other and with the main thread,
+    so the sum of stage times can exceed the elapsed time; the report shows both.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._counts = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._totals[name] = self._totals.get(name, 0.0) + elapsed
+                self._counts[name] = self._counts.get(name, 0) + 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                name: {"calls": self._counts[name], "total": total}
+                for name, total in self._totals.items()
+            }
+
+    def report(self):
+        stats = self.get_stats()
+        elapsed = time.perf_counter() - self._start
+        busy = sum(s["total"] for s in stats.values())
+        print(f"{'stage':<16} {'calls':>6} {'total (s)':>10} {'mean (s)':>9}")
+        for name, s in stats.items():
+            print(f"{name:<16} {s['calls']:>6} {s['total']:>10.2f} {s['total'] / s['calls']:>9.3f}")
+        print(f"Elapsed {elapsed:.2f}s, stage time {busy:.2f}s ({busy / max(elapsed, 1e-9):.2f}x)")
@@ -4,7 +4,7 @@ from glob import glob
 import numpy as np
 from loop_utils.sim3utils import save_confident_pointcloud_batch
 
-from da3_streaming import depth_to_point_cloud_vectorized
+from depth_anything_3.utils.unprojection import depth_to_world_points
 
 
 def read_camera_poses(pose_file):
@@ -57,7 +57,7 @@ def create_point_cloud(npz_folder, pose_file, output_ply, conf_threshold_coef, s
         extrinsics = w2c[:3, :]  # [3, 4]
         extrinsics_reshaped = extrinsics[np.newaxis, :, :]  # [1, 3, 4]
 
-        points_world = depth_to_point_cloud_vectorized(
+        points_world = depth_to_world_points(
             depth_reshaped, intrinsics_reshaped, extrinsics_reshaped
         )
         points_world = points_world[0]  # [H, W, 3]
@@ -20,23 +20,37 @@ inference, and export capabilities. It supports both single and nested model arc
 
 from __future__ import annotations
 
+import os
 import time
-from typing import Optional, Sequence
+from typing import Iterable, Iterator, Optional, Sequence
 import numpy as np
 import torch
 import torch.nn as nn
-from huggingface_hub import PyTorchModelHubMixin
+from huggingface_hub import PyTorchModelHubMixin, hf_hub_download
+from huggingface_hub.errors import EntryNotFoundError
 from PIL import Image
 
 from depth_anything_3.cfg import create_object, load_config
+from depth_anything_3.model.da3 import NestedDepthAnything3Net
+from depth_anything_3.model.dinov2.layers.attention import set_attention_memory_budget
+from depth_anything_3.model.utils.bucketing import ShapeBuckets, enable_bucketing
+from depth_anything_3.model.utils.token_cache import OverlapTokenCache
 from depth_anything_3.registry import MODEL_REGISTRY
-from depth_anything_3.specs import Prediction
-from depth_anything_3.utils.export import export
+from depth_anything_3.specs import Prediction, StreamFrame, StreamWindow
 from depth_anything_3.utils.geometry import affine_inverse
 from depth_anything_3.utils.io.input_processor import InputProcessor
 from depth_anything_3.utils.io.output_processor import OutputProcessor
+from depth_anything_3.utils.io.prefetcher import PrefetchLoader, PreparedChunk
 from depth_anything_3.utils.logger import logger
+from depth_anything_3.utils.model_loading import load_state_dict_file, load_weights
 from depth_anything_3.utils.pose_align import align_poses_umeyama
+from depth_anything_3.utils.streaming import (
+    apply_sim3_to_prediction,
+    estimate_overlap_scale,
+    estimate_overlap_sim3,
+    slice_prediction,
+)
+from depth_anything_3.utils.unprojection import depth_to_world_points
 
 torch.backends.cudnn.benchmark = False
 # logger.info("CUDNN Benchmark Disabled")
@@ -96,6 +110,86 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         # Device management (set by user)
         self.device = None
 
+    @classmethod
+    def from_weights_file(
+        cls,
+        model_file: str,
+        device: str | torch.device = "cpu",
+        strict: bool = False,
+        **model_kwargs,
+    ) -> DepthAnything3:
+        """
+        Build the network on the meta device and load a checkpoint into it.
+
+        No weights are randomly initialised and then overwritten: parameters take the
+        checkpoint tensors, which are memory-mapped for ``.safetensors`` files, so
+        construction is near-instant and loading on CPU does not copy the weights.
+
+        Args:
+            model_file: Path to a ``.safetensors`` file or a torch checkpoint
+            device: Device to load the weights to
+            strict: Whether missing and unexpected keys are errors
+            **model_kwargs: Arguments of ``DepthAnything3``, e.g. ``model_name``
+
+        Returns:
+            The model in eval mode
+        """
+        with torch.device("meta"):
+            model = cls(**model_kwargs)
+        state_dict = load_state_dict_file(model_file, device)
+        missed, unexpected = load_weights(model, state_dict, strict=strict, device=device)
+        if missed:
+            logger.warn(f"Missing keys (zero-initialised): {missed}")
+        if unexpected:
+            logger.warn(f"Unexpected keys: {unexpected}")
+        model.eval()
+        return model
+
+    @classmethod
+    def _from_pretrained(
+        cls,
+        *,
+        model_id: str,
+        revision: str | None,
+        cache_dir: str | None,
+        force_download: bool,
+        local_files_only: bool,
+        token: str | bool | None,
+        map_location: str = "cpu",
+        strict: bool = False,
+        **model_kwargs,
+    ) -> DepthAnything3:
+        """Load ``model.safetensors`` with ``from_weights_file``; other checkpoints as usual."""
+        model_file = os.path.join(model_id, SAFETENSORS_NAME)
+        if not os.path.isdir(model_id):
+            try:
+                model_file = hf_hub_download(
+                    repo_id=model_id,
+                    filename=SAFETENSORS_NAME,
+                    revision=revision,
+                    cache_dir=cache_dir,
+                    force_download=force_download,
+                    token=token,
+                    local_files_only=local_files_only,
+                )
+            except EntryNotFoundError:
+                model_file = None
+        if model_file is None or not os.path.exists(model_file):
+            return super()._from_pretrained(
+                model_id=model_id,
+                revision=revision,
+                cache_dir=cache_dir,
+                force_download=force_download,
+                local_files_only=local_files_only,
+                token=token,
+                map_location=map_location,
+                strict=strict,
+                **model_kwargs,
+            )
+        return cls.from_weights_file(
+            model_file, device=map_location, strict=strict, **model_kwargs
+        )
+
     @torch.inference_mode()
     def forward(
         self,
@@ -106,6 +200,7 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         infer_gs: bool = False,
         use_ray_pose: bool = False,
         ref_view_strategy: str = "saddle_balanced",
+        token_cache: OverlapTokenCache | None = None,
     ) -> dict[str, torch.Tensor]:
         """
         Forward pass through the model.
@@ -118,6 +213,7 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             infer_gs: Enable Gaussian Splatting branch.
             use_ray_pose: Use ray-based pose estimation instead of camera decoder.
             ref_view_strategy: Strategy for selecting reference view from multiple views.
+            token_cache: Per-view backbone tokens carried over from an overlapping chunk.
 
         Returns:
             Dictionary containing model predictions
@@ -127,9 +223,95 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         with torch.no_grad():
             with torch.autocast(device_type=image.device.type, dtype=autocast_dtype):
                 return self.model(
-                    image, extrinsics, intrinsics, export_feat_layers, infer_gs, use_ray_pose, ref_view_strategy
+                    image,
+                    extrinsics,
+                    intrinsics,
+                    export_feat_layers,
+                    infer_gs,
+                    use_ray_pose,
+                    ref_view_strategy,
+                    token_cache=token_cache,
                 )
 
+    def enable_compile(self, buckets: ShapeBuckets | None = None, mode: str | None = None) -> None:
+        """
+        Opt in to compiled backbone inference on bucketed input shapes.
+
+        Inputs are padded to the nearest (views, height, width) bucket and masked, so
+        outputs match eager inference; one graph is compiled per bucket on first use,
+        see ``warmup`` to compile them ahead of time.
+
+        Args:
+            buckets: Shape buckets; defaults to ``ShapeBuckets()``
+            mode: ``torch.compile`` mode; defaults to "reduce-overhead" (CUDA graphs)
+                on CUDA and "default" elsewhere
+        """
+        if mode is None:
+            on_cuda = next(self.parameters()).device.type == "cuda"
+            mode = "reduce-overhead" if on_cuda else "default"
+        count = enable_bucketing(self.model, buckets, mode)
+        logger.info(f"Compiled inference enabled for {count} backbone(s), mode: {mode}")
+
+    def set_attention_memory_budget(self, memory_budget: int | None) -> None:
+        """
+        Bound the attention scores the backbone materialises per attention call.
+
+        Calls above the budget (typically global attention over many views) process
+        queries and keys in tiles with a streaming softmax, so memory grows linearly with
+        the number of views instead of quadratically.
+
+        Args:
+            memory_budget: Bytes of attention scores per call; None disables tiling
+        """
+        count = set_attention_memory_budget(self.model, memory_budget)
+        logger.info(f"Attention memory budget of {count} layers: {memory_budget} bytes")
+
+    def set_output_dtype(self, dtype: torch.dtype | str) -> None:
+        """
+        Set the dtype of the depth and confidence maps of returned predictions.
+
+        float16 halves their host memory and device-to-host transfer; extrinsics and
+        intrinsics stay float32 and processed images uint8.
+
+        Args:
+            dtype: torch.float32 (default) or torch.float16, or their names
+        """
+        if isinstance(dtype, str):
+            dtype = getattr(torch, dtype, None)
+        if dtype not in (torch.float32, torch.float16):
+            raise ValueError(f"Unsupported output dtype {dtype}, use float32 or float16")
+        self.output_processor.depth_dtype = dtype
+        logger.info(f"Depth and confidence outputs: {dtype}")
+
+    def warmup(
+        self,
+        shapes: Iterable[tuple[int, int, int]],
+        batch_size: int = 1,
+        ref_view_strategy: str = "saddle_balanced",
+        runs: int = 2,
+    ) -> None:
+        """
+        Run the model on dummy inputs to compile (and capture) graphs before serving.
+
+        Args:
+            shapes: (views, height, width) of processed inputs, e.g. ``(4, 504, 378)``
+            batch_size: Batch size of the requests to warm up for
+            ref_view_strategy: Reference view strategy of the requests
+            runs: Forward passes per shape; CUDA graphs are recorded on the second one
+        """
+        device = self._get_model_device()
+        for num_views, height, width in shapes:
+            start_time = time.time()
+            image = torch.zeros(batch_size, num_views, 3, height, width, device=device)
+            for _ in range(runs):
+                self.forward(image, export_feat_layers=[], ref_view_strategy=ref_view_strategy)
+            if device.type == "cuda":
+                torch.cuda.synchronize(device)
+            logger.info(
+                f"Warm-up of {num_views}x{height}x{width} done. "
+                f"Time: {time.time() - start_time} seconds"
+            )
+
     def inference(
         self,
         image: list[np.ndarray | Image.Image | str],
@@ -155,6 +337,8 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         feat_vis_fps: int = 15,
         # Other export parameters, e.g., gs_ply, gs_video
         export_kwargs: Optional[dict] = {},
+        prepared: PreparedChunk | None = None,
+        token_cache: OverlapTokenCache | None = None,
     ) -> Prediction:
         """
         Run inference on input images.
@@ -175,13 +359,17 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             process_res: Processing resolution
             process_res_method: Resize method for processing
             export_dir: Directory to export results
-            export_format: Export format (mini_npz, npz, glb, ply, gs, gs_video)
+            export_format: Export format (mini_npz, npz, glb, tiles, ply, gs, gs_video)
             export_feat_layers: Layer indices to export intermediate features from
             conf_thresh_percentile: [GLB] Lower percentile for adaptive confidence threshold (default: 40.0) # noqa: E501
             num_max_points: [GLB] Maximum number of points in the point cloud (default: 1,000,000)
             show_cameras: [GLB] Show camera wireframes in the exported scene (default: True)
             feat_vis_fps: [FEAT_VIS] Frame rate for output video (default: 15)
             export_kwargs: additional arguments to export functions.
+            prepared: Inputs already preprocessed and copied to the device by a
+                PrefetchLoader (see `inference_chunks`); skips preprocessing
+            token_cache: OverlapTokenCache whose ``set_frames`` was called for this chunk;
+                per-view backbone blocks of views shared with the previous chunk are reused
 
         Returns:
             Prediction object containing depth maps and camera parameters
@@ -192,13 +380,21 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         if "colmap" in export_format:
             assert isinstance(image[0], str), "`image` must be image paths for COLMAP export."
 
-        # Preprocess images
-        imgs_cpu, extrinsics, intrinsics = self._preprocess_inputs(
-            image, extrinsics, intrinsics, process_res, process_res_method
-        )
+        if prepared is not None:
+            imgs_cpu, extrinsics, intrinsics = (
+                prepared.imgs_cpu,
+                prepared.extrinsics,
+                prepared.intrinsics,
+            )
+            imgs, ex_t, in_t = prepared.model_inputs()
+        else:
+            # Preprocess images
+            imgs_cpu, extrinsics, intrinsics = self._preprocess_inputs(
+                image, extrinsics, intrinsics, process_res, process_res_method
+            )
 
-        # Prepare tensors for model
-        imgs, ex_t, in_t = self._prepare_model_inputs(imgs_cpu, extrinsics, intrinsics)
+            # Prepare tensors for model
+            imgs, ex_t, in_t = self._prepare_model_inputs(imgs_cpu, extrinsics, intrinsics)
 
         # Normalize extrinsics
         ex_t_norm = self._normalize_extrinsics(ex_t.clone() if ex_t is not None else None)
@@ -207,70 +403,360 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         export_feat_layers = list(export_feat_layers) if export_feat_layers is not None else []
 
         raw_output = self._run_model_forward(
-            imgs, ex_t_norm, in_t, export_feat_layers, infer_gs, use_ray_pose, ref_view_strategy
+            imgs,
+            ex_t_norm,
+            in_t,
+            export_feat_layers,
+            infer_gs,
+            use_ray_pose,
+            ref_view_strategy,
+            token_cache=token_cache,
         )
 
-        # Convert raw output to prediction
-        prediction = self._convert_to_prediction(raw_output)
+        # Convert raw output to prediction, with the processed images for visualization
+        prediction = self._convert_to_prediction(raw_output, imgs)
 
         # Align prediction to extrinsincs
         prediction = self._align_to_input_extrinsics_intrinsics(
             extrinsics, intrinsics, prediction, align_to_input_ext_scale
         )
 
-        # Add processed images for visualization
-        prediction = self._add_processed_images(prediction, imgs_cpu)
-
         # Export if requested
         if export_dir is not None:
+            self.export_prediction(
+                prediction,
+                image,
+                export_dir,
+                export_format,
+                infer_gs=infer_gs,
+                render_exts=render_exts,
+                render_ixts=render_ixts,
+                render_hw=render_hw,
+                process_res_method=process_res_method,
+                conf_thresh_percentile=conf_thresh_percentile,
+                num_max_points=num_max_points,
+                show_cameras=show_cameras,
+                feat_vis_fps=feat_vis_fps,
+                export_kwargs=export_kwargs,
+            )
 
-            if "gs" in export_format:
-                if infer_gs and "gs_video" not in export_format:
-                    export_format = f"{export_format}-gs_video"
-                if "gs_video" in export_format:
-                    if "gs_video" not in export_kwargs:
-                        export_kwargs["gs_video"] = {}
-                    export_kwargs["gs_video"].update(
-                        {
-                            "extrinsics": render_exts,
-                            "intrinsics": render_ixts,
-                            "out_image_hw": render_hw,
-                        }
-                    )
-            # Add GLB export parameters
-            if "glb" in export_format:
-                if "glb" not in export_kwargs:
-                    export_kwargs["glb"] = {}
-                export_kwargs["glb"].update(
-                    {
-                        "conf_thresh_percentile": conf_thresh_percentile,
-                        "num_max_points": num_max_points,
-                        "show_cameras": show_cameras,
-                    }
+        return prediction
+
+    def batch_inference(
+        self,
+        images: list[list[np.ndarray | Image.Image | str]],
+        use_ray_pose: bool = False,
+        ref_view_strategy: str = "saddle_balanced",
+        process_res: int = 504,
+        process_res_method: str = "upper_bound_resize",
+        export_feat_layers: Sequence[int] | None = None,
+    ) -> list[Prediction]:
+        """
+        Run inference on several independent scenes, sharing forward passes where possible.
+
+        Scenes whose processed tensors have the same shape (same view count and resolution)
+        are stacked along the batch dimension and run through a single forward pass; the
+        output is then split back into one Prediction per scene. Nested (metric) models
+        derive a single scale factor per forward pass, so they process scenes one at a time.
+        Camera-conditioned inference is not supported here; use :meth:`inference` instead.
+
+        Args:
+            images: One list of input images per scene
+            use_ray_pose: Use ray-based pose estimation instead of camera decoder
+            ref_view_strategy: Strategy for selecting reference view from multiple views
+            process_res: Processing resolution
+            process_res_method: Resize method for processing
+            export_feat_layers: Layer indices to export intermediate features from
+
+        Returns:
+            List of Prediction objects, in the same order as ``images``
+        """
+        export_feat_layers = list(export_feat_layers) if export_feat_layers is not None else []
+        imgs_cpu_list = [
+            self._preprocess_inputs(scene, None, None, process_res, process_res_method)[0]
+            for scene in images
+        ]
+
+        # Group scenes that can share a forward pass
+        groups: dict = {}
+        can_stack = not isinstance(self.model, NestedDepthAnything3Net)
+        for idx, imgs_cpu in enumerate(imgs_cpu_list):
+            key = tuple(imgs_cpu.shape) if can_stack else idx
+            groups.setdefault(key, []).append(idx)
+
+        device = self._get_model_device()
+        predictions: list[Prediction | None] = [None] * len(images)
+        for indices in groups.values():
+            imgs = torch.stack([imgs_cpu_list[i] for i in indices])
+            imgs = imgs.to(device, non_blocking=True).float()
+            raw_output = self._run_model_forward(
+                imgs, None, None, export_feat_layers, False, use_ray_pose, ref_view_strategy
+            )
+            for b, idx in enumerate(indices):
+                predictions[idx] = self._convert_to_prediction(
+                    self.output_processor.select_batch_item(raw_output, b), imgs[b : b + 1]
                 )
-            # Add Feat_vis export parameters
-            if "feat_vis" in export_format:
-                if "feat_vis" not in export_kwargs:
-                    export_kwargs["feat_vis"] = {}
-                export_kwargs["feat_vis"].update(
-                    {
-                        "fps": feat_vis_fps,
-                    }
+        return predictions
+
+    def inference_chunks(
+        self,
+        chunks: Iterable[list | tuple],
+        prefetch: int = 2,
+        process_res: int = 504,
+        process_res_method: str = "upper_bound_resize",
+        **kwargs,
+    ) -> Iterator[Prediction]:
+        """
+        Run `inference` on a sequence of chunks, preparing the next chunks in the background.
+
+        Decoding, resizing, normalisation and the host-to-device copy of upcoming
+        chunks overlap with the forward pass of the current one (see PrefetchLoader).
+
+        Args:
+            chunks: Iterable of image lists, or of (images, extrinsics, intrinsics) tuples
+            prefetch: Max number of chunks prepared ahead
+            process_res: Processing resolution
+            process_res_method: Resize method for processing
+            **kwargs: Other `inference` arguments, applied to every chunk
+
+        Yields:
+            One Prediction per chunk, in order
+        """
+        loader = PrefetchLoader(
+            chunks,
+            self.input_processor,
+            self._get_model_device(),
+            process_res=process_res,
+            process_res_method=process_res_method,
+            prefetch=prefetch,
+        )
+        for chunk in loader:
+            yield self.inference(
+                chunk.image,
+                process_res=process_res,
+                process_res_method=process_res_method,
+                prepared=chunk,
+                **kwargs,
+            )
+        loader.log_stats()
+
+    def inference_stream(
+        self,
+        images: Iterable[np.ndarray | Image.Image | str],
+        window: int = 32,
+        overlap: int = 8,
+        yield_windows: bool = False,
+        align: bool = True,
+        use_ray_pose: bool = False,
+        ref_view_strategy: str = "saddle_balanced",
+        process_res: int = 504,
+        process_res_method: str = "upper_bound_resize",
+        align_conf_thresh_percentile: float = 40.0,
+    ) -> Iterator[StreamFrame | StreamWindow]:
+        """
+        Run inference over an arbitrarily long image sequence with bounded memory.
+
+        Images are consumed lazily and processed in sliding windows of ``window``
+        frames, consecutive windows sharing ``overlap`` frames. Each window is
+        aligned to the previous one with a robust Sim(3) fit on the confident
+        overlap point maps (a depth scale fit for models without pose output), so
+        all results live in the frame of the first window. Only the overlap frames
+        of the last window are kept between windows. The next window is decoded
+        and uploaded in the background while the current one runs.
+
+        Args:
+            images: Iterable of input images (numpy arrays, PIL Images, or file paths)
+            window: Number of frames per forward pass
+            overlap: Number of frames shared by consecutive windows (0 < overlap < window)
+            yield_windows: Yield one StreamWindow per window instead of one StreamFrame per frame
+            align: Align each window to the previous one (otherwise windows are independent)
+            use_ray_pose: Use ray-based pose estimation instead of camera decoder
+            ref_view_strategy: Strategy for selecting the reference view of each window
+            process_res: Processing resolution
+            process_res_method: Resize method for processing
+            align_conf_thresh_percentile: Overlap pixels below this confidence percentile
+                are ignored by the alignment
+
+        Yields:
+            StreamFrame per new frame, or StreamWindow per window, in stream order
+        """
+        if not 0 < overlap < window:
+            raise ValueError(f"overlap must be in (0, window), got {overlap} for window {window}")
+
+        prev_overlap = None  # (points or depth, conf) of the previous window's tail
+
+        def windows():
+            buffer: list = []
+            num_windows = 0
+            for image in images:
+                buffer.append(image)
+                if len(buffer) == window:
+                    yield list(buffer)
+                    num_windows += 1
+                    buffer = buffer[-overlap:]
+            # Flush the remaining frames (skip a tail made only of already yielded frames)
+            if buffer and (num_windows == 0 or len(buffer) > overlap):
+                yield buffer
+
+        def run_window(prediction, window_index):
+            nonlocal prev_overlap
+            start = window_index * (window - overlap)
+            num_seen = overlap if window_index > 0 else 0
+            num_frames = prediction.depth.shape[0]
+            has_poses = prediction.extrinsics is not None and prediction.intrinsics is not None
+            scale, rotation, translation = 1.0, np.eye(3, dtype=np.float32), np.zeros(3, np.float32)
+            points = None
+            if has_poses:
+                points = depth_to_world_points(
+                    prediction.depth, prediction.intrinsics, prediction.extrinsics
+                )
+
+            if align and prev_overlap is not None and prediction.conf is not None:
+                ref, ref_conf = prev_overlap
+                try:
+                    if has_poses:
+                        scale, rotation, translation = estimate_overlap_sim3(
+                            ref,
+                            ref_conf,
+                            points[:num_seen],
+                            prediction.conf[:num_seen],
+                            align_conf_thresh_percentile,
+                            device=self._get_model_device(),
+                        )
+                    else:
+                        scale = estimate_overlap_scale(
+                            ref,
+                            ref_conf,
+                            prediction.depth[:num_seen],
+                            prediction.conf[:num_seen],
+                            align_conf_thresh_percentile,
+                        )
+                except ValueError as e:
+                    logger.warn(f"Window {window_index} alignment failed ({e}); left unaligned")
+                apply_sim3_to_prediction(prediction, scale, rotation, translation)
+                if points is not None:
+                    points = scale * points @ rotation.T + translation
+
+            if prediction.conf is not None:
+                tail = points if points is not None else prediction.depth
+                prev_overlap = (tail[-overlap:].copy(), prediction.conf[-overlap:].copy())
+
+            new = slice_prediction(prediction, num_seen)
+            indices = list(range(start + num_seen, start + num_frames))
+            if yield_windows:
+                yield StreamWindow(
+                    window_index=window_index,
+                    frame_indices=indices,
+                    prediction=new,
+                    scale=scale,
+                    rotation=rotation,
+                    translation=translation,
+                )
+                return
+            for i, index in enumerate(indices):
+                yield StreamFrame(
+                    index=index,
+                    window_index=window_index,
+                    depth=new.depth[i],
+                    conf=new.conf[i] if new.conf is not None else None,
+                    sky=new.sky[i] if new.sky is not None else None,
+                    extrinsics=new.extrinsics[i] if new.extrinsics is not None else None,
+                    intrinsics=new.intrinsics[i] if new.intrinsics is not None else None,
+                    processed_image=(
+                        new.processed_images[i] if new.processed_images is not None else None
+                    ),
                 )
-            # Add COLMAP export parameters
-            if "colmap" in export_format:
-                if "colmap" not in export_kwargs:
-                    export_kwargs["colmap"] = {}
-                export_kwargs["colmap"].update(
+
+        # Windows are decoded and uploaded in the background while the previous one runs
+        predictions = self.inference_chunks(
+            windows(),
+            prefetch=1,
+            process_res=process_res,
+            process_res_method=process_res_method,
+            use_ray_pose=use_ray_pose,
+            ref_view_strategy=ref_view_strategy,
+        )
+        for window_index, prediction in enumerate(predictions):
+            yield from run_window(prediction, window_index)
+
+    def export_prediction(
+        self,
+        prediction: Prediction,
+        image: list[np.ndarray | Image.Image | str],
+        export_dir: str,
+        export_format: str = "mini_npz",
+        infer_gs: bool = False,
+        render_exts: np.ndarray | None = None,
+        render_ixts: np.ndarray | None = None,
+        render_hw: tuple[int, int] | None = None,
+        process_res_method: str = "upper_bound_resize",
+        conf_thresh_percentile: float = 40.0,
+        num_max_points: int = 1_000_000,
+        show_cameras: bool = True,
+        feat_vis_fps: int = 15,
+        export_kwargs: Optional[dict] = None,
+    ) -> None:
+        """
+        Export a prediction produced by :meth:`inference` or :meth:`batch_inference`.
+
+        Arguments mirror the export-related parameters of :meth:`inference`; ``image`` is the
+        original input list of the scene (needed for COLMAP export).
+        """
+        export_kwargs = {} if export_kwargs is None else export_kwargs
+        if "gs" in export_format:
+            if infer_gs and "gs_video" not in export_format:
+                export_format = f"{export_format}-gs_video"
+            if "gs_video" in export_format:
+                if "gs_video" not in export_kwargs:
+                    export_kwargs["gs_video"] = {}
+                export_kwargs["gs_video"].update(
                     {
-                        "image_paths": image,
-                        "conf_thresh_percentile": conf_thresh_percentile,
-                        "process_res_method": process_res_method,
+                        "extrinsics": render_exts,
+                        "intrinsics": render_ixts,
+                        "out_image_hw": render_hw,
                     }
                 )
-            self._export_results(prediction, export_format, export_dir, **export_kwargs)
-
-        return prediction
+        # Add GLB export parameters
+        if "glb" in export_format:
+            if "glb" not in export_kwargs:
+                export_kwargs["glb"] = {}
+            export_kwargs["glb"].update(
+                {
+                    "conf_thresh_percentile": conf_thresh_percentile,
+                    "num_max_points": num_max_points,
+                    "show_cameras": show_cameras,
+                }
+            )
+        # Add tile export parameters
+        if "tiles" in export_format:
+            if "tiles" not in export_kwargs:
+                export_kwargs["tiles"] = {}
+            export_kwargs["tiles"].update(
+                {
+                    "conf_thresh_percentile": conf_thresh_percentile,
+                }
+            )
+        # Add Feat_vis export parameters
+        if "feat_vis" in export_format:
+            if "feat_vis" not in export_kwargs:
+                export_kwargs["feat_vis"] = {}
+            export_kwargs["feat_vis"].update(
+                {
+                    "fps": feat_vis_fps,
+                }
+            )
+        # Add COLMAP export parameters
+        if "colmap" in export_format:
+            if "colmap" not in export_kwargs:
+                export_kwargs["colmap"] = {}
+            export_kwargs["colmap"].update(
+                {
+                    "image_paths": image,
+                    "conf_thresh_percentile": conf_thresh_percentile,
+                    "process_res_method": process_res_method,
+                }
+            )
+        self._export_results(prediction, export_format, export_dir, **export_kwargs)
 
     def _preprocess_inputs(
         self,
@@ -373,6 +859,7 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         infer_gs: bool = False,
         use_ray_pose: bool = False,
         ref_view_strategy: str = "saddle_balanced",
+        token_cache: OverlapTokenCache | None = None,
     ) -> dict[str, torch.Tensor]:
         """Run model forward pass."""
         device = imgs.device
@@ -381,40 +868,39 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             torch.cuda.synchronize(device)
         start_time = time.time()
         feat_layers = list(export_feat_layers) if export_feat_layers is not None else None
-        output = self.forward(imgs, ex_t, in_t, feat_layers, infer_gs, use_ray_pose, ref_view_strategy)
+        output = self.forward(
+            imgs,
+            ex_t,
+            in_t,
+            feat_layers,
+            infer_gs,
+            use_ray_pose,
+            ref_view_strategy,
+            token_cache=token_cache,
+        )
         if need_sync:
             torch.cuda.synchronize(device)
         end_time = time.time()
         logger.info(f"Model Forward Pass Done. Time: {end_time - start_time} seconds")
         return output
 
-    def _convert_to_prediction(self, raw_output: dict[str, torch.Tensor]) -> Prediction:
-        """Convert raw model output to Prediction object."""
+    def _convert_to_prediction(
+        self, raw_output: dict[str, torch.Tensor], imgs: torch.Tensor | None = None
+    ) -> Prediction:
+        """Convert raw model output (and normalized input images) to Prediction object."""
         start_time = time.time()
-        output = self.output_processor(raw_output)
+        output = self.output_processor(raw_output, imgs)
         end_time = time.time()
         logger.info(f"Conversion to Prediction Done. Time: {end_time - start_time} seconds")
         return output
 
-    def _add_processed_images(self, prediction: Prediction, imgs_cpu: torch.Tensor) -> Prediction:
-        """Add processed images to prediction for visualization."""
-        # Convert from (N, 3, H, W) to (N, H, W, 3) and denormalize
-        processed_imgs = imgs_cpu.permute(0, 2, 3, 1).cpu().numpy()  # (N, H, W, 3)
-
-        # Denormalize from ImageNet normalization
-        mean = np.array([0.485, 0.456, 0.406])
-        std = np.array([0.229, 0.224, 0.225])
-        processed_imgs = processed_imgs * std + mean
-        processed_imgs = np.clip(processed_imgs, 0, 1)
-        processed_imgs = (processed_imgs * 255).astype(np.uint8)
-
-        prediction.processed_images = processed_imgs
-        return prediction
-
     def _export_results(
         self, prediction: Prediction, export_format: str, export_dir: str, **kwargs
     ) -> None:
         """Export results to specified format and directory."""
+        # Imported on first use: the exporters pull in moviepy and trimesh
+        from depth_anything_3.utils.export import export
+
         start_time = time.time()
         export(prediction, export_format, export_dir, **kwargs)
         end_time = time.time()
@@ -21,6 +21,7 @@ This package contains all the modular components for the Gradio application.
 from depth_anything_3.app.modules.event_handlers import EventHandlers
 from depth_anything_3.app.modules.file_handlers import FileHandler
 from depth_anything_3.app.modules.model_inference import ModelInference
+from depth_anything_3.app.modules.prediction_cache import PredictionCache
 from depth_anything_3.app.modules.ui_components import UIComponents
 from depth_anything_3.app.modules.utils import (
     create_depth_visualization,
@@ -32,6 +33,7 @@ from depth_anything_3.app.modules.visualization import VisualizationHandler
 
 __all__ = [
     "ModelInference",
+    "PredictionCache",
     "FileHandler",
     "VisualizationHandler",
     "EventHandlers",
@@ -26,8 +26,9 @@ import numpy as np
 import torch
 
 from depth_anything_3.api import DepthAnything3
+from depth_anything_3.app.modules.prediction_cache import PredictionCache
 from depth_anything_3.utils.memory import cleanup_cuda_memory
-from depth_anything_3.utils.export.glb import export_to_glb
+from depth_anything_3.utils.export.glb import GLBExportCache, export_to_glb
 from depth_anything_3.utils.export.gs import export_to_gs_video
 
 
@@ -39,6 +40,14 @@ class ModelInference:
     def __init__(self):
         """Initialize the model inference handler."""
         self.model = None
+        self.prediction_cache = PredictionCache()
+        # (cache key, prediction, GLB intermediates) of the last run, for display-only changes
+        self._last_export = None
+
+    @staticmethod
+    def _model_dir() -> str:
+        """Model directory from the DA3_MODEL_DIR environment variable or the default."""
+        return os.environ.get("DA3_MODEL_DIR", "/dev/shm/da3_models/DA3HF-VITG-METRIC_VITL")
 
     def initialize_model(self, device: str = "cuda") -> None:
         """
@@ -48,11 +57,7 @@ class ModelInference:
             device: Device to load the model on
         """
         if self.model is None:
-            # Get model directory from environment variable or use default
-            model_dir = os.environ.get(
-                "DA3_MODEL_DIR", "/dev/shm/da3_models/DA3HF-VITG-METRIC_VITL"
-            )
-            self.model = DepthAnything3.from_pretrained(model_dir)
+            self.model = DepthAnything3.from_pretrained(self._model_dir())
             self.model = self.model.to(device)
         else:
             self.model = self.model.to(device)
@@ -98,9 +103,6 @@ class ModelInference:
         device = "cuda" if torch.cuda.is_available() else "cpu"
         device = torch.device(device)
 
-        # Initialize model if needed
-        self.initialize_model(device)
-
         # Get image paths
         print("Loading images...")
         image_folder_path = os.path.join(target_dir, "images")
@@ -128,16 +130,38 @@ class ModelInference:
         method_mapping = {"high_res": "lower_bound_resize", "low_res": "upper_bound_resize"}
         actual_method = method_mapping.get(process_res_method, "upper_bound_crop")
 
-        # Run model inference
-        print(f"Running inference with method: {actual_method}")
-        with torch.no_grad():
-            prediction = self.model.inference(
-                image_paths,
-                export_dir=None,
-                process_res_method=actual_method,
-                infer_gs=infer_gs,
-                ref_view_strategy=ref_view_strategy,
-            )
+        # Display-only options do not change the prediction, so reuse a cached one
+        cache_key = self.prediction_cache.key(
+            image_paths,
+            model_dir=self._model_dir(),
+            process_res_method=actual_method,
+            ref_view_strategy=ref_view_strategy,
+            infer_gs=infer_gs,
+        )
+        if self._last_export is not None and self._last_export[0] == cache_key:
+            # Same prediction object, so the GLB intermediates stay valid
+            _, prediction, glb_cache = self._last_export
+        else:
+            prediction = self.prediction_cache.load(cache_key, device=device)
+            glb_cache = GLBExportCache()
+        if prediction is not None:
+            print(f"Using cached prediction {cache_key[:12]}")
+        else:
+            # Initialize model if needed
+            self.initialize_model(device)
+
+            # Run model inference
+            print(f"Running inference with method: {actual_method}")
+            with torch.no_grad():
+                prediction = self.model.inference(
+                    image_paths,
+                    export_dir=None,
+                    process_res_method=actual_method,
+                    infer_gs=infer_gs,
+                    ref_view_strategy=ref_view_strategy,
+                )
+            self.prediction_cache.save(cache_key, prediction)
+        self._last_export = (cache_key, prediction, glb_cache)
         # num_max_points: int = 1_000_000,
         export_to_glb(
             prediction,
@@ -147,6 +171,7 @@ class ModelInference:
             show_cameras=show_camera,
             conf_thresh_percentile=save_percentage,
             num_max_points=int(num_max_points),
+            cache=glb_cache,
         )
 
         # export to gs video if needed
@@ -156,7 +181,6 @@ class ModelInference:
             export_to_gs_video(
                 prediction,
                 export_dir=target_dir,
-                chunk_size=4,
                 trj_mode=mode_mapping.get(gs_trj_mode, "extend"),
                 enable_tqdm=True,
                 vis_depth="hcat",
@@ -164,7 +188,7 @@ class ModelInference:
             )
 
         # Save predictions.npz for caching metric depth data
-        self._save_predictions_cache(target_dir, prediction)
+        self._save_predictions_cache(target_dir, prediction, cache_key)
 
         # Process results
         processed_data = self._process_results(target_dir, prediction, image_paths)
@@ -174,16 +198,28 @@ class ModelInference:
 
         return prediction, processed_data
 
-    def _save_predictions_cache(self, target_dir: str, prediction: Any) -> None:
+    def _save_predictions_cache(
+        self, target_dir: str, prediction: Any, cache_key: Optional[str] = None
+    ) -> None:
         """
         Save predictions data to predictions.npz for caching.
 
         Args:
             target_dir: Directory to save the cache
             prediction: Model prediction object
+            cache_key: Prediction cache key; the file is not rewritten if it already
+                holds this prediction
         """
         try:
             output_file = os.path.join(target_dir, "predictions.npz")
+            key_file = os.path.join(target_dir, "predictions.key")
+            if cache_key is not None and os.path.exists(output_file):
+                try:
+                    with open(key_file, encoding="utf-8") as f:
+                        if f.read().strip() == cache_key:
+                            return
+                except OSError:
+                    pass
 
             # Build save dict with prediction data
             save_dict = {}
@@ -208,6 +244,11 @@ class ModelInference:
 
             # Save to file
             np.savez_compressed(output_file, **save_dict)
+            if cache_key is not None:
+                with open(key_file, "w", encoding="utf-8") as f:
+                    f.write(cache_key)
+            elif os.path.exists(key_file):
+                os.remove(key_file)
             print(f"Saved predictions cache to: {output_file}")
 
         except Exception as e:
@@ -0,0 +1,187 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Persistent prediction cache for Depth Anything 3 Gradio app.
+
+Predictions are stored under a hash of the input image bytes and of the parameters
+that affect inference (model, resize method, reference view strategy, 3DGS), so
+changing display-only options (background filters, point percentage, cameras) reuses
+them instead of running the model again. Each entry is a directory of uncompressed
+``.npy`` files that are memory-mapped (copy-on-write) on a hit.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import List, Optional
+
+import numpy as np
+import torch
+
+from depth_anything_3.specs import Gaussians, Prediction
+
+# Bump to invalidate all cached predictions
+CACHE_VERSION = 1
+
+_ARRAY_FIELDS = ("depth", "sky", "conf", "extrinsics", "intrinsics", "processed_images")
+_GAUSSIAN_FIELDS = ("means", "scales", "rotations", "harmonics", "opacities")
+
+
+class PredictionCache:
+    """
+    Content-addressed on-disk cache of model predictions.
+
+    Args:
+        cache_dir: Cache directory; defaults to ``DA3_PREDICTION_CACHE_DIR`` or
+            ``<DA3_WORKSPACE_DIR>/prediction_cache``
+        max_entries: Least recently used entries beyond this count are removed
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 32):
+        if cache_dir is None:
+            workspace_dir = os.environ.get("DA3_WORKSPACE_DIR", "gradio_workspace")
+            cache_dir = os.environ.get(
+                "DA3_PREDICTION_CACHE_DIR", os.path.join(workspace_dir, "prediction_cache")
+            )
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def key(self, image_paths: List[str], **params) -> str:
+        """
+        Hash of the image contents (in order) and the inference-affecting parameters.
+
+        Args:
+            image_paths: Input images
+            **params: JSON-serialisable parameters that change the prediction
+
+        Returns:
+            Hex digest identifying the prediction
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps({"cache_version": CACHE_VERSION, **params}, sort_keys=True).encode()
+        )
+        for path in image_paths:
+            file_digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    file_digest.update(block)
+            digest.update(file_digest.digest())
+        return digest.hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str, device: Optional[torch.device] = None) -> Optional[Prediction]:
+        """
+        Load a cached prediction with memory-mapped arrays.
+
+        Args:
+            key: Key from ``key()``
+            device: Device of the Gaussians, if the entry has any
+
+        Returns:
+            The cached prediction, or None on a miss
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = os.path.join(entry_dir, "meta.json")
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            arrays = {
+                # Copy-on-write: exporters modify depth/conf in place
+                name: np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode="c")
+                for name in meta["arrays"]
+            }
+            gaussians = None
+            if meta.get("gaussians"):
+                gaussians = Gaussians(
+                    **{
+                        name: torch.from_numpy(
+                            np.load(os.path.join(entry_dir, f"gs_{name}.npy"))
+                        ).to(device or "cpu")
+                        for name in _GAUSSIAN_FIELDS
+                    }
+                )
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.isdir(entry_dir):
+                print(f"Warning: Ignoring unreadable prediction cache entry {key}: {e}")
+            return None
+
+        # Mark as recently used for the eviction order
+        os.utime(meta_path)
+        return Prediction(
+            depth=arrays.pop("depth"),
+            is_metric=meta["is_metric"],
+            scale_factor=meta.get("scale_factor"),
+            gaussians=gaussians,
+            aux={},
+            **arrays,
+        )
+
+    def save(self, key: str, prediction: Prediction) -> None:
+        """
+        Store a prediction; the entry only becomes visible once fully written.
+
+        Args:
+            key: Key from ``key()``
+            prediction: Model prediction object
+        """
+        entry_dir = self._entry_dir(key)
+        if os.path.isdir(entry_dir):
+            return
+        tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(tmp_dir, exist_ok=True)
+            arrays = []
+            for name in _ARRAY_FIELDS:
+                value = getattr(prediction, name)
+                if value is not None:
+                    np.save(os.path.join(tmp_dir, f"{name}.npy"), np.asarray(value))
+                    arrays.append(name)
+            if prediction.gaussians is not None:
+                for name in _GAUSSIAN_FIELDS:
+                    value = getattr(prediction.gaussians, name).detach().cpu().numpy()
+                    np.save(os.path.join(tmp_dir, f"gs_{name}.npy"), value)
+            scale_factor = prediction.scale_factor
+            meta = {
+                "arrays": arrays,
+                "gaussians": prediction.gaussians is not None,
+                "is_metric": int(prediction.is_metric),
+                "scale_factor": None if scale_factor is None else float(scale_factor),
+                "created": time.time(),
+            }
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_dir, entry_dir)
+            print(f"Saved prediction to cache: {entry_dir}")
+            self._evict()
+        except OSError as e:
+            print(f"Warning: Failed to save prediction cache: {e}")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries beyond ``max_entries``."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            meta_path = os.path.join(self.cache_dir, name, "meta.json")
+            if os.path.exists(meta_path):
+                entries.append((os.path.getmtime(meta_path), name))
+        entries.sort(reverse=True)
+        for _, name in entries[self.max_entries :]:
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
@@ -22,12 +22,13 @@ the required abstract methods.
 import os
 import time
 from abc import abstractmethod
-from typing import Dict as TDict
+from typing import Dict as TDict, Optional
 
 import numpy as np
 import torch
 from addict import Dict
 
+from depth_anything_3.bench.fusion import consistency_masks, projection_matrices
 from depth_anything_3.bench.utils import compute_pose
 from depth_anything_3.utils.geometry import as_homogeneous
 
@@ -62,15 +63,46 @@ class Dataset:
 
     Optional overrides:
         - eval_pose(scene, result_path): Evaluate pose estimation (default provided)
+        - consist_dist_thresh / consist_num_views: Enable the multi-view consistency
+          filter of ``filter_consistent_depths`` (used by the TSDF-based fuse3d)
+
+    Fusion and evaluation settings are class attributes named in ``RECON_SETTINGS``;
+    their values are part of the hash under which reconstruction metrics are cached.
     """
 
     # Subclasses should define these
     SCENES: list = []
     data_root: str = ""
 
+    # Multi-view consistency filter applied before fusion; None disables it
+    consist_dist_thresh: Optional[float] = None
+    consist_num_views: int = 3
+    # Bytes of working memory per batch of fused reference views (None = fusion default)
+    fusion_memory_budget: Optional[int] = None
+
+    # Attributes that change fused point clouds or their metrics
+    RECON_SETTINGS = (
+        "max_depth",
+        "sampling_number",
+        "voxel_length",
+        "sdf_trunc",
+        "dist_thresh",
+        "num_consist",
+        "consist_dist_thresh",
+        "consist_num_views",
+        "eval_threshold",
+        "down_sample",
+    )
+
     def __init__(self):
         pass
 
+    def recon_settings(self) -> TDict[str, object]:
+        """Fusion and 3D evaluation settings of this dataset (see ``RECON_SETTINGS``)."""
+        return {
+            name: getattr(self, name) for name in self.RECON_SETTINGS if hasattr(self, name)
+        }
+
     def eval_pose(self, scene: str, result_path: str) -> TDict[str, float]:
         """
         Evaluate camera pose estimation accuracy.
@@ -90,6 +122,34 @@ class Dataset:
             torch.from_numpy(as_homogeneous(gt["extrinsics"])),
         )
 
+    def filter_consistent_depths(
+        self, depths: np.ndarray, intrinsics: np.ndarray, extrinsics: np.ndarray
+    ) -> np.ndarray:
+        """
+        Zero out depths that are consistent with fewer than ``consist_num_views`` views.
+
+        Uses the batched engine of ``depth_anything_3.bench.fusion``. Returns ``depths``
+        unchanged if ``consist_dist_thresh`` is None.
+
+        Args:
+            depths: Depth maps [N, H, W]
+            intrinsics: Camera intrinsics [N, 3, 3]
+            extrinsics: Camera extrinsics (world-to-camera) [N, 4, 4]
+
+        Returns:
+            Filtered depth maps [N, H, W]
+        """
+        if self.consist_dist_thresh is None:
+            return depths
+        masks = consistency_masks(
+            depths,
+            projection_matrices(intrinsics, extrinsics),
+            self.consist_dist_thresh,
+            self.consist_num_views,
+            memory_budget=self.fusion_memory_budget,
+        )
+        return np.where(masks, depths, 0).astype(depths.dtype, copy=False)
+
     @abstractmethod
     def get_data(self, scene: str) -> Dict:
         """
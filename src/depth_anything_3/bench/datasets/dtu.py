@@ -34,9 +34,10 @@ from PIL import Image
 from plyfile import PlyData
 from scipy.io import loadmat
 from sklearn import neighbors as skln
-from tqdm import tqdm
 
 from depth_anything_3.bench.dataset import Dataset
+from depth_anything_3.bench.fusion import fuse_consistent_points, projection_matrices
+from depth_anything_3.bench.nn_search import nn_distances
 from depth_anything_3.bench.registries import MONO_REGISTRY, MV_REGISTRY
 from depth_anything_3.utils.constants import (
     DTU_DIST_THRESH,
@@ -46,6 +47,7 @@ from depth_anything_3.utils.constants import (
     DTU_SCENES,
 )
 from depth_anything_3.utils.pose_align import align_poses_umeyama
+from depth_anything_3.utils.unprojection import unproject_affine
 
 
 @MV_REGISTRY.register(name="dtu")
@@ -149,7 +151,8 @@ class DTU(Dataset):
         Args:
             scene: Scene identifier
             fuse_path: Path to fused point cloud
-            use_gpu: If True, use GPU-accelerated distance computation (faster but may have minor numerical differences)
+            use_gpu: If True, let the nearest-neighbour engine use torch on the GPU
+                (faster but may have minor numerical differences)
 
         Returns:
             Dict with metrics: {"comp": float, "acc": float, "overall": float}
@@ -205,17 +208,26 @@ class DTU(Dataset):
         else:
             raise ValueError(f"Invalid mode: {mode}")
 
-        proj_mat = self._build_proj_mats(intrinsics, extrinsics)
-
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        dtype = torch.float32
-        depths_t = torch.from_numpy(depths).to(device=device, dtype=dtype).unsqueeze(1)
-        proj_t = torch.from_numpy(proj_mat).to(device=device, dtype=dtype)
-        height, width = depths_t.shape[-2:]
+        proj_mat = projection_matrices(intrinsics, extrinsics)
 
         points: List[np.ndarray] = []
-        for idx in range(len(gt_data.image_files)):
-            if mode == "recon_unposed":
+        if mode == "recon_posed":
+            # All reference views at once, batched under a memory budget
+            points.append(
+                fuse_consistent_points(
+                    depths,
+                    proj_mat,
+                    self.dist_thresh,
+                    self.num_consist,
+                    memory_budget=self.fusion_memory_budget,
+                )
+            )
+        else:
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            dtype = torch.float32
+            depths_t = torch.from_numpy(depths).to(device=device, dtype=dtype).unsqueeze(1)
+            proj_t = torch.from_numpy(proj_mat).to(device=device, dtype=dtype)
+            for idx in range(len(gt_data.image_files)):
                 # Simple unfiltered back-projection per frame
                 cur_p_pcd = self._generate_points_from_depth(
                     depths_t[idx : idx + 1], proj_t[idx : idx + 1]
@@ -224,9 +236,6 @@ class DTU(Dataset):
                 cur_p_pcd = cur_p_pcd[:, :, mask]
                 no_filter_pc = cur_p_pcd.squeeze(0).permute(1, 0).cpu().numpy()
                 points.append(no_filter_pc)
-            else:  # recon_posed
-                final_pc = self._fuse_consistent_points(depths_t, proj_t, idx, height, width)
-                points.append(final_pc)
 
         # Concatenate and optionally downsample to hard cap
         points_np = np.concatenate(points, axis=0)
@@ -254,124 +263,9 @@ class DTU(Dataset):
         Returns:
             Point cloud tensor [B, 3, H, W]
         """
-        batch, height, width = depth.shape[0], depth.shape[2], depth.shape[3]
         inv_proj = torch.inverse(proj)
-        rot = inv_proj[:, :3, :3]
-        trans = inv_proj[:, :3, 3:4]
-
-        y, x = torch.meshgrid(
-            [
-                torch.arange(0, height, dtype=torch.float32, device=depth.device),
-                torch.arange(0, width, dtype=torch.float32, device=depth.device),
-            ],
-            indexing="ij",
-        )
-        y, x = y.contiguous(), x.contiguous()
-        y, x = y.view(height * width), x.view(height * width)
-        xyz = torch.stack((x, y, torch.ones_like(x)))
-        xyz = torch.unsqueeze(xyz, 0).repeat(batch, 1, 1)
-        rot_xyz = torch.matmul(rot, xyz)
-        rot_depth_xyz = rot_xyz * depth.view(batch, 1, -1)
-        proj_xyz = rot_depth_xyz + trans.view(batch, 3, 1)
-        return proj_xyz.view(batch, 3, height, width)
-
-    def _homo_warping(
-        self,
-        src_fea: torch.Tensor,
-        src_proj: torch.Tensor,
-        ref_proj: torch.Tensor,
-        depth_values: torch.Tensor,
-    ) -> torch.Tensor:
-        """
-        Homography warping for multi-view consistency checking.
-
-        Args:
-            src_fea: Source features [B, C, H, W]
-            src_proj: Source projection [B, 4, 4]
-            ref_proj: Reference projection [B, 4, 4]
-            depth_values: Depth values [B, Ndepth] or [B, Ndepth, H, W]
-
-        Returns:
-            Warped features [B, C, H, W]
-        """
-        batch, channels = src_fea.shape[0], src_fea.shape[1]
-        height, width = src_fea.shape[2], src_fea.shape[3]
-
-        with torch.no_grad():
-            proj = torch.matmul(src_proj, torch.inverse(ref_proj))
-            rot = proj[:, :3, :3]
-            trans = proj[:, :3, 3:4]
-
-            y, x = torch.meshgrid(
-                [
-                    torch.arange(0, height, dtype=torch.float32, device=src_fea.device),
-                    torch.arange(0, width, dtype=torch.float32, device=src_fea.device),
-                ],
-                indexing="ij",
-            )
-            y, x = y.contiguous(), x.contiguous()
-            y, x = y.view(height * width), x.view(height * width)
-            xyz = torch.stack((x, y, torch.ones_like(x)))
-            xyz = torch.unsqueeze(xyz, 0).repeat(batch, 1, 1)
-            rot_xyz = torch.matmul(rot, xyz)
-
-            rot_depth_xyz = rot_xyz.unsqueeze(2) * depth_values.view(-1, 1, 1, height * width)
-            proj_xyz = rot_depth_xyz + trans.view(batch, 3, 1, 1)
-            proj_xy = proj_xyz[:, :2, :, :] / proj_xyz[:, 2:3, :, :]
-            proj_x_normalized = proj_xy[:, 0, :, :] / ((width - 1) / 2) - 1
-            proj_y_normalized = proj_xy[:, 1, :, :] / ((height - 1) / 2) - 1
-            grid = torch.stack((proj_x_normalized, proj_y_normalized), dim=3)
-
-        warped_src_fea = F.grid_sample(
-            src_fea,
-            grid.view(batch, height, width, 2),
-            mode="bilinear",
-            padding_mode="zeros",
-            align_corners=True,
-        )
-        return warped_src_fea.view(batch, channels, height, width)
-
-    def _filter_depth(
-        self,
-        ref_depth: torch.Tensor,
-        src_depths: torch.Tensor,
-        ref_proj: torch.Tensor,
-        src_projs: torch.Tensor,
-    ) -> tuple:
-        """
-        Compute geometric consistency between reference and source depths.
-
-        Args:
-            ref_depth: Reference depth [1, 1, H, W]
-            src_depths: Source depths [B, 1, H, W]
-            ref_proj: Reference projection [1, 4, 4]
-            src_projs: Source projections [B, 4, 4]
-
-        Returns:
-            Tuple of (ref_pc, aligned_pcs, dist)
-        """
-        ref_pc = self._generate_points_from_depth(ref_depth, ref_proj)
-        src_pcs = self._generate_points_from_depth(src_depths, src_projs)
-        aligned_pcs = self._homo_warping(src_pcs, src_projs, ref_proj, ref_depth)
-        x_2 = (ref_pc[:, 0] - aligned_pcs[:, 0]) ** 2
-        y_2 = (ref_pc[:, 1] - aligned_pcs[:, 1]) ** 2
-        z_2 = (ref_pc[:, 2] - aligned_pcs[:, 2]) ** 2
-        dist = torch.sqrt(x_2 + y_2 + z_2).unsqueeze(1)
-        return ref_pc, aligned_pcs, dist
-
-    def _extract_points(
-        self, pc: torch.Tensor, mask: torch.Tensor, rgb: np.ndarray = None
-    ) -> np.ndarray:
-        """Extract masked points from a dense grid."""
-        pc = pc.cpu().numpy()
-        mask = mask.cpu().numpy().reshape(-1)
-        pc = pc.reshape(-1, 3)
-        points = pc[np.where(mask)]
-        if rgb is not None:
-            rgb = rgb.reshape(-1, 3)
-            colors = rgb[np.where(mask)]
-            return np.concatenate([points, colors], axis=1)
-        return points
+        points = unproject_affine(depth[:, 0], inv_proj[:, :3, :3], inv_proj[:, :3, 3])
+        return points.permute(0, 3, 1, 2)
 
     # ------------------------------
     # 3D Reconstruction Evaluation
@@ -450,96 +344,24 @@ class DTU(Dataset):
         # Compute accuracy (pred -> GT) and completeness (GT -> pred)
         stl = self._read_ply(gt_ply) if isinstance(gt_ply, str) else gt_ply
 
-        if use_gpu and torch.cuda.is_available():
-            # GPU-accelerated distance computation
-            mean_d2s = self._knn_dist_gpu(data_in_obs, stl, max_dist)
-        else:
-            # CPU version (original, for exact reproduction)
-            nn_engine.fit(stl)
-            dist_d2s, _ = nn_engine.kneighbors(data_in_obs, n_neighbors=1, return_distance=True)
-            mean_d2s = dist_d2s[dist_d2s < max_dist].mean()
+        # Distances beyond max_dist are discarded, so the searches stop there. The
+        # float64 KD-tree reproduces the original numbers exactly; use_gpu lets the
+        # engine pick the (float32) torch backends instead.
+        nn_method = "auto" if use_gpu else "kdtree"
+        dist_d2s = nn_distances(stl, data_in_obs, max_dist=max_dist, method=nn_method)
+        mean_d2s = dist_d2s[dist_d2s < max_dist].mean()
 
         ground_plane = loadmat(plane_file)["P"]
         stl_hom = np.concatenate([stl, np.ones_like(stl[:, :1])], -1)
         above = (ground_plane.reshape((1, 4)) * stl_hom).sum(-1) > 0
         stl_above = stl[above]
 
-        if use_gpu and torch.cuda.is_available():
-            # GPU-accelerated distance computation
-            mean_s2d = self._knn_dist_gpu(stl_above, data_in, max_dist)
-        else:
-            # CPU version (original, for exact reproduction)
-            nn_engine.fit(data_in)
-            dist_s2d, _ = nn_engine.kneighbors(stl_above, n_neighbors=1, return_distance=True)
-            mean_s2d = dist_s2d[dist_s2d < max_dist].mean()
+        dist_s2d = nn_distances(data_in, stl_above, max_dist=max_dist, method=nn_method)
+        mean_s2d = dist_s2d[dist_s2d < max_dist].mean()
 
         overall = (mean_d2s + mean_s2d) / 2
         return mean_d2s, mean_s2d, overall
 
-    def _knn_dist_gpu(
-        self,
-        query: np.ndarray,
-        target: np.ndarray,
-        max_dist: float,
-        batch_size: int = 8192,
-        target_batch_size: int = 50000,
-    ) -> float:
-        """
-        GPU-accelerated nearest neighbor distance computation.
-
-        Args:
-            query: Query points [N, 3]
-            target: Target points [M, 3]
-            max_dist: Outlier threshold
-            batch_size: Batch size for query to avoid OOM (tuned for 16GB GPU)
-            target_batch_size: Batch size for target to avoid OOM
-
-        Returns:
-            Mean distance (excluding outliers)
-        """
-        device = torch.device("cuda")
-
-        all_min_dists = []
-        n_query_batches = (len(query) + batch_size - 1) // batch_size
-        n_target_batches = (len(target) + target_batch_size - 1) // target_batch_size
-
-        # Pre-load target batches to GPU to avoid repeated transfers
-        # Memory: ~50000 pts * 3 coords * 4 bytes * n_batches
-        target_batches = []
-        for j in range(0, len(target), target_batch_size):
-            target_batch = target[j : j + target_batch_size]
-            target_t = torch.from_numpy(target_batch).float().to(device)
-            target_batches.append(target_t)
-
-        with tqdm(total=n_query_batches, desc="  GPU KNN", leave=False, ncols=100) as pbar:
-            for i in range(0, len(query), batch_size):
-                batch = query[i : i + batch_size]
-                query_t = torch.from_numpy(batch).float().to(device)
-
-                # Compute distances to all target batches
-                # Memory peak: query_batch × target_batch_size × 4 bytes
-                # = 8192 × 50000 × 4 = ~1.6 GB per cdist call
-                batch_min_dists = []
-                for target_t in target_batches:
-                    dists = torch.cdist(query_t, target_t)
-                    batch_min_dists.append(dists.min(dim=1).values)
-                    del dists  # Free immediately
-
-                # Get minimum distance across all target batches
-                min_dists = torch.stack(batch_min_dists, dim=1).min(dim=1).values
-                all_min_dists.append(min_dists.cpu().numpy())
-
-                del query_t, min_dists, batch_min_dists
-                pbar.update(1)
-
-        # Clean up target batches
-        for target_t in target_batches:
-            del target_t
-        torch.cuda.empty_cache()
-
-        all_min_dists = np.concatenate(all_min_dists)
-        return all_min_dists[all_min_dists < max_dist].mean()
-
     def _read_ply(self, file: str) -> np.ndarray:
         """Read point cloud from PLY file."""
         data = PlyData.read(file)
@@ -623,53 +445,6 @@ class DTU(Dataset):
 
         return depths, intrinsics, extrinsics
 
-    def _build_proj_mats(
-        self, intrinsics: np.ndarray, extrinsics: np.ndarray
-    ) -> np.ndarray:
-        """Compute per-view 4x4 projection matrices from K and [R|t]."""
-        proj_mat_list = []
-        for i in range(len(intrinsics)):
-            proj_mat = np.eye(4, dtype=np.float32)
-            proj_mat[:3, :4] = np.dot(intrinsics[i], extrinsics[i][:3])
-            proj_mat_list.append(proj_mat)
-        return np.stack(proj_mat_list, axis=0)
-
-    def _fuse_consistent_points(
-        self,
-        depths_t: torch.Tensor,
-        proj_t: torch.Tensor,
-        idx: int,
-        H: int,
-        W: int,
-    ) -> np.ndarray:
-        """Fuse points consistent across multiple source views for a reference index."""
-        device, dtype = depths_t.device, depths_t.dtype
-        pc_buff = torch.zeros((3, H, W), device=device, dtype=dtype)
-        val_cnt = torch.zeros((1, H, W), device=device, dtype=dtype)
-
-        j = 0
-        batch_size = 20
-        tot_frame = depths_t.shape[0]
-        while True:
-            ref_pc, pcs, dist = self._filter_depth(
-                ref_depth=depths_t[idx : idx + 1],
-                src_depths=depths_t[j : min(j + batch_size, tot_frame)],
-                ref_proj=proj_t[idx : idx + 1],
-                src_projs=proj_t[j : min(j + batch_size, tot_frame)],
-            )
-            masks = (dist < self.dist_thresh).float()
-            masked_pc = pcs * masks
-            pc_buff += masked_pc.sum(dim=0, keepdim=False)
-            val_cnt += masks.sum(dim=0, keepdim=False)
-            j += batch_size
-            if j >= tot_frame:
-                break
-
-        final_mask = (val_cnt >= self.num_consist).squeeze(0)
-        avg_points = torch.div(pc_buff, val_cnt).permute(1, 2, 0)
-        final_pc = self._extract_points(avg_points, final_mask)
-        return final_pc
-
     def _cap_points(self, points: np.ndarray, max_points: int) -> np.ndarray:
         """Downsample points if exceeding max count."""
         if len(points) <= max_points:
@@ -373,6 +373,9 @@ class ETH3D(Dataset):
 
         images = np.stack(images, axis=0)
 
+        # Optional multi-view consistency filter (off unless consist_dist_thresh is set)
+        depths = self.filter_consistent_depths(depths, intrinsics, extrinsics)
+
         # Create TSDF volume and fuse
         volume = create_tsdf_volume(
             voxel_length=self.voxel_length,
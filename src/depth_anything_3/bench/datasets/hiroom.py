@@ -274,6 +274,9 @@ class HiRoomDataset(Dataset):
         else:
             raise ValueError(f"Invalid mode: {mode}")
 
+        # Optional multi-view consistency filter (off unless consist_dist_thresh is set)
+        depths = self.filter_consistent_depths(depths, intrinsics, extrinsics)
+
         # Create TSDF volume and fuse
         volume = create_tsdf_volume(
             voxel_length=self.voxel_length,
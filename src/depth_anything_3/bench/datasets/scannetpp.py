@@ -34,11 +34,11 @@ import open3d as o3d
 from addict import Dict
 
 from depth_anything_3.bench.dataset import Dataset, _wait_for_file_ready
+from depth_anything_3.bench.nn_search import chamfer_metrics
 from depth_anything_3.bench.registries import MONO_REGISTRY, MV_REGISTRY
 from depth_anything_3.bench.utils import (
     create_tsdf_volume,
     fuse_depth_to_tsdf,
-    nn_correspondance,
     sample_points_from_mesh,
 )
 from depth_anything_3.utils.constants import (
@@ -292,41 +292,7 @@ class ScanNetPP(Dataset):
         verts_pred = np.asarray(pred_pcd.points)
         verts_gt = np.asarray(gt_pcd.points)
 
-        if len(verts_pred) == 0 or len(verts_gt) == 0:
-            return {
-                "acc": float("inf"),
-                "comp": float("inf"),
-                "overall": float("inf"),
-                "precision": 0.0,
-                "recall": 0.0,
-                "fscore": 0.0,
-            }
-
-        # Compute distances
-        dist_pred_to_gt = nn_correspondance(verts_gt, verts_pred)
-        dist_gt_to_pred = nn_correspondance(verts_pred, verts_gt)
-
-        # Compute metrics
-        accuracy = float(np.mean(dist_pred_to_gt))
-        completeness = float(np.mean(dist_gt_to_pred))
-        overall = (accuracy + completeness) / 2
-
-        precision = float(np.mean((dist_pred_to_gt < self.eval_threshold).astype(float)))
-        recall = float(np.mean((dist_gt_to_pred < self.eval_threshold).astype(float)))
-
-        if precision + recall > 0:
-            fscore = 2 * precision * recall / (precision + recall)
-        else:
-            fscore = 0.0
-
-        return {
-            "acc": accuracy,
-            "comp": completeness,
-            "overall": overall,
-            "precision": precision,
-            "recall": recall,
-            "fscore": fscore,
-        }
+        return chamfer_metrics(verts_pred, verts_gt, self.eval_threshold)
 
     def _load_gt_meta(self, result_path: str) -> Dict:
         """Load saved GT meta for fusion."""
@@ -408,6 +374,9 @@ class ScanNetPP(Dataset):
         else:
             raise ValueError(f"Invalid mode: {mode}")
 
+        # Optional multi-view consistency filter (off unless consist_dist_thresh is set)
+        depths = self.filter_consistent_depths(depths, intrinsics, extrinsics)
+
         # Create TSDF volume and fuse
         volume = create_tsdf_volume(
             voxel_length=self.voxel_length,
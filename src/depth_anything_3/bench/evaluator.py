@@ -23,8 +23,12 @@ Supports multiple datasets and evaluation modes:
 """
 
 import json
+import multiprocessing as mp
 import os
+import queue
 import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict as TDict, Iterable, List
 
 import numpy as np
@@ -33,8 +37,18 @@ from addict import Dict
 from tqdm import tqdm
 
 from depth_anything_3.bench.print_metrics import MetricsPrinter
-from depth_anything_3.utils.parallel_utils import parallel_execution
+from depth_anything_3.utils.io.input_processor import PreprocessCache
 from depth_anything_3.bench.registries import MV_REGISTRY
+from depth_anything_3.bench.runner import (
+    StageTimes,
+    cached_result,
+    config_hash,
+    marker_matches,
+    read_marker,
+    run_recon_job,
+    weights_identity,
+    write_marker,
+)
 from depth_anything_3.utils.constants import EVAL_REF_VIEW_STRATEGY
 
 
@@ -49,9 +63,13 @@ class Evaluator:
             modes=["pose", "recon_unposed", "recon_posed"],
         )
         api = DepthAnything3.from_pretrained("...")
-        evaluator.infer(api)
-        metrics = evaluator.eval()
+        metrics = evaluator.all(api)  # or evaluator.infer(api); evaluator.eval()
         evaluator.print_metrics()
+
+    Scenes are loaded on a background thread while the model runs, and fusion plus 3D
+    evaluation of finished scenes runs on a process pool during inference. Outputs are
+    stamped with a hash of the config that produced them; with ``resume`` (default),
+    matching outputs are reused, so an interrupted sweep continues where it stopped.
     """
 
     VALID_MODES = {"pose", "recon_unposed", "recon_posed", "view_syn"}
@@ -68,6 +86,10 @@ class Evaluator:
         max_frames: int = 100,
         gpu_id: int = 0,
         total_gpus: int = 1,
+        preprocess_cache_gb: float = 2.0,
+        resume: bool = True,
+        prefetch_scenes: int = 2,
+        process_res: int = 504,
     ):
         """
         Initialize the evaluator.
@@ -86,6 +108,12 @@ class Evaluator:
                         Set to -1 to disable sampling.
             gpu_id: GPU index for multi-GPU (0-indexed)
             total_gpus: Total number of GPUs for task distribution
+            preprocess_cache_gb: Size of the in-memory cache of preprocessed images, so the
+                                 posed pass reuses the unposed pass's decode/resize work
+                                 (0 = disabled)
+            resume: Skip scenes whose outputs exist with a matching config hash
+            prefetch_scenes: Scenes loaded ahead of inference by the loader thread
+            process_res: Processing resolution of inference (default: 504)
         """
         self.work_dir = work_dir
         self.datas = list(datas)
@@ -97,6 +125,13 @@ class Evaluator:
         self.max_frames = max_frames
         self.gpu_id = gpu_id
         self.total_gpus = total_gpus
+        self.preprocess_cache_gb = preprocess_cache_gb
+        self.resume = resume
+        self.prefetch_scenes = prefetch_scenes
+        self.process_res = process_res
+        self.times = StageTimes()
+        self._pool = None
+        self._futures = {}  # (data, scene, mode) -> Future of run_recon_job
 
         # Validate modes
         unknown = self.modes - self.VALID_MODES
@@ -118,17 +153,26 @@ class Evaluator:
 
     # -------------------- Public APIs -------------------- #
 
-    def all(self, api) -> TDict[str, dict]:
+    def all(self, api, model_path: str = None) -> TDict[str, dict]:
         """
         Run complete evaluation pipeline: inference + evaluation.
 
+        Reconstruction jobs of each scene are queued on the fusion pool as soon as its
+        inference finishes, so CPU-heavy fusion overlaps with inference.
+
         Args:
             api: DepthAnything3 API instance
+            model_path: Model path or ID, part of the config hash
 
         Returns:
             Combined metrics dictionary
         """
-        self.infer(api)
+        recon_modes = {"recon_unposed", "recon_posed"} & self.modes
+        self.infer(
+            api,
+            model_path=model_path,
+            on_scene_done=self._submit_recon_jobs if recon_modes else None,
+        )
         return self.eval()
 
     def _get_scenes(self, dataset) -> List[str]:
@@ -141,23 +185,32 @@ class Evaluator:
             return scenes
         return all_scenes
 
-    def infer(self, api, model_path: str = None) -> None:
+    def infer(self, api, model_path: str = None, on_scene_done=None) -> None:
         """
         Run inference according to requested modes.
 
         - Unposed export if 'pose' or 'recon_unposed' is in modes
         - Posed export if 'recon_posed' or 'view_syn' is in modes
 
+        Scene data is loaded by a background thread, ``prefetch_scenes`` scenes ahead of
+        the model. With ``resume``, exports whose marker matches the current config are
+        skipped without loading the scene.
+
         Multi-GPU: Use --gpu_id and --total_gpus to distribute tasks.
         Example: Launch 4 processes with gpu_id=0,1,2,3 and total_gpus=4
 
         Args:
             api: DepthAnything3 API instance
-            model_path: Model path (unused, kept for API compatibility)
+            model_path: Model path or ID, part of the config hash (defaults to the API's
+                        model name)
+            on_scene_done: Optional callback ``(data, scene)`` run after each scene
         """
         need_unposed = {"pose", "recon_unposed"} & self.modes
         need_posed = {"recon_posed", "view_syn"} & self.modes
         export_format = "mini_npz-glb" if self.debug else "mini_npz"
+        model_id = model_path or getattr(api, "model_name", None)
+        weights_id = weights_identity(model_id)
+        passes = [posed for posed, needed in ((False, need_unposed), (True, need_posed)) if needed]
 
         # Collect all tasks
         all_tasks = []
@@ -174,32 +227,104 @@ class Evaluator:
             tasks = all_tasks
             print(f"[INFO] Total inference tasks: {len(tasks)}")
 
-        for data, scene in tqdm(tasks, desc=f"Inference (GPU {self.gpu_id})"):
-            dataset = self.datasets[data]
-            scene_data = dataset.get_data(scene)
-            scene_data = self._sample_frames(scene_data, scene)
-
-            if need_unposed:
-                export_dir = self._export_dir(data, scene, posed=False)
-                api.inference(
-                    scene_data.image_files,
-                    export_dir=export_dir,
-                    export_format=export_format,
-                    ref_view_strategy=self.ref_view_strategy,
-                )
-                self._save_gt_meta(export_dir, scene_data)
+        # Resolve the passes each scene still needs
+        todo = []
+        for data, scene in tasks:
+            pending = []
+            for posed in passes:
+                key = self._infer_hash(data, scene, posed, weights_id, export_format)
+                if self.resume and self._is_done(self._export_dir(data, scene, posed), key):
+                    continue
+                pending.append((posed, key))
+            if pending:
+                todo.append((data, scene, pending))
+            else:
+                self.times.skip(data)
+                if on_scene_done is not None:
+                    on_scene_done(data, scene)
+        if len(todo) < len(tasks):
+            print(f"[INFO] Resuming: {len(tasks) - len(todo)} scenes already done")
+
+        if self.preprocess_cache_gb > 0 and api.input_processor.cache is None:
+            api.input_processor.cache = PreprocessCache(
+                max_bytes=int(self.preprocess_cache_gb * 1024**3)
+            )
 
-            if need_posed:
-                export_dir = self._export_dir(data, scene, posed=True)
-                api.inference(
-                    scene_data.image_files,
-                    scene_data.extrinsics,
-                    scene_data.intrinsics,
-                    export_dir=export_dir,
-                    export_format=export_format,
-                    ref_view_strategy=self.ref_view_strategy,
-                )
+        for data, scene, scene_data, pending in tqdm(
+            self._prefetch_scenes(todo), total=len(todo), desc=f"Inference (GPU {self.gpu_id})"
+        ):
+            for posed, key in pending:
+                export_dir = self._export_dir(data, scene, posed=posed)
+                with self.times.stage(data, scene, "infer_posed" if posed else "infer_unposed"):
+                    if posed:
+                        api.inference(
+                            scene_data.image_files,
+                            scene_data.extrinsics,
+                            scene_data.intrinsics,
+                            export_dir=export_dir,
+                            export_format=export_format,
+                            ref_view_strategy=self.ref_view_strategy,
+                            process_res=self.process_res,
+                        )
+                    else:
+                        api.inference(
+                            scene_data.image_files,
+                            export_dir=export_dir,
+                            export_format=export_format,
+                            ref_view_strategy=self.ref_view_strategy,
+                            process_res=self.process_res,
+                        )
                 self._save_gt_meta(export_dir, scene_data)
+                write_marker(self._marker_path(export_dir), hash=key, model=model_id)
+            if on_scene_done is not None:
+                on_scene_done(data, scene)
+
+        if api.input_processor.cache is not None:
+            stats = api.input_processor.cache.get_stats()
+            print(
+                f"[INFO] Preprocess cache: {stats['hits'] + stats['spill_hits']} hits, "
+                f"{stats['misses']} misses ({stats['hit_rate'] * 100:.0f}% hit rate), "
+                f"{stats['memory_bytes'] / 1024**2:.0f} MiB in memory"
+            )
+        print(f"\n[INFO] Stage times (s):\n{self.times.table()}")
+
+    def _prefetch_scenes(self, todo: List[tuple]) -> Iterable[tuple]:
+        """Yield (data, scene, scene_data, pending) with scenes loaded on a background thread."""
+        buffer = queue.Queue(maxsize=max(1, self.prefetch_scenes))
+        stop = threading.Event()
+
+        def load():
+            try:
+                for data, scene, pending in todo:
+                    if stop.is_set():
+                        return
+                    with self.times.stage(data, scene, "load"):
+                        scene_data = self.datasets[data].get_data(scene)
+                        scene_data = self._sample_frames(scene_data, scene)
+                    buffer.put((data, scene, scene_data, pending))
+            except BaseException as e:  # Re-raised in the consumer
+                buffer.put(e)
+                return
+            buffer.put(None)
+
+        thread = threading.Thread(target=load, name="bench-loader", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            # Unblock a loader waiting on a full queue
+            while thread.is_alive():
+                try:
+                    buffer.get(timeout=0.1)
+                except queue.Empty:
+                    pass
 
     def eval(self) -> TDict[str, dict]:
         """
@@ -241,6 +366,9 @@ class Evaluator:
             # TODO: Add view synthesis metrics here when available
             pass
 
+        self._shutdown_pool()
+        print(f"\n[INFO] Stage times (s):\n{self.times.table()}")
+        self.times.dump(os.path.join(self.work_dir, "timing.json"))
         return summary
 
     def print_metrics(self, metrics: TDict[str, dict] = None) -> None:
@@ -269,23 +397,33 @@ class Evaluator:
             for scene in tqdm(scenes, desc=f"{data} scenes", leave=False):
                 export_dir = self._export_dir(data, scene, posed=False)
                 result_path = os.path.join(export_dir, "exports", "mini_npz", "results.npz")
-                
+
                 # Check if result file exists and is valid
                 if not os.path.exists(result_path):
                     print(f"\n[ERROR] Result file not found: {result_path}")
                     print(f"[ERROR] CWD: {os.getcwd()}")
                     print(f"[ERROR] Please run inference first (remove --eval_only)")
                     continue
-                
+
+                metrics_path = os.path.join(export_dir, "exports", "metrics_pose.json")
+                key = config_hash(stage="pose", result=self._result_key(export_dir, result_path))
+                result = cached_result(metrics_path, key) if self.resume else None
+                if result is not None:
+                    self.times.skip(data)
+                    dataset_results[scene] = result
+                    continue
+
                 try:
-                    # Use saved GT meta (handles frame sampling correctly)
-                    gt_meta = self._load_gt_meta(export_dir)
-                    if gt_meta is not None:
-                        result = self._compute_pose_with_gt(result_path, gt_meta)
-                    else:
-                        # Fallback to dataset GT (no sampling was done)
-                        result = dataset.eval_pose(scene, result_path)
+                    with self.times.stage(data, scene, "pose"):
+                        # Use saved GT meta (handles frame sampling correctly)
+                        gt_meta = self._load_gt_meta(export_dir)
+                        if gt_meta is not None:
+                            result = self._compute_pose_with_gt(result_path, gt_meta)
+                        else:
+                            # Fallback to dataset GT (no sampling was done)
+                            result = dataset.eval_pose(scene, result_path)
                     dataset_results[scene] = self._to_float_dict(result)
+                    write_marker(metrics_path, hash=key, result=dataset_results[scene])
                 except Exception as e:
                     print(f"\n[ERROR] Failed to evaluate pose for {data}/{scene}: {e}")
                     print(f"[ERROR] File path: {os.path.abspath(result_path)}")
@@ -297,7 +435,7 @@ class Evaluator:
             if not dataset_results:
                 print(f"[WARNING] No valid results for {data}")
                 continue
-                
+
             dataset_results["mean"] = self._mean_of_dicts(dataset_results.values())
             out_path = os.path.join(self._metric_dir, f"{data}_pose.json")
             self._dump_json(out_path, dataset_results)
@@ -307,63 +445,151 @@ class Evaluator:
         """
         Compute reconstruction metrics for each dataset and scene.
 
+        Fusion and 3D evaluation of all scenes are queued on the process pool before
+        any result is collected, so datasets overlap; scenes already submitted during
+        inference (see ``all``) are not submitted again.
+
         Args:
             mode: "recon_unposed" or "recon_posed"
         """
         assert mode in {"recon_unposed", "recon_posed"}
         os.makedirs(self._metric_dir, exist_ok=True)
 
-        posed_flag = mode == "recon_posed"
-        
         # Filter out datasets that don't support reconstruction (e.g., dtu64)
         recon_datas = [d for d in self.datas if d != "dtu64"]
+        for data in recon_datas:
+            for scene in self._get_scenes(self.datasets[data]):
+                self._submit_recon_job(data, scene, mode)
 
         for data in tqdm(recon_datas, desc=f"Datasets ({mode} eval)"):
-            dataset = self.datasets[data]
             dataset_results = Dict()
-            scenes = self._get_scenes(dataset)
-
-            # Prepare paths for all scenes
-            scene_list = []
-            result_paths = []
-            fuse_paths = []
-            for scene in scenes:
-                export_dir = self._export_dir(data, scene, posed=posed_flag)
-                result_path = os.path.join(export_dir, "exports", "mini_npz", "results.npz")
-                fuse_path = os.path.join(export_dir, "exports", "fuse", "pcd.ply")
-                scene_list.append(scene)
-                result_paths.append(result_path)
-                fuse_paths.append(fuse_path)
-
-            # Parallel fusion (default 4 workers)
-            # DTU uses CUDA operations in fusion, which doesn't work well with ThreadPool
-            use_sequential = (data == "dtu")
-            parallel_execution(
-                scene_list,
-                result_paths,
-                fuse_paths,
-                action=lambda s, rp, fp: dataset.fuse3d(s, rp, fp, mode),
-                num_processes=self.num_fusion_workers,
-                print_progress=True,
-                desc=f"{data} fusion",
-                sequential=use_sequential,
-            )
-
-            # Sequential evaluation (fast, no need to parallelize)
-            for scene, fuse_path in zip(scene_list, fuse_paths):
-                # DTU supports CPU-based evaluation
-                if data == "dtu" and hasattr(dataset, "eval3d"):
-                    result = dataset.eval3d(scene, fuse_path)
-                else:
-                    result = dataset.eval3d(scene, fuse_path)
-                dataset_results[scene] = self._to_float_dict(result)
+            for scene in self._get_scenes(self.datasets[data]):
+                try:
+                    result = self._collect_recon_job(data, scene, mode)
+                except Exception as e:
+                    print(f"\n[ERROR] Failed to evaluate {mode} for {data}/{scene}: {e}")
+                    if self.debug:
+                        import traceback
+                        traceback.print_exc()
+                    continue
+                dataset_results[scene] = result
                 print(f"  {mode} | {data} | {scene}: {result}")
 
+            if not dataset_results:
+                print(f"[WARNING] No valid results for {data}")
+                continue
+
             dataset_results["mean"] = self._mean_of_dicts(dataset_results.values())
             out_path = os.path.join(self._metric_dir, f"{data}_{mode}.json")
             self._dump_json(out_path, dataset_results)
             yield data, dataset_results
 
+    # -------------------- Work queue -------------------- #
+
+    def _infer_hash(
+        self, data: str, scene: str, posed: bool, weights_id: str, export_format: str
+    ) -> str:
+        """
+        Hash of everything that determines the inference outputs of a scene.
+
+        ``weights_id`` is the ``weights_identity`` of the model, so new weights saved
+        under the same path do not reuse stale predictions.
+        """
+        return config_hash(
+            stage="infer",
+            data=data,
+            scene=scene,
+            posed=posed,
+            model=weights_id,
+            ref_view_strategy=self.ref_view_strategy,
+            max_frames=self.max_frames,
+            process_res=self.process_res,
+            export_format=export_format,
+        )
+
+    @staticmethod
+    def _marker_path(export_dir: str) -> str:
+        return os.path.join(export_dir, "exports", "done.json")
+
+    def _is_done(self, export_dir: str, key: str) -> bool:
+        result_path = os.path.join(export_dir, "exports", "mini_npz", "results.npz")
+        return marker_matches(self._marker_path(export_dir), key) and os.path.exists(
+            result_path
+        )
+
+    def _result_key(self, export_dir: str, result_path: str) -> str:
+        """Identity of the predictions a metric is computed from."""
+        marker = read_marker(self._marker_path(export_dir))
+        if marker is not None and "hash" in marker:
+            return marker["hash"]
+        # Predictions written before markers existed: fall back to the file stamp
+        stat = os.stat(result_path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _recon_job_args(self, data: str, scene: str, mode: str):
+        """Arguments of ``run_recon_job`` for a scene, or None if it has no predictions."""
+        export_dir = self._export_dir(data, scene, posed=mode == "recon_posed")
+        result_path = os.path.join(export_dir, "exports", "mini_npz", "results.npz")
+        if not os.path.exists(result_path):
+            return None
+        fuse_path = os.path.join(export_dir, "exports", "fuse", "pcd.ply")
+        metrics_path = os.path.join(export_dir, "exports", f"metrics_{mode}.json")
+        # Fusion and evaluation settings of the dataset change the metrics as well
+        key = config_hash(
+            stage=mode,
+            result=self._result_key(export_dir, result_path),
+            settings=self.datasets[data].recon_settings(),
+        )
+        return data, scene, mode, result_path, fuse_path, metrics_path, key
+
+    def _use_pool(self, data: str) -> bool:
+        # DTU uses CUDA operations in fusion, so it runs in the main process
+        return self.num_fusion_workers > 1 and data != "dtu"
+
+    def _submit_recon_job(self, data: str, scene: str, mode: str) -> None:
+        """Queue fusion + 3D evaluation of a scene on the process pool if needed."""
+        if (data, scene, mode) in self._futures or not self._use_pool(data):
+            return
+        args = self._recon_job_args(data, scene, mode)
+        if args is None or (self.resume and cached_result(args[5], args[6]) is not None):
+            return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.num_fusion_workers, mp_context=mp.get_context("spawn")
+            )
+        self._futures[data, scene, mode] = self._pool.submit(run_recon_job, *args)
+
+    def _submit_recon_jobs(self, data: str, scene: str) -> None:
+        """``infer`` callback: start evaluating a scene as soon as its predictions exist."""
+        if data == "dtu64":
+            return
+        for mode in sorted({"recon_unposed", "recon_posed"} & self.modes):
+            self._submit_recon_job(data, scene, mode)
+
+    def _collect_recon_job(self, data: str, scene: str, mode: str) -> TDict[str, float]:
+        """Metrics of a scene: from its pool job, the cache, or computed in-process."""
+        future = self._futures.pop((data, scene, mode), None)
+        if future is not None:
+            result, timings = future.result()
+        else:
+            args = self._recon_job_args(data, scene, mode)
+            if args is None:
+                raise FileNotFoundError(f"No predictions for {data}/{scene}, run inference first")
+            result = cached_result(args[5], args[6]) if self.resume else None
+            if result is not None:
+                self.times.skip(data)
+                return result
+            result, timings = run_recon_job(*args, dataset=self.datasets[data])
+        for stage, seconds in timings.items():
+            self.times.add(data, scene, stage, seconds)
+        return result
+
+    def _shutdown_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        self._futures.clear()
+
     # -------------------- Helpers -------------------- #
 
     def _save_gt_meta(self, export_dir: str, scene_data: Dict) -> None:
@@ -579,8 +805,12 @@ Config Overrides (using dotlist notation):
   eval.ref_view_strategy=VALUE       Reference view strategy (default: first)
   eval.eval_only=VALUE               Only run evaluation (skip inference) (true/false)
   eval.print_only=VALUE              Only print saved metrics (true/false)
+  eval.resume=VALUE                  Reuse outputs with a matching config hash (default: true)
   inference.num_fusion_workers=VALUE Number of parallel workers (default: 4)
   inference.debug=VALUE              Enable debug mode (true/false)
+  inference.preprocess_cache_gb=VALUE
+                                     Preprocessed-image cache size in GB (0=off, default: 2)
+  inference.process_res=VALUE        Processing resolution (default: 504)
 
 Special Flags:
   --help, -h                         Show this help message
@@ -640,6 +870,9 @@ Examples:
     print_only = config.eval.print_only
     debug = config.inference.debug
     num_fusion_workers = config.inference.num_fusion_workers
+    preprocess_cache_gb = config.inference.get("preprocess_cache_gb", 2.0)
+    process_res = config.inference.get("process_res", 504)
+    resume = config.eval.get("resume", True)
 
     # GPU settings: parse from CLI dotlist args (gpu_id=X total_gpus=Y)
     # These are passed by the main process when spawning workers
@@ -666,6 +899,9 @@ Examples:
         max_frames=max_frames,
         gpu_id=gpu_id,
         total_gpus=total_gpus,
+        preprocess_cache_gb=preprocess_cache_gb,
+        resume=resume,
+        process_res=process_res,
     )
 
     if print_only:
@@ -710,6 +946,9 @@ Examples:
             base_cmd += [f"eval.ref_view_strategy={ref_view_strategy}"]
             base_cmd += [f"inference.debug={str(debug).lower()}"]
             base_cmd += [f"inference.num_fusion_workers={num_fusion_workers}"]
+            base_cmd += [f"inference.preprocess_cache_gb={preprocess_cache_gb}"]
+            base_cmd += [f"inference.process_res={process_res}"]
+            base_cmd += [f"eval.resume={str(resume).lower()}"]
 
             # Launch workers
             processes = []
@@ -743,10 +982,11 @@ Examples:
             api = DepthAnything3.from_pretrained(model_path)
             api = api.to(device)
 
-            evaluator.infer(api, model_path=model_path)
-
-            # Only run eval if single GPU mode (workers don't eval)
-            if not is_worker:
-                metrics = evaluator.eval()
+            # Only run eval if single GPU mode (workers don't eval); in that case fusion
+            # of finished scenes overlaps with inference of the next ones
+            if is_worker:
+                evaluator.infer(api, model_path=model_path)
+            else:
+                metrics = evaluator.all(api, model_path=model_path)
                 evaluator.print_metrics(metrics)
 
@@ -0,0 +1,201 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batched multi-view geometric-consistency fusion of posed depth maps.
+
+A pixel of a reference view is consistent with a source view if the world point of
+the source view, sampled where the reference point projects into it, lies within
+``dist_thresh`` of the reference point. Pixels consistent with at least
+``num_consist`` views (the reference itself included) are kept, at the mean of the
+consistent source points.
+
+Inverse projections, world points and the pixel grid of every view are computed once
+per scene. Reference views are then processed in batches sized by a memory budget:
+every source view is warped to all references of the batch in one ``grid_sample``
+call, with the references stacked along the image height.
+
+    proj = projection_matrices(intrinsics, extrinsics)
+    points = fuse_consistent_points(depths, proj, dist_thresh=0.2, num_consist=4)
+    masks = consistency_masks(depths, proj, dist_thresh=0.05, num_consist=3)
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from depth_anything_3.utils.unprojection import unproject_affine
+
+# Working memory of one batch of reference views, used when no budget is given
+FUSION_MEMORY_BUDGET = 1 << 30
+# float32 buffers held per reference pixel while a batch is processed
+_FLOATS_PER_PIXEL = 20
+
+
+def projection_matrices(intrinsics: np.ndarray, extrinsics: np.ndarray) -> np.ndarray:
+    """
+    Per-view 4x4 projection matrices ``[[K @ R, K @ t], [0, 0, 0, 1]]``.
+
+    Args:
+        intrinsics: Camera intrinsics [N, 3, 3]
+        extrinsics: Camera extrinsics (world-to-camera) [N, 3 or 4, 4]
+
+    Returns:
+        Projection matrices [N, 4, 4] (float32)
+    """
+    proj = np.tile(np.eye(4, dtype=np.float32), (len(intrinsics), 1, 1))
+    proj[:, :3, :4] = np.matmul(intrinsics, np.asarray(extrinsics)[:, :3])
+    return proj
+
+
+def _reference_batch_size(
+    height: int, width: int, device: torch.device, budget: Optional[int]
+) -> int:
+    """
+    Reference views per batch whose working memory fits in ``budget`` bytes.
+
+    Without a budget, ``FUSION_MEMORY_BUDGET`` is used. On CUDA the budget is capped
+    at half of the free device memory, so other processes sharing the device keep room.
+    """
+    if budget is None:
+        budget = FUSION_MEMORY_BUDGET
+    if device.type == "cuda":
+        free, _ = torch.cuda.mem_get_info(device)
+        budget = min(budget, free // 2)
+    return max(1, int(budget // (_FLOATS_PER_PIXEL * 4 * height * width)))
+
+
+def _iter_consistency(
+    depths: np.ndarray,
+    proj_mats: np.ndarray,
+    dist_thresh: float,
+    device=None,
+    memory_budget: Optional[int] = None,
+) -> Iterator[Tuple[slice, torch.Tensor, torch.Tensor, torch.Tensor]]:
+    """
+    Yield (reference slice, flat pixel indices [P] into the batch, summed consistent
+    points [3, P], consistent view counts [P]) per batch of reference views.
+    """
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    device = torch.device(device)
+    depths = torch.as_tensor(np.asarray(depths), dtype=torch.float32, device=device)
+    proj = torch.as_tensor(np.asarray(proj_mats), dtype=torch.float64)
+    num_views, height, width = depths.shape
+
+    # Once per scene: inverse projections, world points and source projections
+    inv_proj = torch.linalg.inv(proj).float().to(device)
+    proj = proj.float().to(device)
+    with torch.no_grad():
+        # [N, 3, H, W], the layout sampled by grid_sample
+        points = unproject_affine(depths, inv_proj[:, :3, :3], inv_proj[:, :3, 3])
+        points = points.permute(0, 3, 1, 2).contiguous()
+    # Pixel -> normalized grid coordinates of grid_sample with align_corners=True
+    scale = torch.tensor([2.0 / max(width - 1, 1), 2.0 / max(height - 1, 1)], device=device)
+
+    batch = _reference_batch_size(height, width, device, memory_budget)
+    with torch.no_grad():
+        for begin in range(0, num_views, batch):
+            refs = slice(begin, min(begin + batch, num_views))
+            # Pixels without depth unproject to the camera centre and are never
+            # consistent, so only valid pixels are warped
+            pixels = torch.nonzero(depths[refs].reshape(-1) > 0).squeeze(1)
+            # [3, P], valid reference pixels in (view, row, column) order
+            ref_points = points[refs].transpose(0, 1).reshape(3, -1)[:, pixels]
+            pc_sum = torch.zeros_like(ref_points)
+            count = torch.zeros(ref_points.shape[1], device=device)
+            for src in range(num_views):
+                uvw = torch.addmm(proj[src, :3, 3:4], proj[src, :3, :3], ref_points)
+                grid = (uvw[:2] / uvw[2:3]).T * scale - 1
+                sampled = F.grid_sample(
+                    points[src : src + 1],
+                    grid.view(1, 1, -1, 2),
+                    mode="bilinear",
+                    padding_mode="zeros",
+                    align_corners=True,
+                ).view(3, -1)
+                # Squared distances: a strided norm over dim 0 is much slower on CPU
+                consistent = (ref_points - sampled).square_().sum(dim=0) < dist_thresh**2
+                pc_sum += sampled * consistent
+                count += consistent
+            yield refs, pixels, pc_sum, count
+
+
+def fuse_consistent_points(
+    depths: np.ndarray,
+    proj_mats: np.ndarray,
+    dist_thresh: float,
+    num_consist: int,
+    device=None,
+    memory_budget: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Fuse posed depth maps into the points consistent across at least ``num_consist`` views.
+
+    Args:
+        depths: Depth maps [N, H, W]; pixels with depth <= 0 are skipped
+        proj_mats: Projection matrices [N, 4, 4], see ``projection_matrices``
+        dist_thresh: Maximum distance between a point and a consistent source point
+        num_consist: Minimum number of consistent views (the reference included)
+        device: Torch device (CUDA if available)
+        memory_budget: Bytes of working memory per batch of reference views
+            (``FUSION_MEMORY_BUDGET`` if None; capped by free memory on CUDA)
+
+    Returns:
+        Fused points [M, 3] (float32), ordered by view and then pixel
+    """
+    points = []
+    for _, _, pc_sum, count in _iter_consistency(
+        depths, proj_mats, dist_thresh, device, memory_budget
+    ):
+        valid = count >= num_consist
+        points.append((pc_sum[:, valid] / count[valid]).T.cpu().numpy())
+    if not points:
+        return np.zeros((0, 3), dtype=np.float32)
+    return np.concatenate(points, axis=0)
+
+
+def consistency_masks(
+    depths: np.ndarray,
+    proj_mats: np.ndarray,
+    dist_thresh: float,
+    num_consist: int,
+    device=None,
+    memory_budget: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Per-view masks of the pixels consistent across at least ``num_consist`` views.
+
+    Args:
+        depths: Depth maps [N, H, W]; pixels with depth <= 0 are never consistent
+        proj_mats: Projection matrices [N, 4, 4], see ``projection_matrices``
+        dist_thresh: Maximum distance between a point and a consistent source point
+        num_consist: Minimum number of consistent views (the reference included)
+        device: Torch device (CUDA if available)
+        memory_budget: Bytes of working memory per batch of reference views
+            (``FUSION_MEMORY_BUDGET`` if None; capped by free memory on CUDA)
+
+    Returns:
+        Boolean masks [N, H, W]
+    """
+    num_views, height, width = np.shape(depths)
+    masks = np.zeros((num_views, height * width), dtype=bool)
+    for refs, pixels, _, count in _iter_consistency(
+        depths, proj_mats, dist_thresh, device, memory_budget
+    ):
+        pixels = pixels[count >= num_consist].cpu().numpy()
+        masks[refs.start + pixels // (height * width), pixels % (height * width)] = True
+    return masks.reshape(num_views, height, width)
@@ -0,0 +1,205 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Work-queue helpers for the benchmark Evaluator.
+
+- Every scene output is stamped with a JSON marker holding a hash of the config that
+  produced it. Scenes whose marker matches are skipped, so an interrupted sweep
+  resumes where it stopped and a changed config only recomputes what it affects.
+- Fusion plus 3D evaluation of a scene is a standalone job (``run_recon_job``) that
+  can run on a process pool while inference of later scenes continues on the GPU.
+- Stage wall times are recorded per (dataset, scene, stage) and printed as a table.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict as TDict, Optional
+
+# Bump to invalidate all cached scene outputs
+CACHE_VERSION = 1
+
+
+def config_hash(**fields) -> str:
+    """Short, stable hash of JSON-serialisable config fields."""
+    payload = json.dumps({"cache_version": CACHE_VERSION, **fields}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def weights_identity(model_path: Optional[str]) -> Optional[str]:
+    """
+    Identity of the weights behind a model path, part of the inference config hash.
+
+    Local checkpoints (a file or a directory) are identified by the path plus the size
+    and modification time of their files, so retrained weights saved to the same path
+    invalidate cached predictions. Hub ids and other non-local names are returned as is.
+    """
+    if not model_path or not os.path.exists(model_path):
+        return model_path
+    if os.path.isfile(model_path):
+        files = [(os.path.basename(model_path), model_path)]
+    else:
+        files = [
+            (os.path.relpath(os.path.join(root, fn), model_path), os.path.join(root, fn))
+            for root, _, filenames in os.walk(model_path)
+            for fn in filenames
+        ]
+    stamps = []
+    for name, path in sorted(files):
+        stat = os.stat(path)
+        stamps.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    digest = hashlib.sha1("\n".join(stamps).encode("utf-8")).hexdigest()
+    return f"{os.path.abspath(model_path)}:{digest}"
+
+
+def read_marker(path: str) -> Optional[dict]:
+    """Load a marker written by ``write_marker``, or None if missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_marker(path: str, **fields) -> None:
+    """Atomically write a JSON marker; it is only visible once complete."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(fields, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def marker_matches(path: str, key: str) -> bool:
+    marker = read_marker(path)
+    return marker is not None and marker.get("hash") == key
+
+
+class StageTimes:
+    """Thread-safe record of per-scene stage wall times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = []  # (data, scene, stage, seconds)
+        self.skipped = defaultdict(int)  # data -> scenes served from cache
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, data: str, scene: str, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(data, scene, stage, time.perf_counter() - start)
+
+    def add(self, data: str, scene: str, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.records.append((data, scene, stage, float(seconds)))
+
+    def skip(self, data: str) -> None:
+        with self._lock:
+            self.skipped[data] += 1
+
+    def table(self) -> str:
+        """Per-dataset totals of every stage, in seconds."""
+        with self._lock:
+            records = list(self.records)
+            skipped = dict(self.skipped)
+        stages = list(dict.fromkeys(r[2] for r in records))
+        datas = list(dict.fromkeys([r[0] for r in records] + list(skipped)))
+        totals = defaultdict(float)
+        for data, _, stage, seconds in records:
+            totals[data, stage] += seconds
+            totals["all", stage] += seconds
+
+        header = f"{'dataset':<12}" + "".join(f"{s:>14}" for s in stages)
+        lines = [header + f"{'total':>10}{'cached':>8}", "-" * (len(header) + 18)]
+        for data in datas + ["all"]:
+            row = [totals[data, s] for s in stages]
+            cached = sum(skipped.values()) if data == "all" else skipped.get(data, 0)
+            cells = "".join(f"{v:>14.1f}" for v in row)
+            lines.append(f"{data:<12}{cells}{sum(row):>10.1f}{cached:>8}")
+        elapsed = time.perf_counter() - self._start
+        lines.append(f"Elapsed {elapsed:.1f}s (stages overlap, so their sum can exceed it)")
+        return "\n".join(lines)
+
+    def dump(self, path: str) -> None:
+        with self._lock:
+            records = [
+                {"data": d, "scene": s, "stage": st, "seconds": t} for d, s, st, t in self.records
+            ]
+        write_marker(path, records=records, skipped=dict(self.skipped))
+
+
+# Datasets are constructed once per worker process
+_DATASETS = {}
+
+
+def _get_dataset(data: str):
+    if data not in _DATASETS:
+        from depth_anything_3.bench.registries import MV_REGISTRY
+
+        _DATASETS[data] = MV_REGISTRY.get(data)()
+    return _DATASETS[data]
+
+
+def run_recon_job(
+    data: str,
+    scene: str,
+    mode: str,
+    result_path: str,
+    fuse_path: str,
+    metrics_path: str,
+    key: str,
+    dataset=None,
+) -> tuple:
+    """
+    Fuse the predictions of one scene, evaluate the point cloud and cache the metrics.
+
+    Module-level so that it can run in a spawned worker process.
+
+    Args:
+        data: Dataset name (registered in MV_REGISTRY)
+        scene: Scene identifier
+        mode: "recon_unposed" or "recon_posed"
+        result_path: Predictions (.npz) of the scene
+        fuse_path: Output path of the fused point cloud (.ply)
+        metrics_path: Marker caching the metrics under ``key``
+        key: Config hash of this job
+        dataset: Optional dataset instance (in-process runs); built from the registry if None
+
+    Returns:
+        Tuple of (metrics dict, {stage: seconds})
+    """
+    dataset = dataset if dataset is not None else _get_dataset(data)
+    start = time.perf_counter()
+    dataset.fuse3d(scene, result_path, fuse_path, mode)
+    fused = time.perf_counter()
+    result = {k: float(v) for k, v in dataset.eval3d(scene, fuse_path).items()}
+    timings = {"fuse": fused - start, "eval3d": time.perf_counter() - fused}
+    write_marker(metrics_path, hash=key, result=result, timings=timings)
+    return result, timings
+
+
+def cached_result(metrics_path: str, key: str) -> Optional[TDict[str, float]]:
+    """Metrics cached by ``run_recon_job`` (or the pose evaluation) under ``key``."""
+    marker = read_marker(metrics_path)
+    if marker is None or marker.get("hash") != key:
+        return None
+    return marker.get("result")
@@ -0,0 +1,135 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark cold-start latency: imports, model construction and weight loading.
+
+Every run starts a fresh interpreter, so import times are cold in-process; the weight
+file is read from disk on the first run and from the OS page cache afterwards (warm).
+``--eager`` times the previous path for comparison: random-initialised construction,
+then reading the whole checkpoint into memory and copying it into the parameters.
+
+    python -m depth_anything_3.bench.startup --model depth-anything/DA3-LARGE --runs 3
+    python -m depth_anything_3.bench.startup --model ./weights --device cuda --eager
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+STAGES = ("cli_import", "api_import", "construct", "load", "to_device")
+
+
+def resolve_model(model: str) -> tuple:
+    """(weights file, model kwargs) of a local model directory or Hub repo id."""
+    if os.path.isdir(model):
+        model_file = os.path.join(model, "model.safetensors")
+        config_file = os.path.join(model, "config.json")
+    else:
+        from huggingface_hub import hf_hub_download
+
+        model_file = hf_hub_download(model, "model.safetensors")
+        config_file = hf_hub_download(model, "config.json")
+    with open(config_file) as f:
+        return model_file, json.load(f)
+
+
+def _sync(device: str) -> None:
+    import torch
+
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+
+
+def measure(model_file: str, model_kwargs: dict, device: str, eager: bool) -> dict:
+    """Stage times (seconds) of one start-up; must run in a fresh interpreter."""
+    times = {}
+    start = time.perf_counter()
+    import depth_anything_3.cli  # noqa: F401
+
+    times["cli_import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    import torch
+
+    from depth_anything_3.api import DepthAnything3
+    from depth_anything_3.utils.model_loading import load_state_dict_file, load_weights
+
+    times["api_import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if eager:
+        model = DepthAnything3(**model_kwargs)
+    else:
+        with torch.device("meta"):
+            model = DepthAnything3(**model_kwargs)
+    times["construct"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if eager:
+        from safetensors.torch import load
+
+        with open(model_file, "rb") as f:
+            model.load_state_dict(load(f.read()), strict=False)
+    else:
+        load_weights(model, load_state_dict_file(model_file), device="cpu")
+    model.eval()
+    times["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.to(device)
+    _sync(device)
+    times["to_device"] = time.perf_counter() - start
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="depth-anything/DA3-LARGE", help="Model dir or repo")
+    parser.add_argument("--device", default="cpu", help="Device the model is moved to")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter runs")
+    parser.add_argument("--eager", action="store_true", help="Time the eager loading path")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    model_file, model_kwargs = resolve_model(args.model)
+    if args.child:
+        print(json.dumps(measure(model_file, model_kwargs, args.device, args.eager)))
+        return
+
+    mode = "eager" if args.eager else "meta + mmap"
+    print(f"{model_kwargs['model_name']} ({mode}) on {args.device}, {args.runs} runs")
+    header = f"{'run':<8}" + "".join(f"{s:>12}" for s in STAGES) + f"{'total':>10}"
+    print(header)
+    print("-" * len(header))
+    runs = []
+    for i in range(args.runs):
+        cmd = [sys.executable, "-m", "depth_anything_3.bench.startup", "--child"]
+        cmd += ["--model", args.model, "--device", args.device] + ["--eager"] * args.eager
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        times = json.loads(out.strip().splitlines()[-1])
+        runs.append(times)
+        cells = "".join(f"{times[s]:>12.2f}" for s in STAGES)
+        print(f"{i:<8}{cells}{sum(times.values()):>10.2f}")
+    median = {s: statistics.median(r[s] for r in runs) for s in STAGES}
+    cells = "".join(f"{median[s]:>12.2f}" for s in STAGES)
+    print(f"{'median':<8}{cells}{sum(median.values()):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
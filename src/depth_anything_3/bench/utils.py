@@ -27,8 +27,8 @@ import numpy as np
 import open3d as o3d
 import torch
 from addict import Dict
-from scipy.spatial import KDTree
 
+from depth_anything_3.bench.nn_search import chamfer_metrics, nn_distances
 from depth_anything_3.utils.geometry import mat_to_quat
 
 
@@ -71,7 +71,10 @@ def quat2rotmat(qvec: list) -> np.ndarray:
 
 def nn_correspondance(verts1: np.ndarray, verts2: np.ndarray) -> np.ndarray:
     """
-    Compute nearest neighbor distances from verts2 to verts1 using KDTree.
+    Compute nearest neighbor distances from verts2 to verts1.
+
+    The search backend (parallel KD-tree or tiled torch brute force) is picked from the
+    problem size, see ``depth_anything_3.bench.nn_search``.
 
     Args:
         verts1: Reference point cloud [N, 3]
@@ -80,12 +83,7 @@ def nn_correspondance(verts1: np.ndarray, verts2: np.ndarray) -> np.ndarray:
     Returns:
         Distance array [M,] - distance from each point in verts2 to nearest in verts1
     """
-    if len(verts1) == 0 or len(verts2) == 0:
-        return np.array([])
-
-    kdtree = KDTree(verts1)
-    distances, _ = kdtree.query(verts2)
-    return distances.reshape(-1)
+    return nn_distances(verts1, verts2)
 
 
 def evaluate_3d_reconstruction(
@@ -93,6 +91,7 @@ def evaluate_3d_reconstruction(
     pcd_trgt: Union[o3d.geometry.PointCloud, np.ndarray],
     threshold: float = 0.05,
     down_sample: Optional[float] = None,
+    timings: Optional[dict] = None,
 ) -> TDict[str, float]:
     """
     Evaluate 3D reconstruction quality using standard metrics.
@@ -110,6 +109,7 @@ def evaluate_3d_reconstruction(
         pcd_trgt: Ground truth point cloud (Open3D or numpy array)
         threshold: Distance threshold for precision/recall (meters)
         down_sample: Voxel size for downsampling (None to skip)
+        timings: Optional dict filled with the nearest-neighbour search timings
 
     Returns:
         Dict with metrics: acc, comp, overall, precision, recall, fscore
@@ -131,43 +131,7 @@ def evaluate_3d_reconstruction(
 
     verts_pred = np.asarray(pcd_pred.points)
     verts_trgt = np.asarray(pcd_trgt.points)
-
-    # Handle empty point clouds
-    if len(verts_pred) == 0 or len(verts_trgt) == 0:
-        return {
-            "acc": float("inf"),
-            "comp": float("inf"),
-            "overall": float("inf"),
-            "precision": 0.0,
-            "recall": 0.0,
-            "fscore": 0.0,
-        }
-
-    # Compute distances
-    dist_pred_to_gt = nn_correspondance(verts_trgt, verts_pred)  # Accuracy
-    dist_gt_to_pred = nn_correspondance(verts_pred, verts_trgt)  # Completeness
-
-    # Compute metrics
-    accuracy = float(np.mean(dist_pred_to_gt))
-    completeness = float(np.mean(dist_gt_to_pred))
-    overall = (accuracy + completeness) / 2
-
-    precision = float(np.mean((dist_pred_to_gt < threshold).astype(float)))
-    recall = float(np.mean((dist_gt_to_pred < threshold).astype(float)))
-
-    if precision + recall > 0:
-        fscore = 2 * precision * recall / (precision + recall)
-    else:
-        fscore = 0.0
-
-    return {
-        "acc": accuracy,
-        "comp": completeness,
-        "overall": overall,
-        "precision": precision,
-        "recall": recall,
-        "fscore": fscore,
-    }
+    return chamfer_metrics(verts_pred, verts_trgt, threshold, timings=timings)
 
 
 def create_tsdf_volume(
@@ -22,17 +22,8 @@ from __future__ import annotations
 import os
 import typer
 
-from depth_anything_3.services import start_server
-from depth_anything_3.services.gallery import gallery as gallery_main
-from depth_anything_3.services.inference_service import run_inference
-from depth_anything_3.services.input_handlers import (
-    ColmapHandler,
-    ImageHandler,
-    ImagesHandler,
-    InputHandler,
-    VideoHandler,
-    parse_export_feat,
-)
+# Services (torch, cv2, the model and its exporters) are imported inside the commands
+# that use them, so that `--help` and argument errors return without loading them
 from depth_anything_3.utils.constants import (
     DEFAULT_EXPORT_DIR,
     DEFAULT_GALLERY_DIR,
@@ -171,6 +162,16 @@ def auto(
     - Video file (.mp4, .avi, etc.)
     - COLMAP directory (with 'images' and 'sparse' subdirectories)
     """
+    from depth_anything_3.services.inference_service import run_inference
+    from depth_anything_3.services.input_handlers import (
+        ColmapHandler,
+        ImageHandler,
+        ImagesHandler,
+        InputHandler,
+        VideoHandler,
+        parse_export_feat,
+    )
+
     # Detect input type
     input_type = detect_input_type(input_path)
 
@@ -356,6 +357,13 @@ def image(
     feat_vis_fps: int = typer.Option(15, help="[FEAT_VIS] Frame rate for output video"),
 ):
     """Run camera pose and depth estimation on a single image."""
+    from depth_anything_3.services.inference_service import run_inference
+    from depth_anything_3.services.input_handlers import (
+        ImageHandler,
+        InputHandler,
+        parse_export_feat,
+    )
+
     # Process input
     image_files = ImageHandler.process(image_path)
 
@@ -435,6 +443,13 @@ def images(
     feat_vis_fps: int = typer.Option(15, help="[FEAT_VIS] Frame rate for output video"),
 ):
     """Run camera pose and depth estimation on a directory of images."""
+    from depth_anything_3.services.inference_service import run_inference
+    from depth_anything_3.services.input_handlers import (
+        ImagesHandler,
+        InputHandler,
+        parse_export_feat,
+    )
+
     # Process input
     image_files = ImagesHandler.process(images_dir, image_extensions)
 
@@ -519,6 +534,13 @@ def colmap(
     feat_vis_fps: int = typer.Option(15, help="[FEAT_VIS] Frame rate for output video"),
 ):
     """Run pose conditioned depth estimation on COLMAP data."""
+    from depth_anything_3.services.inference_service import run_inference
+    from depth_anything_3.services.input_handlers import (
+        ColmapHandler,
+        InputHandler,
+        parse_export_feat,
+    )
+
     # Process input
     image_files, extrinsics, intrinsics = ColmapHandler.process(colmap_dir, sparse_subdir)
 
@@ -599,6 +621,13 @@ def video(
     feat_vis_fps: int = typer.Option(15, help="[FEAT_VIS] Frame rate for output video"),
 ):
     """Run depth estimation on video by extracting frames and processing them."""
+    from depth_anything_3.services.inference_service import run_inference
+    from depth_anything_3.services.input_handlers import (
+        InputHandler,
+        VideoHandler,
+        parse_export_feat,
+    )
+
     # Handle export directory
     export_dir = InputHandler.handle_export_dir(export_dir, auto_cleanup)
 
@@ -643,13 +672,50 @@ def backend(
     host: str = typer.Option("127.0.0.1", help="Host to bind to"),
     port: int = typer.Option(8008, help="Port to bind to"),
     gallery_dir: str = typer.Option(DEFAULT_GALLERY_DIR, help="Gallery directory path (optional)"),
+    max_batch_wait_ms: float = typer.Option(
+        50.0, help="Max time (ms) to wait for compatible tasks to join a micro-batch"
+    ),
+    max_batch_images: int = typer.Option(
+        16, help="Max total images per micro-batch (1 disables batching)"
+    ),
+    queue_path: str = typer.Option(
+        "", help="SQLite file for a persistent task queue (in-memory if empty)"
+    ),
+    memory_budget_gb: float = typer.Option(
+        0.0, help="Admission memory budget in GB (0 = total device memory)"
+    ),
+    memory_policy: str = typer.Option(
+        "reject",
+        help="'defer' holds queued tasks until their memory fits next to the running ones",
+    ),
+    max_pending_per_client: int = typer.Option(
+        0, help="Max pending tasks per client_id (0 = unlimited)"
+    ),
+    max_queue_depth: int = typer.Option(0, help="Max pending tasks overall (0 = unlimited)"),
+    num_workers: int = typer.Option(
+        0,
+        help="Model worker processes, spread over comma-separated --device (0 = in-process)",
+    ),
+    compile_model: bool = typer.Option(
+        False, "--compile", help="Compile the backbone on bucketed input shapes"
+    ),
+    warmup_shapes: str = typer.Option(
+        "", help="VIEWSxHEIGHTxWIDTH shapes compiled at start-up, e.g. 4x504x378,8x504x336"
+    ),
 ):
     """Start model backend service with integrated gallery."""
+    from depth_anything_3.model.utils.bucketing import parse_shapes
+    from depth_anything_3.services.backend import start_server
+
     typer.echo("=" * 60)
     typer.echo("🚀 Starting Depth Anything 3 Backend Server")
     typer.echo("=" * 60)
     typer.echo(f"Model directory: {model_dir}")
     typer.echo(f"Device: {device}")
+    if num_workers > 0:
+        typer.echo(f"Model workers: {num_workers}")
+    if compile_model:
+        typer.echo(f"Compiled inference, warm-up shapes: {warmup_shapes or 'none'}")
 
     # Check if gallery directory exists
     if gallery_dir and os.path.exists(gallery_dir):
@@ -669,7 +735,23 @@ def backend(
     typer.echo("=" * 60)
 
     try:
-        start_server(model_dir, device, host, port, gallery_dir)
+        start_server(
+            model_dir,
+            device,
+            host,
+            port,
+            gallery_dir,
+            max_batch_wait_ms,
+            max_batch_images,
+            queue_path=queue_path or None,
+            memory_budget_gb=memory_budget_gb or None,
+            memory_policy=memory_policy,
+            max_pending_per_client=max_pending_per_client or None,
+            max_queue_depth=max_queue_depth or None,
+            num_workers=num_workers,
+            compile_model=compile_model,
+            warmup_shapes=parse_shapes(warmup_shapes),
+        )
     except KeyboardInterrupt:
         typer.echo("\n👋 Backend server stopped.")
     except Exception as e:
@@ -770,6 +852,7 @@ def gallery(
     open_browser: bool = typer.Option(False, help="Open browser after launch"),
 ):
     """Launch Depth Anything 3 Gallery server"""
+    from depth_anything_3.services.gallery import gallery as gallery_main
 
     # Validate gallery directory
     if not os.path.exists(gallery_dir):
@@ -20,6 +20,7 @@ from addict import Dict
 from omegaconf import DictConfig, OmegaConf
 
 from depth_anything_3.cfg import create_object
+from depth_anything_3.model.utils.token_cache import OverlapTokenCache
 from depth_anything_3.model.utils.transform import pose_encoding_to_extri_intri
 from depth_anything_3.utils.alignment import (
     apply_metric_scaling,
@@ -106,6 +107,7 @@ class DepthAnything3Net(nn.Module):
         infer_gs: bool = False,
         use_ray_pose: bool = False,
         ref_view_strategy: str = "saddle_balanced",
+        token_cache: OverlapTokenCache | None = None,
     ) -> Dict[str, torch.Tensor]:
         """
         Forward pass through the network.
@@ -118,6 +120,7 @@ class DepthAnything3Net(nn.Module):
             infer_gs: Enable Gaussian Splatting branch
             use_ray_pose: Use ray-based pose estimation
             ref_view_strategy: Strategy for selecting reference view
+            token_cache: Per-view backbone tokens carried over from an overlapping chunk
 
         Returns:
             Dictionary containing predictions and auxiliary features
@@ -130,7 +133,11 @@ class DepthAnything3Net(nn.Module):
             cam_token = None
 
         feats, aux_feats = self.backbone(
-            x, cam_token=cam_token, export_feat_layers=export_feat_layers, ref_view_strategy=ref_view_strategy
+            x,
+            cam_token=cam_token,
+            export_feat_layers=export_feat_layers,
+            ref_view_strategy=ref_view_strategy,
+            token_cache=token_cache,
         )
         # feats = [[item for item in feat] for feat in feats]
         H, W = x.shape[-2], x.shape[-1]
@@ -158,13 +165,28 @@ class DepthAnything3Net(nn.Module):
         """Process mono sky estimation."""
         if "sky" not in output:
             return output
-        non_sky_mask = compute_sky_mask(output.sky, threshold=0.3)
+        if output.depth.shape[0] > 1:
+            # Batched scenes are independent: derive the sky depth per scene
+            output.depth = torch.cat(
+                [
+                    self._set_sky_depth(output.depth[b : b + 1], output.sky[b : b + 1])
+                    for b in range(output.depth.shape[0])
+                ],
+                dim=0,
+            )
+        else:
+            output.depth = self._set_sky_depth(output.depth, output.sky)
+        return output
+
+    def _set_sky_depth(self, depth: torch.Tensor, sky: torch.Tensor) -> torch.Tensor:
+        """Set sky regions of a single scene to its 99th-percentile non-sky depth."""
+        non_sky_mask = compute_sky_mask(sky, threshold=0.3)
         if non_sky_mask.sum() <= 10:
-            return output
+            return depth
         if (~non_sky_mask).sum() <= 10:
-            return output
-        
-        non_sky_depth = output.depth[non_sky_mask]
+            return depth
+
+        non_sky_depth = depth[non_sky_mask]
         if non_sky_depth.numel() > 100000:
             idx = torch.randint(0, non_sky_depth.numel(), (100000,), device=non_sky_depth.device)
             sampled_depth = non_sky_depth[idx]
@@ -173,10 +195,8 @@ class DepthAnything3Net(nn.Module):
         non_sky_max = torch.quantile(sampled_depth, 0.99)
 
         # Set sky regions to maximum depth and high confidence
-        output.depth, _ = set_sky_regions_to_max_depth(
-            output.depth, None, non_sky_mask, max_depth=non_sky_max
-        )
-        return output
+        depth, _ = set_sky_regions_to_max_depth(depth, None, non_sky_mask, max_depth=non_sky_max)
+        return depth
 
     def _process_ray_pose_estimation(
         self, output: Dict[str, torch.Tensor], height: int, width: int
@@ -342,6 +362,7 @@ class NestedDepthAnything3Net(nn.Module):
         infer_gs: bool = False,
         use_ray_pose: bool = False,
         ref_view_strategy: str = "saddle_balanced",
+        token_cache: OverlapTokenCache | None = None,
     ) -> Dict[str, torch.Tensor]:
         """
         Forward pass through both branches with metric scaling alignment.
@@ -354,15 +375,16 @@ class NestedDepthAnything3Net(nn.Module):
             infer_gs: Enable Gaussian Splatting branch
             use_ray_pose: Use ray-based pose estimation
             ref_view_strategy: Strategy for selecting reference view
+            token_cache: Per-view backbone tokens carried over from an overlapping chunk
 
         Returns:
             Dictionary containing aligned depth predictions and camera parameters
         """
         # Get predictions from both branches
         output = self.da3(
-            x, extrinsics, intrinsics, export_feat_layers=export_feat_layers, infer_gs=infer_gs, use_ray_pose=use_ray_pose, ref_view_strategy=ref_view_strategy
+            x, extrinsics, intrinsics, export_feat_layers=export_feat_layers, infer_gs=infer_gs, use_ray_pose=use_ray_pose, ref_view_strategy=ref_view_strategy, token_cache=token_cache
         )
-        metric_output = self.da3_metric(x)
+        metric_output = self.da3_metric(x, token_cache=token_cache)
 
         # Apply metric scaling and alignment
         output = self._apply_metric_scaling(output, metric_output)
@@ -55,8 +55,13 @@ class DinoV2(nn.Module):
             rope_start=rope_start,
             cat_token=cat_token,
         )
+        # Compiled, shape-bucketed path, see depth_anything_3.model.utils.bucketing
+        self.bucketed = None
 
     def forward(self, x, **kwargs):
+        if self.bucketed is not None and kwargs.get("token_cache", None) is None:
+            kwargs.pop("token_cache", None)
+            return self.bucketed(x, self.out_layers, **kwargs)
         return self.pretrained.get_intermediate_layers(
             x,
             self.out_layers,
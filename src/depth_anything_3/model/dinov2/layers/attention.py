@@ -9,11 +9,132 @@
 #   https://github.com/rwightman/pytorch-image-models/tree/master/timm/models/vision_transformer.py
 
 import logging
+import math
+from typing import Optional, Tuple
+import torch
 import torch.nn.functional as F
 from torch import Tensor, nn
 
 logger = logging.getLogger("dinov2")
 
+# Bytes held per attention score while a tile is processed (fp32 scores and weights)
+_BYTES_PER_SCORE = 12
+# Smallest query / key tile of the streaming attention
+_MIN_TILE = 64
+
+
+def attention_score_bytes(batch: int, heads: int, num_queries: int, num_keys: int) -> int:
+    """Bytes of the fp32 attention matrix of a non-tiled attention call."""
+    return batch * heads * num_queries * num_keys * _BYTES_PER_SCORE
+
+
+def fused_attention_streams(device: torch.device, masked: bool) -> bool:
+    """
+    Whether ``scaled_dot_product_attention`` runs without materialising the scores.
+
+    The CPU flash kernel streams with or without a mask. On CUDA the flash and
+    memory-efficient kernels stream, but an attention mask whose length is not aligned
+    gets padded to its full (B, H, Nq, Nk) size first. Other devices may fall back to
+    the math implementation.
+    """
+    return device.type == "cpu" or (device.type == "cuda" and not masked)
+
+
+def attention_tile_sizes(
+    batch: int, heads: int, num_queries: int, num_keys: int, memory_budget: int
+) -> Tuple[int, int]:
+    """
+    Query and key tile sizes whose attention scores fit in ``memory_budget`` bytes.
+
+    Args:
+        batch: Batch size
+        heads: Number of attention heads
+        num_queries: Query sequence length
+        num_keys: Key sequence length
+        memory_budget: Bytes the scores of one tile may use
+
+    Returns:
+        (query tile, key tile); never below 64 x 64
+    """
+    scores = max(int(memory_budget) // (batch * heads * _BYTES_PER_SCORE), _MIN_TILE * _MIN_TILE)
+    query_tile = min(num_queries, max(_MIN_TILE, math.isqrt(scores)))
+    key_tile = min(num_keys, max(_MIN_TILE, scores // query_tile))
+    return query_tile, key_tile
+
+
+def streaming_attention(
+    q: Tensor,
+    k: Tensor,
+    v: Tensor,
+    attn_mask: Optional[Tensor] = None,
+    memory_budget: int = 1 << 30,
+) -> Tensor:
+    """
+    Scaled dot-product attention over query and key tiles with a streaming softmax.
+
+    Each query tile runs through the keys tile by tile, keeping a running maximum, a
+    running softmax denominator and an fp32 output accumulator (as in FlashAttention),
+    so at most one tile of scores exists at a time.
+
+    Args:
+        q: Queries (B, H, Nq, D)
+        k: Keys (B, H, Nk, D)
+        v: Values (B, H, Nk, D)
+        attn_mask: Optional bool mask broadcastable to (B, H, Nq, Nk); True attends
+        memory_budget: Bytes the scores of one tile may use
+
+    Returns:
+        Attention output (B, H, Nq, D) in the dtype of ``q``
+    """
+    B, H, num_queries, _ = q.shape
+    num_keys = k.shape[2]
+    query_tile, key_tile = attention_tile_sizes(B, H, num_queries, num_keys, memory_budget)
+    scale = q.shape[-1] ** -0.5
+    out = torch.empty_like(q)
+    for qs in range(0, num_queries, query_tile):
+        q_tile = q[:, :, qs : qs + query_tile] * scale
+        running_max = q_tile.new_full((*q_tile.shape[:3], 1), float("-inf"), dtype=torch.float32)
+        denominator = torch.zeros_like(running_max)
+        acc = torch.zeros(q_tile.shape, dtype=torch.float32, device=q.device)
+        for ks in range(0, num_keys, key_tile):
+            scores = torch.matmul(q_tile, k[:, :, ks : ks + key_tile].transpose(-2, -1)).float()
+            if attn_mask is not None:
+                mask = attn_mask[..., ks : ks + key_tile]
+                if mask.shape[-2] != 1:
+                    mask = mask[..., qs : qs + query_tile, :]
+                scores.masked_fill_(~mask, float("-inf"))
+            new_max = torch.maximum(running_max, scores.amax(dim=-1, keepdim=True))
+            # Rows without any unmasked key so far stay at zero instead of NaN
+            new_max = new_max.masked_fill(new_max == float("-inf"), 0.0)
+            weights = torch.exp(scores - new_max)
+            correction = torch.exp(running_max - new_max)
+            denominator = denominator * correction + weights.sum(dim=-1, keepdim=True)
+            acc = acc * correction + torch.matmul(
+                weights.to(v.dtype), v[:, :, ks : ks + key_tile]
+            ).float()
+            running_max = new_max
+        out[:, :, qs : qs + query_tile] = (acc / denominator).to(q.dtype)
+    return out
+
+
+def set_attention_memory_budget(module: nn.Module, memory_budget: Optional[int]) -> int:
+    """
+    Set the memory budget of every ``Attention`` layer in ``module``.
+
+    Args:
+        module: Model or backbone
+        memory_budget: Bytes of attention scores one call may materialise; larger calls
+            that would materialise them use ``streaming_attention``. None restores the
+            default (never tiled).
+
+    Returns:
+        Number of attention layers updated
+    """
+    layers = [m for m in module.modules() if isinstance(m, Attention)]
+    for layer in layers:
+        layer.memory_budget = memory_budget
+    return len(layers)
+
 
 class Attention(nn.Module):
     def __init__(
@@ -43,6 +164,9 @@ class Attention(nn.Module):
         self.proj = nn.Linear(dim, dim, bias=proj_bias)
         self.proj_drop = nn.Dropout(proj_drop)
         self.rope = rope
+        # Tiled attention above this many bytes of materialised scores, see
+        # set_attention_memory_budget
+        self.memory_budget = None
 
     def forward(self, x: Tensor, pos=None, attn_mask=None) -> Tensor:
         B, N, C = x.shape
@@ -56,7 +180,20 @@ class Attention(nn.Module):
         if self.rope is not None and pos is not None:
             q = self.rope(q, pos)
             k = self.rope(k, pos)
-        if self.fused_attn:
+        if (
+            self.memory_budget is not None
+            and not self.training
+            and attention_score_bytes(B, self.num_heads, N, N) > self.memory_budget
+            and not (self.fused_attn and fused_attention_streams(x.device, attn_mask is not None))
+        ):
+            x = streaming_attention(
+                q,
+                k,
+                v,
+                attn_mask=attn_mask[:, None] if attn_mask is not None else None,
+                memory_budget=self.memory_budget,
+            )
+        elif self.fused_attn:
             x = F.scaled_dot_product_attention(
                 q,
                 k,
@@ -99,7 +99,9 @@ class RotaryPositionEmbedding2D(nn.Module):
             Tuple of (cosine, sine) tensors for frequency components.
         """
         cache_key = (dim, seq_len, device, dtype)
-        if cache_key not in self.frequency_cache:
+        # Compiled graphs compute them in-graph: a mutated cache would fail their guards
+        compiling = torch.compiler.is_compiling()
+        if compiling or cache_key not in self.frequency_cache:
             # Compute frequency bands
             exponents = torch.arange(0, dim, 2, device=device).float() / dim
             inv_freq = 1.0 / (self.base_frequency**exponents)
@@ -113,6 +115,8 @@ class RotaryPositionEmbedding2D(nn.Module):
             angles = torch.cat((angles, angles), dim=-1)
             cos_components = angles.cos().to(dtype)
             sin_components = angles.sin().to(dtype)
+            if compiling:
+                return cos_components, sin_components
             self.frequency_cache[cache_key] = (cos_components, sin_components)
 
         return self.frequency_cache[cache_key]
@@ -180,7 +184,12 @@ class RotaryPositionEmbedding2D(nn.Module):
         feature_dim = tokens.size(-1) // 2
 
         # Get frequency components
-        max_position = int(positions.max()) + 1
+        if torch.compiler.is_compiling():
+            # Reading positions.max() would break the graph; no position exceeds the
+            # number of tokens
+            max_position = positions.shape[1] + 1
+        else:
+            max_position = int(positions.max()) + 1
         cos_comp, sin_comp = self._compute_frequency_components(
             feature_dim, max_position, tokens.device, tokens.dtype
         )
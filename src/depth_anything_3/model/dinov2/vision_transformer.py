@@ -173,8 +173,8 @@ class DinoVisionTransformer(nn.Module):
             dpr = [drop_path_rate] * depth
         else:
             dpr = [
-                x.item() for x in torch.linspace(0, drop_path_rate, depth)
-            ]  # stochastic depth decay rule
+                x.item() for x in torch.linspace(0, drop_path_rate, depth, device="cpu")
+            ]  # stochastic depth decay rule (on CPU, also when built on the meta device)
         if ffn_layer == "mlp":
             logger.info("using MLP layer as FFN")
             ffn_layer = Mlp
@@ -253,12 +253,27 @@ class DinoVisionTransformer(nn.Module):
         patch_pos_embed = patch_pos_embed.permute(0, 2, 3, 1).view(1, -1, dim)
         return torch.cat((class_pos_embed.unsqueeze(0), patch_pos_embed), dim=1).to(previous_dtype)
 
+    def padded_pos_encoding(self, height, width, padded_height, padded_width):
+        """
+        Positional encoding of a height x width image placed at the top-left corner of a
+        padded_height x padded_width input: its tokens get the encoding they would get
+        without padding, padded tokens get zeros.
+        """
+        p = self.patch_size
+        gh, gw, ph, pw = height // p, width // p, padded_height // p, padded_width // p
+        tokens = self.pos_embed.new_empty(1, 1 + gh * gw, self.embed_dim)
+        pos_embed = self.interpolate_pos_encoding(tokens, height, width)
+        padded = pos_embed.new_zeros(1, 1 + ph * pw, self.embed_dim)
+        padded[:, 0] = pos_embed[:, 0]
+        padded[0, 1:].view(ph, pw, -1)[:gh, :gw] = pos_embed[0, 1:].view(gh, gw, -1)
+        return padded
+
     def prepare_cls_token(self, B, S):
         cls_token = self.cls_token.expand(B, S, -1)
         cls_token = cls_token.reshape(B * S, -1, self.embed_dim)
         return cls_token
 
-    def prepare_tokens_with_masks(self, x, masks=None, cls_token=None, **kwargs):
+    def prepare_tokens_with_masks(self, x, masks=None, cls_token=None, pos_embed=None, **kwargs):
         B, S, nc, w, h = x.shape
         x = rearrange(x, "b s c h w -> (b s) c h w")
         x = self.patch_embed(x)
@@ -266,7 +281,9 @@ class DinoVisionTransformer(nn.Module):
             x = torch.where(masks.unsqueeze(-1), self.mask_token.to(x.dtype).unsqueeze(0), x)
         cls_token = self.prepare_cls_token(B, S)
         x = torch.cat((cls_token, x), dim=1)
-        x = x + self.interpolate_pos_encoding(x, w, h)
+        if pos_embed is None:
+            pos_embed = self.interpolate_pos_encoding(x, w, h)
+        x = x + pos_embed.to(x.dtype)
         if self.register_tokens is not None:
             x = torch.cat(
                 (
@@ -299,12 +316,31 @@ class DinoVisionTransformer(nn.Module):
 
     def _get_intermediate_layers_not_chunked(self, x, n=1, export_feat_layers=[], **kwargs):
         B, S, _, H, W = x.shape
-        x = self.prepare_tokens_with_masks(x)
+        token_cache = kwargs.get("token_cache", None)
+        reuse = token_cache.bind(self, x) if token_cache is not None else None
         output, total_block_len, aux_output = [], len(self.blocks), []
         blocks_to_take = range(total_block_len - n, total_block_len) if isinstance(n, int) else n
         pos, pos_nodiff = self._prepare_rope(B, S, H, W, x.device)
+        # Bucketed inputs: padded tokens and views are masked out as attention keys
+        token_valid, view_valid = kwargs.get("token_valid", None), kwargs.get("view_valid", None)
+        local_mask, global_mask, view_mask = None, None, None
+        if token_valid is not None:
+            local_mask = token_valid.expand(B * S, 1, -1)
+            global_mask = (view_valid[:, None] & token_valid).reshape(1, 1, -1).expand(B, -1, -1)
+            view_mask = view_valid.expand(B, -1)
+        if reuse is not None:
+            # Per-view blocks of views carried over from the previous chunk are skipped
+            x, first_block, output, aux_output = reuse.run_prefix(
+                x, pos, blocks_to_take, export_feat_layers
+            )
+            local_x = x
+        else:
+            x = self.prepare_tokens_with_masks(x, pos_embed=kwargs.get("pos_embed", None))
+            first_block = 0
 
         for i, blk in enumerate(self.blocks):
+            if i < first_block:
+                continue
             if i < self.rope_start or self.rope is None:
                 g_pos, l_pos = None, None
             else:
@@ -314,15 +350,19 @@ class DinoVisionTransformer(nn.Module):
             if self.alt_start != -1 and (i == self.alt_start - 1) and x.shape[1] >= THRESH_FOR_REF_SELECTION and kwargs.get("cam_token", None) is None:
                 # Select reference view using configured strategy
                 strategy = kwargs.get("ref_view_strategy", "saddle_balanced")
-                logger.info(f"Selecting reference view using strategy: {strategy}")
-                b_idx = select_reference_view(x, strategy=strategy)
+                if not torch.compiler.is_compiling():
+                    logger.info(f"Selecting reference view using strategy: {strategy}")
+                b_idx = select_reference_view(x, strategy=strategy, view_mask=view_mask)
                 # Reorder views to place reference view first
                 x = reorder_by_reference(x, b_idx)
                 local_x = reorder_by_reference(local_x, b_idx)
+                if reuse is not None:
+                    reuse.reorder(b_idx)
 
             if self.alt_start != -1 and i == self.alt_start:
                 if kwargs.get("cam_token", None) is not None:
-                    logger.info("Using camera conditions provided by the user")
+                    if not torch.compiler.is_compiling():
+                        logger.info("Using camera conditions provided by the user")
                     cam_token = kwargs.get("cam_token")
                 else:
                     ref_token = self.camera_token[:, :1].expand(B, -1, -1)
@@ -331,11 +371,19 @@ class DinoVisionTransformer(nn.Module):
                 x[:, :, 0] = cam_token
 
             if self.alt_start != -1 and i >= self.alt_start and i % 2 == 1:
+                attn_mask = kwargs.get("attn_mask", None)
                 x = self.process_attention(
-                    x, blk, "global", pos=g_pos, attn_mask=kwargs.get("attn_mask", None)
+                    x,
+                    blk,
+                    "global",
+                    pos=g_pos,
+                    attn_mask=global_mask if attn_mask is None else attn_mask,
                 )
+            elif reuse is not None:
+                x = reuse.local_block(i, x, blk, l_pos)
+                local_x = x
             else:
-                x = self.process_attention(x, blk, "local", pos=l_pos)
+                x = self.process_attention(x, blk, "local", pos=l_pos, attn_mask=local_mask)
                 local_x = x
 
             if i in blocks_to_take:
@@ -346,6 +394,8 @@ class DinoVisionTransformer(nn.Module):
                 output.append((out_x[:, :, 0], out_x))
             if i in export_feat_layers:
                 aux_output.append(x)
+        if reuse is not None:
+            reuse.finish()
         return output, aux_output
 
     def process_attention(self, x, block, attn_type="global", pos=None, attn_mask=None):
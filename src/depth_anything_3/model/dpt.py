@@ -20,6 +20,7 @@ import torch.nn as nn
 from addict import Dict
 from einops import rearrange
 
+from depth_anything_3.model.utils.head_chunking import ChunkSize, run_head_chunks
 from depth_anything_3.model.utils.head_utils import (
     Permute,
     create_uv_grid,
@@ -162,7 +163,7 @@ class DPT(nn.Module):
         H: int,
         W: int,
         patch_start_idx: int,
-        chunk_size: int = 8,
+        chunk_size: ChunkSize = "auto",
         **kwargs,
     ) -> Dict:
         """
@@ -170,7 +171,7 @@ class DPT(nn.Module):
             feats: List of 4 entries, each entry is a tensor like [B, S, T, C] (or the 0th element of tuple/list is that tensor).
             H, W:  Original image dimensions
             patch_start_idx: Starting index of patch tokens in sequence (for cropping non-patch tokens)
-            chunk_size:      Chunk size along time dimension S
+            chunk_size:      Chunk size along time dimension S; "auto" picks it from free memory
 
         Returns:
             Dict[str, Tensor]
@@ -183,21 +184,19 @@ class DPT(nn.Module):
         if "images" in kwargs:
             extra_kwargs.update({"images": rearrange(kwargs["images"], "B S ... -> (B S) ...")})
 
-        if chunk_size is None or chunk_size >= S:
-            out_dict = self._forward_impl(feats, H, W, patch_start_idx, **extra_kwargs)
-            out_dict = {k: v.view(B, S, *v.shape[1:]) for k, v in out_dict.items()}
-            return Dict(out_dict)
-
-        out_dicts: List[TyDict[str, torch.Tensor]] = []
-        for s0 in range(0, S, chunk_size):
-            s1 = min(s0 + chunk_size, S)
+        def run(s0: int, s1: int) -> TyDict[str, torch.Tensor]:
             kw = {}
             if "images" in extra_kwargs:
                 kw.update({"images": extra_kwargs["images"][s0:s1]})
-            out_dicts.append(
-                self._forward_impl([f[s0:s1] for f in feats], H, W, patch_start_idx, **kw)
-            )
-        out_dict = {k: torch.cat([od[k] for od in out_dicts], dim=0) for k in out_dicts[0].keys()}
+            return self._forward_impl([f[s0:s1] for f in feats], H, W, patch_start_idx, **kw)
+
+        out_dicts = run_head_chunks(self, run, B * S, chunk_size, H, W, feats[0])
+        if len(out_dicts) == 1:
+            out_dict = out_dicts[0]
+        else:
+            out_dict = {
+                k: torch.cat([od[k] for od in out_dicts], dim=0) for k in out_dicts[0].keys()
+            }
         out_dict = {k: v.view(B, S, *v.shape[1:]) for k, v in out_dict.items()}
         return Dict(out_dict)
 
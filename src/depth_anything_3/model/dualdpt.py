@@ -19,6 +19,7 @@ import torch.nn as nn
 from addict import Dict
 
 from depth_anything_3.model.dpt import _make_fusion_block, _make_scratch
+from depth_anything_3.model.utils.head_chunking import ChunkSize, run_head_chunks
 from depth_anything_3.model.utils.head_utils import (
     Permute,
     create_uv_grid,
@@ -159,14 +160,15 @@ class DualDPT(nn.Module):
         H: int,
         W: int,
         patch_start_idx: int,
-        chunk_size: int = 8,
+        chunk_size: ChunkSize = "auto",
     ) -> Dict[str, torch.Tensor]:
         """
         Args:
             aggregated_tokens_list: List of 4 tensors [B, S, T, C] from transformer.
             images:                [B, S, 3, H, W], in [0, 1].
             patch_start_idx:       Patch-token start in the token sequence (to drop non-patch tokens).
-            frames_chunk_size:     Optional chunking along S for memory.
+            chunk_size:            Optional chunking along S for memory; "auto" picks it
+                                   from free memory.
 
         Returns:
             Dict[str, Tensor] with keys based on `head_names`, e.g.:
@@ -180,25 +182,25 @@ class DualDPT(nn.Module):
         """
         B, S, N, C = feats[0][0].shape
         feats = [feat[0].reshape(B * S, N, C) for feat in feats]
-        if chunk_size is None or chunk_size >= S:
-            out_dict = self._forward_impl(feats, H, W, patch_start_idx)
-            out_dict = {k: v.reshape(B, S, *v.shape[1:]) for k, v in out_dict.items()}
-            return Dict(out_dict)
-        out_dicts = []
-        for s0 in range(0, B * S, chunk_size):
-            s1 = min(s0 + chunk_size, B * S)
-            out_dict = self._forward_impl(
-                [feat[s0:s1] for feat in feats],
-                H,
-                W,
-                patch_start_idx,
-            )
-            out_dicts.append(out_dict)
-        out_dict = {
-            k: torch.cat([out_dict[k] for out_dict in out_dicts], dim=0)
-            for k in out_dicts[0].keys()
-        }
-        out_dict = {k: v.view(B, S, *v.shape[1:]) for k, v in out_dict.items()}
+        out_dicts = run_head_chunks(
+            self,
+            lambda s0, s1: self._forward_impl(
+                [feat[s0:s1] for feat in feats], H, W, patch_start_idx
+            ),
+            B * S,
+            chunk_size,
+            H,
+            W,
+            feats[0],
+        )
+        if len(out_dicts) == 1:
+            out_dict = out_dicts[0]
+        else:
+            out_dict = {
+                k: torch.cat([out_dict[k] for out_dict in out_dicts], dim=0)
+                for k in out_dicts[0].keys()
+            }
+        out_dict = {k: v.reshape(B, S, *v.shape[1:]) for k, v in out_dict.items()}
         return Dict(out_dict)
 
     # -------------------------------------------------------------------------
@@ -46,10 +46,12 @@ class GaussianAdapter(nn.Module):
         # Create a mask for the spherical harmonics coefficients. This ensures that at
         # initialization, the coefficients are biased towards having a large DC
         # component and small view-dependent components.
+        # The mask is not in the state dict, so it is built on CPU even when the model is
+        # constructed on the meta device; ``load_weights`` then moves it to the load device.
         if not pred_color:
             self.register_buffer(
                 "sh_mask",
-                torch.ones((self.d_sh,), dtype=torch.float32),
+                torch.ones((self.d_sh,), dtype=torch.float32, device="cpu"),
                 persistent=False,
             )
             for degree in range(1, sh_degree + 1):
@@ -20,7 +20,7 @@ from multiple input views in multi-view depth estimation.
 """
 
 import torch
-from typing import Literal
+from typing import Literal, Optional
 
 
 RefViewStrategy = Literal["first", "middle", "saddle_balanced", "saddle_sim_range"]
@@ -29,6 +29,7 @@ RefViewStrategy = Literal["first", "middle", "saddle_balanced", "saddle_sim_rang
 def select_reference_view(
     x: torch.Tensor,
     strategy: RefViewStrategy = "saddle_balanced",
+    view_mask: Optional[torch.Tensor] = None,
 ) -> torch.Tensor:
     """
     Select a reference view from multiple views using the specified strategy.
@@ -44,6 +45,9 @@ def select_reference_view(
             - "middle": Select the middle view
             - "saddle_balanced": Select view with balanced features across multiple metrics
             - "saddle_sim_range": Select view with largest similarity range
+        view_mask: Optional bool tensor of shape (B, S) marking the real views of
+            padded (bucketed) inputs. Padded views come last, are never selected and
+            do not affect the selection.
     
     Returns:
         b_idx: Tensor of shape (B,) containing the selected view index for each batch
@@ -59,6 +63,8 @@ def select_reference_view(
         return torch.zeros(B, dtype=torch.long, device=x.device)
     
     elif strategy == "middle":
+        if view_mask is not None:
+            return view_mask.sum(dim=1) // 2
         return torch.full((B,), S // 2, dtype=torch.long, device=x.device)
     
     # Feature-based strategies require normalized class tokens
@@ -70,15 +76,23 @@ def select_reference_view(
         # Compute similarity matrix
         sim = torch.matmul(img_class_feat, img_class_feat.transpose(1, 2))  # B S S
         sim_no_diag = sim - torch.eye(S, device=sim.device).unsqueeze(0)
-        sim_score = sim_no_diag.sum(dim=-1) / (S - 1)  # B S
+        if view_mask is None:
+            sim_score = sim_no_diag.sum(dim=-1) / (S - 1)  # B S
+        else:
+            num_views = view_mask.sum(dim=1, keepdim=True)
+            sim_score = (sim_no_diag * view_mask[:, None]).sum(dim=-1) / (num_views - 1)
         
         feat_norm = x[:, :, 0].norm(dim=-1)  # B S
         feat_var = img_class_feat.var(dim=-1)  # B S
         
         # Normalize all metrics to [0, 1]
         def normalize_metric(metric):
-            min_val = metric.min(dim=1, keepdim=True).values
-            max_val = metric.max(dim=1, keepdim=True).values
+            if view_mask is None:
+                min_val = metric.min(dim=1, keepdim=True).values
+                max_val = metric.max(dim=1, keepdim=True).values
+            else:
+                min_val = metric.masked_fill(~view_mask, float("inf")).amin(1, keepdim=True)
+                max_val = metric.masked_fill(~view_mask, float("-inf")).amax(1, keepdim=True)
             return (metric - min_val) / (max_val - min_val + 1e-8)
         
         sim_score_norm = normalize_metric(sim_score)
@@ -91,6 +105,8 @@ def select_reference_view(
             (norm_norm - 0.5).abs() +
             (var_norm - 0.5).abs()
         )
+        if view_mask is not None:
+            balance_score = balance_score.masked_fill(~view_mask, float("inf"))
         b_idx = balance_score.argmin(dim=1)
         
     elif strategy == "saddle_sim_range":
@@ -98,9 +114,16 @@ def select_reference_view(
         sim = torch.matmul(img_class_feat, img_class_feat.transpose(1, 2))  # B S S
         sim_no_diag = sim - torch.eye(S, device=sim.device).unsqueeze(0)
         
-        sim_max = sim_no_diag.max(dim=-1).values  # B S
-        sim_min = sim_no_diag.min(dim=-1).values  # B S
+        if view_mask is None:
+            sim_max = sim_no_diag.max(dim=-1).values  # B S
+            sim_min = sim_no_diag.min(dim=-1).values  # B S
+        else:
+            key_mask = ~view_mask[:, None]
+            sim_max = sim_no_diag.masked_fill(key_mask, float("-inf")).max(dim=-1).values
+            sim_min = sim_no_diag.masked_fill(key_mask, float("inf")).min(dim=-1).values
         sim_range = sim_max - sim_min
+        if view_mask is not None:
+            sim_range = sim_range.masked_fill(~view_mask, float("-inf"))
         b_idx = sim_range.argmax(dim=1)
     
     else:
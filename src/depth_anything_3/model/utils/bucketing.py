@@ -0,0 +1,230 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compiled backbone inference on a small set of input shape buckets.
+
+``torch.compile`` specialises its graphs (and CUDA graphs replay) a fixed input shape,
+so every new (views, height, width) would trigger a recompile. Inputs are instead
+snapped to a bucket: images are zero-padded at the bottom and right to a multiple of
+``spatial_step`` and all-zero views are appended up to the next view count bucket.
+
+- Padded tokens and views are masked out as attention keys, and real tokens keep the
+  positional encoding of the unpadded image, so they see exactly what they would see
+  without padding.
+- Padded views come last and are never picked as the reference view.
+- Outputs are cropped back to the real views and tokens; the heads run eagerly at the
+  real shape.
+
+One graph is compiled per bucket (and batch size, dtype and call options), on first
+use or ahead of time with ``DepthAnything3.warmup``.
+
+    model.enable_compile()
+    model.warmup([(4, 504, 378), (8, 504, 336)])
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Tuple
+import torch
+import torch.nn.functional as F
+
+from depth_anything_3.utils.constants import THRESH_FOR_REF_SELECTION
+from depth_anything_3.utils.logger import logger
+
+# Dynamo recompile limit per code object, i.e. the number of buckets that can be compiled
+MAX_COMPILED_BUCKETS = 64
+
+
+def _round_up(value: int, step: int) -> int:
+    return -(-value // step) * step
+
+
+@dataclass(frozen=True)
+class ShapeBuckets:
+    """
+    Input shape buckets of the compiled backbone.
+
+    Args:
+        views: Allowed view counts; larger inputs are padded to a multiple of the last one
+        spatial_step: Image height and width are padded to a multiple of this (pixels)
+    """
+
+    views: Tuple[int, ...] = (1, 2, 4, 8, 16, 32, 64)
+    spatial_step: int = 56
+
+    def snap(self, num_views: int, height: int, width: int) -> Tuple[int, int, int]:
+        """
+        Bucket (views, height, width) of an input shape.
+
+        Args:
+            num_views: Number of input views
+            height: Image height (pixels)
+            width: Image width (pixels)
+
+        Returns:
+            Padded (views, height, width)
+        """
+        height = _round_up(height, self.spatial_step)
+        width = _round_up(width, self.spatial_step)
+        if num_views < THRESH_FOR_REF_SELECTION:
+            # Extra views would switch reference view selection on
+            return num_views, height, width
+        bucket = next((v for v in self.views if v >= num_views), None)
+        if bucket is None:
+            bucket = _round_up(num_views, self.views[-1])
+        return bucket, height, width
+
+
+def parse_shapes(spec: str) -> List[Tuple[int, int, int]]:
+    """
+    Parse warm-up shapes such as ``"4x504x378,8x504x336"`` (views x height x width).
+
+    Args:
+        spec: Comma-separated shapes; empty for none
+
+    Returns:
+        List of (views, height, width)
+    """
+    shapes = []
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        try:
+            num_views, height, width = (int(v) for v in item.lower().split("x"))
+        except ValueError:
+            raise ValueError(f"Invalid shape '{item}', expected VIEWSxHEIGHTxWIDTH") from None
+        shapes.append((num_views, height, width))
+    return shapes
+
+
+class BucketedBackbone:
+    """
+    Runs ``get_intermediate_layers`` of a DINOv2 ViT compiled, on bucketed input shapes.
+
+    Args:
+        vit: Vision transformer (``DinoV2.pretrained``)
+        buckets: Shape buckets; defaults to ``ShapeBuckets()``
+        mode: ``torch.compile`` mode, e.g. "reduce-overhead" to capture CUDA graphs
+    """
+
+    def __init__(self, vit, buckets: ShapeBuckets | None = None, mode: str | None = None):
+        self.buckets = buckets or ShapeBuckets()
+        if self.buckets.spatial_step % vit.patch_size:
+            raise ValueError(
+                f"spatial_step ({self.buckets.spatial_step}) must be a multiple of the "
+                f"patch size ({vit.patch_size})"
+            )
+        self.vit = vit
+        self.mode = mode
+        self.compiled = torch.compile(vit.get_intermediate_layers, mode=mode, dynamic=False)
+        self.graphs = set()
+        self._padding = {}
+        limit = "recompile_limit"
+        if not hasattr(torch._dynamo.config, limit):
+            limit = "cache_size_limit"
+        setattr(
+            torch._dynamo.config,
+            limit,
+            max(getattr(torch._dynamo.config, limit), MAX_COMPILED_BUCKETS),
+        )
+
+    def padding(
+        self, shape: Tuple[int, int, int], bucket: Tuple[int, int, int], device: torch.device
+    ) -> tuple:
+        """
+        Backbone kwargs masking the padding of ``shape`` inside ``bucket``, and the
+        indices of the real patch tokens of a view (cached per shape and bucket).
+        """
+        key = (shape, bucket, device)
+        if key not in self._padding:
+            num_views, height, width = shape
+            padded_views, padded_height, padded_width = bucket
+            p = self.vit.patch_size
+            grid = torch.zeros(padded_height // p, padded_width // p, dtype=torch.bool)
+            grid[: height // p, : width // p] = True
+            special = torch.ones(1 + self.vit.num_register_tokens, dtype=torch.bool)
+            pos_embed = None
+            if (height, width) != (padded_height, padded_width):
+                pos_embed = self.vit.padded_pos_encoding(
+                    height, width, padded_height, padded_width
+                ).detach()
+            self._padding[key] = (
+                {
+                    "token_valid": torch.cat([special, grid.flatten()]).to(device),
+                    "view_valid": (torch.arange(padded_views) < num_views).to(device),
+                    "pos_embed": pos_embed,
+                },
+                grid.flatten().nonzero().squeeze(1).to(device),
+            )
+        return self._padding[key]
+
+    def __call__(self, x: torch.Tensor, n, export_feat_layers=(), cam_token=None, **kwargs):
+        B, S, _, H, W = x.shape
+        bucket = self.buckets.snap(S, H, W)
+        padded_views, padded_height, padded_width = bucket
+        x = F.pad(x, (0, padded_width - W, 0, padded_height - H))
+        if padded_views > S:
+            x = torch.cat([x, x.new_zeros(B, padded_views - S, *x.shape[2:])], dim=1)
+            if cam_token is not None:
+                cam_token = torch.cat(
+                    [cam_token, cam_token.new_zeros(B, padded_views - S, cam_token.shape[-1])],
+                    dim=1,
+                )
+        keep = None
+        if bucket != (S, H, W):
+            padding, keep = self.padding((S, H, W), bucket, x.device)
+            kwargs.update(padding)
+
+        key = (B, *bucket, x.dtype, keep is not None, cam_token is not None)
+        export_feat_layers = list(export_feat_layers or ())
+        key += (tuple(export_feat_layers), kwargs.get("ref_view_strategy"))
+        if key not in self.graphs:
+            logger.info(f"Compiling backbone for bucket {bucket} (input {(S, H, W)}, batch {B})")
+            self.graphs.add(key)
+        if self.mode == "reduce-overhead":
+            torch.compiler.cudagraph_mark_step_begin()
+        outputs, aux_outputs = self.compiled(
+            x, n, export_feat_layers=export_feat_layers, cam_token=cam_token, **kwargs
+        )
+
+        # Crop to the real views and tokens; copies, as CUDA graphs reuse their outputs
+        def crop(tokens):
+            tokens = tokens[:, :S]
+            return tokens.clone() if keep is None else tokens.index_select(2, keep)
+
+        outputs = tuple((crop(feat), cam[:, :S].clone()) for feat, cam in outputs)
+        return outputs, [crop(aux) for aux in aux_outputs]
+
+
+def enable_bucketing(
+    model: torch.nn.Module, buckets: ShapeBuckets | None = None, mode: str | None = None
+) -> int:
+    """
+    Route the DINOv2 backbones of ``model`` through ``BucketedBackbone``.
+
+    Args:
+        model: Network containing ``DinoV2`` modules
+        buckets: Shape buckets; defaults to ``ShapeBuckets()``
+        mode: ``torch.compile`` mode
+
+    Returns:
+        Number of backbones compiled
+    """
+    from depth_anything_3.model.dinov2.dinov2 import DinoV2
+
+    backbones = [m for m in model.modules() if isinstance(m, DinoV2)]
+    for backbone in backbones:
+        backbone.bucketed = BucketedBackbone(backbone.pretrained, buckets, mode)
+    return len(backbones)
+
@@ -12,9 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import math
 from math import isqrt
-from typing import Literal, Optional
+from typing import Iterator, Literal, Optional
 import torch
 from einops import rearrange, repeat
 from tqdm import tqdm
@@ -40,6 +39,14 @@ except ImportError:
         "gsplat.git@0b4dddf04cb687367602c01196913cde6a743d70"
     )
 
+# Share of the free GPU memory a chunk of rendered views may use
+RENDER_MEMORY_FRACTION = 0.5
+# Views per chunk when rendering off CUDA
+CPU_RENDER_CHUNK = 8
+# Rough rasterizer footprint: per (Gaussian, view) projection data and per output pixel
+_BYTES_PER_GAUSSIAN_VIEW = 128
+_BYTES_PER_PIXEL = 64
+
 
 def render_3dgs(
     extrinsics: torch.Tensor,  # "batch_views 4 4", w2c
@@ -94,34 +101,30 @@ def render_3dgs(
     # assume the Gaussian parameters are originally repeated along the view dim
     batch_scene = b // num_view
 
+    # Pixel-space intrinsics of all views, built once
+    Ks = torch.zeros(b, 3, 3).to(gaussian_means)
+    Ks[:, 0, 0] = focal_length_x
+    Ks[:, 1, 1] = focal_length_y
+    Ks[:, 0, 2] = w / 2.0
+    Ks[:, 1, 2] = h / 2.0
+    Ks[:, 2, 2] = 1.0
+    Ks = rearrange(Ks, "(b v) ... -> b v ...", v=num_view)
+    view_matrix = rearrange(view_matrix, "(b v) ... -> b v ...", v=num_view)
+    background_color = rearrange(background_color, "(b v) ... -> b v ...", v=num_view)
+
     def index_i_gs_attr(full_attr, idx):
         # return rearrange(full_attr, "(b v) ... -> b v ...", v=num_view)[idx, 0]
         return full_attr[idx]
 
     for i in range(batch_scene):
-        K = repeat(
-            torch.tensor(
-                [
-                    [0, 0, w / 2.0],
-                    [0, 0, h / 2.0],
-                    [0, 0, 1],
-                ]
-            ),
-            "i j -> v i j",
-            v=num_view,
-        ).to(gaussian_means)
-        K[:, 0, 0] = focal_length_x.reshape(batch_scene, num_view)[i]
-        K[:, 1, 1] = focal_length_y.reshape(batch_scene, num_view)[i]
-
+        K = Ks[i]  # [v, 3, 3]
         i_means = index_i_gs_attr(gaussian_means, i)  # [N, 3]
         i_scales = index_i_gs_attr(gaussian_scales, i)
         i_quats = index_i_gs_attr(gaussian_quats, i)
         i_opacities = index_i_gs_attr(gaussian_opacities, i)  # [N,]
         i_colors = index_i_gs_attr(shs, i)  # [N, K, 3]
-        i_viewmats = rearrange(view_matrix, "(b v) ... -> b v ...", v=num_view)[i]  # [v, 4, 4]
-        i_backgrounds = rearrange(background_color, "(b v) ... -> b v ...", v=num_view)[
-            i
-        ]  # [v, 3]
+        i_viewmats = view_matrix[i]  # [v, 4, 4]
+        i_backgrounds = background_color[i]  # [v, 3]
 
         render_colors, render_alphas, info = rasterization(
             means=i_means,
@@ -153,12 +156,10 @@ def render_3dgs(
     return torch.stack(all_images), torch.stack(all_depths)
 
 
-def run_renderer_in_chunk_w_trj_mode(
-    gaussians: Gaussians,
+def build_render_trajectory(
     extrinsics: torch.Tensor,  # world2cam, "batch view 4 4" | "batch view 3 4"
     intrinsics: torch.Tensor,  # unnormed intrinsics, "batch view 3 3"
     image_shape: tuple[int, int],
-    chunk_size: Optional[int] = 8,
     trj_mode: Literal[
         "original",
         "smooth",
@@ -170,11 +171,9 @@ def run_renderer_in_chunk_w_trj_mode(
         "wobble_inter",
     ] = "smooth",
     input_shape: Optional[tuple[int, int]] = None,
-    enable_tqdm: Optional[bool] = False,
-    **kwargs,
 ) -> tuple[
-    torch.Tensor,  # color, "batch view 3 height width"
-    torch.Tensor,  # depth, "batch view height width"
+    torch.Tensor,  # render views' world2cam, "batch render_view 4 4"
+    torch.Tensor,  # render views' normed intrinsics, "batch render_view 3 3"
 ]:
     cam2world = affine_inverse(as_homogeneous(extrinsics))
     if input_shape is not None:
@@ -308,32 +307,120 @@ def run_renderer_in_chunk_w_trj_mode(
     else:
         raise Exception(f"trj mode [{trj_mode}] is not implemented.")
 
-    _, v = tgt_c2w.shape[:2]
-    tgt_extr = affine_inverse(tgt_c2w)
+    return affine_inverse(tgt_c2w), tgt_intr
+
+
+def render_chunk_size(
+    gaussians: Gaussians,
+    image_shape: tuple[int, int],
+    max_chunk: int = 64,
+) -> int:
+    """
+    Number of views rendered per call that fits in a fraction of the free GPU memory.
+
+    Falls back to ``CPU_RENDER_CHUNK`` views off CUDA.
+    """
+    device = gaussians.means.device
+    if device.type != "cuda":
+        return min(CPU_RENDER_CHUNK, max_chunk)
+    free, _ = torch.cuda.mem_get_info(device)
+    h, w = image_shape
+    num_gaussians = gaussians.means.shape[-2]
+    per_view = num_gaussians * _BYTES_PER_GAUSSIAN_VIEW + h * w * _BYTES_PER_PIXEL
+    return int(max(1, min(max_chunk, free * RENDER_MEMORY_FRACTION // per_view)))
+
+
+def iter_render_chunks(
+    gaussians: Gaussians,
+    extrinsics: torch.Tensor,  # world2cam, "batch view 4 4"
+    intrinsics: torch.Tensor,  # normed intrinsics, "batch view 3 3"
+    image_shape: tuple[int, int],
+    chunk_size: Optional[int] = None,
+    **kwargs,
+) -> Iterator[
+    tuple[
+        int,  # index of the first view of the chunk
+        torch.Tensor,  # color, "batch chunk_view 3 height width"
+        torch.Tensor,  # depth, "batch chunk_view height width"
+    ]
+]:
+    """
+    Render views chunk by chunk, yielding each chunk as soon as it is rendered.
+
+    With ``chunk_size=None`` the chunk size follows the free GPU memory
+    (``render_chunk_size``); on out-of-memory the chunk is halved and rendered again.
+    """
+    _, v = extrinsics.shape[:2]
+    if chunk_size is None:
+        chunk_size = render_chunk_size(gaussians, image_shape)
+    chunk_size = max(1, min(v, chunk_size))
+    s = 0
+    while s < v:
+        e = min(s + chunk_size, v)
+        try:
+            color, depth = render_3dgs(
+                extrinsics=rearrange(extrinsics[:, s:e], "b v ... -> (b v) ..."),  # w2c
+                intrinsics=rearrange(intrinsics[:, s:e], "b v ... -> (b v) ..."),  # normed
+                image_shape=image_shape,
+                gaussian=gaussians,
+                num_view=e - s,
+                **kwargs,
+            )
+        except torch.cuda.OutOfMemoryError:
+            if chunk_size == 1:
+                raise
+            chunk_size = max(1, chunk_size // 2)
+            torch.cuda.empty_cache()
+            logger.warn(f"Out of memory while rendering, retrying with {chunk_size} views")
+            continue
+        yield (
+            s,
+            rearrange(color, "(b v) ... -> b v ...", v=e - s),
+            rearrange(depth, "(b v) ... -> b v ...", v=e - s),
+        )
+        s = e
+
+
+def run_renderer_in_chunk_w_trj_mode(
+    gaussians: Gaussians,
+    extrinsics: torch.Tensor,  # world2cam, "batch view 4 4" | "batch view 3 4"
+    intrinsics: torch.Tensor,  # unnormed intrinsics, "batch view 3 3"
+    image_shape: tuple[int, int],
+    chunk_size: Optional[int] = 8,
+    trj_mode: Literal[
+        "original",
+        "smooth",
+        "interpolate",
+        "interpolate_smooth",
+        "wander",
+        "dolly_zoom",
+        "extend",
+        "wobble_inter",
+    ] = "smooth",
+    input_shape: Optional[tuple[int, int]] = None,
+    enable_tqdm: Optional[bool] = False,
+    **kwargs,
+) -> tuple[
+    torch.Tensor,  # color, "batch view 3 height width"
+    torch.Tensor,  # depth, "batch view height width"
+]:
+    tgt_extr, tgt_intr = build_render_trajectory(
+        extrinsics, intrinsics, image_shape, trj_mode=trj_mode, input_shape=input_shape
+    )
+    _, v = tgt_extr.shape[:2]
     if chunk_size is None:
         chunk_size = v
-    chunk_size = min(v, chunk_size)
     all_colors = []
     all_depths = []
-    for chunk_idx in tqdm(
-        range(math.ceil(v / chunk_size)),
-        desc="Rendering novel views",
-        disable=(not enable_tqdm),
-        leave=False,
-    ):
-        s = int(chunk_idx * chunk_size)
-        e = int((chunk_idx + 1) * chunk_size)
-        cur_n_view = tgt_extr[:, s:e].shape[1]
-        color, depth = render_3dgs(
-            extrinsics=rearrange(tgt_extr[:, s:e], "b v ... -> (b v) ..."),  # w2c
-            intrinsics=rearrange(tgt_intr[:, s:e], "b v ... -> (b v) ..."),  # normed
-            image_shape=image_shape,
-            gaussian=gaussians,
-            num_view=cur_n_view,
-            **kwargs,
-        )
-        all_colors.append(rearrange(color, "(b v) ... -> b v ...", v=cur_n_view))
-        all_depths.append(rearrange(depth, "(b v) ... -> b v ...", v=cur_n_view))
+    with tqdm(
+        total=v, desc="Rendering novel views", disable=(not enable_tqdm), leave=False
+    ) as pbar:
+        for _, color, depth in iter_render_chunks(
+            gaussians, tgt_extr, tgt_intr, image_shape, chunk_size=chunk_size, **kwargs
+        ):
+            all_colors.append(color)
+            all_depths.append(depth)
+            pbar.update(color.shape[1])
     all_colors = torch.cat(all_colors, dim=1)
     all_depths = torch.cat(all_depths, dim=1)
 
@@ -0,0 +1,128 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Adaptive view chunking of the DPT / DualDPT heads.
+
+The heads decode views independently, in chunks along the view dimension. With
+``chunk_size="auto"`` the chunk size is picked from the memory one view needs and the
+memory currently free:
+
+- CUDA: the first view is decoded on its own while the peak allocation is measured;
+  free memory is the unreserved device memory plus the cached blocks of the allocator.
+- CPU: the per-view cost is estimated from the output resolution and the head width;
+  free memory is the available host memory (bounded by the cgroup limit minus RSS).
+
+The result is cached per head and (resolution, device, dtype), so the measurement runs
+once per input resolution.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Union
+import torch
+
+from depth_anything_3.utils.logger import logger
+from depth_anything_3.utils.memory import get_gpu_memory_info, get_host_memory_info
+
+# Share of the free memory the head activations of one chunk may use
+HEAD_MEMORY_FRACTION = 0.5
+MAX_HEAD_CHUNK = 64
+# Chunk size used when no memory snapshot is available
+DEFAULT_HEAD_CHUNK = 8
+# CPU estimate: fp32 values alive per output pixel and head feature channel (measured
+# peak of DualDPT at 504x378, rounded up)
+_CPU_FLOATS_PER_PIXEL_FEATURE = 2
+
+ChunkSize = Optional[Union[int, str]]
+
+
+def _free_bytes(device: torch.device) -> Optional[float]:
+    if device.type == "cuda":
+        info = get_gpu_memory_info(device)
+        if info is None:
+            return None
+        return (info["free_gb"] + info["reserved_gb"] - info["allocated_gb"]) * 1024**3
+    if device.type == "cpu":
+        info = get_host_memory_info()
+        return None if info is None else info["available_gb"] * 1024**3
+    return None
+
+
+def _measure_view(run: Callable[[int, int], dict], device: torch.device):
+    """Decode the first view alone; returns (its output, peak bytes or None)."""
+    if device.type != "cuda":
+        return run(0, 1), None
+    torch.cuda.synchronize(device)
+    before = torch.cuda.memory_allocated(device)
+    torch.cuda.reset_peak_memory_stats(device)
+    out = run(0, 1)
+    torch.cuda.synchronize(device)
+    return out, torch.cuda.max_memory_allocated(device) - before
+
+
+def run_head_chunks(
+    head: torch.nn.Module,
+    run: Callable[[int, int], Dict[str, torch.Tensor]],
+    num_views: int,
+    chunk_size: ChunkSize,
+    H: int,
+    W: int,
+    ref: torch.Tensor,
+) -> List[Dict[str, torch.Tensor]]:
+    """
+    Run a head over ``num_views`` views in chunks.
+
+    Args:
+        head: Head module; its chosen chunk sizes are cached on it
+        run: ``(start, end) -> outputs`` decoding views ``start:end``
+        num_views: Number of views (batch and view dimensions flattened)
+        chunk_size: Views per chunk, None for a single chunk, or "auto"
+        H, W: Output resolution
+        ref: Head input tensor, giving the device and dtype
+
+    Returns:
+        Outputs of the chunks, in view order
+    """
+    outputs, start = [], 0
+    if chunk_size == "auto":
+        key = (H, W, ref.device, ref.dtype)
+        cache = head.__dict__.setdefault("_auto_chunk_sizes", {})
+        if key not in cache:
+            first, per_view = _measure_view(run, ref.device)
+            outputs.append(first)
+            start = 1
+            if per_view is None:
+                features = head.scratch.output_conv1.in_channels
+                per_view = 4 * _CPU_FLOATS_PER_PIXEL_FEATURE * features * H * W
+            free = _free_bytes(ref.device)
+            if free is None:
+                cache[key] = DEFAULT_HEAD_CHUNK
+            else:
+                chunk = int(free * HEAD_MEMORY_FRACTION // max(per_view, 1))
+                cache[key] = max(1, min(chunk, MAX_HEAD_CHUNK))
+            free_text = "unknown" if free is None else f"{free / 1024**3:.1f}GB"
+            logger.info(
+                f"{type(head).__name__} chunk size for {H}x{W} on {ref.device}: {cache[key]} "
+                f"views ({per_view / 1024**2:.0f}MB per view, {free_text} free)"
+            )
+        chunk_size = cache[key]
+
+    if chunk_size is None or chunk_size >= num_views - start:
+        if start < num_views:
+            outputs.append(run(start, num_views))
+        return outputs
+    for s0 in range(start, num_views, chunk_size):
+        outputs.append(run(s0, min(s0 + chunk_size, num_views)))
+    return outputs
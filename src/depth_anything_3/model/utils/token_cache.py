@@ -0,0 +1,271 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Reuse of per-view backbone tokens between overlapping chunks.
+
+When a long sequence is processed in overlapping chunks, the overlap frames of chunk k
+are the first frames of chunk k+1. Blocks with local (per-view) attention only see the
+frame itself, so their outputs can be carried over instead of being recomputed:
+
+- ``"prefix"``: reuse the per-view blocks in front of the alternating local/global
+  stack (the whole backbone for monocular models). The result is the same as a full
+  pass, up to floating-point noise.
+- ``"local"``: additionally reuse the outputs of the local blocks inside the
+  alternating stack, so only the global-attention blocks run for overlap frames.
+  Those local blocks consume global-attention outputs, so this is an approximation.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Hashable, Sequence
+import torch
+import torch.nn as nn
+
+TOKEN_REUSE_MODES = ("prefix", "local")
+
+
+def block_flops(block: nn.Module, num_tokens: int, seq_len: int, dim: int) -> float:
+    """Approximate FLOPs of a transformer block over ``num_tokens`` tokens.
+
+    Args:
+        block: Transformer block; every 2D parameter is treated as a linear layer
+        num_tokens: Total number of tokens processed
+        seq_len: Length of each attention sequence (tokens per view for local attention)
+        dim: Embedding dimension
+
+    Returns:
+        FLOPs (2 per multiply-add) of the linear layers plus the attention matmuls
+    """
+    linear = sum(p.numel() for p in block.parameters() if p.dim() == 2)
+    return 2.0 * num_tokens * linear + 4.0 * num_tokens * seq_len * dim
+
+
+class OverlapTokenCache:
+    """
+    Carries per-view backbone tokens of overlap frames from one chunk to the next.
+
+    Call ``set_frames`` before each forward pass with an id per input view (e.g. the
+    frame index in the sequence) and the ids that the next chunk will share. Pass the
+    cache to ``DepthAnything3.inference(..., token_cache=cache)``; backbones look up
+    the ids of the current chunk and only compute the blocks they cannot reuse.
+
+    Statistics are recorded once per chunk forward, for the first backbone bound after
+    ``set_frames`` (the any-view backbone of nested models).
+
+    Args:
+        mode: ``"prefix"`` (exact) or ``"local"`` (approximate), see module docstring
+    """
+
+    def __init__(self, mode: str = "prefix"):
+        if mode not in TOKEN_REUSE_MODES:
+            raise ValueError(f"Unsupported token reuse mode: {mode}")
+        self.mode = mode
+        self.frame_ids: list[Hashable] | None = None
+        self.keep_ids: set[Hashable] | None = None
+        self._states: dict[int, dict[str, Any]] = {}
+        self._accounted = False
+        self.reset_stats()
+
+    def set_frames(
+        self, frame_ids: Sequence[Hashable], keep_ids: Sequence[Hashable] | None = None
+    ) -> None:
+        """Set the ids of the views of the next forward pass and those to keep after it."""
+        self.frame_ids = list(frame_ids)
+        self.keep_ids = set(self.frame_ids if keep_ids is None else keep_ids)
+        self._accounted = False
+
+    def reset(self) -> None:
+        """Drop all carried tokens."""
+        self._states.clear()
+
+    def reset_stats(self) -> None:
+        self.frames = 0
+        self.reused_frames = 0
+        self.total_flops = 0.0
+        self.saved_flops = 0.0
+
+    def get_stats(self) -> dict[str, float]:
+        """Backbone FLOPs of the passes so far and the part skipped through reuse."""
+        return {
+            "frames": self.frames,
+            "reused_frames": self.reused_frames,
+            "backbone_flops": self.total_flops,
+            "saved_flops": self.saved_flops,
+            "saved_fraction": self.saved_flops / self.total_flops if self.total_flops else 0.0,
+        }
+
+    def bind(self, backbone: nn.Module, x: torch.Tensor) -> "_ChunkReuse | None":
+        """Reuse helper for one backbone forward pass, or None if reuse does not apply."""
+        B, S, _, H, W = x.shape
+        if B != 1 or self.frame_ids is None or len(self.frame_ids) != S:
+            return None
+        state = self._states.get(id(backbone))
+        if state is None or state["shape"] != (H, W, x.device):
+            state = {"shape": (H, W, x.device), "frames": {}}
+            self._states[id(backbone)] = state
+        account = not self._accounted
+        self._accounted = True
+        return _ChunkReuse(self, backbone, state, self.frame_ids, self.keep_ids, account)
+
+
+class _ChunkReuse:
+    """Per-forward helper driving a DinoVisionTransformer through cached and fresh views."""
+
+    def __init__(self, cache, backbone, state, frame_ids, keep_ids, account=True):
+        self.cache = cache
+        self.account = account
+        self.backbone = backbone
+        self.state = state
+        self.frame_ids = frame_ids
+        self.keep_ids = keep_ids
+        self.old_frames = state["frames"]
+        self.new_frames: dict[Hashable, dict[Any, torch.Tensor]] = {
+            fid: {} for fid in frame_ids if fid in keep_ids
+        }
+        # order[p] is the input position of the view at position p (views get reordered
+        # to put the reference view first)
+        self.order = list(range(len(frame_ids)))
+        alt_start = backbone.alt_start
+        self.prefix_len = alt_start - 1 if alt_start != -1 else len(backbone.blocks)
+
+    def _rope_pos(self, i, pos):
+        if i < self.backbone.rope_start or self.backbone.rope is None:
+            return None
+        return pos
+
+    def _store(self, key, x):
+        for p, j in enumerate(self.order):
+            fid = self.frame_ids[j]
+            if fid in self.new_frames:
+                self.new_frames[fid][key] = x[0, p].clone()
+
+    def run_prefix(self, images, pos, blocks_to_take, export_feat_layers):
+        """
+        Run the per-view blocks in front of the first reference-view selection.
+
+        Returns:
+            Tuple of (tokens after the prefix, index of the next block, outputs, aux outputs)
+        """
+        bb = self.backbone
+        S = images.shape[1]
+        P = max(self.prefix_len, 0)
+        record = {i for i in set(blocks_to_take) | set(export_feat_layers) if i < P}
+        needed = {"prefix"} | {("layer", i) for i in record}
+        cached = [
+            j
+            for j, fid in enumerate(self.frame_ids)
+            if needed <= self.old_frames.get(fid, {}).keys()
+        ]
+        fresh = [j for j in range(S) if j not in set(cached)]
+
+        layers = {}
+        if fresh:
+            x = bb.prepare_tokens_with_masks(images[:, fresh])
+            for i in range(P):
+                l_pos = self._rope_pos(i, pos)
+                l_pos = l_pos[:, fresh] if l_pos is not None else None
+                x = bb.process_attention(x, bb.blocks[i], "local", pos=l_pos)
+                if i in record:
+                    layers[i] = x
+
+        def assemble(new, key):
+            if not cached:
+                return new
+            old = torch.stack([self.old_frames[self.frame_ids[j]][key] for j in cached])[None]
+            if new is None:
+                return old
+            out = new.new_empty((1, S) + new.shape[2:])
+            out[:, fresh] = new
+            out[:, cached] = old.to(new.dtype)
+            return out
+
+        x = assemble(x if fresh else None, "prefix")
+        self._store("prefix", x)
+        output, aux_output = [], []
+        for i in sorted(record):
+            x_i = assemble(layers.get(i), ("layer", i))
+            self._store(("layer", i), x_i)
+            if i in blocks_to_take:
+                out_x = torch.cat([x_i, x_i], dim=-1) if bb.cat_token else x_i
+                output.append((out_x[:, :, 0], out_x))
+            if i in export_feat_layers:
+                aux_output.append(x_i)
+
+        self._account(x, P, num_reused=len(cached), reused_blocks=P)
+        return x, P, output, aux_output
+
+    def reorder(self, b_idx):
+        ref = int(b_idx[0])
+        self.order = [ref] + [j for j in self.order if j != ref]
+
+    def local_block(self, i, x, block, l_pos):
+        """Run a local block, reusing the carried output of overlap views in "local" mode."""
+        bb = self.backbone
+        if self.cache.mode != "local":
+            return bb.process_attention(x, block, "local", pos=l_pos)
+        key = ("local", i)
+        # The reference view carries a different camera token; always recompute it
+        cached = [
+            p
+            for p, j in enumerate(self.order)
+            if p > 0 and key in self.old_frames.get(self.frame_ids[j], {})
+        ]
+        fresh = [p for p in range(x.shape[1]) if p not in set(cached)]
+        if not cached:
+            out = bb.process_attention(x, block, "local", pos=l_pos)
+        else:
+            out = x.new_empty(x.shape)
+            if fresh:
+                out[:, fresh] = bb.process_attention(
+                    x[:, fresh],
+                    block,
+                    "local",
+                    pos=l_pos[:, fresh] if l_pos is not None else None,
+                )
+            out[:, cached] = torch.stack(
+                [self.old_frames[self.frame_ids[self.order[p]]][key] for p in cached]
+            )[None].to(x.dtype)
+            if self.account:
+                self.cache.saved_flops += block_flops(
+                    block, len(cached) * x.shape[2], x.shape[2], x.shape[-1]
+                )
+        # The reference view's tokens are never reused, so do not keep them
+        for p, j in enumerate(self.order):
+            fid = self.frame_ids[j]
+            if p > 0 and fid in self.new_frames:
+                self.new_frames[fid][key] = out[0, p].clone()
+        return out
+
+    def _account(self, x, prefix_len, num_reused, reused_blocks):
+        if not self.account:
+            return
+        bb = self.backbone
+        S, N, C = x.shape[1], x.shape[2], x.shape[-1]
+        embed_flops = 2.0 * N * sum(p.numel() for p in bb.patch_embed.parameters() if p.dim() > 1)
+        total = S * embed_flops
+        for i, blk in enumerate(bb.blocks):
+            is_global = bb.alt_start != -1 and i >= bb.alt_start and i % 2 == 1
+            total += block_flops(blk, S * N, S * N if is_global else N, C)
+        saved = num_reused * embed_flops
+        for i in range(reused_blocks):
+            saved += block_flops(bb.blocks[i], num_reused * N, N, C)
+        self.cache.frames += S
+        self.cache.reused_frames += num_reused
+        self.cache.total_flops += total
+        self.cache.saved_flops += saved
+
+    def finish(self):
+        """Replace the carried tokens with those of the views shared with the next chunk."""
+        self.state["frames"] = self.new_frames
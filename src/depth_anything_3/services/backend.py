@@ -18,13 +18,17 @@ Model backend service for Depth Anything 3.
 Provides HTTP API for model inference with persistent model loading.
 """
 
+import asyncio
+import json
 import os
 import posixpath
+import threading
 import time
 import uuid
 
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import quote
 import numpy as np
 
@@ -34,12 +38,27 @@ from fastapi.responses import FileResponse, HTMLResponse
 from pydantic import BaseModel
 
 from ..api import DepthAnything3
+from ..model.utils.bucketing import parse_shapes
+from .batching import MicroBatchScheduler
+from .worker_pool import WorkerPool, load_model_replica, resolve_worker_devices
+from .task_queue import (
+    ADMITTED_MESSAGE,
+    DEFAULT_PRIORITY,
+    AdmissionController,
+    InMemoryTaskQueue,
+    TaskQueue,
+    create_task_queue,
+    dump_request,
+    load_request,
+)
+from ..utils.export.tiles import build_lod_glb
 from ..utils.memory import (
     get_gpu_memory_info,
     cleanup_cuda_memory,
     check_memory_availability,
     estimate_memory_requirement,
 )
+from ..utils.tile_index import has_scene_model, tile_levels
 
 
 class InferenceRequest(BaseModel):
@@ -60,6 +79,9 @@ class InferenceRequest(BaseModel):
     show_cameras: bool = True
     # Feat_vis export parameters
     feat_vis_fps: int = 15
+    # Scheduling parameters
+    priority: str = DEFAULT_PRIORITY  # "high", "normal" or "low"
+    client_id: Optional[str] = None  # Used for per-client quotas
 
 
 class InferenceResponse(BaseModel):
@@ -91,14 +113,36 @@ class TaskStatus(BaseModel):
     export_format: Optional[str] = None  # Export format
     process_res_method: Optional[str] = None  # Processing resolution method
     video_path: Optional[str] = None  # Source video path
+    priority: Optional[str] = None  # Priority class the task was queued with
+    client_id: Optional[str] = None  # Submitting client
 
 
 class ModelBackend:
     """Model backend service with persistent model loading."""
 
-    def __init__(self, model_dir: str, device: str = "cuda"):
+    def __init__(
+        self,
+        model_dir: str,
+        device: str = "cuda",
+        num_workers: int = 0,
+        compile_model: bool = False,
+        warmup_shapes: Optional[List[Tuple[int, int, int]]] = None,
+    ):
         self.model_dir = model_dir
         self.device = device
+        self.compile_model = compile_model
+        self.warmup_shapes = warmup_shapes or []
+        # With num_workers > 0 the model runs in a pool of worker processes instead
+        self.pool = None
+        if num_workers > 0:
+            loader = partial(
+                load_model_replica,
+                compile_model=compile_model,
+                warmup_shapes=self.warmup_shapes,
+            )
+            self.pool = WorkerPool(
+                model_dir, resolve_worker_devices(device), num_workers, loader=loader
+            )
         self.model = None
         self.model_loaded = False
         self.load_time = None
@@ -108,6 +152,9 @@ class ModelBackend:
 
     def load_model(self):
         """Load model if not already loaded."""
+        if self.pool is not None:
+            return self._start_pool()
+
         if self.model_loaded and self.model is not None:
             self.last_used = time.time()
             return self.model
@@ -119,6 +166,9 @@ class ModelBackend:
 
             self.model = DepthAnything3.from_pretrained(self.model_dir).to(self.device)
             self.model.eval()
+            if self.compile_model:
+                self.model.enable_compile()
+                self.model.warmup(self.warmup_shapes)
 
             self.model_loaded = True
             self.load_time = time.time() - start_time
@@ -132,6 +182,23 @@ class ModelBackend:
             print(f"Failed to load model: {e}")
             raise e
 
+    def _start_pool(self):
+        """Start the worker pool; replicas load asynchronously in the workers."""
+        if self.load_start_time is None:
+            print(f"Starting {self.pool.num_workers} model workers on {', '.join(self.pool.devices)}...")
+            self.load_start_time = time.time()
+            self.pool.start()
+        return None
+
+    def reload_model(self):
+        """Drop the loaded model (or restart all workers) and load it again."""
+        if self.pool is not None:
+            self.pool.restart()
+            return None
+        self.model = None
+        self.model_loaded = False
+        return self.load_model()
+
     def get_model(self):
         """Get model, loading if necessary."""
         if not self.model_loaded:
@@ -143,10 +210,16 @@ class ModelBackend:
         """Get backend status information."""
         # Calculate uptime from when model loading completed
         uptime = 0
+        if self.pool is not None:
+            workers = self.pool.get_stats()
+            self.model_loaded = any(w["ready"] for w in workers)
+            if self.model_loaded and self.load_completed_time is None:
+                self.load_completed_time = time.time()
+                self.load_time = self.load_completed_time - self.load_start_time
         if self.model_loaded and self.load_completed_time:
             uptime = time.time() - self.load_completed_time
 
-        return {
+        status = {
             "model_loaded": self.model_loaded,
             "model_dir": self.model_dir,
             "device": self.device,
@@ -154,37 +227,95 @@ class ModelBackend:
             "last_used": self.last_used,
             "uptime": uptime,
         }
+        if self.pool is not None:
+            status["workers"] = workers
+        return status
 
 
 # Global backend instance
 _backend: Optional[ModelBackend] = None
 _app: Optional[FastAPI] = None
 _tasks: Dict[str, TaskStatus] = {}
-_executor = ThreadPoolExecutor(max_workers=1)  # Restrict to single-task execution
-_running_task_id: Optional[str] = None  # Currently running task ID
-_task_queue: List[str] = []  # Pending task queue
+_executor = ThreadPoolExecutor(max_workers=1)  # One thread per concurrently running batch
+_max_running = 1  # Concurrent batches: 1 in-process, one per worker with a model pool
+_running_task_ids: List[str] = []  # Running task IDs (first task of each batch)
+_task_queue: TaskQueue = InMemoryTaskQueue()  # Pending task queue (replaced in create_app)
+_dispatch_lock = threading.Lock()  # Guards _running_task_ids
+_batch_scheduler = MicroBatchScheduler()
+_admission = AdmissionController()
 
 # Task cleanup configuration
 MAX_TASK_HISTORY = 100  # Maximum number of tasks to keep in memory
 CLEANUP_INTERVAL = 300  # Cleanup interval in seconds (5 minutes)
 
 
+def _get_task_request(task_id: str) -> Optional[InferenceRequest]:
+    """Get the stored request of a task, or None if the task is gone."""
+    task = _tasks.get(task_id)
+    return task.request if task is not None else None
+
+
+def _reserve_task(task_id: str) -> bool:
+    """Whether a queued task may start now; reserves its memory if so."""
+    request = _get_task_request(task_id)
+    return request is None or _admission.try_reserve(task_id, request)
+
+
 def _process_next_task():
-    """Process the next task in the queue."""
-    global _task_queue, _running_task_id
+    """Start queued tasks (or micro-batches of tasks) while execution slots are free."""
+    global _task_queue, _running_task_ids
 
-    if not _task_queue or _running_task_id is not None:
-        return
+    while True:
+        with _dispatch_lock:
+            if len(_running_task_ids) >= _max_running:
+                return
 
-    # Get next task from queue
-    task_id = _task_queue.pop(0)
+            # Get the next task whose memory fits, skipping tasks deleted in the meantime
+            task_id = None
+            while True:
+                taken = _task_queue.take(_reserve_task, 1)
+                if not taken:
+                    return
+                if taken[0] in _tasks:
+                    task_id = taken[0]
+                    break
+                _task_queue.complete(taken[0])
 
-    # Get task request from tasks dict (we need to store the request)
-    if task_id not in _tasks:
-        return
+            _running_task_ids.append(task_id)
+
+        # Submit task to executor
+        _executor.submit(_run_scheduled_tasks, task_id)
 
-    # Submit task to executor
-    _executor.submit(_run_inference_task, task_id)
+
+def _run_scheduled_tasks(first_task_id: str):
+    """Collect a micro-batch starting at ``first_task_id`` and run it."""
+    global _running_task_ids
+
+    task_ids = [first_task_id]
+    try:
+        task_ids = _batch_scheduler.collect(
+            first_task_id, _task_queue, _get_task_request, can_start=_reserve_task
+        )
+        for task_id in task_ids:
+            _admission.record_wait(time.time() - _tasks[task_id].created_at)
+        if _backend.pool is not None:
+            _run_pool_task(task_ids)
+        elif len(task_ids) > 1:
+            _run_batched_inference_task(task_ids)
+        else:
+            _run_inference_task(first_task_id)
+    finally:
+        for task_id in task_ids:
+            _task_queue.complete(task_id)
+            _admission.release(task_id)
+
+        # Clear running state and process next task in queue
+        with _dispatch_lock:
+            _running_task_ids.remove(first_task_id)
+        _process_next_task()
+
+        # Schedule cleanup after task completion
+        _schedule_task_cleanup()
 
 
 # get_gpu_memory_info imported from depth_anything_3.utils.memory
@@ -201,7 +332,7 @@ def _process_next_task():
 
 def _run_inference_task(task_id: str):
     """Run inference task in background thread with OOM protection."""
-    global _tasks, _backend, _running_task_id, _task_queue
+    global _tasks, _backend
 
     model = None
     inference_started = False
@@ -216,9 +347,6 @@ def _run_inference_task(task_id: str):
         request = _tasks[task_id].request
         num_images = len(request.image_paths)
 
-        # Set current running task
-        _running_task_id = task_id
-
         # Update task status to running
         _tasks[task_id].status = "running"
         _tasks[task_id].started_at = start_time
@@ -342,12 +470,6 @@ def _run_inference_task(task_id: str):
         _tasks[task_id].progress = 1.0
         _tasks[task_id].export_dir = request.export_dir
 
-        # Clear running state
-        _running_task_id = None
-
-        # Process next task in queue
-        _process_next_task()
-
         print(f"[{task_id}] Task completed successfully")
         print(
             f"[{task_id}] Total time: {total_time:.2f}s, "
@@ -369,12 +491,6 @@ def _run_inference_task(task_id: str):
         _tasks[task_id].completed_at = time.time()
         _tasks[task_id].message = f"[{task_id}] Failed after {total_time:.2f}s: {error_msg}"
 
-        # Clear running state
-        _running_task_id = None
-
-        # Process next task in queue
-        _process_next_task()
-
     finally:
         # Final cleanup in finally block to ensure it always runs
         # This is critical for releasing resources even if unexpected errors occur
@@ -385,8 +501,144 @@ def _run_inference_task(task_id: str):
         except Exception as e:
             print(f"[{task_id}] Warning: Finally block cleanup failed: {e}")
 
-        # Schedule cleanup after task completion
-        _schedule_task_cleanup()
+
+def _run_batched_inference_task(task_ids: List[str]):
+    """Run a micro-batch of compatible tasks through shared forward passes.
+
+    Each task is exported and completed individually. If the batched forward pass
+    fails (e.g. OOM), the tasks are retried one by one.
+    """
+    global _tasks, _backend
+
+    start_time = time.time()
+    requests = [_tasks[task_id].request for task_id in task_ids]
+    num_images = sum(len(request.image_paths) for request in requests)
+    batch_tag = f"batch:{task_ids[0][:8]}+{len(task_ids) - 1}"
+
+    try:
+        for task_id in task_ids:
+            _tasks[task_id].status = "running"
+            _tasks[task_id].started_at = start_time
+            _tasks[task_id].message = (
+                f"[{task_id}] Starting batched inference "
+                f"({len(task_ids)} tasks, {num_images} frames)..."
+            )
+            _tasks[task_id].progress = 0.1
+        print(f"[{batch_tag}] Starting batched inference on {len(task_ids)} tasks, {num_images} frames")
+
+        cleanup_cuda_memory()
+        estimated_memory = estimate_memory_requirement(num_images, requests[0].process_res)
+        mem_available, mem_msg = check_memory_availability(estimated_memory)
+        print(f"[{batch_tag}] {mem_msg}")
+        if not mem_available:
+            raise RuntimeError(f"Insufficient GPU memory for batch. {mem_msg}")
+
+        model = _backend.get_model()
+        for task_id in task_ids:
+            _tasks[task_id].progress = 0.3
+
+        inference_start_time = time.time()
+        predictions = model.batch_inference(
+            [request.image_paths for request in requests],
+            process_res=requests[0].process_res,
+            process_res_method=requests[0].process_res_method,
+            export_feat_layers=requests[0].export_feat_layers,
+        )
+        inference_time = time.time() - inference_start_time
+        avg_time_per_image = inference_time / num_images if num_images > 0 else 0
+        print(
+            f"[{batch_tag}] Batched inference completed in {inference_time:.2f}s "
+            f"({avg_time_per_image:.2f}s per image)"
+        )
+    except Exception as e:
+        print(f"[{batch_tag}] Batched inference failed: {e}; running tasks sequentially")
+        cleanup_cuda_memory()
+        for task_id in task_ids:
+            _run_inference_task(task_id)
+        return
+
+    for task_id, request, prediction in zip(task_ids, requests, predictions):
+        try:
+            _tasks[task_id].progress = 0.9
+            if request.export_dir:
+                _tasks[task_id].message = f"[{task_id}] Exporting results..."
+                model.export_prediction(
+                    prediction,
+                    request.image_paths,
+                    request.export_dir,
+                    request.export_format,
+                    process_res_method=request.process_res_method,
+                    conf_thresh_percentile=request.conf_thresh_percentile,
+                    num_max_points=request.num_max_points,
+                    show_cameras=request.show_cameras,
+                    feat_vis_fps=request.feat_vis_fps,
+                )
+
+            total_time = time.time() - start_time
+            _tasks[task_id].status = "completed"
+            _tasks[task_id].completed_at = time.time()
+            _tasks[task_id].message = (
+                f"[{task_id}] Completed in {total_time:.2f}s "
+                f"(batched with {len(task_ids) - 1} other tasks, "
+                f"{avg_time_per_image:.2f}s per image)"
+            )
+            _tasks[task_id].progress = 1.0
+            _tasks[task_id].export_dir = request.export_dir
+            print(f"[{task_id}] Task completed successfully in {total_time:.2f}s ({batch_tag})")
+        except Exception as e:
+            total_time = time.time() - start_time
+            print(f"[{task_id}] Task failed after {total_time:.2f}s: {e}")
+            _tasks[task_id].status = "failed"
+            _tasks[task_id].completed_at = time.time()
+            _tasks[task_id].message = f"[{task_id}] Failed after {total_time:.2f}s: {e}"
+
+    del predictions
+    cleanup_cuda_memory()
+
+
+def _run_pool_task(task_ids: List[str]):
+    """Run a task or micro-batch on the least-loaded worker of the model pool."""
+    global _tasks, _backend
+
+    start_time = time.time()
+    requests = [_tasks[task_id].request for task_id in task_ids]
+    num_images = sum(len(request.image_paths) for request in requests)
+    worker_id = None
+
+    try:
+        future = _backend.pool.submit([json.loads(dump_request(r)) for r in requests])
+        worker_id = getattr(future, "worker_id", None)
+        for task_id in task_ids:
+            _tasks[task_id].status = "running"
+            _tasks[task_id].started_at = start_time
+            _tasks[task_id].message = (
+                f"[{task_id}] Running on worker {worker_id} "
+                f"({len(task_ids)} tasks, {num_images} frames)..."
+            )
+            _tasks[task_id].progress = 0.1
+        print(f"[{task_ids[0]}] Dispatched {len(task_ids)} tasks to worker {worker_id}")
+        results = future.result()
+    except Exception as e:
+        results = [{"success": False, "message": str(e), "inference_time": None}] * len(task_ids)
+
+    for task_id, request, result in zip(task_ids, requests, results):
+        total_time = time.time() - start_time
+        _tasks[task_id].completed_at = time.time()
+        if result["success"]:
+            _tasks[task_id].status = "completed"
+            _tasks[task_id].message = (
+                f"[{task_id}] Completed in {total_time:.2f}s "
+                f"(inference {result['inference_time']:.2f}s on worker {worker_id})"
+            )
+            _tasks[task_id].progress = 1.0
+            _tasks[task_id].export_dir = request.export_dir
+            print(f"[{task_id}] Task completed successfully in {total_time:.2f}s")
+        else:
+            _tasks[task_id].status = "failed"
+            _tasks[task_id].message = (
+                f"[{task_id}] Failed after {total_time:.2f}s: {result['message']}"
+            )
+            print(f"[{task_id}] Task failed after {total_time:.2f}s: {result['message']}")
 
 
 def _cleanup_old_tasks():
@@ -444,8 +696,8 @@ def _schedule_task_cleanup():
         except Exception as e:
             print(f"[CLEANUP] Cleanup worker failed: {e}")
 
-    # Run cleanup in background thread
-    _executor.submit(cleanup_worker)
+    # Run cleanup in its own thread so it never delays the next inference batch
+    threading.Thread(target=cleanup_worker, daemon=True).start()
 
 
 # ============================================================================
@@ -501,7 +753,7 @@ def build_group_list(root_dir: str) -> dict:
                     spath = os.path.join(gpath, sname)
                     if not os.path.isdir(spath):
                         continue
-                    if os.path.exists(os.path.join(spath, "scene.glb")) and os.path.exists(
+                    if has_scene_model(spath) and os.path.exists(
                         os.path.join(spath, "scene.jpg")
                     ):
                         has_scene = True
@@ -526,9 +778,8 @@ def build_group_manifest(root_dir: str, group: str) -> dict:
             spath = os.path.join(gpath, sname)
             if not os.path.isdir(spath):
                 continue
-            glb_fs = os.path.join(spath, "scene.glb")
             jpg_fs = os.path.join(spath, "scene.jpg")
-            if not (os.path.exists(glb_fs) and os.path.exists(jpg_fs)):
+            if not (has_scene_model(spath) and os.path.exists(jpg_fs)):
                 continue
             depth_images = []
             dpath = os.path.join(spath, "depth_vis")
@@ -542,25 +793,113 @@ def build_group_manifest(root_dir: str, group: str) -> dict:
                     depth_images.append(
                         "/gallery/" + _gallery_url_join(group, sname, "depth_vis", fn)
                     )
-            items.append(
-                {
-                    "id": sname,
-                    "title": sname,
-                    "model": "/gallery/" + _gallery_url_join(group, sname, "scene.glb"),
-                    "thumbnail": "/gallery/" + _gallery_url_join(group, sname, "scene.jpg"),
-                    "depth_images": depth_images,
-                }
-            )
+            item = {
+                "id": sname,
+                "title": sname,
+                "model": "/gallery/" + _gallery_url_join(group, sname, "scene.glb"),
+                "thumbnail": "/gallery/" + _gallery_url_join(group, sname, "scene.jpg"),
+                "depth_images": depth_images,
+            }
+            levels = tile_levels(os.path.join(spath, "tiles"))
+            if levels:
+                # Merged levels 0..L, built on demand by gallery_files; coarse first
+                item["tiles"] = "/gallery/" + _gallery_url_join(
+                    group, sname, "tiles", "index.json"
+                )
+                item["lods"] = [
+                    "/gallery/" + _gallery_url_join(group, sname, "tiles", "lod", f"{level}.glb")
+                    for level in range(levels)
+                ]
+                if not os.path.exists(os.path.join(spath, "scene.glb")):
+                    item["model"] = item["lods"][-1]
+            items.append(item)
     except Exception as e:
         print(f"[warn] build_group_manifest failed for {group}: {e}")
     return {"group": group, "items": items}
 
 
-def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str] = None) -> FastAPI:
-    """Create FastAPI application with model backend."""
-    global _backend, _app
+def _recover_persisted_tasks():
+    """Restore tasks left pending (or interrupted) in a persistent queue."""
+    recovered = 0
+    for task_id, payload, priority, client_id, created_at in _task_queue.recover():
+        try:
+            request = load_request(InferenceRequest, payload)
+        except Exception as e:
+            print(f"[QUEUE] Dropping unreadable persisted task {task_id}: {e}")
+            _task_queue.remove(task_id)
+            continue
+        _tasks[task_id] = TaskStatus(
+            task_id=task_id,
+            status="pending",
+            message=f"[{task_id}] Task recovered from persistent queue",
+            created_at=created_at,
+            export_dir=request.export_dir,
+            request=request,
+            num_images=len(request.image_paths),
+            export_format=request.export_format,
+            process_res_method=request.process_res_method,
+            video_path=request.image_paths[0] if request.image_paths else None,
+            priority=priority,
+            client_id=client_id,
+        )
+        recovered += 1
+    if recovered:
+        print(f"[QUEUE] Recovered {recovered} pending tasks")
+        _process_next_task()
 
-    _backend = ModelBackend(model_dir, device)
+
+def create_app(
+    model_dir: str,
+    device: str = "cuda",
+    gallery_dir: Optional[str] = None,
+    max_batch_wait_ms: float = 50.0,
+    max_batch_images: int = 16,
+    queue_path: Optional[str] = None,
+    memory_budget_gb: Optional[float] = None,
+    memory_policy: str = "reject",
+    max_pending_per_client: Optional[int] = None,
+    max_queue_depth: Optional[int] = None,
+    num_workers: int = 0,
+    compile_model: bool = False,
+    warmup_shapes: Optional[List[Tuple[int, int, int]]] = None,
+) -> FastAPI:
+    """Create FastAPI application with model backend.
+
+    Args:
+        model_dir: Model directory path
+        device: Device to use
+        gallery_dir: Gallery directory path (optional)
+        max_batch_wait_ms: Max time to wait for compatible tasks to join a micro-batch
+        max_batch_images: Max total number of images in a micro-batch (<=1 disables batching)
+        queue_path: SQLite file persisting the task queue across restarts (in-memory if None)
+        memory_budget_gb: Device memory budget for admission control (device total if None)
+        memory_policy: "defer" holds queued tasks until their memory fits next to the
+            running tasks; tasks over the whole budget are rejected with either policy
+        max_pending_per_client: Max pending tasks per client_id (unlimited if None)
+        max_queue_depth: Max pending tasks overall (unlimited if None)
+        num_workers: Number of model worker processes, placed round-robin on the
+            comma-separated ``device`` list (0 runs the model in-process)
+        compile_model: Compile the backbone on bucketed input shapes (opt-in)
+        warmup_shapes: (views, height, width) inputs compiled at start-up; the model is
+            then loaded before the server accepts requests
+    """
+    global _backend, _app, _task_queue, _admission, _executor, _max_running
+
+    _backend = ModelBackend(model_dir, device, num_workers, compile_model, warmup_shapes)
+    _max_running = max(1, num_workers)
+    _executor = ThreadPoolExecutor(max_workers=_max_running)
+    if _backend.pool is not None or compile_model:
+        _backend.load_model()
+    _batch_scheduler.max_wait = max(max_batch_wait_ms, 0.0) / 1000.0
+    _batch_scheduler.max_batch_images = max_batch_images
+    _task_queue = create_task_queue(queue_path)
+    _admission = AdmissionController(
+        memory_budget_gb=memory_budget_gb,
+        memory_policy=memory_policy,
+        max_pending_per_client=max_pending_per_client,
+        max_queue_depth=max_queue_depth,
+    )
+    _recover_persisted_tasks()
     _app = FastAPI(
         title="Depth Anything 3 Backend",
         description="Model inference service for Depth Anything 3",
@@ -847,11 +1186,23 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
         else:
             uptime_str = "Not running"
 
+        workers_html = ""
+        if status.get("workers"):
+            workers_html = "".join(
+                f"""
+                <div class="status-item">
+                    <span>Worker {w['worker_id']} ({w['device']}):</span>
+                    <span class="status-value">{'ready' if w['ready'] else 'alive' if w['alive'] else 'down'}, {w['utilization_percent']:.0f}% busy, {w['restarts']} restarts</span>
+                </div>"""
+                for w in status["workers"]
+            )
+
         # Get tasks information
         active_tasks = [task for task in _tasks.values() if task.status in ["pending", "running"]]
         completed_tasks = [
             task for task in _tasks.values() if task.status in ["completed", "failed"]
         ]
+        queue_stats = _admission.get_stats(_task_queue)
 
         # Generate task HTML
         active_tasks_html = ""
@@ -1089,7 +1440,7 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
                 <div class="status-item">
                     <span>Uptime:</span>
                     <span class="status-value">{uptime_str}</span>
-                </div>
+                </div>{workers_html}
             </div>
 
             <div class="status-card">
@@ -1106,6 +1457,18 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
                     <span>Total Tasks:</span>
                     <span class="status-value">{len(_tasks)}</span>
                 </div>
+                <div class="status-item">
+                    <span>Queue Depth (high/normal/low):</span>
+                    <span class="status-value">{queue_stats['depth']} ({'/'.join(str(v) for v in queue_stats['depth_by_priority'].values())})</span>
+                </div>
+                <div class="status-item">
+                    <span>Avg Queue Wait:</span>
+                    <span class="status-value">{f"{queue_stats['wait_time_s']['avg']:.2f}s" if queue_stats['wait_time_s'] else 'N/A'}</span>
+                </div>
+                <div class="status-item">
+                    <span>Rejected / Deferred:</span>
+                    <span class="status-value">{queue_stats['rejected_total']} / {queue_stats['deferred']}</span>
+                </div>
             </div>
         </div>
 
@@ -1173,13 +1536,15 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
         else:
             status["gpu_memory"] = None
 
+        status["running_batches"] = len(_running_task_ids)
+        status["queue"] = _admission.get_stats(_task_queue)
+        status["batching"] = _batch_scheduler.get_stats()
+
         return status
 
     @_app.post("/inference", response_model=InferenceResponse)
     async def run_inference(request: InferenceRequest):
         """Submit inference task and return task ID."""
-        global _running_task_id
-
         if _backend is None:
             raise HTTPException(status_code=500, detail="Backend not initialized")
 
@@ -1187,37 +1552,64 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
         task_id = str(uuid.uuid4())
 
         # Create task status
-        if _running_task_id is not None:
-            status_msg = f"[{task_id}] Task queued (waiting for {_running_task_id} to complete)"
-        else:
-            status_msg = f"[{task_id}] Task submitted"
-
-        _tasks[task_id] = TaskStatus(
-            task_id=task_id,
-            status="pending",
-            message=status_msg,
-            created_at=time.time(),
-            export_dir=request.export_dir,
-            request=request,
-            # Record essential parameters
-            num_images=len(request.image_paths),
-            export_format=request.export_format,
-            process_res_method=request.process_res_method,
-            video_path=(
-                request.image_paths[0] if request.image_paths else None
-            ),  # Use first image path as video reference
-        )
-
-        # Add task to queue
-        _task_queue.append(task_id)
+        with _dispatch_lock:
+            if len(_running_task_ids) >= _max_running:
+                status_msg = (
+                    f"[{task_id}] Task queued (waiting for {_running_task_ids[0]} to complete)"
+                )
+            else:
+                status_msg = f"[{task_id}] Task submitted"
+
+        def enqueue():
+            _tasks[task_id] = TaskStatus(
+                task_id=task_id,
+                status="pending",
+                message=status_msg,
+                created_at=time.time(),
+                export_dir=request.export_dir,
+                request=request,
+                # Record essential parameters
+                num_images=len(request.image_paths),
+                export_format=request.export_format,
+                process_res_method=request.process_res_method,
+                video_path=(
+                    request.image_paths[0] if request.image_paths else None
+                ),  # Use first image path as video reference
+                priority=request.priority,
+                client_id=request.client_id,
+            )
+            _task_queue.put(
+                task_id,
+                dump_request(request),
+                priority=request.priority,
+                client_id=request.client_id,
+                created_at=_tasks[task_id].created_at,
+            )
 
-        # If no task is running, start processing the queue
-        if _running_task_id is None:
-            _process_next_task()
+        # Admission control (back-pressure, per-client quotas and memory budget) and the
+        # enqueue run under one lock
+        try:
+            admitted, _, status_code, admission_msg = _admission.admit(
+                request, _task_queue, request.priority, enqueue=enqueue
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not admitted:
+            raise HTTPException(status_code=status_code, detail=admission_msg)
+        deferred = admission_msg != ADMITTED_MESSAGE
+        if deferred:
+            _tasks[task_id].message += f" ({admission_msg})"
+
+        # If an execution slot is free, start processing the queue
+        _process_next_task()
 
         return InferenceResponse(
             success=True,
-            message="Task submitted successfully",
+            message=(
+                f"Task submitted successfully ({admission_msg})"
+                if deferred
+                else "Task submitted successfully"
+            ),
             task_id=task_id,
             export_dir=request.export_dir,
             export_format=request.export_format,
@@ -1234,11 +1626,25 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
     @_app.get("/gpu-memory")
     async def get_gpu_memory():
         """Get detailed GPU memory information."""
+        workers = None
+        if _backend is not None and _backend.pool is not None:
+            workers = [
+                {
+                    "worker_id": w["worker_id"],
+                    "device": w["device"],
+                    "alive": w["alive"],
+                    "utilization_percent": w["utilization_percent"],
+                    "gpu_memory": w["gpu_memory"],
+                }
+                for w in _backend.pool.get_stats()
+            ]
+
         gpu_memory = get_gpu_memory_info()
         if gpu_memory is None:
             return {
                 "available": False,
                 "message": "CUDA not available or memory info cannot be retrieved",
+                "workers": workers,
             }
 
         return {
@@ -1253,6 +1659,7 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
                 if gpu_memory["utilization"] < 80
                 else "warning" if gpu_memory["utilization"] < 95 else "critical"
             ),
+            "workers": workers,
         }
 
     @_app.get("/tasks")
@@ -1301,9 +1708,7 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
             raise HTTPException(status_code=500, detail="Backend not initialized")
 
         try:
-            _backend.model = None
-            _backend.model_loaded = False
-            _backend.load_model()
+            _backend.reload_model()
             return {"message": "Model reloaded successfully"}
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to reload model: {str(e)}")
@@ -1360,6 +1765,21 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
             if not real_file_path.startswith(real_gallery_dir):
                 raise HTTPException(status_code=403, detail="Access denied")
 
+            # Merged LOD levels of octree tiles are built on first request
+            parts = [part for part in path_parts if part]
+            level, ext = os.path.splitext(parts[-1]) if parts else ("", "")
+            if len(parts) >= 4 and parts[-3:-1] == ["tiles", "lod"] and ext == ".glb":
+                tiles_dir = os.path.dirname(os.path.dirname(file_path))
+                levels = tile_levels(tiles_dir)
+                if not level.isdigit() or levels is None or int(level) >= levels:
+                    raise HTTPException(status_code=404, detail="Level not found")
+                try:
+                    await asyncio.to_thread(build_lod_glb, tiles_dir, int(level))
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=500, detail=f"Failed to build tiles: {str(e)}"
+                    )
+
             if not os.path.exists(file_path) or not os.path.isfile(file_path):
                 raise HTTPException(status_code=404, detail="File not found")
 
@@ -1374,13 +1794,43 @@ def start_server(
     host: str = "127.0.0.1",
     port: int = 8000,
     gallery_dir: Optional[str] = None,
+    max_batch_wait_ms: float = 50.0,
+    max_batch_images: int = 16,
+    queue_path: Optional[str] = None,
+    memory_budget_gb: Optional[float] = None,
+    memory_policy: str = "reject",
+    max_pending_per_client: Optional[int] = None,
+    max_queue_depth: Optional[int] = None,
+    num_workers: int = 0,
+    compile_model: bool = False,
+    warmup_shapes: Optional[List[Tuple[int, int, int]]] = None,
 ):
     """Start the backend server."""
-    app = create_app(model_dir, device, gallery_dir)
+    app = create_app(
+        model_dir,
+        device,
+        gallery_dir,
+        max_batch_wait_ms,
+        max_batch_images,
+        queue_path,
+        memory_budget_gb,
+        memory_policy,
+        max_pending_per_client,
+        max_queue_depth,
+        num_workers,
+        compile_model,
+        warmup_shapes,
+    )
 
     print("Starting Depth Anything 3 Backend...")
     print(f"Model directory: {model_dir}")
     print(f"Device: {device}")
+    if num_workers > 0:
+        print(f"Model workers: {num_workers}")
+    if compile_model:
+        print(f"Compiled inference: warm-up shapes {warmup_shapes or 'none'}")
+    print(f"Micro-batching: max {max_batch_images} images, max wait {max_batch_wait_ms:.0f}ms")
+    print(f"Task queue: {queue_path or 'in-memory'} (memory policy: {memory_policy})")
     print(f"Server: http://{host}:{port}")
     print(f"Dashboard: http://{host}:{port}/dashboard")
     print(f"API Status: http://{host}:{port}/status")
@@ -1412,6 +1862,45 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
     parser.add_argument("--gallery-dir", help="Gallery directory path (optional)")
+    parser.add_argument(
+        "--max-batch-wait-ms", type=float, default=50.0, help="Max micro-batch wait window"
+    )
+    parser.add_argument(
+        "--max-batch-images", type=int, default=16, help="Max images per micro-batch"
+    )
+    parser.add_argument("--queue-path", help="SQLite file for a persistent task queue")
+    parser.add_argument("--memory-budget-gb", type=float, help="Admission memory budget")
+    parser.add_argument("--memory-policy", default="reject", choices=["reject", "defer"])
+    parser.add_argument("--max-pending-per-client", type=int, help="Per-client queue quota")
+    parser.add_argument("--max-queue-depth", type=int, help="Max pending tasks overall")
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=0,
+        help="Model worker processes, spread over comma-separated --device (0: in-process)",
+    )
+    parser.add_argument(
+        "--compile", action="store_true", help="Compile the backbone on bucketed shapes"
+    )
+    parser.add_argument(
+        "--warmup-shapes", default="", help="Shapes compiled at start-up, e.g. 4x504x378,8x504x336"
+    )
 
     args = parser.parse_args()
-    start_server(args.model_dir, args.device, args.host, args.port, args.gallery_dir)
+    start_server(
+        args.model_dir,
+        args.device,
+        args.host,
+        args.port,
+        args.gallery_dir,
+        args.max_batch_wait_ms,
+        args.max_batch_images,
+        args.queue_path,
+        args.memory_budget_gb,
+        args.memory_policy,
+        args.max_pending_per_client,
+        args.max_queue_depth,
+        args.num_workers,
+        args.compile,
+        parse_shapes(args.warmup_shapes),
+    )
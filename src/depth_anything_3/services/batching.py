@@ -0,0 +1,130 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro-batching scheduler for the backend service.
+Groups queued inference tasks that can share a single model forward pass.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from .task_queue import TaskQueue
+
+
+class MicroBatchScheduler:
+    """
+    Collects compatible queued tasks into micro-batches.
+
+    Once a task is dequeued, the scheduler waits at most ``max_wait`` seconds for
+    more tasks with the same batch key, until the batch holds ``max_batch_images``
+    images. Tasks with known camera poses are never batched, since extrinsics
+    normalisation and pose alignment are computed per request.
+    """
+
+    def __init__(
+        self,
+        max_wait: float = 0.05,
+        max_batch_images: int = 16,
+        poll_interval: float = 0.005,
+    ):
+        self.max_wait = max_wait
+        self.max_batch_images = max_batch_images
+        self.poll_interval = poll_interval
+        self._stats_lock = threading.Lock()
+        self.num_batches = 0
+        self.num_batched_tasks = 0
+        self.max_batch_size = 0
+
+    def batch_key(self, request: Any) -> Optional[Hashable]:
+        """Return the compatibility key of a request, or None if it must run alone."""
+        num_images = len(request.image_paths)
+        if num_images == 0 or num_images * 2 > self.max_batch_images:
+            return None
+        if request.extrinsics or request.intrinsics:
+            return None
+        return (
+            request.process_res,
+            request.process_res_method,
+            num_images,
+            tuple(request.export_feat_layers),
+        )
+
+    def collect(
+        self,
+        first_task_id: str,
+        queue: TaskQueue,
+        get_request: Callable[[str], Any],
+        can_start: Optional[Callable[[str], bool]] = None,
+    ) -> List[str]:
+        """
+        Build a micro-batch starting from an already dequeued task.
+
+        Compatible tasks are taken from ``queue`` in queue order and appended to the batch.
+
+        Args:
+            first_task_id: Task that opens the batch
+            queue: Pending task queue
+            get_request: Maps a task id to its InferenceRequest (or None)
+            can_start: Called on each compatible task before it joins the batch; tasks
+                it rejects stay queued
+
+        Returns:
+            Task ids of the batch, starting with ``first_task_id``
+        """
+        first_request = get_request(first_task_id)
+        key = self.batch_key(first_request) if first_request is not None else None
+        if key is None:
+            return [first_task_id]
+
+        def is_compatible(task_id: str) -> bool:
+            request = get_request(task_id)
+            if request is None or self.batch_key(request) != key:
+                return False
+            return can_start is None or can_start(task_id)
+
+        batch = [first_task_id]
+        images_per_task = len(first_request.image_paths)
+        budget = self.max_batch_images - images_per_task
+        deadline = time.time() + self.max_wait
+        while budget >= images_per_task:
+            taken = queue.take(is_compatible, budget // images_per_task)
+            batch.extend(taken)
+            budget -= images_per_task * len(taken)
+            if time.time() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+
+        with self._stats_lock:
+            self.num_batches += 1
+            self.num_batched_tasks += len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+        return batch
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching configuration and counters."""
+        with self._stats_lock:
+            return {
+                "max_wait_ms": round(self.max_wait * 1000, 1),
+                "max_batch_images": self.max_batch_images,
+                "batches": self.num_batches,
+                "batched_tasks": self.num_batched_tasks,
+                "avg_batch_size": (
+                    round(self.num_batched_tasks / self.num_batches, 2)
+                    if self.num_batches
+                    else None
+                ),
+                "max_batch_size": self.max_batch_size,
+            }
@@ -30,6 +30,8 @@ from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import quote, unquote
 
+from depth_anything_3.utils.tile_index import has_scene_model, tile_levels
+
 # ------------------------------ Embedded HTML ------------------------------ #
 
 HTML_PAGE = r"""<!doctype html>
@@ -610,9 +612,11 @@ function buildResGrid(i,page=1){
   pager.appendChild(next);
   resGrid.appendChild(pager);
 }
-function openViewer(i,{push=false}={}){currentScene=i;viewerTitle.textContent=i.title;mv.src=i.model;overlay.classList.add('show');resGrid.hidden=true;toggleViewBtn.textContent='Resource View';viewer.style.blockSize='min(82vh,var(--maxH))';buildResGrid(i,1);downloadBtn.onclick=()=>{const a=document.createElement('a');a.href=i.model;a.download=i.title+'.glb';a.click();};if(push){const u=new URL(location.href);if(!u.searchParams.get('group'))u.searchParams.set('group',currentGroup||'');u.searchParams.set('id',i.id);history.pushState(null,'',u);}}
+let lodToken=0;
+async function loadModel(i){const t=++lodToken;if(!i.lods||!i.lods.length){mv.src=i.model;return;}mv.src=i.lods[0];for(const u of i.lods.slice(1)){try{const r=await fetch(u);if(!r.ok)return;await r.blob();}catch(e){return;}if(t!==lodToken||!overlay.classList.contains('show'))return;mv.src=u;}}
+function openViewer(i,{push=false}={}){currentScene=i;viewerTitle.textContent=i.title;loadModel(i);overlay.classList.add('show');resGrid.hidden=true;toggleViewBtn.textContent='Resource View';viewer.style.blockSize='min(82vh,var(--maxH))';buildResGrid(i,1);downloadBtn.onclick=()=>{const a=document.createElement('a');a.href=i.model;a.download=i.title+'.glb';a.click();};if(push){const u=new URL(location.href);if(!u.searchParams.get('group'))u.searchParams.set('group',currentGroup||'');u.searchParams.set('id',i.id);history.pushState(null,'',u);}}
 function toggleView(){const hidden=!resGrid.hidden;resGrid.hidden=hidden;toggleViewBtn.textContent=hidden?'Resource View':'3D Only';viewer.style.blockSize=hidden?'min(82vh,var(--maxH))':'min(92vh,900px)';}
-function closeViewer(){const hasId=!!qs().get('id');if(hasId&&history.length>1){history.back();return;}const u=new URL(location.href);u.searchParams.delete('id');history.replaceState(null,'',u);overlay.classList.remove('show');mv.src='';}
+function closeViewer(){lodToken++;const hasId=!!qs().get('id');if(hasId&&history.length>1){history.back();return;}const u=new URL(location.href);u.searchParams.delete('id');history.replaceState(null,'',u);overlay.classList.remove('show');mv.src='';}
 overlay.onclick=e=>{if(e.target===overlay)closeViewer();};closeBtn.onclick=closeViewer;toggleViewBtn.onclick=toggleView;backBtn.onclick=()=>history.back();
 searchInput.oninput=()=>{!qs().get('group')?renderGroups(GROUPS):renderScenes(SCENES,1);};
 window.onpopstate=()=>routeFromURL();
@@ -651,9 +655,7 @@ def build_group_list(root_dir: str) -> dict:
                     spath = os.path.join(gpath, sname)
                     if not os.path.isdir(spath):
                         continue
-                    if os.path.exists(os.path.join(spath, "scene.glb")) and os.path.exists(
-                        os.path.join(spath, "scene.jpg")
-                    ):
+                    if has_scene_model(spath) and os.path.exists(os.path.join(spath, "scene.jpg")):
                         has_scene = True
                         break
             except Exception:
@@ -675,9 +677,8 @@ def build_group_manifest(root_dir: str, group: str) -> dict:
             spath = os.path.join(gpath, sname)
             if not os.path.isdir(spath):
                 continue
-            glb_fs = os.path.join(spath, "scene.glb")
             jpg_fs = os.path.join(spath, "scene.jpg")
-            if not (os.path.exists(glb_fs) and os.path.exists(jpg_fs)):
+            if not (has_scene_model(spath) and os.path.exists(jpg_fs)):
                 continue
             depth_images = []
             dpath = os.path.join(spath, "depth_vis")
@@ -687,15 +688,24 @@ def build_group_manifest(root_dir: str, group: str) -> dict:
                 ]
                 for fn in sorted(files):
                     depth_images.append("/" + _url_join(group, sname, "depth_vis", fn))
-            items.append(
-                {
-                    "id": sname,
-                    "title": sname,
-                    "model": "/" + _url_join(group, sname, "scene.glb"),
-                    "thumbnail": "/" + _url_join(group, sname, "scene.jpg"),
-                    "depth_images": depth_images,
-                }
-            )
+            item = {
+                "id": sname,
+                "title": sname,
+                "model": "/" + _url_join(group, sname, "scene.glb"),
+                "thumbnail": "/" + _url_join(group, sname, "scene.jpg"),
+                "depth_images": depth_images,
+            }
+            levels = tile_levels(os.path.join(spath, "tiles"))
+            if levels:
+                # Merged levels 0..L, built on demand by the handler; coarse first
+                item["tiles"] = "/" + _url_join(group, sname, "tiles", "index.json")
+                item["lods"] = [
+                    "/" + _url_join(group, sname, "tiles", "lod", f"{level}.glb")
+                    for level in range(levels)
+                ]
+                if not os.path.exists(os.path.join(spath, "scene.glb")):
+                    item["model"] = item["lods"][-1]
+            items.append(item)
     except Exception as e:
         print(f"[warn] build_group_manifest failed for {group}: {e}", file=sys.stderr)
     return {"group": group, "items": items}
@@ -745,12 +755,43 @@ class GalleryHandler(SimpleHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(data)
             return
+        if self._ensure_lod_glb():
+            return
         if self.path == "/favicon.ico":
             self.send_response(HTTPStatus.NO_CONTENT)
             self.end_headers()
             return
         return super().do_GET()
 
+    def _ensure_lod_glb(self) -> bool:
+        """
+        Build ``<scene>/tiles/lod/<L>.glb`` on first request; the file itself is then served
+        as a static file. Returns True if an error response was sent.
+        """
+        parts = [unquote(p) for p in self.path.split("?", 1)[0].split("/") if p]
+        if len(parts) < 4 or parts[-3:-1] != ["tiles", "lod"]:
+            return False
+        level, ext = os.path.splitext(parts[-1])
+        if ext != ".glb" or not level.isdigit():
+            return False
+        if not all(_is_plain_name(p) for p in parts):
+            self.send_error(HTTPStatus.BAD_REQUEST, "Invalid path")
+            return True
+        tiles_dir = os.path.join(self.directory, *parts[:-2])
+        levels = tile_levels(tiles_dir)
+        if levels is None or int(level) >= levels:
+            self.send_error(HTTPStatus.NOT_FOUND, "Level not found")
+            return True
+        try:
+            from depth_anything_3.utils.export.tiles import build_lod_glb
+
+            build_lod_glb(tiles_dir, int(level))
+        except Exception as e:
+            print(f"[warn] building {self.path} failed: {e}", file=sys.stderr)
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "Failed to build tiles")
+            return True
+        return False
+
     def list_directory(self, path):
         self.send_error(HTTPStatus.NOT_FOUND, "Directory listing disabled")
         return None
@@ -0,0 +1,549 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Task queues and admission control for the backend service.
+
+Queues order pending tasks by priority class (with aging, so low-priority tasks
+are not starved forever) and FIFO within a class. The SQLite implementation
+persists pending and running tasks so they survive a server restart.
+"""
+
+from abc import ABC, abstractmethod
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.memory import estimate_memory_requirement, get_gpu_memory_info
+
+# Priority classes, lower value is served first
+PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY = "normal"
+
+# A pending task is promoted by one priority class per AGING_SECONDS of waiting
+AGING_SECONDS = 600.0
+
+# Admission message of tasks admitted without remarks
+ADMITTED_MESSAGE = "Task admitted"
+
+
+def priority_value(priority: str) -> int:
+    """Map a priority class name to its numeric value."""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(
+            f"Unknown priority '{priority}', expected one of {list(PRIORITY_CLASSES)}"
+        )
+    return PRIORITY_CLASSES[priority]
+
+
+class TaskQueue(ABC):
+    """
+    Interface of a pending-task queue.
+
+    Entries carry the task id, priority class, client id, creation time and a JSON
+    payload (the serialized request). ``pop``/``take`` hand tasks out for execution;
+    ``complete`` must be called once a handed-out task has finished.
+    """
+
+    def __init__(self, aging_seconds: float = AGING_SECONDS):
+        self.aging_seconds = aging_seconds
+
+    @abstractmethod
+    def put(
+        self,
+        task_id: str,
+        payload: str,
+        priority: str = DEFAULT_PRIORITY,
+        client_id: Optional[str] = None,
+        created_at: Optional[float] = None,
+    ) -> None:
+        """Add a pending task."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def pop(self) -> Optional[str]:
+        """Hand out the next task id, or None if the queue is empty."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def take(self, match: Callable[[str], bool], limit: int) -> List[str]:
+        """Hand out up to ``limit`` pending task ids accepted by ``match``, in queue order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove(self, task_id: str) -> bool:
+        """Drop a pending task. Returns True if it was pending."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, task_id: str) -> None:
+        """Forget a handed-out task after it finished (successfully or not)."""
+        raise NotImplementedError
+
+    def recover(self) -> List[Tuple[str, str, str, Optional[str], float]]:
+        """
+        Requeue tasks that were handed out but never completed (e.g. after a crash).
+
+        Returns:
+            (task_id, payload, priority, client_id, created_at) of every pending task
+        """
+        return []
+
+    @abstractmethod
+    def pending_ids(self) -> List[str]:
+        """Pending task ids in the order they would be handed out."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self, client_id: Optional[str] = None) -> int:
+        """Number of pending tasks, optionally restricted to one client."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def depth_by_priority(self) -> Dict[str, int]:
+        """Number of pending tasks per priority class."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def _sort_key(self, priority: int, created_at: float, seq: int, now: float) -> tuple:
+        effective = priority
+        if self.aging_seconds > 0:
+            effective = priority - (now - created_at) / self.aging_seconds
+        return (effective, seq)
+
+
+class InMemoryTaskQueue(TaskQueue):
+    """Process-local task queue; state is lost on restart."""
+
+    def __init__(self, aging_seconds: float = AGING_SECONDS):
+        super().__init__(aging_seconds)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._seq = 0
+
+    def put(self, task_id, payload, priority=DEFAULT_PRIORITY, client_id=None, created_at=None):
+        with self._lock:
+            self._seq += 1
+            self._entries[task_id] = {
+                "priority": priority_value(priority),
+                "client_id": client_id,
+                "created_at": created_at if created_at is not None else time.time(),
+                "seq": self._seq,
+            }
+
+    def _ordered(self) -> List[str]:
+        now = time.time()
+        return sorted(
+            self._entries,
+            key=lambda t: self._sort_key(
+                self._entries[t]["priority"],
+                self._entries[t]["created_at"],
+                self._entries[t]["seq"],
+                now,
+            ),
+        )
+
+    def pop(self):
+        with self._lock:
+            ordered = self._ordered()
+            if not ordered:
+                return None
+            del self._entries[ordered[0]]
+            return ordered[0]
+
+    def take(self, match, limit):
+        taken = []
+        with self._lock:
+            for task_id in self._ordered():
+                if len(taken) >= limit:
+                    break
+                if match(task_id):
+                    del self._entries[task_id]
+                    taken.append(task_id)
+        return taken
+
+    def remove(self, task_id):
+        with self._lock:
+            return self._entries.pop(task_id, None) is not None
+
+    def complete(self, task_id):
+        pass
+
+    def pending_ids(self):
+        with self._lock:
+            return self._ordered()
+
+    def count(self, client_id=None):
+        with self._lock:
+            if client_id is None:
+                return len(self._entries)
+            return sum(1 for e in self._entries.values() if e["client_id"] == client_id)
+
+    def depth_by_priority(self):
+        names = {v: k for k, v in PRIORITY_CLASSES.items()}
+        with self._lock:
+            depth = {name: 0 for name in PRIORITY_CLASSES}
+            for e in self._entries.values():
+                depth[names[e["priority"]]] += 1
+            return depth
+
+
+class SQLiteTaskQueue(TaskQueue):
+    """
+    Task queue persisted in a local SQLite database.
+
+    Handed-out tasks stay in the database in the ``running`` state until
+    ``complete`` is called, so ``recover`` can requeue them after a crash.
+    """
+
+    def __init__(self, path: str, aging_seconds: float = AGING_SECONDS):
+        super().__init__(aging_seconds)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT UNIQUE NOT NULL,
+                priority INTEGER NOT NULL,
+                client_id TEXT,
+                created_at REAL NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                payload TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state)")
+
+    def _order_by(self) -> Tuple[str, tuple]:
+        if self.aging_seconds > 0:
+            return "ORDER BY priority - (? - created_at) / ?, seq", (
+                time.time(),
+                self.aging_seconds,
+            )
+        return "ORDER BY priority, seq", ()
+
+    def put(self, task_id, payload, priority=DEFAULT_PRIORITY, client_id=None, created_at=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks (task_id, priority, client_id, created_at, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    task_id,
+                    priority_value(priority),
+                    client_id,
+                    created_at if created_at is not None else time.time(),
+                    payload,
+                ),
+            )
+
+    def _pending_locked(self) -> List[str]:
+        order_by, params = self._order_by()
+        rows = self._conn.execute(
+            f"SELECT task_id FROM tasks WHERE state = 'pending' {order_by}", params
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _mark_running_locked(self, task_ids: List[str]) -> None:
+        self._conn.executemany(
+            "UPDATE tasks SET state = 'running' WHERE task_id = ?", [(t,) for t in task_ids]
+        )
+
+    def pop(self):
+        with self._lock:
+            pending = self._pending_locked()
+            if not pending:
+                return None
+            self._mark_running_locked(pending[:1])
+            return pending[0]
+
+    def take(self, match, limit):
+        with self._lock:
+            taken = []
+            for task_id in self._pending_locked():
+                if len(taken) >= limit:
+                    break
+                if match(task_id):
+                    taken.append(task_id)
+            self._mark_running_locked(taken)
+            return taken
+
+    def remove(self, task_id):
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM tasks WHERE task_id = ? AND state = 'pending'", (task_id,)
+            )
+            return cur.rowcount > 0
+
+    def complete(self, task_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def recover(self):
+        with self._lock:
+            self._conn.execute("UPDATE tasks SET state = 'pending' WHERE state = 'running'")
+            rows = self._conn.execute(
+                "SELECT task_id, payload, priority, client_id, created_at FROM tasks ORDER BY seq"
+            ).fetchall()
+        names = {v: k for k, v in PRIORITY_CLASSES.items()}
+        return [
+            (task_id, payload, names.get(priority, DEFAULT_PRIORITY), client_id, created_at)
+            for task_id, payload, priority, client_id, created_at in rows
+        ]
+
+    def pending_ids(self):
+        with self._lock:
+            return self._pending_locked()
+
+    def count(self, client_id=None):
+        with self._lock:
+            if client_id is None:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE state = 'pending'"
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE state = 'pending' AND client_id = ?",
+                    (client_id,),
+                ).fetchone()
+            return row[0]
+
+    def depth_by_priority(self):
+        names = {v: k for k, v in PRIORITY_CLASSES.items()}
+        depth = {name: 0 for name in PRIORITY_CLASSES}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT priority, COUNT(*) FROM tasks WHERE state = 'pending' GROUP BY priority"
+            ).fetchall()
+        for priority, n in rows:
+            depth[names.get(priority, DEFAULT_PRIORITY)] += n
+        return depth
+
+
+def create_task_queue(queue_path: Optional[str] = None) -> TaskQueue:
+    """Create a SQLite-backed queue if ``queue_path`` is given, else an in-memory one."""
+    if queue_path:
+        return SQLiteTaskQueue(queue_path)
+    return InMemoryTaskQueue()
+
+
+class AdmissionController:
+    """
+    Decides whether a new task may enter the queue and records queue metrics.
+
+    Checks, in order:
+      - global back-pressure: at most ``max_queue_depth`` pending tasks
+      - per-client quota: at most ``max_pending_per_client`` pending tasks per client
+      - memory: tasks whose ``estimate_memory_requirement`` exceeds the device budget
+        can never run and are rejected
+
+    With ``memory_policy="defer"`` a queued task is also held back from dispatch
+    (see ``try_reserve``) until its estimate fits in the budget left by the running
+    tasks; with ``"reject"`` tasks within the budget are dispatched in queue order.
+
+    The device budget is ``memory_budget_gb`` if set, otherwise the total memory of
+    the current CUDA device; without CUDA the memory check is skipped.
+    """
+
+    def __init__(
+        self,
+        memory_budget_gb: Optional[float] = None,
+        memory_policy: str = "reject",
+        max_pending_per_client: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        wait_window: int = 200,
+    ):
+        if memory_policy not in ("reject", "defer"):
+            raise ValueError(f"Unknown memory_policy '{memory_policy}'")
+        self.memory_budget_gb = memory_budget_gb
+        self.memory_policy = memory_policy
+        self.max_pending_per_client = max_pending_per_client
+        self.max_queue_depth = max_queue_depth
+        self._lock = threading.Lock()
+        # Serialises the admission checks with the enqueue of the admitted task
+        self._admit_lock = threading.Lock()
+        self._wait_times = deque(maxlen=wait_window)
+        self._reserved: Dict[str, float] = {}
+        self.accepted = 0
+        self.deferred = 0
+        self.rejections: Dict[str, int] = {"queue_full": 0, "client_quota": 0, "memory": 0}
+
+    def device_budget_gb(self) -> Optional[float]:
+        if self.memory_budget_gb is not None:
+            return self.memory_budget_gb
+        mem_info = get_gpu_memory_info()
+        return mem_info["total_gb"] if mem_info else None
+
+    @staticmethod
+    def required_gb(request: Any) -> float:
+        """Estimated device memory of a request (GB)."""
+        return estimate_memory_requirement(len(request.image_paths), request.process_res)
+
+    def admit(
+        self,
+        request: Any,
+        queue: TaskQueue,
+        priority: str,
+        enqueue: Optional[Callable[[], None]] = None,
+    ) -> Tuple[bool, str, int, str]:
+        """
+        Check a request against the admission rules.
+
+        The checks and ``enqueue`` run under one lock, so concurrent submissions
+        cannot together exceed the queue depth or a client quota.
+
+        Args:
+            request: Request to admit (``image_paths``, ``process_res``, ``client_id``)
+            queue: Pending task queue the request would join
+            priority: Requested priority class
+            enqueue: Called, still under the lock, if the request is admitted; it must
+                put the task into ``queue``
+
+        Returns:
+            (admitted, priority to enqueue with, HTTP status for rejections, message)
+        """
+        priority_value(priority)
+        with self._admit_lock:
+            admitted = self._check(request, queue, priority)
+            if admitted[0] and enqueue is not None:
+                enqueue()
+        return admitted
+
+    def _check(self, request: Any, queue: TaskQueue, priority: str):
+        if self.max_queue_depth is not None and queue.count() >= self.max_queue_depth:
+            return self._reject(
+                "queue_full", 503, f"Queue is full ({self.max_queue_depth} pending tasks)"
+            )
+
+        client_id = getattr(request, "client_id", None)
+        if (
+            client_id is not None
+            and self.max_pending_per_client is not None
+            and queue.count(client_id) >= self.max_pending_per_client
+        ):
+            return self._reject(
+                "client_quota",
+                429,
+                f"Client '{client_id}' already has {self.max_pending_per_client} pending tasks",
+            )
+
+        budget = self.device_budget_gb()
+        message = ADMITTED_MESSAGE
+        if budget is not None:
+            required = self.required_gb(request)
+            if required > budget:
+                return self._reject(
+                    "memory",
+                    413,
+                    f"Estimated memory {required:.2f}GB exceeds device budget {budget:.2f}GB; "
+                    "reduce the number of images or process_res",
+                )
+            if self.memory_policy == "defer" and not self._fits(required, budget):
+                with self._lock:
+                    self.deferred += 1
+                message = f"Estimated memory {required:.2f}GB deferred until it fits the budget"
+
+        with self._lock:
+            self.accepted += 1
+        return True, priority, 200, message
+
+    def _fits(self, required: float, budget: float) -> bool:
+        with self._lock:
+            return required <= budget - sum(self._reserved.values())
+
+    def try_reserve(self, task_id: str, request: Any) -> bool:
+        """
+        Reserve the estimated memory of a task about to run.
+
+        With ``memory_policy="defer"`` this fails (and the task stays queued) while
+        the estimate does not fit in the budget left by the other reserved tasks.
+        Reservations must be released with ``release`` once the task finished.
+
+        Returns:
+            Whether the task may run now
+        """
+        required = self.required_gb(request)
+        budget = self.device_budget_gb() if self.memory_policy == "defer" else None
+        with self._lock:
+            if budget is not None and required > budget - sum(self._reserved.values()):
+                return False
+            self._reserved[task_id] = required
+            return True
+
+    def release(self, task_id: str) -> None:
+        """Release the memory reserved for a finished task."""
+        with self._lock:
+            self._reserved.pop(task_id, None)
+
+    def _reject(self, reason: str, status_code: int, message: str):
+        with self._lock:
+            self.rejections[reason] += 1
+        return False, "", status_code, message
+
+    def record_wait(self, wait_time: float) -> None:
+        """Record the time a task spent queued before it started running."""
+        with self._lock:
+            self._wait_times.append(wait_time)
+
+    def get_stats(self, queue: TaskQueue) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._wait_times)
+            stats = {
+                "accepted": self.accepted,
+                "deferred": self.deferred,
+                "rejected": dict(self.rejections),
+                "rejected_total": sum(self.rejections.values()),
+                "reserved_gb": round(sum(self._reserved.values()), 2),
+            }
+        stats["depth"] = queue.count()
+        stats["depth_by_priority"] = queue.depth_by_priority()
+        stats["backend"] = type(queue).__name__
+        stats["wait_time_s"] = (
+            {
+                "avg": round(sum(waits) / len(waits), 3),
+                "p95": round(waits[min(len(waits) - 1, int(0.95 * len(waits)))], 3),
+                "max": round(waits[-1], 3),
+                "samples": len(waits),
+            }
+            if waits
+            else None
+        )
+        budget = self.device_budget_gb()
+        stats["memory_budget_gb"] = round(budget, 2) if budget is not None else None
+        stats["memory_policy"] = self.memory_policy
+        return stats
+
+
+def dump_request(request: Any) -> str:
+    """Serialize a pydantic request for persistence."""
+    if hasattr(request, "model_dump_json"):
+        return request.model_dump_json()
+    return request.json()
+
+
+def load_request(request_cls: Any, payload: str) -> Any:
+    """Deserialize a request persisted with :func:`dump_request`."""
+    if hasattr(request_cls, "model_validate_json"):
+        return request_cls.model_validate_json(payload)
+    return request_cls(**json.loads(payload))
@@ -0,0 +1,504 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Multi-process model pool for the backend service.
+
+Each worker process holds one model replica on its own device (or shares the CPU
+with the other workers) and executes batches of inference requests sent by the
+pool. The pool dispatches to the least-loaded worker, tracks per-worker
+utilisation and restarts workers that crash.
+"""
+
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+
+def load_model_replica(
+    model_dir: str,
+    device: str,
+    compile_model: bool = False,
+    warmup_shapes: Optional[List[Tuple[int, int, int]]] = None,
+) -> Any:
+    """
+    Default worker model loader.
+
+    Args:
+        model_dir: Model directory or Hub repo id
+        device: Device to load the model on
+        compile_model: Enable compiled inference on bucketed shapes
+        warmup_shapes: (views, height, width) inputs compiled before the model is returned
+    """
+    from ..api import DepthAnything3
+
+    model = DepthAnything3.from_pretrained(model_dir).to(device)
+    model.eval()
+    if compile_model:
+        model.enable_compile()
+        model.warmup(warmup_shapes or [])
+    return model
+
+
+def resolve_worker_devices(device: str) -> List[str]:
+    """
+    Expand a device spec into the devices workers are placed on.
+
+    "cuda:0,cuda:1" lists devices explicitly; a bare "cuda" uses every visible GPU.
+    """
+    devices = [d.strip() for d in device.split(",") if d.strip()]
+    if devices == ["cuda"] and torch.cuda.device_count() > 1:
+        devices = [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+    return devices or ["cpu"]
+
+
+def inference_kwargs_from_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Build ``DepthAnything3.inference`` kwargs from a serialized InferenceRequest."""
+    kwargs = {
+        "image": request["image_paths"],
+        "export_format": request["export_format"],
+        "process_res": request["process_res"],
+        "process_res_method": request["process_res_method"],
+        "export_feat_layers": request["export_feat_layers"],
+        "align_to_input_ext_scale": request["align_to_input_ext_scale"],
+        "conf_thresh_percentile": request["conf_thresh_percentile"],
+        "num_max_points": request["num_max_points"],
+        "show_cameras": request["show_cameras"],
+        "feat_vis_fps": request["feat_vis_fps"],
+    }
+    if request.get("export_dir"):
+        kwargs["export_dir"] = request["export_dir"]
+    if request.get("extrinsics"):
+        kwargs["extrinsics"] = np.array(request["extrinsics"], dtype=np.float32)
+    if request.get("intrinsics"):
+        kwargs["intrinsics"] = np.array(request["intrinsics"], dtype=np.float32)
+    return kwargs
+
+
+def execute_requests(model: Any, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run a batch of serialized requests on a model replica.
+
+    Several requests are run through ``batch_inference`` (see the micro-batching
+    scheduler) and exported one by one; a single request goes through ``inference``.
+    If the batched forward pass fails, the requests are retried one by one.
+
+    Returns:
+        One ``{"success", "message", "inference_time"}`` dict per request
+    """
+    if len(requests) > 1:
+        try:
+            start_time = time.time()
+            predictions = model.batch_inference(
+                [r["image_paths"] for r in requests],
+                process_res=requests[0]["process_res"],
+                process_res_method=requests[0]["process_res_method"],
+                export_feat_layers=requests[0]["export_feat_layers"],
+            )
+            inference_time = time.time() - start_time
+        except Exception:
+            return [execute_requests(model, [r])[0] for r in requests]
+
+        results = []
+        for request, prediction in zip(requests, predictions):
+            try:
+                if request.get("export_dir"):
+                    model.export_prediction(
+                        prediction,
+                        request["image_paths"],
+                        request["export_dir"],
+                        request["export_format"],
+                        process_res_method=request["process_res_method"],
+                        conf_thresh_percentile=request["conf_thresh_percentile"],
+                        num_max_points=request["num_max_points"],
+                        show_cameras=request["show_cameras"],
+                        feat_vis_fps=request["feat_vis_fps"],
+                    )
+                results.append(
+                    {"success": True, "message": "ok", "inference_time": inference_time}
+                )
+            except Exception as e:
+                results.append({"success": False, "message": str(e), "inference_time": None})
+        return results
+
+    start_time = time.time()
+    try:
+        model.inference(**inference_kwargs_from_request(requests[0]))
+        return [{"success": True, "message": "ok", "inference_time": time.time() - start_time}]
+    except Exception as e:
+        if "out of memory" in str(e).lower() and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return [{"success": False, "message": str(e), "inference_time": None}]
+
+
+def _device_memory(device: str) -> Optional[Dict[str, float]]:
+    if not device.startswith("cuda") or not torch.cuda.is_available():
+        return None
+    try:
+        dev = torch.device(device)
+        total = torch.cuda.get_device_properties(dev).total_memory
+        reserved = torch.cuda.memory_reserved(dev)
+        return {
+            "total_gb": total / 1024**3,
+            "allocated_gb": torch.cuda.memory_allocated(dev) / 1024**3,
+            "reserved_gb": reserved / 1024**3,
+            "peak_allocated_gb": torch.cuda.max_memory_allocated(dev) / 1024**3,
+            "utilization": reserved / total * 100,
+        }
+    except Exception:
+        return None
+
+
+def _worker_main(
+    worker_id: int,
+    model_dir: str,
+    device: str,
+    num_threads: int,
+    loader: Callable[[str, str], Any],
+    job_queue: Any,
+    result_queue: Any,
+) -> None:
+    """Entry point of a worker process."""
+    if device.startswith("cuda"):
+        torch.cuda.set_device(torch.device(device))
+    elif num_threads > 0:
+        torch.set_num_threads(num_threads)
+
+    start_time = time.time()
+    try:
+        model = loader(model_dir, device)
+    except Exception as e:
+        result_queue.put(("error", worker_id, f"Failed to load model: {e}"))
+        return
+    result_queue.put(("ready", worker_id, time.time() - start_time, _device_memory(device)))
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+        job_id, requests = job
+        start_time = time.time()
+        results = execute_requests(model, requests)
+        result_queue.put(
+            ("result", worker_id, job_id, results, time.time() - start_time, _device_memory(device))
+        )
+
+
+class _WorkerHandle:
+    """Parent-side state of one worker process."""
+
+    def __init__(self, worker_id: int, device: str):
+        self.worker_id = worker_id
+        self.device = device
+        self.process = None
+        self.job_queue = None
+        self.ready = False
+        self.started_at = None
+        self.load_time = None
+        self.restarts = 0
+        self.next_restart_at = 0.0
+        self.inflight: Dict[int, tuple] = {}  # job_id -> (future, num_images, process)
+        self.retiring: List[tuple] = []  # (process, job_queue) finishing their queued jobs
+        self.completed_jobs = 0
+        self.failed_jobs = 0
+        self.busy_time = 0.0
+        self.memory = None
+        self.last_error = None
+
+    def load(self) -> int:
+        return sum(num_images for _, num_images, _ in self.inflight.values())
+
+
+class WorkerPool:
+    """
+    Pool of model worker processes.
+
+    Worker ``i`` runs on ``devices[i % len(devices)]``; CPU workers split the
+    available cores between them. Crashed workers are restarted with exponential
+    backoff and their in-flight jobs fail with a RuntimeError.
+
+    Args:
+        model_dir: Model directory passed to ``loader``
+        devices: Devices to place workers on, e.g. ["cuda:0", "cuda:1"] or ["cpu"]
+        num_workers: Number of worker processes
+        loader: Picklable ``(model_dir, device) -> model`` factory run in each worker
+        max_restart_backoff: Max delay in seconds between restarts of a failing worker
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        devices: List[str],
+        num_workers: int,
+        loader: Callable[[str, str], Any] = load_model_replica,
+        max_restart_backoff: float = 60.0,
+    ):
+        if num_workers < 1:
+            raise ValueError("num_workers must be >= 1")
+        self.model_dir = model_dir
+        self.devices = devices or ["cpu"]
+        self.num_workers = num_workers
+        self.loader = loader
+        self.max_restart_backoff = max_restart_backoff
+        self._ctx = mp.get_context("spawn")
+        self._result_queue = self._ctx.Queue()
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._workers = [
+            _WorkerHandle(i, self.devices[i % len(self.devices)]) for i in range(num_workers)
+        ]
+        num_cpu_workers = sum(1 for w in self._workers if not w.device.startswith("cuda"))
+        self._cpu_threads = max(1, (os.cpu_count() or 1) // max(1, num_cpu_workers))
+        self._stop = threading.Event()
+        self._monitor = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Start all worker processes and the monitor thread."""
+        with self._lock:
+            if self._monitor is not None:
+                return
+            self._stop.clear()
+            for worker in self._workers:
+                self._spawn(worker)
+            self._monitor = threading.Thread(target=self._monitor_loop, daemon=True)
+            self._monitor.start()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop all workers; in-flight jobs fail."""
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=timeout)
+            self._monitor = None
+        with self._lock:
+            for worker in self._workers:
+                self._stop_worker(worker, timeout)
+
+    def restart(self) -> None:
+        """
+        Restart all workers (e.g. to reload the model) without dropping jobs.
+
+        Each worker is replaced by a fresh process right away; the old process finishes
+        the jobs already sent to it and then exits.
+        """
+        with self._lock:
+            for worker in self._workers:
+                if worker.process is not None and worker.process.is_alive():
+                    worker.job_queue.put(None)
+                    worker.retiring.append((worker.process, worker.job_queue))
+                worker.restarts += 1
+                worker.next_restart_at = 0.0
+                self._spawn(worker)
+
+    def _spawn(self, worker: _WorkerHandle) -> None:
+        worker.job_queue = self._ctx.Queue()
+        worker.ready = False
+        worker.started_at = time.time()
+        worker.busy_time = 0.0
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                worker.worker_id,
+                self.model_dir,
+                worker.device,
+                self._cpu_threads,
+                self.loader,
+                worker.job_queue,
+                self._result_queue,
+            ),
+            daemon=True,
+        )
+        worker.process.start()
+
+    def _stop_worker(self, worker: _WorkerHandle, timeout: float) -> None:
+        if worker.process is not None and worker.process.is_alive():
+            worker.job_queue.put(None)
+            worker.process.join(timeout=timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+        for process, _ in worker.retiring:
+            process.join(timeout=timeout)
+        worker.retiring.clear()
+        self._fail_inflight(worker, "Worker pool shut down")
+        worker.ready = False
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    def submit(self, requests: List[Dict[str, Any]]) -> Future:
+        """
+        Send a batch of serialized requests to the least-loaded live worker.
+
+        Returns:
+            Future resolving to the per-request result list of :func:`execute_requests`
+        """
+        future = Future()
+        num_images = sum(len(r["image_paths"]) for r in requests)
+        with self._lock:
+            candidates = [
+                w for w in self._workers if w.process is not None and w.process.is_alive()
+            ]
+            if not candidates:
+                future.set_exception(RuntimeError("No live model workers available"))
+                return future
+            # Prefer ready workers, then the fewest in-flight images, then the least busy
+            worker = min(
+                candidates,
+                key=lambda w: (not w.ready, w.load(), len(w.inflight), w.busy_time),
+            )
+            job_id = next(self._job_ids)
+            worker.inflight[job_id] = (future, num_images, worker.process)
+            worker.job_queue.put((job_id, requests))
+        future.worker_id = worker.worker_id
+        return future
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+    def _monitor_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                message = self._result_queue.get(timeout=0.5)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                if message is not None:
+                    self._handle_message(message)
+                self._check_workers()
+
+    def _handle_message(self, message: tuple) -> None:
+        kind, worker_id = message[0], message[1]
+        worker = self._workers[worker_id]
+        if kind == "ready":
+            worker.ready = True
+            worker.load_time = message[2]
+            worker.memory = message[3]
+            worker.last_error = None
+            print(f"[POOL] Worker {worker_id} ready on {worker.device} in {worker.load_time:.2f}s")
+        elif kind == "error":
+            worker.last_error = message[2]
+            print(f"[POOL] Worker {worker_id} error: {worker.last_error}")
+        elif kind == "result":
+            _, _, job_id, results, busy_time, memory = message
+            worker.busy_time += busy_time
+            worker.memory = memory
+            future = worker.inflight.pop(job_id, (None, 0, None))[0]
+            if all(r["success"] for r in results):
+                worker.completed_jobs += 1
+            else:
+                worker.failed_jobs += 1
+            if future is not None and not future.done():
+                future.set_result(results)
+
+    def _fail_inflight(self, worker: _WorkerHandle, reason: str, process: Any = None) -> None:
+        """Fail the in-flight jobs of a worker (only those sent to ``process`` if given)."""
+        for job_id, (future, _, job_process) in list(worker.inflight.items()):
+            if process is not None and job_process is not process:
+                continue
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+            worker.failed_jobs += 1
+            del worker.inflight[job_id]
+
+    def _drain_results(self) -> None:
+        """Handle results a process sent right before exiting."""
+        while True:
+            try:
+                self._handle_message(self._result_queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _check_workers(self) -> None:
+        now = time.time()
+        for worker in self._workers:
+            for retired in [r for r in worker.retiring if not r[0].is_alive()]:
+                self._drain_results()
+                self._fail_inflight(
+                    worker, f"Model worker {worker.worker_id} exited during restart", retired[0]
+                )
+                worker.retiring.remove(retired)
+
+            if worker.process is None or worker.process.is_alive():
+                continue
+            if worker.next_restart_at == 0.0:
+                exitcode = worker.process.exitcode
+                print(f"[POOL] Worker {worker.worker_id} on {worker.device} died (exit code {exitcode})")
+                self._drain_results()
+                self._fail_inflight(
+                    worker,
+                    f"Model worker {worker.worker_id} crashed (exit code {exitcode})",
+                    worker.process,
+                )
+                worker.ready = False
+                backoff = min(self.max_restart_backoff, 2.0 ** min(worker.restarts, 16))
+                worker.next_restart_at = now + backoff
+            elif now >= worker.next_restart_at:
+                worker.restarts += 1
+                worker.next_restart_at = 0.0
+                print(f"[POOL] Restarting worker {worker.worker_id} (restart #{worker.restarts})")
+                self._spawn(worker)
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+    @property
+    def any_ready(self) -> bool:
+        return any(w.ready for w in self._workers)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-worker status, load and utilisation."""
+        now = time.time()
+        stats = []
+        with self._lock:
+            for w in self._workers:
+                alive = w.process is not None and w.process.is_alive()
+                uptime = now - w.started_at if w.started_at else 0.0
+                memory = None
+                if w.memory:
+                    memory = {k: round(v, 2) for k, v in w.memory.items()}
+                stats.append(
+                    {
+                        "worker_id": w.worker_id,
+                        "device": w.device,
+                        "pid": w.process.pid if w.process is not None else None,
+                        "alive": alive,
+                        "ready": w.ready,
+                        "load_time": w.load_time,
+                        "restarts": w.restarts,
+                        "inflight_jobs": len(w.inflight),
+                        "inflight_images": w.load(),
+                        "completed_jobs": w.completed_jobs,
+                        "failed_jobs": w.failed_jobs,
+                        "busy_time": round(w.busy_time, 2),
+                        "utilization_percent": (
+                            round(min(100.0, w.busy_time / uptime * 100), 1) if uptime else 0.0
+                        ),
+                        "gpu_memory": memory,
+                        "last_error": w.last_error,
+                    }
+                )
+        return stats
@@ -43,3 +43,29 @@ class Prediction:
     gaussians: Gaussians | None = None  # 3D gaussians
     aux: dict[str, Any] = None  #
     scale_factor: Optional[float] = None  # metric scale
+
+
+@dataclass
+class StreamFrame:
+    """Per-frame result of ``DepthAnything3.inference_stream``, in the stream's world frame"""
+
+    index: int  # position of the frame in the input stream
+    window_index: int  # window the frame was predicted in
+    depth: np.ndarray  # H, W
+    conf: np.ndarray | None = None  # H, W
+    sky: np.ndarray | None = None  # H, W
+    extrinsics: np.ndarray | None = None  # 3, 4 (world-to-camera)
+    intrinsics: np.ndarray | None = None  # 3, 3
+    processed_image: np.ndarray | None = None  # H, W, 3
+
+
+@dataclass
+class StreamWindow:
+    """Per-window result of ``DepthAnything3.inference_stream``, in the stream's world frame"""
+
+    window_index: int
+    frame_indices: list[int]  # stream positions of the frames in ``prediction``
+    prediction: Prediction  # new frames of the window only (overlap frames are not repeated)
+    scale: float = 1.0  # Sim(3) mapping the window's own frame into the stream frame
+    rotation: np.ndarray | None = None  # 3, 3
+    translation: np.ndarray | None = None  # 3
@@ -17,6 +17,7 @@ Alignment utilities for depth estimation and metric scaling.
 """
 
 from typing import Tuple
+import numpy as np
 import torch
 
 
@@ -161,3 +162,110 @@ def set_sky_regions_to_max_depth(
         return depth, depth_conf
     else:
         return depth, None
+
+
+def weighted_estimate_sim3(
+    src: torch.Tensor, tgt: torch.Tensor, weights: torch.Tensor, with_scale: bool = True
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Closed-form weighted Umeyama estimate of the transform tgt ≈ s * R @ src + t.
+
+    Args:
+        src: Source points (N, 3)
+        tgt: Target points (N, 3)
+        weights: Non-negative point weights (N,)
+        with_scale: Estimate the scale (Sim(3)); otherwise s = 1 (SE(3))
+
+    Returns:
+        Tuple of (scale, rotation (3, 3), translation (3,))
+
+    Raises:
+        ValueError: If the total weight is too small for a meaningful estimate
+    """
+    total_weight = weights.sum()
+    if total_weight < 1e-6:
+        raise ValueError("Total weight too small for meaningful estimation")
+    w = weights / total_weight
+
+    mu_src = (w[:, None] * src).sum(dim=0)
+    mu_tgt = (w[:, None] * tgt).sum(dim=0)
+    src_centered = src - mu_src
+    tgt_centered = tgt - mu_tgt
+
+    scale = torch.ones((), dtype=src.dtype, device=src.device)
+    if with_scale:
+        scale_src = torch.sqrt((w * (src_centered**2).sum(dim=1)).sum())
+        scale_tgt = torch.sqrt((w * (tgt_centered**2).sum(dim=1)).sum())
+        scale = scale_tgt / scale_src.clamp_min(1e-12)
+
+    H = (src_centered * w[:, None]).T @ tgt_centered
+    U, _, Vt = torch.linalg.svd(H)
+    R = Vt.T @ U.T
+    if torch.det(R) < 0:
+        Vt = Vt.clone()
+        Vt[2, :] *= -1
+        R = Vt.T @ U.T
+
+    t = mu_tgt - scale * R @ mu_src
+    return scale, R, t
+
+
+def robust_weighted_estimate_sim3(
+    src: torch.Tensor,
+    tgt: torch.Tensor,
+    init_weights: torch.Tensor,
+    delta: float = 0.1,
+    max_iters: int = 20,
+    tol: float = 1e-9,
+    with_scale: bool = True,
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Iteratively reweighted (Huber) Sim(3) estimate of tgt ≈ s * R @ src + t.
+
+    Device-agnostic port of the IRLS estimator used by DA3-Streaming
+    (``loop_utils.alignment_torch.robust_weighted_estimate_sim3_torch``).
+
+    Args:
+        src: Source points (N, 3)
+        tgt: Target points (N, 3)
+        init_weights: Initial point weights (N,), e.g. confidences
+        delta: Huber threshold on point residuals
+        max_iters: Maximum number of reweighting iterations
+        tol: Convergence tolerance
+        with_scale: Estimate the scale (Sim(3)); otherwise s = 1 (SE(3))
+
+    Returns:
+        Tuple of (scale, rotation (3, 3), translation (3,)) as float / numpy arrays
+    """
+    src = src.float()
+    tgt = tgt.float()
+    init_weights = init_weights.float()
+
+    s, R, t = weighted_estimate_sim3(src, tgt, init_weights, with_scale)
+    prev_error = float("inf")
+    for _ in range(max_iters):
+        residuals = torch.linalg.norm(tgt - (s * src @ R.T + t), dim=1)
+        huber_weights = torch.where(
+            residuals > delta, delta / residuals.clamp_min(1e-12), torch.ones_like(residuals)
+        )
+        weights = init_weights * huber_weights
+        weights = weights / (weights.sum() + 1e-12)
+
+        s_new, R_new, t_new = weighted_estimate_sim3(src, tgt, weights, with_scale)
+
+        param_change = (s_new - s).abs() + torch.linalg.norm(t_new - t)
+        cos_angle = ((torch.trace(R_new @ R.T) - 1) / 2).clamp(-1.0, 1.0)
+        rot_angle = torch.arccos(cos_angle)
+        huber = torch.where(
+            residuals <= delta, 0.5 * residuals**2, delta * (residuals - 0.5 * delta)
+        )
+        current_error = float((huber * init_weights).sum())
+
+        s, R, t = s_new, R_new, t_new
+        if (param_change < tol and rot_angle < np.radians(0.1)) or (
+            abs(prev_error - current_error) < tol * prev_error
+        ):
+            break
+        prev_error = current_error
+
+    return float(s), R.cpu().numpy(), t.cpu().numpy()
@@ -20,6 +20,7 @@ from .depth_vis import export_to_depth_vis
 from .feat_vis import export_to_feat_vis
 from .glb import export_to_glb
 from .npz import export_to_mini_npz, export_to_npz
+from .tiles import export_to_tiles
 
 
 def export(
@@ -50,6 +51,8 @@ def export(
         export_to_gs_video(prediction, export_dir, **kwargs.get(export_format, {}))
     elif export_format == "colmap":
         export_to_colmap(prediction, export_dir, **kwargs.get(export_format, {}))
+    elif export_format == "tiles":
+        export_to_tiles(prediction, export_dir, **kwargs.get(export_format, {}))
     else:
         raise ValueError(f"Unsupported export format: {export_format}")
 
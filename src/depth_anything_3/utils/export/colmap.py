@@ -12,17 +12,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""
+COLMAP sparse-model export.
+
+Every confident pixel becomes a 3D point observed by exactly one image. Points are
+grouped by frame once and ``cameras.bin`` / ``images.bin`` / ``points3D.bin`` are
+written with vectorised record packing, so the cost is dominated by the unprojection
+instead of per-point Python calls.
+"""
+
 import os
-import pycolmap
-import cv2 as cv
 import numpy as np
-
-from PIL import Image
+from PIL import Image as PILImage
 
 from depth_anything_3.specs import Prediction
 from depth_anything_3.utils.logger import logger
-
-from .glb import _depths_to_world_points_with_colors
+from depth_anything_3.utils.read_write_model import (
+    Camera,
+    Image,
+    rotmat2qvec,
+    write_cameras_binary,
+    write_images_binary,
+    write_points3D_binary_arrays,
+)
+from depth_anything_3.utils.unprojection import depth_to_point_cloud
+from depth_anything_3.utils.voxel_grid import VoxelGridReducer
 
 
 def export_to_colmap(
@@ -31,120 +45,101 @@ def export_to_colmap(
     image_paths: list[str],
     conf_thresh_percentile: float = 40.0,
     process_res_method: str = "upper_bound_resize",
+    num_max_points: int | None = None,
+    voxel_size: float | None = None,
 ) -> None:
+    """
+    Export a prediction as a COLMAP binary model.
+
+    Args:
+        prediction: Prediction with depth, conf, intrinsics, extrinsics and processed_images
+        export_dir: Output directory for cameras.bin, images.bin and points3D.bin
+        image_paths: Original image paths; used for image names and sizes
+        conf_thresh_percentile: Confidence percentile below which pixels are dropped
+        process_res_method: Resize method used during preprocessing
+        num_max_points: If set, keep at most this many points (evenly strided over the
+            confident pixels) so that the tracks and the model stay small
+        voxel_size: If set, merge points into voxels of this size (world units); each
+            voxel becomes one point at its confidence-weighted centroid, observed by the
+            most confident pixel that fell into it
+    """
+    if not process_res_method.endswith("resize"):
+        if process_res_method == "crop":
+            raise NotImplementedError("COLMAP export for crop method is not implemented")
+        raise ValueError(f"Unknown process_res_method: {process_res_method}")
+
     # 1. Data preparation
+    num_frames, h, w = prediction.depth.shape
     conf_thresh = np.percentile(prediction.conf, conf_thresh_percentile)
-    points, colors = _depths_to_world_points_with_colors(
+    points, colors, pixel_idx = depth_to_point_cloud(
         prediction.depth,
         prediction.intrinsics,
         prediction.extrinsics,  # w2c
-        prediction.processed_images,
-        prediction.conf,
-        conf_thresh,
+        images=prediction.processed_images,
+        conf=prediction.conf,
+        conf_thresh=conf_thresh,
+        return_indices=True,
     )
+
+    if voxel_size:
+        reducer = VoxelGridReducer(voxel_size)
+        reducer.add(points, colors, prediction.conf.reshape(-1)[pixel_idx])
+        grid = reducer.result()
+        # Back to frame-major order of the observing pixels
+        order = np.argsort(pixel_idx[grid.indices], kind="stable")
+        points, colors = grid.points[order], grid.colors[order]
+        pixel_idx = pixel_idx[grid.indices][order]
+
+    if num_max_points is not None and len(pixel_idx) > num_max_points:
+        keep = np.linspace(0, len(pixel_idx) - 1, num_max_points).astype(np.int64)
+        points, colors, pixel_idx = points[keep], colors[keep], pixel_idx[keep]
     num_points = len(points)
     logger.info(f"Exporting to COLMAP with {num_points} points")
-    num_frames = len(prediction.processed_images)
-    h, w = prediction.processed_images.shape[1:3]
-    points_xyf = _create_xyf(num_frames, h, w)
-    points_xyf = points_xyf[prediction.conf >= conf_thresh]
-
-    # 2. Set Reconstruction
-    reconstruction = pycolmap.Reconstruction()
-
-    point3d_ids = []
-    for vidx in range(num_points):
-        point3d_id = reconstruction.add_point3D(points[vidx], pycolmap.Track(), colors[vidx])
-        point3d_ids.append(point3d_id)
 
+    # 2. Group points by frame; flat indices are frame-major, so they are already sorted
+    frame_idx = pixel_idx // (h * w)
+    counts = np.bincount(frame_idx, minlength=num_frames)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    point2D_idxs = np.arange(num_points) - offsets[frame_idx]
+    xs = (pixel_idx % w).astype(np.float64)
+    ys = ((pixel_idx // w) % h).astype(np.float64)
+    point3D_ids = np.arange(1, num_points + 1, dtype=np.int64)
+
+    # 3. Cameras and images, one PINHOLE camera per frame at the original resolution
+    cameras, images = {}, {}
     for fidx in range(num_frames):
-        orig_w, orig_h = Image.open(image_paths[fidx]).size
-
-        intrinsic = prediction.intrinsics[fidx]
-        if process_res_method.endswith("resize"):
-            intrinsic[:1] *= orig_w / w
-            intrinsic[1:2] *= orig_h / h
-        elif process_res_method == "crop":
-            raise NotImplementedError("COLMAP export for crop method is not implemented")
-        else:
-            raise ValueError(f"Unknown process_res_method: {process_res_method}")
-
-        pycolmap_intri = np.array(
-            [intrinsic[0, 0], intrinsic[1, 1], intrinsic[0, 2], intrinsic[1, 2]]
+        with PILImage.open(image_paths[fidx]) as img:
+            orig_w, orig_h = img.size
+        sx, sy = orig_w / w, orig_h / h
+        K = prediction.intrinsics[fidx]
+        cameras[fidx + 1] = Camera(
+            id=fidx + 1,
+            model="PINHOLE",
+            width=orig_w,
+            height=orig_h,
+            params=[K[0, 0] * sx, K[1, 1] * sy, K[0, 2] * sx, K[1, 2] * sy],
         )
-
         extrinsic = prediction.extrinsics[fidx]
-        cam_from_world = pycolmap.Rigid3d(pycolmap.Rotation3d(extrinsic[:3, :3]), extrinsic[:3, 3])
-
-        # set and add camera
-        camera = pycolmap.Camera()
-        camera.camera_id = fidx + 1
-        camera.model = pycolmap.CameraModelId.PINHOLE
-        camera.width = orig_w
-        camera.height = orig_h
-        camera.params = pycolmap_intri
-        reconstruction.add_camera(camera)
-
-        # set and add rig (from camera)
-        rig = pycolmap.Rig()
-        rig.rig_id = camera.camera_id
-        rig.add_ref_sensor(camera.sensor_id)
-        reconstruction.add_rig(rig)
-
-        # set image
-        image = pycolmap.Image()
-        image.image_id = fidx + 1
-        image.camera_id = camera.camera_id
-
-        # set and add frame (from image)
-        frame = pycolmap.Frame()
-        frame.frame_id = image.image_id
-        frame.rig_id = camera.camera_id
-        frame.add_data_id(image.data_id)
-        frame.rig_from_world = cam_from_world
-        reconstruction.add_frame(frame)
-
-        # set point2d and update track
-        point2d_list = []
-        points_in_frame = points_xyf[:, 2].astype(np.int32) == fidx
-        for vidx in np.where(points_in_frame)[0]:
-            point2d = points_xyf[vidx][:2]
-            point2d[0] *= orig_w / w
-            point2d[1] *= orig_h / h
-            point3d_id = point3d_ids[vidx]
-            point2d_list.append(pycolmap.Point2D(point2d, point3d_id))
-            reconstruction.point3D(point3d_id).track.add_element(
-                image.image_id, len(point2d_list) - 1
-            )
-
-        # set and add image
-        image.frame_id = image.image_id
-        image.name = os.path.basename(image_paths[fidx])
-        image.points2D = pycolmap.Point2DList(point2d_list)
-        reconstruction.add_image(image)
-
-    # 3. Export
-    reconstruction.write(export_dir)
-
-
-def _create_xyf(num_frames, height, width):
-    """
-    Creates a grid of pixel coordinates and frame indices (fidx) for all frames.
-    """
-    # Create coordinate grids for a single frame
-    y_grid, x_grid = np.indices((height, width), dtype=np.int32)
-    x_grid = x_grid[np.newaxis, :, :]
-    y_grid = y_grid[np.newaxis, :, :]
-
-    # Broadcast to all frames
-    x_coords = np.broadcast_to(x_grid, (num_frames, height, width))
-    y_coords = np.broadcast_to(y_grid, (num_frames, height, width))
-
-    # Create frame indices and broadcast
-    f_idx = np.arange(num_frames, dtype=np.int32)[:, np.newaxis, np.newaxis]
-    f_coords = np.broadcast_to(f_idx, (num_frames, height, width))
-
-    # Stack coordinates and frame indices
-    points_xyf = np.stack((x_coords, y_coords, f_coords), axis=-1)
+        s, e = offsets[fidx], offsets[fidx + 1]
+        images[fidx + 1] = Image(
+            id=fidx + 1,
+            qvec=rotmat2qvec(extrinsic[:3, :3].astype(np.float64)),
+            tvec=extrinsic[:3, 3].astype(np.float64),
+            camera_id=fidx + 1,
+            name=os.path.basename(image_paths[fidx]),
+            xys=np.stack([xs[s:e] * sx, ys[s:e] * sy], axis=-1),
+            point3D_ids=point3D_ids[s:e],
+        )
 
-    return points_xyf
+    # 4. Export
+    os.makedirs(export_dir, exist_ok=True)
+    write_cameras_binary(cameras, os.path.join(export_dir, "cameras.bin"))
+    write_images_binary(images, os.path.join(export_dir, "images.bin"))
+    write_points3D_binary_arrays(
+        os.path.join(export_dir, "points3D.bin"),
+        points,
+        colors,
+        image_ids=frame_idx + 1,
+        point2D_idxs=point2D_idxs,
+        point3D_ids=point3D_ids,
+    )
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import os
 import imageio
 import numpy as np
@@ -20,9 +21,19 @@ from depth_anything_3.specs import Prediction
 from depth_anything_3.utils.visualize import visualize_depth
 
 
+def _fingerprint(prediction: Prediction) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (prediction.depth, prediction.processed_images):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
 def export_to_depth_vis(
     prediction: Prediction,
     export_dir: str,
+    skip_unchanged: bool = True,
 ):
     # Use prediction.processed_images, which is already processed image data
     if prediction.processed_images is None:
@@ -30,8 +41,21 @@ def export_to_depth_vis(
 
     images_u8 = prediction.processed_images  # (N,H,W,3) uint8
 
-    os.makedirs(os.path.join(export_dir, "depth_vis"), exist_ok=True)
-    for idx in range(prediction.depth.shape[0]):
+    vis_dir = os.path.join(export_dir, "depth_vis")
+    os.makedirs(vis_dir, exist_ok=True)
+    # The images are only re-encoded if depth or images changed since the last export
+    stamp_path = os.path.join(vis_dir, ".fingerprint")
+    fingerprint = _fingerprint(prediction)
+    num_frames = prediction.depth.shape[0]
+    if os.path.exists(stamp_path):
+        with open(stamp_path) as f:
+            unchanged = f.read().strip() == fingerprint
+        paths = [os.path.join(vis_dir, f"{idx:04d}.jpg") for idx in range(num_frames)]
+        if skip_unchanged and unchanged and all(os.path.exists(p) for p in paths):
+            return
+        os.remove(stamp_path)
+
+    for idx in range(num_frames):
         depth_vis = visualize_depth(prediction.depth[idx])
         image_vis = images_u8[idx]
         depth_vis = depth_vis.astype(np.uint8)
@@ -39,3 +63,5 @@ def export_to_depth_vis(
         vis_image = np.concatenate([image_vis, depth_vis], axis=1)
         save_path = os.path.join(export_dir, f"depth_vis/{idx:04d}.jpg")
         imageio.imwrite(save_path, vis_image, quality=95)
+    with open(stamp_path, "w") as f:
+        f.write(fingerprint)
@@ -15,13 +15,17 @@
 from __future__ import annotations
 
 import os
+from dataclasses import dataclass
 import numpy as np
 import trimesh
 
 from depth_anything_3.specs import Prediction
 from depth_anything_3.utils.logger import logger
+from depth_anything_3.utils.unprojection import depth_to_point_cloud
+from depth_anything_3.utils.voxel_grid import voxel_downsample
 
 from .depth_vis import export_to_depth_vis
+from .stream_writers import StreamingGLBWriter
 
 
 def set_sky_depth(prediction: Prediction, sky_mask: np.ndarray, sky_depth_def: float = 98.0):
@@ -49,10 +53,170 @@ def get_conf_thresh(
     return conf_thresh
 
 
+def _sorted_percentile(values: np.ndarray, q: float) -> float:
+    """``np.percentile`` (linear interpolation) of an ascending array, without a partition."""
+    if len(values) == 0:
+        return float("nan")
+    pos = q / 100.0 * (len(values) - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, len(values) - 1)
+    return float(values[lo] + (values[hi] - values[lo]) * (pos - lo))
+
+
+@dataclass
+class ConfSortedPoints:
+    """Valid pixels of a prediction, unprojected once and sorted by ascending confidence.
+
+    A confidence threshold selects a suffix of the arrays (binary search plus slice), so
+    changing it does not unproject the frames again.
+    """
+
+    points: np.ndarray  # (P, 3) float32 world points
+    colors: np.ndarray  # (P, 3) uint8
+    conf: np.ndarray  # (P,) ascending
+    conf_pixels: np.ndarray  # ascending confidences the threshold percentiles are taken over
+
+    @classmethod
+    def from_prediction(
+        cls,
+        prediction: Prediction,
+        filter_black_bg: bool = False,
+        filter_white_bg: bool = False,
+        sky_depth_def: float = 98.0,
+    ) -> ConfSortedPoints:
+        # Sky processing (if sky_mask is provided)
+        sky_mask = getattr(prediction, "sky_mask", None)
+        if sky_mask is not None:
+            set_sky_depth(prediction, sky_mask, sky_depth_def)
+
+        # Background pixels get the lowest confidence; on a copy, so that the prediction
+        # can be exported again with other filters
+        conf = prediction.conf
+        if filter_black_bg or filter_white_bg:
+            conf = np.array(conf, copy=True)
+            if filter_black_bg:
+                conf[(prediction.processed_images < 16).all(axis=-1)] = 1.0
+            if filter_white_bg:
+                conf[(prediction.processed_images >= 240).all(axis=-1)] = 1.0
+        if sky_mask is not None and (~sky_mask).sum() > 10:
+            conf_pixels = conf[~sky_mask]
+        else:
+            conf_pixels = conf.reshape(-1)
+
+        points, colors, indices = depth_to_point_cloud(
+            prediction.depth,
+            prediction.intrinsics,
+            prediction.extrinsics,  # w2c
+            images=prediction.processed_images,
+            return_indices=True,
+        )
+        point_conf = np.asarray(conf).reshape(-1)[indices]
+        order = np.argsort(point_conf, kind="stable")
+        return cls(
+            points=points[order],
+            colors=colors[order],
+            conf=point_conf[order],
+            conf_pixels=np.sort(conf_pixels, axis=None),
+        )
+
+    def conf_thresh(
+        self,
+        conf_thresh: float,
+        conf_thresh_percentile: float = 10.0,
+        ensure_thresh_percentile: float = 90.0,
+    ) -> float:
+        """Same adaptive threshold as ``get_conf_thresh``."""
+        lower = _sorted_percentile(self.conf_pixels, conf_thresh_percentile)
+        upper = _sorted_percentile(self.conf_pixels, ensure_thresh_percentile)
+        return min(max(conf_thresh, lower), upper)
+
+    def select(self, conf_thresh: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Points, colors and confidences of the points with confidence >= ``conf_thresh``."""
+        begin = int(np.searchsorted(self.conf, conf_thresh, side="left"))
+        return self.points[begin:], self.colors[begin:], self.conf[begin:]
+
+
+class GLBExportCache:
+    """Intermediates of ``export_to_glb`` reused by later exports of the same prediction.
+
+    - The confidence-sorted points are rebuilt only if the prediction, the background
+      filters or the sky fill change.
+    - The selected (thresholded, downsampled, aligned) points are reused while the
+      point options are unchanged, e.g. when only the cameras are toggled.
+    - The camera wireframes are rebuilt only if the points or the camera size change.
+    """
+
+    def __init__(self):
+        self.prediction: Prediction | None = None
+        self._entries: dict[str, tuple] = {}
+
+    def get(self, prediction: Prediction, name: str, key: tuple, build):
+        """Cached ``build()`` result for ``name``, rebuilt if ``key`` changed."""
+        if self.prediction is not prediction:
+            self.prediction = prediction
+            self._entries.clear()
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != key:
+            entry = (key, build())
+            self._entries[name] = entry
+        return entry[1]
+
+
+def prepare_aligned_points(
+    prediction: Prediction,
+    voxel_size: float | None = None,
+    conf_thresh: float = 1.05,
+    filter_black_bg: bool = False,
+    filter_white_bg: bool = False,
+    conf_thresh_percentile: float = 40.0,
+    ensure_thresh_percentile: float = 90.0,
+    sky_depth_def: float = 98.0,
+    cache: GLBExportCache | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Confidence-filtered, coloured world points aligned to the first camera in glTF axes.
+
+    Shared by the GLB and tile exporters; see ``export_to_glb`` for the arguments.
+
+    Returns:
+        Tuple of (points (M, 3), colors (M, 3) uint8, alignment transform A (4, 4))
+    """
+    # 2) + 3) Sky processing, background filters and the confidence-sorted point cloud
+    cache = cache if cache is not None else GLBExportCache()
+    sorted_points = cache.get(
+        prediction,
+        "sorted_points",
+        (filter_black_bg, filter_white_bg, sky_depth_def),
+        lambda: ConfSortedPoints.from_prediction(
+            prediction, filter_black_bg, filter_white_bg, sky_depth_def
+        ),
+    )
+    conf_thr = sorted_points.conf_thresh(
+        conf_thresh, conf_thresh_percentile, ensure_thresh_percentile
+    )
+
+    # 4) World points and colors above the threshold
+    points, colors, weights = sorted_points.select(conf_thr)
+    if voxel_size:
+        num_points = points.shape[0]
+        points, colors = voxel_downsample(points, colors, weights, voxel_size=voxel_size)
+        logger.info(f"Voxel grid ({voxel_size}): {num_points} -> {points.shape[0]} points")
+
+    # 5) Based on first camera orientation + glTF axis system, center by point cloud,
+    # construct alignment transform, and apply to point cloud
+    A = _compute_alignment_transform_first_cam_glTF_center_by_points(
+        prediction.extrinsics[0], points
+    )  # (4,4)
+
+    if points.shape[0] > 0:
+        points = trimesh.transform_points(points, A)
+    return points, colors, A
+
+
 def export_to_glb(
     prediction: Prediction,
     export_dir: str,
     num_max_points: int = 1_000_000,
+    voxel_size: float | None = None,
     conf_thresh: float = 1.05,
     filter_black_bg: bool = False,
     filter_white_bg: bool = False,
@@ -62,6 +226,8 @@ def export_to_glb(
     show_cameras: bool = True,
     camera_size: float = 0.03,
     export_depth_vis: bool = True,
+    quantize_points: bool = False,
+    cache: GLBExportCache | None = None,
 ) -> str:
     """Generate a 3D point cloud and camera wireframes and export them as a ``.glb`` file.
 
@@ -75,6 +241,8 @@ def export_to_glb(
             and pre-processed images.
         export_dir: Output directory where the glTF assets will be written.
         num_max_points: Maximum number of points retained after downsampling.
+        voxel_size: If set, merge points into voxels of this size (world units) before
+            the point cap, keeping confidence-weighted centroids and mean colours.
         conf_thresh: Base confidence threshold used before percentile adjustments.
         filter_black_bg: Mark near-black background pixels for removal during confidence filtering.
         filter_white_bg: Mark near-white background pixels for removal during confidence filtering.
@@ -84,6 +252,10 @@ def export_to_glb(
         show_cameras: Whether to render camera wireframes in the exported scene.
         camera_size: Relative camera wireframe scale as a fraction of the scene diagonal.
         export_depth_vis: Whether to export raster depth visualisations alongside the glTF.
+        quantize_points: Store point positions as int16 (``KHR_mesh_quantization``),
+            which shrinks the file at sub-millimetre cost for typical scene extents.
+        cache: Optional ``GLBExportCache`` kept by the caller across exports of the same
+            prediction; only the intermediates affected by changed options are rebuilt.
 
     Returns:
         Path to the exported ``scene.glb`` file.
@@ -110,73 +282,66 @@ def export_to_glb(
     if prediction.processed_images is None:
         raise ValueError("prediction.processed_images is required but not available")
 
-    images_u8 = prediction.processed_images  # (N,H,W,3) uint8
-
-    # 2) Sky processing (if sky_mask is provided)
-    if getattr(prediction, "sky_mask", None) is not None:
-        set_sky_depth(prediction, prediction.sky_mask, sky_depth_def)
-
-    # 3) Confidence threshold (if no conf, then no filtering)
-    if filter_black_bg:
-        prediction.conf[(prediction.processed_images < 16).all(axis=-1)] = 1.0
-    if filter_white_bg:
-        prediction.conf[(prediction.processed_images >= 240).all(axis=-1)] = 1.0
-    conf_thr = get_conf_thresh(
-        prediction,
-        getattr(prediction, "sky_mask", None),
+    cache = cache if cache is not None else GLBExportCache()
+    point_options = (
+        voxel_size,
         conf_thresh,
+        filter_black_bg,
+        filter_white_bg,
         conf_thresh_percentile,
         ensure_thresh_percentile,
+        sky_depth_def,
+        num_max_points,
     )
 
-    # 4) Back-project to world coordinates and get colors (world frame)
-    points, colors = _depths_to_world_points_with_colors(
-        prediction.depth,
-        prediction.intrinsics,
-        prediction.extrinsics,  # w2c
-        images_u8,
-        prediction.conf,
-        conf_thr,
-    )
-
-    # 5) Based on first camera orientation + glTF axis system, center by point cloud,
-    # construct alignment transform, and apply to point cloud
-    A = _compute_alignment_transform_first_cam_glTF_center_by_points(
-        prediction.extrinsics[0], points
-    )  # (4,4)
-
-    if points.shape[0] > 0:
-        points = trimesh.transform_points(points, A)
-
-    # 6) Clean + downsample
-    points, colors = _filter_and_downsample(points, colors, num_max_points)
-
-    # 7) Assemble scene (add point cloud first)
-    scene = trimesh.Scene()
-    if scene.metadata is None:
-        scene.metadata = {}
-    scene.metadata["hf_alignment"] = A  # For camera wireframes and external reuse
-
-    if points.shape[0] > 0:
-        pc = trimesh.points.PointCloud(vertices=points, colors=colors)
-        scene.add_geometry(pc)
-
-    # 8) Draw cameras (wireframe pyramids), using the same transform A
-    if show_cameras and prediction.intrinsics is not None and prediction.extrinsics is not None:
-        scene_scale = _estimate_scene_scale(points, fallback=1.0)
-        H, W = prediction.depth.shape[1:]
-        _add_cameras_to_scene(
-            scene=scene,
-            K=prediction.intrinsics,
-            ext_w2c=prediction.extrinsics,
-            image_sizes=[(H, W)] * prediction.depth.shape[0],
-            scale=scene_scale * camera_size,
+    def select_points():
+        points, colors, A = prepare_aligned_points(
+            prediction,
+            voxel_size=voxel_size,
+            conf_thresh=conf_thresh,
+            filter_black_bg=filter_black_bg,
+            filter_white_bg=filter_white_bg,
+            conf_thresh_percentile=conf_thresh_percentile,
+            ensure_thresh_percentile=ensure_thresh_percentile,
+            sky_depth_def=sky_depth_def,
+            cache=cache,
         )
+        # 6) Clean + downsample
+        points, colors = _filter_and_downsample(points, colors, num_max_points)
+        return points, colors, A
+
+    points, colors, A = cache.get(prediction, "points", point_options, select_points)
 
-    # 9) Export
+    # 7) Write the point cloud, then the cameras (wireframe pyramids) using the same
+    # transform A; vertex data is appended chunk by chunk instead of building a Scene
     os.makedirs(export_dir, exist_ok=True)
     out_path = os.path.join(export_dir, "scene.glb")
-    scene.export(out_path)
+    with StreamingGLBWriter(out_path, quantize=quantize_points) as writer:
+        writer.extras["hf_alignment"] = A.tolist()  # For external reuse
+        writer.write_points(points, colors)
+
+        # 8) Draw cameras, grouped under their own node
+        has_cameras = prediction.intrinsics is not None and prediction.extrinsics is not None
+        if show_cameras and has_cameras:
+
+            def camera_wireframes():
+                scene_scale = _estimate_scene_scale(points, fallback=1.0)
+                H, W = prediction.depth.shape[1:]
+                return _camera_wireframes(
+                    K=prediction.intrinsics,
+                    ext_w2c=prediction.extrinsics,
+                    image_sizes=[(H, W)] * prediction.depth.shape[0],
+                    scale=scene_scale * camera_size,
+                    A=A,
+                )
+
+            wireframes = cache.get(
+                prediction, "cameras", (point_options, camera_size), camera_wireframes
+            )
+            first_node = writer.num_nodes
+            for segs, color in wireframes:
+                writer.write_lines(segs, color)
+            writer.group_nodes("cameras", first_node)
 
     if export_depth_vis:
         export_to_depth_vis(prediction, export_dir)
@@ -202,56 +367,6 @@ def _as_homogeneous44(ext: np.ndarray) -> np.ndarray:
     raise ValueError(f"extrinsic must be (4,4) or (3,4), got {ext.shape}")
 
 
-def _depths_to_world_points_with_colors(
-    depth: np.ndarray,
-    K: np.ndarray,
-    ext_w2c: np.ndarray,
-    images_u8: np.ndarray,
-    conf: np.ndarray | None,
-    conf_thr: float,
-) -> tuple[np.ndarray, np.ndarray]:
-    """
-    For each frame, transform (u,v,1) through K^{-1} to get rays,
-    multiply by depth to camera frame, then use (w2c)^{-1} to transform to world frame.
-    Simultaneously extract colors.
-    """
-    N, H, W = depth.shape
-    us, vs = np.meshgrid(np.arange(W), np.arange(H))
-    ones = np.ones_like(us)
-    pix = np.stack([us, vs, ones], axis=-1).reshape(-1, 3)  # (H*W,3)
-
-    pts_all, col_all = [], []
-
-    for i in range(N):
-        d = depth[i]  # (H,W)
-        valid = np.isfinite(d) & (d > 0)
-        if conf is not None:
-            valid &= conf[i] >= conf_thr
-        if not np.any(valid):
-            continue
-
-        d_flat = d.reshape(-1)
-        vidx = np.flatnonzero(valid.reshape(-1))
-
-        K_inv = np.linalg.inv(K[i])  # (3,3)
-        c2w = np.linalg.inv(_as_homogeneous44(ext_w2c[i]))  # (4,4)
-
-        rays = K_inv @ pix[vidx].T  # (3,M)
-        Xc = rays * d_flat[vidx][None, :]  # (3,M)
-        Xc_h = np.vstack([Xc, np.ones((1, Xc.shape[1]))])
-        Xw = (c2w @ Xc_h)[:3].T.astype(np.float32)  # (M,3)
-
-        cols = images_u8[i].reshape(-1, 3)[vidx].astype(np.uint8)  # (M,3)
-
-        pts_all.append(Xw)
-        col_all.append(cols)
-
-    if len(pts_all) == 0:
-        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.uint8)
-
-    return np.concatenate(pts_all, 0), np.concatenate(col_all, 0)
-
-
 def _filter_and_downsample(points: np.ndarray, colors: np.ndarray, num_max: int):
     if points.shape[0] == 0:
         return points, colors
@@ -319,44 +434,34 @@ def _compute_alignment_transform_first_cam_glTF_center_by_points(
     return A
 
 
-def _add_cameras_to_scene(
-    scene: trimesh.Scene,
+def _camera_wireframes(
     K: np.ndarray,
     ext_w2c: np.ndarray,
     image_sizes: list[tuple[int, int]],
     scale: float,
-) -> None:
-    """Draws camera frustums to visualize their position and orientation.
+    A: np.ndarray | None = None,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Builds camera frustums to visualize their position and orientation.
 
-    This function renders each camera as a wireframe pyramid, originating from
-    the camera's center and extending to the corners of its imaging plane.
+    Each camera is a wireframe pyramid, originating from the camera's center and
+    extending to the corners of its imaging plane, returned as ``(segments (8, 2, 3),
+    rgb color)``.
 
-    It reads the 'hf_alignment' metadata from the scene to ensure the
+    The alignment matrix ``A`` (identity if missing) is applied so that the
     wireframes are correctly aligned with the 3D point cloud.
     """
     N = K.shape[0]
-    if N == 0:
-        return
-
-    # Alignment matrix consistent with point cloud (use identity matrix if missing)
-    A = None
-    try:
-        A = scene.metadata.get("hf_alignment", None) if scene.metadata else None
-    except Exception:
-        A = None
     if A is None:
         A = np.eye(4, dtype=np.float64)
 
+    wireframes = []
     for i in range(N):
         H, W = image_sizes[i]
         segs = _camera_frustum_lines(K[i], ext_w2c[i], W, H, scale)  # (8,2,3) world frame
         # Apply unified transformation
         segs = trimesh.transform_points(segs.reshape(-1, 3), A).reshape(-1, 2, 3)
-        path = trimesh.load_path(segs)
-        color = _index_color_rgb(i, N)
-        if hasattr(path, "colors"):
-            path.colors = np.tile(color, (len(path.entities), 1))
-        scene.add_geometry(path)
+        wireframes.append((segs, _index_color_rgb(i, N)))
+    return wireframes
 
 
 def _camera_frustum_lines(
@@ -13,15 +13,19 @@
 # limitations under the License.
 
 import os
-from typing import Literal, Optional
-import moviepy as mpy
+import queue
+import threading
+from typing import Callable, Literal, Optional
+import numpy as np
 import torch
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+from tqdm import tqdm
 
-from depth_anything_3.model.utils.gs_renderer import run_renderer_in_chunk_w_trj_mode
+from depth_anything_3.model.utils.gs_renderer import build_render_trajectory, iter_render_chunks
 from depth_anything_3.specs import Prediction
 from depth_anything_3.utils.gsply_helpers import save_gaussian_ply
 from depth_anything_3.utils.layout_helpers import hcat, vcat
-from depth_anything_3.utils.visualize import vis_depth_map_tensor
+from depth_anything_3.utils.visualize import depth_percentile_range, vis_depth_map_tensor
 
 VIDEO_QUALITY_MAP = {
     "low": {"crf": "28", "preset": "veryfast"},
@@ -58,13 +62,152 @@ def export_to_gs_ply(
     )
 
 
+class _VideoEncoderThread(threading.Thread):
+    """
+    Encodes rendered chunks into one video per batch element in the background.
+
+    Chunks are queued as host tensors, optionally with a CUDA event that marks the end
+    of their device-to-host copy and a callback that hands their staging buffers back
+    once encoded, so that the next chunk renders while this one is colorized, composed
+    and piped to ffmpeg. The queue is bounded to cap host memory.
+    """
+
+    def __init__(
+        self,
+        save_paths: list[str],
+        fps: int,
+        ffmpeg_params: list[str],
+        vis_depth: Optional[Literal["hcat", "vcat"]],
+        depth_range: Optional[tuple[float, float]],
+        max_pending: int = 2,
+    ):
+        super().__init__(daemon=True)
+        self.save_paths = save_paths
+        self.fps = fps
+        self.ffmpeg_params = ffmpeg_params
+        self.vis_depth = vis_depth
+        self.depth_range = depth_range
+        self.max_pending = max_pending
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+
+    def put(
+        self,
+        color: torch.Tensor,  # uint8, "batch view 3 height width"
+        depth: torch.Tensor,  # "batch view height width"
+        event: Optional[torch.cuda.Event] = None,
+        release: Optional[Callable[[], None]] = None,
+    ) -> None:
+        if self.error is not None:
+            if release is not None:
+                release()
+            raise self.error
+        self.queue.put((color, depth, event, release))
+
+    def finish(self, raise_error: bool = True) -> None:
+        """Encode the pending chunks, close the videos and re-raise any encoding error."""
+        self.queue.put(None)
+        self.join()
+        if raise_error and self.error is not None:
+            raise self.error
+
+    def run(self) -> None:
+        writers = [None] * len(self.save_paths)
+        try:
+            while (item := self.queue.get()) is not None:
+                color, depth, event, release = item
+                # After an error keep draining, so that the producer never blocks
+                try:
+                    if self.error is None:
+                        self._encode(writers, color, depth, event)
+                except Exception as e:
+                    self.error = e
+                finally:
+                    if release is not None:
+                        release()
+        finally:
+            for writer in writers:
+                if writer is not None:
+                    writer.close()
+
+    def _encode(self, writers, color, depth, event) -> None:
+        if event is not None:
+            event.synchronize()
+        for idx, save_path in enumerate(self.save_paths):
+            video_i = color[idx]
+            if self.vis_depth is not None:
+                depth_i = vis_depth_map_tensor(depth[idx], depth_range=self.depth_range)
+                depth_i = (depth_i.clamp(0, 1) * 255).byte()
+                cat_fn = hcat if self.vis_depth == "hcat" else vcat
+                video_i = torch.stack(
+                    [cat_fn(c.float(), d.float(), gap_color=255) for c, d in zip(video_i, depth_i)]
+                ).byte()
+            frames = video_i.permute(0, 2, 3, 1).numpy()  # T x H x W x C, uint8
+            if writers[idx] is None:
+                writers[idx] = FFMPEG_VideoWriter(
+                    save_path,
+                    size=(frames.shape[2], frames.shape[1]),
+                    fps=self.fps,
+                    codec="libx264",
+                    ffmpeg_params=self.ffmpeg_params,
+                )
+            for frame in frames:
+                writers[idx].write_frame(frame)
+
+
+class _PinnedStagingRing:
+    """
+    Fixed set of pinned host buffers for the device-to-host copies of rendered chunks.
+
+    A slot is taken per chunk and handed back by the encoder once the chunk is encoded,
+    so page-locked memory is allocated once per slot instead of once per chunk. Buffers
+    are reused through views while chunks fit and only regrown for larger chunks.
+    """
+
+    def __init__(self, num_slots: int):
+        self._free = queue.Queue()
+        for slot in range(num_slots):
+            self._free.put(slot)
+        # Flat (color, depth) buffers of each slot, viewed in the shape of each chunk
+        self._buffers: list[list[Optional[torch.Tensor]]] = [
+            [None, None] for _ in range(num_slots)
+        ]
+
+    def copy(
+        self, color: torch.Tensor, depth: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor, Optional[torch.cuda.Event], Optional[Callable]]:
+        """
+        Start copying a rendered chunk to host memory; color is sent as uint8.
+
+        Returns:
+            Tuple of (host color, host depth, CUDA event of the copy or None, callback
+            that releases the staging slot or None); CPU chunks are returned as is
+        """
+        color = (color.clamp(0, 1) * 255).byte()
+        if not color.is_cuda:
+            return color, depth, None, None
+        slot = self._free.get()
+        host = []
+        for k, src in enumerate((color, depth)):
+            buffer = self._buffers[slot][k]
+            if buffer is None or buffer.dtype != src.dtype or buffer.numel() < src.numel():
+                buffer = torch.empty(src.numel(), dtype=src.dtype, pin_memory=True)
+                self._buffers[slot][k] = buffer
+            host.append(buffer[: src.numel()].view(src.shape))
+            host[-1].copy_(src, non_blocking=True)
+        host_color, host_depth = host
+        event = torch.cuda.Event()
+        event.record()
+        return host_color, host_depth, event, lambda: self._free.put(slot)
+
+
 def export_to_gs_video(
     prediction: Prediction,
     export_dir: str,
     extrinsics: Optional[torch.Tensor] = None,  # render views' world2cam, "b v 4 4"
     intrinsics: Optional[torch.Tensor] = None,  # render views' unnormed intrinsics, "b v 3 3"
     out_image_hw: Optional[tuple[int, int]] = None,  # render views' resolution, (h, w)
-    chunk_size: Optional[int] = 4,
+    chunk_size: Optional[int] = None,  # views per render call, None to fit free GPU memory
     trj_mode: Literal[
         "original",
         "smooth",
@@ -82,15 +225,14 @@ def export_to_gs_video(
     video_quality: Literal["low", "medium", "high"] = "high",
 ) -> None:
     gs_world = prediction.gaussians
+    scale_factor = prediction.scale_factor if prediction.is_metric else None
     # if target poses are not provided, render the (smooth/interpolate) input poses
     if extrinsics is not None:
         tgt_extrs = extrinsics
     else:
         tgt_extrs = torch.from_numpy(prediction.extrinsics).unsqueeze(0).to(gs_world.means)
-        if prediction.is_metric:
-            scale_factor = prediction.scale_factor
-            if scale_factor is not None:
-                tgt_extrs[:, :, :3, 3] /= scale_factor
+        if scale_factor is not None:
+            tgt_extrs[:, :, :3, 3] /= scale_factor
     tgt_intrs = (
         intrinsics
         if intrinsics is not None
@@ -106,17 +248,17 @@ def export_to_gs_video(
         trj_mode = "wander"
         # trj_mode = "dolly_zoom"
 
-    color, depth = run_renderer_in_chunk_w_trj_mode(
-        gaussians=gs_world,
-        extrinsics=tgt_extrs,
-        intrinsics=tgt_intrs,
-        image_shape=(H, W),
-        chunk_size=chunk_size,
-        trj_mode=trj_mode,
-        use_sh=True,
-        color_mode=color_mode,
-        enable_tqdm=enable_tqdm,
+    render_extrs, render_intrs = build_render_trajectory(
+        tgt_extrs, tgt_intrs, (H, W), trj_mode=trj_mode
     )
+    # Frames are encoded as soon as they are rendered, so the depth colors are fixed
+    # from the predicted depth (in the Gaussians' scale) rather than from all frames
+    depth_range = None
+    if vis_depth is not None:
+        near, far = depth_percentile_range(torch.as_tensor(np.asarray(prediction.depth)))
+        depth_range = (float(near), float(far))
+        if scale_factor is not None:
+            depth_range = (depth_range[0] / scale_factor, depth_range[1] / scale_factor)
 
     # save as video
     ffmpeg_params = [
@@ -129,26 +271,41 @@ def export_to_gs_video(
     ]  # best compatibility
 
     os.makedirs(os.path.join(export_dir, "gs_video"), exist_ok=True)
-    for idx in range(color.shape[0]):
-        video_i = color[idx]
-        if vis_depth is not None:
-            depth_i = vis_depth_map_tensor(depth[0])
-            cat_fn = hcat if vis_depth == "hcat" else vcat
-            video_i = torch.stack([cat_fn(c, d) for c, d in zip(video_i, depth_i)])
-        frames = list(
-            (video_i.clamp(0, 1) * 255).byte().permute(0, 2, 3, 1).cpu().numpy()
-        )  # T x H x W x C, uint8, numpy()
-
-        fps = 24
-        clip = mpy.ImageSequenceClip(frames, fps=fps)
-        output_name = f"{idx:04d}_{trj_mode}" if output_name is None else output_name
-        save_path = os.path.join(export_dir, f"gs_video/{output_name}.mp4")
-        # clip.write_videofile(save_path, codec="libx264", audio=False, bitrate="4000k")
-        clip.write_videofile(
-            save_path,
-            codec="libx264",
-            audio=False,
-            fps=fps,
-            ffmpeg_params=ffmpeg_params,
-        )
+    names = [
+        f"{idx:04d}_{trj_mode}" if output_name is None else output_name
+        for idx in range(render_extrs.shape[0])
+    ]
+    encoder = _VideoEncoderThread(
+        [os.path.join(export_dir, f"gs_video/{name}.mp4") for name in names],
+        fps=24,
+        ffmpeg_params=ffmpeg_params,
+        vis_depth=vis_depth,
+        depth_range=depth_range,
+    )
+    encoder.start()
+    # One slot per queued chunk, plus the chunk being encoded and the one being copied
+    staging = _PinnedStagingRing(encoder.max_pending + 2)
+    try:
+        with tqdm(
+            total=render_extrs.shape[1],
+            desc="Rendering novel views",
+            disable=(not enable_tqdm),
+            leave=False,
+        ) as pbar:
+            for _, color, depth in iter_render_chunks(
+                gs_world,
+                render_extrs,
+                render_intrs,
+                (H, W),
+                chunk_size=chunk_size,
+                use_sh=True,
+                color_mode=color_mode,
+            ):
+                encoder.put(*staging.copy(color, depth))
+                pbar.update(color.shape[1])
+    except BaseException:
+        # Close the videos without masking the error that stopped rendering
+        encoder.finish(raise_error=False)
+        raise
+    encoder.finish()
     return
@@ -0,0 +1,383 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Point-cloud writers that append vertex data batch by batch.
+
+Counts, bounds and lengths are only known once all batches are written, so both
+writers reserve room for them up front and patch the file on ``close()``. Memory use
+is bounded by the batch size, not by the size of the scene.
+
+- ``StreamingPLYWriter``: binary little-endian PLY with float32 xyz and uint8 rgb.
+- ``StreamingGLBWriter``: glTF 2.0 binary with POINTS primitives (and optional LINES
+  for camera frustums). With ``quantize=True`` positions are stored as int16 with a
+  per-chunk node transform (``KHR_mesh_quantization``), 12 instead of 16 bytes per point.
+
+    with StreamingGLBWriter("scene.glb", quantize=True) as writer:
+        for points, colors in batches:
+            writer.write_points(points, colors)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import numpy as np
+
+# glTF constants
+_ARRAY_BUFFER = 34962
+_UNSIGNED_BYTE = 5121
+_SHORT = 5122
+_FLOAT = 5126
+_MODE_POINTS = 0
+_MODE_LINES = 1
+_GLB_MAGIC = 0x46546C67
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+
+_PLY_COUNT_WIDTH = 12
+_QUANT_MAX = 32767
+
+
+class StreamingPLYWriter:
+    """
+    Binary PLY (x, y, z float32; red, green, blue uint8) with a patched vertex count.
+
+    Args:
+        path: Output ``.ply`` path
+    """
+
+    dtype = np.dtype(
+        [
+            ("x", "<f4"),
+            ("y", "<f4"),
+            ("z", "<f4"),
+            ("red", "u1"),
+            ("green", "u1"),
+            ("blue", "u1"),
+        ]
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._f = open(path, "wb")
+        self._f.write(self._header(0))
+
+    @staticmethod
+    def _header(count: int) -> bytes:
+        # Zero-padded to a fixed width so the count can be patched in place
+        lines = [
+            "ply",
+            "format binary_little_endian 1.0",
+            f"element vertex {count:0{_PLY_COUNT_WIDTH}d}",
+            "property float x",
+            "property float y",
+            "property float z",
+            "property uchar red",
+            "property uchar green",
+            "property uchar blue",
+            "end_header",
+        ]
+        return ("\n".join(lines) + "\n").encode()
+
+    def write(self, points: np.ndarray, colors: np.ndarray) -> None:
+        """Append (N, 3) points and (N, 3) uint8 colours."""
+        records = np.empty(len(points), dtype=self.dtype)
+        points = np.asarray(points)
+        colors = np.asarray(colors)
+        for k, name in enumerate(("x", "y", "z")):
+            records[name] = points[:, k]
+        for k, name in enumerate(("red", "green", "blue")):
+            records[name] = colors[:, k]
+        self._f.write(records.tobytes())
+        self.count += len(records)
+
+    def close(self) -> int:
+        """Patch the vertex count and close the file; returns the number of vertices."""
+        if self._f.closed:
+            return self.count
+        self._f.seek(0)
+        self._f.write(self._header(self.count))
+        self._f.close()
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamingGLBWriter:
+    """
+    glTF binary writer for large coloured point clouds.
+
+    Every ``chunk_size`` points become one mesh (and node) whose interleaved vertex
+    records are appended to the binary chunk as they arrive. The JSON chunk is written
+    into a space reserved at the start of the file on ``close()``; if it outgrows the
+    reservation, the binary data is shifted on disk.
+
+    Args:
+        path: Output ``.glb`` path
+        quantize: Store positions as int16 with per-chunk dequantization transforms
+            (requires ``KHR_mesh_quantization`` support in the viewer)
+        chunk_size: Max points per mesh
+        json_reserve: Bytes reserved for the JSON chunk
+    """
+
+    def __init__(
+        self,
+        path: str,
+        quantize: bool = False,
+        chunk_size: int = 1 << 20,
+        json_reserve: int = 1 << 16,
+    ):
+        self.path = path
+        self.quantize = quantize
+        self.chunk_size = chunk_size
+        self.json_reserve = (json_reserve + 3) // 4 * 4
+        self.num_points = 0
+        self.extras: dict = {}
+        self._gltf = {
+            "asset": {"version": "2.0", "generator": "depth_anything_3"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        self._bin_length = 0
+        self._f = open(path, "w+b")
+        self._f.write(b"\0" * (12 + 8 + self.json_reserve + 8))
+
+    # ------------------------------------------------------------------
+    # Appending
+    # ------------------------------------------------------------------
+    def _append(self, data: bytes, byte_stride: int | None = None) -> int:
+        """Append a 4-byte aligned buffer view; returns its index."""
+        view = {"buffer": 0, "byteOffset": self._bin_length, "byteLength": len(data)}
+        if byte_stride is not None:
+            view["byteStride"] = byte_stride
+            view["target"] = _ARRAY_BUFFER
+        self._f.write(data)
+        pad = -len(data) % 4
+        self._f.write(b"\0" * pad)
+        self._bin_length += len(data) + pad
+        self._gltf["bufferViews"].append(view)
+        return len(self._gltf["bufferViews"]) - 1
+
+    def _accessor(self, **kwargs) -> int:
+        self._gltf["accessors"].append(kwargs)
+        return len(self._gltf["accessors"]) - 1
+
+    def _add_mesh(self, primitive: dict | list[dict], node: dict) -> None:
+        primitives = primitive if isinstance(primitive, list) else [primitive]
+        self._gltf["meshes"].append({"primitives": primitives})
+        node["mesh"] = len(self._gltf["meshes"]) - 1
+        self._gltf["nodes"].append(node)
+        self._gltf["scenes"][0]["nodes"].append(len(self._gltf["nodes"]) - 1)
+
+    def write_points(self, points: np.ndarray, colors: np.ndarray) -> None:
+        """Append (N, 3) points and (N, 3) uint8 colours."""
+        for begin in range(0, len(points), self.chunk_size):
+            end = min(begin + self.chunk_size, len(points))
+            self._write_point_chunk(
+                np.asarray(points[begin:end], dtype=np.float64), np.asarray(colors[begin:end])
+            )
+
+    def _write_point_chunk(self, points: np.ndarray, colors: np.ndarray) -> None:
+        n = len(points)
+        if n == 0:
+            return
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        node = {}
+        if self.quantize:
+            center = (lo + hi) / 2.0
+            scale = np.where(hi > lo, (hi - lo) / (2.0 * _QUANT_MAX), 1.0)
+            q = np.rint((points - center) / scale).clip(-_QUANT_MAX, _QUANT_MAX)
+            dtype = np.dtype([("pos", "<i2", (3,)), ("pad", "<i2"), ("rgba", "u1", (4,))])
+            records = np.zeros(n, dtype=dtype)
+            records["pos"] = q
+            pos_type, pos_min, pos_max = _SHORT, q.min(axis=0), q.max(axis=0)
+            pos_min, pos_max = pos_min.astype(int).tolist(), pos_max.astype(int).tolist()
+            node["translation"] = center.tolist()
+            node["scale"] = scale.tolist()
+        else:
+            dtype = np.dtype([("pos", "<f4", (3,)), ("rgba", "u1", (4,))])
+            records = np.zeros(n, dtype=dtype)
+            records["pos"] = points
+            # Bounds of the float32 values actually stored
+            pos = records["pos"]
+            pos_type = _FLOAT
+            pos_min, pos_max = pos.min(axis=0).tolist(), pos.max(axis=0).tolist()
+        records["rgba"][:, :3] = colors[:, :3]
+        records["rgba"][:, 3] = 255
+
+        view = self._append(records.tobytes(), byte_stride=dtype.itemsize)
+        position = self._accessor(
+            bufferView=view,
+            byteOffset=0,
+            componentType=pos_type,
+            count=n,
+            type="VEC3",
+            min=pos_min,
+            max=pos_max,
+        )
+        color = self._accessor(
+            bufferView=view,
+            byteOffset=dtype.fields["rgba"][1],
+            componentType=_UNSIGNED_BYTE,
+            normalized=True,
+            count=n,
+            type="VEC4",
+        )
+        primitive = {"attributes": {"POSITION": position, "COLOR_0": color}, "mode": _MODE_POINTS}
+        self._add_mesh(primitive, node)
+        self.num_points += n
+
+    def write_lines(self, segments: np.ndarray, color: np.ndarray) -> None:
+        """Append (M, 2, 3) line segments drawn in one uint8 RGB colour."""
+        vertices = np.asarray(segments, dtype=np.float32).reshape(-1, 3)
+        if len(vertices) == 0:
+            return
+        rgba = np.empty((len(vertices), 4), dtype=np.uint8)
+        rgba[:, :3] = np.asarray(color, dtype=np.uint8)[:3]
+        rgba[:, 3] = 255
+        position = self._accessor(
+            bufferView=self._append(vertices.tobytes()),
+            componentType=_FLOAT,
+            count=len(vertices),
+            type="VEC3",
+            min=vertices.min(axis=0).tolist(),
+            max=vertices.max(axis=0).tolist(),
+        )
+        colors = self._accessor(
+            bufferView=self._append(rgba.tobytes()),
+            componentType=_UNSIGNED_BYTE,
+            normalized=True,
+            count=len(vertices),
+            type="VEC4",
+        )
+        primitive = {"attributes": {"POSITION": position, "COLOR_0": colors}, "mode": _MODE_LINES}
+        self._add_mesh(primitive, {})
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._gltf["nodes"])
+
+    def group_nodes(self, name: str, first_node: int) -> None:
+        """Move the root nodes from index ``first_node`` on under one parent node ``name``."""
+        roots = self._gltf["scenes"][0]["nodes"]
+        children = [n for n in roots if n >= first_node]
+        if not children:
+            return
+        self._gltf["nodes"].append({"name": name, "children": children})
+        roots[:] = [n for n in roots if n < first_node] + [len(self._gltf["nodes"]) - 1]
+
+    def append_glb(self, path: str) -> None:
+        """Copy the meshes of a GLB written by this class (e.g. a tile) into this file."""
+        gltf, data = read_glb(path)
+        views = [
+            self._append(
+                data[v.get("byteOffset", 0) : v.get("byteOffset", 0) + v["byteLength"]],
+                byte_stride=v.get("byteStride"),
+            )
+            for v in gltf.get("bufferViews", [])
+        ]
+        accessors = []
+        for accessor in gltf.get("accessors", []):
+            accessor = {**accessor, "bufferView": views[accessor["bufferView"]]}
+            accessors.append(self._accessor(**accessor))
+        for node in gltf.get("nodes", []):
+            if "mesh" not in node:
+                continue
+            primitives = []
+            for primitive in gltf["meshes"][node["mesh"]]["primitives"]:
+                attributes = {k: accessors[v] for k, v in primitive["attributes"].items()}
+                primitives.append({**primitive, "attributes": attributes})
+                if primitive.get("mode") == _MODE_POINTS:
+                    position = primitive["attributes"]["POSITION"]
+                    self.num_points += gltf["accessors"][position]["count"]
+            self._add_mesh(primitives, {k: v for k, v in node.items() if k != "mesh"})
+        if "KHR_mesh_quantization" in gltf.get("extensionsUsed", []):
+            self.quantize = True
+
+    # ------------------------------------------------------------------
+    # Finalisation
+    # ------------------------------------------------------------------
+    def _shift_tail(self, start: int, delta: int, block: int = 1 << 24) -> None:
+        """Move the bytes from ``start`` to the end of the file ``delta`` bytes later."""
+        end = self._f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > start:
+            size = min(block, pos - start)
+            pos -= size
+            self._f.seek(pos)
+            data = self._f.read(size)
+            self._f.seek(pos + delta)
+            self._f.write(data)
+
+    def close(self) -> int:
+        """Write the JSON chunk and the GLB headers; returns the number of points."""
+        if self._f.closed:
+            return self.num_points
+        gltf = self._gltf
+        gltf["buffers"] = [{"byteLength": self._bin_length}] if self._bin_length else []
+        if self.quantize:
+            gltf["extensionsUsed"] = ["KHR_mesh_quantization"]
+            gltf["extensionsRequired"] = ["KHR_mesh_quantization"]
+        if self.extras:
+            gltf["scenes"][0]["extras"] = self.extras
+        for key in ("meshes", "accessors", "bufferViews", "buffers", "nodes"):
+            if not gltf[key]:
+                del gltf[key]
+        payload = json.dumps(gltf, separators=(",", ":")).encode()
+        json_length = max(self.json_reserve, (len(payload) + 3) // 4 * 4)
+        if json_length > self.json_reserve:
+            self._shift_tail(12 + 8 + self.json_reserve, json_length - self.json_reserve)
+        payload = payload.ljust(json_length, b" ")
+
+        self._f.seek(0)
+        total = 12 + 8 + json_length + (8 + self._bin_length if self._bin_length else 0)
+        self._f.write(struct.pack("<III", _GLB_MAGIC, 2, total))
+        self._f.write(struct.pack("<II", json_length, _CHUNK_JSON))
+        self._f.write(payload)
+        if self._bin_length:
+            self._f.write(struct.pack("<II", self._bin_length, _CHUNK_BIN))
+        self._f.truncate(total)
+        self._f.close()
+        return self.num_points
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_glb(path: str) -> tuple[dict, bytes]:
+    """Read the JSON and binary chunks of a GLB file."""
+    with open(path, "rb") as f:
+        magic, version, _ = struct.unpack("<III", f.read(12))
+        if magic != _GLB_MAGIC or version != 2:
+            raise ValueError(f"Not a glTF 2.0 binary file: {path}")
+        json_length, _ = struct.unpack("<II", f.read(8))
+        gltf = json.loads(f.read(json_length))
+        header = f.read(8)
+        data = f.read(struct.unpack("<II", header)[0]) if len(header) == 8 else b""
+    return gltf, data
@@ -0,0 +1,273 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Level-of-detail octree tiles for large point clouds.
+
+The cloud is split top-down into an octree. Every node keeps one random point per
+cell of a ``grid``^3 lattice over its cube and hands the remaining points to its
+eight children, so each level refines its parent additively: the union of the nodes
+up to level L is a uniformly thinned cloud whose spacing halves with every level.
+Nodes holding at most ``max_points_per_tile`` points (or at ``max_depth``) keep all of
+them and become leaves. Each node is written as a small GLB point cloud and the tree
+is described by ``index.json``:
+
+    tiles/
+        index.json   # bounds, spacing and children of every node
+        r.glb        # root, a coarse overview of the whole scene
+        r0.glb ...   # octant children, named by their path from the root
+        lod/2.glb    # nodes of levels 0..2 merged into one file, built on demand
+
+Viewers that understand the index fetch the nodes they need; plain glTF viewers are
+served the merged ``lod/{level}.glb`` files, coarse first.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+import numpy as np
+
+from depth_anything_3.specs import Prediction
+from depth_anything_3.utils.logger import logger
+from depth_anything_3.utils.tile_index import TILE_INDEX, load_tile_index
+
+from .glb import prepare_aligned_points
+from .stream_writers import StreamingGLBWriter
+
+TILE_INDEX_VERSION = 1
+
+
+def build_octree_tiles(
+    points: np.ndarray,
+    colors: np.ndarray,
+    out_dir: str,
+    max_points_per_tile: int = 100_000,
+    grid: int = 64,
+    max_depth: int = 10,
+    quantize: bool = True,
+    extras: dict | None = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Write a point cloud as an additive LOD octree of GLB tiles plus ``index.json``.
+
+    Args:
+        points: (N, 3) positions (a memmap is fine; points are gathered per node)
+        colors: (N, 3) uint8 colours
+        out_dir: Tile directory; stale tiles in it are removed
+        max_points_per_tile: Nodes with at most this many points become leaves
+        grid: Sampling lattice resolution per axis; a node keeps up to grid^3 points
+        max_depth: Deepest level; nodes at this level keep all their points
+        quantize: Store tile positions as int16 (``KHR_mesh_quantization``)
+        extras: Optional JSON-serialisable metadata stored in the index
+        seed: Seed of the per-cell sample choice
+
+    Returns:
+        The index written to ``out_dir/index.json``
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    _remove_tiles(out_dir)
+    rng = np.random.default_rng(seed)
+
+    points = np.asarray(points)
+    finite = np.flatnonzero(np.isfinite(points).all(axis=1))
+    if len(finite):
+        lo, hi = points[finite].min(axis=0), points[finite].max(axis=0)
+    else:
+        lo, hi = np.zeros(3), np.zeros(3)
+    # Cubic root bounds, so that every octant is a cube as well
+    size = float(max((hi - lo).max(), 1e-6))
+    lo = lo.astype(np.float64)
+
+    nodes = []
+    queue = deque([("r", 0, lo, finite)])
+    while queue:
+        name, level, node_lo, idx = queue.popleft()
+        node_size = size / (1 << level)
+        p = np.asarray(points[idx], dtype=np.float64)
+
+        if len(idx) <= max_points_per_tile or level >= max_depth:
+            keep = np.ones(len(idx), dtype=bool)
+        else:
+            cell = np.floor((p - node_lo) * (grid / node_size)).astype(np.int64)
+            np.clip(cell, 0, grid - 1, out=cell)
+            key = (cell[:, 0] * grid + cell[:, 1]) * grid + cell[:, 2]
+            # The first occurrence of a key in a random order is a random point of the cell
+            order = rng.permutation(len(idx))
+            _, first = np.unique(key[order], return_index=True)
+            keep = np.zeros(len(idx), dtype=bool)
+            keep[order[first]] = True
+
+        url = f"{name}.glb"
+        tile_path = os.path.join(out_dir, url)
+        # Tiles are small, so reserve little space for their JSON chunk
+        with StreamingGLBWriter(tile_path, quantize=quantize, json_reserve=4096) as writer:
+            writer.write_points(p[keep], np.asarray(colors[idx[keep]]))
+
+        children = []
+        rest = ~keep
+        if rest.any():
+            half = node_size / 2
+            octant = ((p[rest] >= node_lo + half) * np.array([4, 2, 1])).sum(axis=1)
+            rest_idx = idx[rest]
+            for o in np.unique(octant):
+                child_lo = node_lo + half * np.array([(o >> 2) & 1, (o >> 1) & 1, o & 1])
+                children.append(f"{name}{o}")
+                queue.append((f"{name}{o}", level + 1, child_lo, rest_idx[octant == o]))
+
+        nodes.append(
+            {
+                "name": name,
+                "level": level,
+                "bounds": [node_lo.tolist(), (node_lo + node_size).tolist()],
+                "spacing": node_size / grid,
+                "count": int(keep.sum()),
+                "url": url,
+                "children": children,
+            }
+        )
+
+    index = {
+        "version": TILE_INDEX_VERSION,
+        "refine": "add",
+        "quantized": quantize,
+        "bounds": [lo.tolist(), (lo + size).tolist()],
+        "num_points": int(len(finite)),
+        "levels": max(node["level"] for node in nodes) + 1,
+        "grid": grid,
+        "nodes": nodes,
+        "extras": extras or {},
+    }
+    tmp_path = os.path.join(out_dir, TILE_INDEX + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(out_dir, TILE_INDEX))
+    logger.info(
+        f"Wrote {len(nodes)} tiles over {index['levels']} levels "
+        f"({index['num_points']} points) to {out_dir}"
+    )
+    return index
+
+
+def _remove_tiles(out_dir: str) -> None:
+    for fn in os.listdir(out_dir):
+        if fn.endswith(".glb") or fn == TILE_INDEX:
+            os.remove(os.path.join(out_dir, fn))
+    lod_dir = os.path.join(out_dir, "lod")
+    if os.path.isdir(lod_dir):
+        for fn in os.listdir(lod_dir):
+            os.remove(os.path.join(lod_dir, fn))
+
+
+def build_lod_glb(tiles_dir: str, level: int) -> str:
+    """
+    Merge the tiles of levels ``0..level`` into ``lod/{level}.glb``.
+
+    The file is built on first request and reused until ``index.json`` changes; it is
+    written to a temporary name and renamed, so concurrent requests are safe.
+
+    Args:
+        tiles_dir: Tile directory written by ``build_octree_tiles``
+        level: Deepest level included
+
+    Returns:
+        Path to the merged GLB
+    """
+    index_path = os.path.join(tiles_dir, TILE_INDEX)
+    index = load_tile_index(tiles_dir)
+    if not 0 <= level < index["levels"]:
+        raise ValueError(f"level must be in [0, {index['levels']}), got {level}")
+    path = os.path.join(tiles_dir, "lod", f"{level}.glb")
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(index_path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    nodes = [n for n in index["nodes"] if n["level"] <= level and n["count"] > 0]
+    json_reserve = 4096 + 1024 * len(nodes)
+    with StreamingGLBWriter(
+        tmp_path, quantize=index["quantized"], json_reserve=json_reserve
+    ) as writer:
+        writer.extras.update(index.get("extras", {}))
+        writer.extras["lod_level"] = level
+        for node in nodes:
+            writer.append_glb(os.path.join(tiles_dir, node["url"]))
+    os.replace(tmp_path, path)
+    return path
+
+
+def export_to_tiles(
+    prediction: Prediction,
+    export_dir: str,
+    max_points_per_tile: int = 100_000,
+    grid: int = 64,
+    max_depth: int = 10,
+    quantize: bool = True,
+    voxel_size: float | None = None,
+    conf_thresh: float = 1.05,
+    filter_black_bg: bool = False,
+    filter_white_bg: bool = False,
+    conf_thresh_percentile: float = 40.0,
+    ensure_thresh_percentile: float = 90.0,
+    sky_depth_def: float = 98.0,
+) -> str:
+    """Export the point cloud as LOD octree tiles in ``export_dir/tiles``.
+
+    Points are selected and aligned exactly as for ``export_to_glb`` but are not capped,
+    since only the coarse levels need to be loaded to view the scene.
+
+    Args:
+        prediction: Model prediction containing depth, confidence, intrinsics, extrinsics,
+            and pre-processed images.
+        export_dir: Output directory; tiles are written to its ``tiles`` sub-directory.
+        max_points_per_tile: Nodes with at most this many points become leaves.
+        grid: Sampling lattice resolution per axis of every node.
+        max_depth: Deepest octree level.
+        quantize: Store tile positions as int16 (``KHR_mesh_quantization``).
+        voxel_size: If set, merge points into voxels of this size before tiling.
+        conf_thresh: Base confidence threshold used before percentile adjustments.
+        filter_black_bg: Mark near-black background pixels for removal.
+        filter_white_bg: Mark near-white background pixels for removal.
+        conf_thresh_percentile: Lower percentile used when adapting the confidence threshold.
+        ensure_thresh_percentile: Upper percentile clamp for the adaptive threshold.
+        sky_depth_def: Percentile used to fill sky pixels with plausible depth values.
+
+    Returns:
+        Path to the written ``index.json``.
+    """
+    points, colors, A = prepare_aligned_points(
+        prediction,
+        voxel_size=voxel_size,
+        conf_thresh=conf_thresh,
+        filter_black_bg=filter_black_bg,
+        filter_white_bg=filter_white_bg,
+        conf_thresh_percentile=conf_thresh_percentile,
+        ensure_thresh_percentile=ensure_thresh_percentile,
+        sky_depth_def=sky_depth_def,
+    )
+    out_dir = os.path.join(export_dir, "tiles")
+    build_octree_tiles(
+        points,
+        colors,
+        out_dir,
+        max_points_per_tile=max_points_per_tile,
+        grid=grid,
+        max_depth=max_depth,
+        quantize=quantize,
+        extras={"hf_alignment": A.tolist()},
+    )
+    return os.path.join(out_dir, TILE_INDEX)
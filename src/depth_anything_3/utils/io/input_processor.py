@@ -21,7 +21,11 @@ In addition, it parallelizes per-image preprocessing using the provided `paralle
 
 from __future__ import annotations
 
-from typing import Sequence
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Sequence
 import cv2
 import numpy as np
 import torch
@@ -32,6 +36,141 @@ from depth_anything_3.utils.logger import logger
 from depth_anything_3.utils.parallel_utils import parallel_execution
 
 
+class PreprocessCache:
+    """Thread-safe LRU cache of preprocessed images.
+
+    Entries are keyed by (path, mtime, process_res, process_res_method) and hold the
+    normalised image tensor plus a 3x3 intrinsics transform T (adjusted K = T @ K), so
+    one entry serves any input intrinsics. The in-memory store is capped at
+    ``max_bytes``; evicted entries are optionally spilled to memory-mapped ``.npy``
+    files under ``spill_dir`` (capped at ``max_spill_bytes``) and promoted back on access.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 2 * 1024**3,
+        spill_dir: str | None = None,
+        max_spill_bytes: int | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[Hashable, tuple[torch.Tensor, np.ndarray]] = OrderedDict()
+        self._spill: OrderedDict[Hashable, tuple[str, np.ndarray, int]] = OrderedDict()
+        self.memory_bytes = 0
+        self.spill_bytes = 0
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(img: Any, process_res: Any, process_res_method: str) -> Hashable | None:
+        """Cache key of an input, or None if it is not a file on disk."""
+        if not isinstance(img, (str, os.PathLike)):
+            return None
+        path = os.path.abspath(os.fspath(img))
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        return (path, mtime, process_res, process_res_method)
+
+    def get(self, key: Hashable) -> tuple[torch.Tensor, np.ndarray] | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+            spilled = self._spill.pop(key, None)
+            if spilled is None:
+                self.misses += 1
+                return None
+            file, ixt_transform, nbytes = spilled
+            self.spill_bytes -= nbytes
+            self.spill_hits += 1
+        tensor = torch.from_numpy(np.array(np.load(file, mmap_mode="r")))
+        self._remove_file(file)
+        self.put(key, tensor, ixt_transform)
+        return tensor, ixt_transform
+
+    def put(self, key: Hashable, tensor: torch.Tensor, ixt_transform: np.ndarray) -> None:
+        nbytes = tensor.element_size() * tensor.nelement()
+        if nbytes > self.max_bytes:
+            return
+        evicted = []
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = (tensor, ixt_transform)
+            self.memory_bytes += nbytes
+            while self.memory_bytes > self.max_bytes:
+                old_key, (old_tensor, old_transform) = self._memory.popitem(last=False)
+                self.memory_bytes -= old_tensor.element_size() * old_tensor.nelement()
+                self.evictions += 1
+                evicted.append((old_key, old_tensor, old_transform))
+        if self.spill_dir is not None:
+            for old_key, old_tensor, old_transform in evicted:
+                self._spill_entry(old_key, old_tensor, old_transform)
+
+    def _spill_entry(self, key: Hashable, tensor: torch.Tensor, ixt_transform: np.ndarray):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        file = os.path.join(self.spill_dir, f"{digest}.npy")
+        array = tensor.numpy()
+        mm = np.lib.format.open_memmap(file, mode="w+", dtype=array.dtype, shape=array.shape)
+        mm[...] = array
+        mm.flush()
+        del mm
+        with self._lock:
+            self._spill[key] = (file, ixt_transform, array.nbytes)
+            self.spill_bytes += array.nbytes
+            dropped = []
+            while self.max_spill_bytes is not None and self.spill_bytes > self.max_spill_bytes:
+                _, (old_file, _, old_nbytes) = self._spill.popitem(last=False)
+                self.spill_bytes -= old_nbytes
+                dropped.append(old_file)
+        for old_file in dropped:
+            self._remove_file(old_file)
+
+    @staticmethod
+    def _remove_file(file: str) -> None:
+        try:
+            os.remove(file)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            files = [file for file, _, _ in self._spill.values()]
+            self._memory.clear()
+            self._spill.clear()
+            self.memory_bytes = 0
+            self.spill_bytes = 0
+        for file in files:
+            self._remove_file(file)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Hit/miss counters and store sizes, for sizing the cache."""
+        with self._lock:
+            lookups = self.hits + self.spill_hits + self.misses
+            return {
+                "hits": self.hits,
+                "spill_hits": self.spill_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.spill_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+                "memory_bytes": self.memory_bytes,
+                "max_bytes": self.max_bytes,
+                "spilled_entries": len(self._spill),
+                "spill_bytes": self.spill_bytes,
+            }
+
+
 class InputProcessor:
     """Prepares a batch of images for model inference.
     This processor converts a list of image file paths into a single, model-ready
@@ -51,13 +190,17 @@ class InputProcessor:
     Parallelization:
       - Each image is processed independently in a worker.
       - Order of outputs matches the input order.
+
+    Caching:
+      - With a PreprocessCache, images given as file paths are preprocessed once per
+        (path, mtime, process_res, process_res_method).
     """
 
     NORMALIZE = T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
     PATCH_SIZE = 14
 
-    def __init__(self):
-        pass
+    def __init__(self, cache: PreprocessCache | None = None):
+        self.cache = cache
 
     # -----------------------------
     # Public API
@@ -225,6 +368,20 @@ class InputProcessor:
         process_res: int,
         process_res_method: str,
     ) -> tuple[torch.Tensor, tuple[int, int], np.ndarray | None, np.ndarray | None]:
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(img, process_res, process_res_method)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                img_tensor, ixt_transform = cached
+                if intrinsic is not None:
+                    intrinsic = (ixt_transform @ intrinsic).astype(intrinsic.dtype)
+                return img_tensor, tuple(img_tensor.shape[1:]), intrinsic, extrinsic
+
+        # Track the intrinsics transform (adjusted K = T @ K) for cached entries
+        ixt_transform = np.eye(3) if cache_key is not None else None
+
         # Load & remember original size
         pil_img = self._load_image(img)
         orig_w, orig_h = pil_img.size
@@ -233,17 +390,20 @@ class InputProcessor:
         pil_img = self._resize_image(pil_img, process_res, process_res_method)
         w, h = pil_img.size
         intrinsic = self._resize_ixt(intrinsic, orig_w, orig_h, w, h)
+        ixt_transform = self._resize_ixt(ixt_transform, orig_w, orig_h, w, h)
 
         # Enforce divisibility by PATCH_SIZE
         if process_res_method.endswith("resize"):
             pil_img = self._make_divisible_by_resize(pil_img, self.PATCH_SIZE)
             new_w, new_h = pil_img.size
             intrinsic = self._resize_ixt(intrinsic, w, h, new_w, new_h)
+            ixt_transform = self._resize_ixt(ixt_transform, w, h, new_w, new_h)
             w, h = new_w, new_h
         elif process_res_method.endswith("crop"):
             pil_img = self._make_divisible_by_crop(pil_img, self.PATCH_SIZE)
             new_w, new_h = pil_img.size
             intrinsic = self._crop_ixt(intrinsic, w, h, new_w, new_h)
+            ixt_transform = self._crop_ixt(ixt_transform, w, h, new_w, new_h)
             w, h = new_w, new_h
         else:
             raise ValueError(f"Unsupported process_res_method: {process_res_method}")
@@ -253,6 +413,9 @@ class InputProcessor:
         _, H, W = img_tensor.shape
         assert (W, H) == (w, h), "Tensor size mismatch with PIL image size after processing."
 
+        if cache_key is not None:
+            self.cache.put(cache_key, img_tensor, ixt_transform)
+
         # Return: (img_tensor, (H, W), intrinsic, extrinsic)
         return img_tensor, (H, W), intrinsic, extrinsic
 
@@ -17,16 +17,28 @@ Output processor for Depth Anything 3.
 
 This module handles model output processing, including tensor-to-numpy conversion,
 batch dimension removal, and Prediction object creation.
+
+All output tensors of a CUDA forward pass are packed into one buffer on the device and
+moved to the host through a bounded pinned staging buffer, reused across calls, into
+ordinary (pageable) numpy arrays. Processed images are denormalised to uint8 on the
+device, and depth and confidence can be returned in float16 to halve their host memory
+and transfer time.
 """
 
 from __future__ import annotations
 
+import threading
 import numpy as np
 import torch
 from addict import Dict as AddictDict
 
 from depth_anything_3.specs import Prediction
 
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+# Upper bound of the page-locked staging buffer; larger outputs are copied in windows
+PINNED_STAGING_BYTES = 64 * 1024**2
+
 
 class OutputProcessor:
     """
@@ -36,10 +48,28 @@ class OutputProcessor:
     and creates structured Prediction objects with proper data types.
     """
 
-    def __init__(self) -> None:
-        """Initialize the output processor."""
+    def __init__(
+        self,
+        depth_dtype: torch.dtype = torch.float32,
+        staging_bytes: int = PINNED_STAGING_BYTES,
+    ) -> None:
+        """
+        Initialize the output processor.
 
-    def __call__(self, model_output: dict[str, torch.Tensor]) -> Prediction:
+        Args:
+            depth_dtype: Dtype of the returned depth and confidence maps
+                (torch.float32 or torch.float16)
+            staging_bytes: Size bound of the pinned staging buffer used for
+                device-to-host copies
+        """
+        self.depth_dtype = depth_dtype
+        self.staging_bytes = staging_bytes
+        self._staging: torch.Tensor | None = None
+        self._staging_lock = threading.Lock()
+
+    def __call__(
+        self, model_output: dict[str, torch.Tensor], images: torch.Tensor | None = None
+    ) -> Prediction:
         """
         Convert model output to Prediction object.
 
@@ -47,122 +77,240 @@ class OutputProcessor:
             model_output: Model output dictionary containing depth, conf, extrinsics, intrinsics
                          Expected shapes: depth (B, N, 1, H, W), conf (B, N, 1, H, W),
                          extrinsics (B, N, 4, 4), intrinsics (B, N, 3, 3)
+            images: Optional normalized model input images (B, N, 3, H, W), returned
+                    as uint8 ``processed_images``
 
         Returns:
             Prediction: Object containing depth estimation results with shapes:
                        depth (N, H, W), conf (N, H, W), extrinsics (N, 4, 4), intrinsics (N, 3, 3)
         """
         # Extract data from batch dimension (B=1, N=number of images)
-        depth = self._extract_depth(model_output)
-        conf = self._extract_conf(model_output)
-        extrinsics = self._extract_extrinsics(model_output)
-        intrinsics = self._extract_intrinsics(model_output)
-        sky = self._extract_sky(model_output)
         aux = self._extract_aux(model_output)
+        tensors = {
+            "depth": self._extract_depth(model_output),
+            "conf": self._extract_conf(model_output),
+            "extrinsics": self._extract_extrinsics(model_output),
+            "intrinsics": self._extract_intrinsics(model_output),
+            "sky": self._extract_sky(model_output),
+            "processed_images": None if images is None else self._extract_images(images),
+        }
+        tensors.update({("aux", k): v for k, v in aux.items() if isinstance(v, torch.Tensor)})
+        arrays = self._to_numpy(tensors)
+        for k in aux.keys():
+            if ("aux", k) in arrays:
+                aux[k] = arrays[("aux", k)]
         gaussians = model_output.get("gaussians", None)
         scale_factor = model_output.get("scale_factor", None)
 
         return Prediction(
-            depth=depth,
-            sky=sky,
-            conf=conf,
-            extrinsics=extrinsics,
-            intrinsics=intrinsics,
+            depth=arrays["depth"],
+            sky=arrays["sky"],
+            conf=arrays["conf"],
+            extrinsics=arrays["extrinsics"],
+            intrinsics=arrays["intrinsics"],
             is_metric=getattr(model_output, "is_metric", 0),
             gaussians=gaussians,
             aux=aux,
             scale_factor=scale_factor,
+            processed_images=arrays["processed_images"],
         )
 
-    def _extract_depth(self, model_output: dict[str, torch.Tensor]) -> np.ndarray:
+    def select_batch_item(self, model_output: dict, index: int) -> AddictDict:
+        """
+        Select one element of a batched model output, keeping a batch dimension of 1.
+
+        Used to split a forward pass over several stacked scenes (B > 1) into per-scene
+        outputs that can be passed to :meth:`__call__`.
+
+        Args:
+            model_output: Model output dictionary with tensors shaped (B, ...)
+            index: Batch index to select
+
+        Returns:
+            Model output dictionary with tensors shaped (1, ...)
+        """
+        ret = AddictDict()
+        for k, v in model_output.items():
+            if isinstance(v, torch.Tensor) and v.dim() > 0:
+                ret[k] = v[index : index + 1]
+            elif isinstance(v, dict):
+                ret[k] = self.select_batch_item(v, index)
+            else:
+                ret[k] = v
+        return ret
+
+    def _to_numpy(self, tensors: dict) -> dict:
+        """
+        Move tensors to the host as numpy arrays.
+
+        CUDA tensors are packed into one byte buffer, widest dtype first so every
+        segment stays aligned, and copied through the pinned staging buffer into
+        newly allocated pageable arrays, so no page-locked memory outlives the call.
+
+        Args:
+            tensors: Dictionary of tensors (or None)
+
+        Returns:
+            Dictionary with the same keys and numpy arrays (or None)
+        """
+        arrays = {k: None for k in tensors}
+        present = {k: v for k, v in tensors.items() if v is not None}
+        if not any(v.is_cuda for v in present.values()):
+            arrays.update({k: v.cpu().numpy() for k, v in present.items()})
+            return arrays
+
+        order = sorted(present, key=lambda k: present[k].element_size(), reverse=True)
+        device = present[order[0]].device
+        packed = torch.cat([present[k].to(device).reshape(-1).view(torch.uint8) for k in order])
+        for k in order:
+            dtype = torch.empty(0, dtype=present[k].dtype).numpy().dtype
+            arrays[k] = np.empty(tuple(present[k].shape), dtype=dtype)
+        self._copy_to_host(packed, [arrays[k].reshape(-1).view(np.uint8) for k in order])
+        return arrays
+
+    def _copy_to_host(self, packed: torch.Tensor, outputs: list[np.ndarray]) -> None:
         """
-        Extract depth tensor from model output and convert to numpy.
+        Copy a packed byte tensor into host byte arrays through the staging buffer.
+
+        The copy runs in windows of at most ``staging_bytes``; each window is one
+        non-blocking transfer into the staging buffer, then scattered into the
+        outputs it overlaps.
+
+        Args:
+            packed: uint8 tensor with the concatenated bytes of all outputs
+            outputs: uint8 arrays receiving consecutive byte ranges of ``packed``
+        """
+        total = packed.numel()
+        if total == 0:
+            return
+        with self._staging_lock:
+            staging = self._staging_buffer(min(total, self.staging_bytes), packed.is_cuda)
+            host = staging.numpy()
+            bounds = np.cumsum([0] + [out.size for out in outputs])
+            for w0 in range(0, total, staging.numel()):
+                w1 = min(w0 + staging.numel(), total)
+                staging[: w1 - w0].copy_(packed[w0:w1], non_blocking=True)
+                if packed.is_cuda:
+                    torch.cuda.current_stream(packed.device).synchronize()
+                for out, s0, s1 in zip(outputs, bounds[:-1], bounds[1:]):
+                    lo, hi = max(s0, w0), min(s1, w1)
+                    if lo < hi:
+                        out[lo - s0 : hi - s0] = host[lo - w0 : hi - w0]
+
+    def _staging_buffer(self, nbytes: int, pin: bool) -> torch.Tensor:
+        """Return the reused staging buffer, (re)allocated when too small."""
+        staging = self._staging
+        if staging is not None and staging.numel() >= nbytes and (not pin or staging.is_pinned()):
+            return staging
+        # Release the old buffer first so two are never page-locked at once
+        self._staging = staging = None
+        self._staging = torch.empty(nbytes, dtype=torch.uint8, pin_memory=pin)
+        return self._staging
+
+    def _extract_depth(self, model_output: dict[str, torch.Tensor]) -> torch.Tensor:
+        """
+        Extract depth tensor from model output.
 
         Args:
             model_output: Model output dictionary
 
         Returns:
-            Depth array with shape (N, H, W)
+            Depth tensor with shape (N, H, W), in ``depth_dtype``
         """
-        depth = model_output["depth"].squeeze(0).squeeze(-1).cpu().numpy()  # (N, H, W)
-        return depth
+        depth = model_output["depth"].squeeze(0).squeeze(-1)  # (N, H, W)
+        return depth.to(self.depth_dtype)
 
-    def _extract_conf(self, model_output: dict[str, torch.Tensor]) -> np.ndarray | None:
+    def _extract_conf(self, model_output: dict[str, torch.Tensor]) -> torch.Tensor | None:
         """
-        Extract confidence tensor from model output and convert to numpy.
+        Extract confidence tensor from model output.
 
         Args:
             model_output: Model output dictionary
 
         Returns:
-            Confidence array with shape (N, H, W) or None
+            Confidence tensor with shape (N, H, W) in ``depth_dtype``, or None
         """
         conf = model_output.get("depth_conf", None)
         if conf is not None:
-            conf = conf.squeeze(0).cpu().numpy()  # (N, H, W)
+            conf = conf.squeeze(0).to(self.depth_dtype)  # (N, H, W)
         return conf
 
-    def _extract_extrinsics(self, model_output: dict[str, torch.Tensor]) -> np.ndarray | None:
+    def _extract_extrinsics(self, model_output: dict[str, torch.Tensor]) -> torch.Tensor | None:
         """
-        Extract extrinsics tensor from model output and convert to numpy.
+        Extract extrinsics tensor from model output.
 
         Args:
             model_output: Model output dictionary
 
         Returns:
-            Extrinsics array with shape (N, 4, 4) or None
+            Extrinsics tensor with shape (N, 4, 4) or None
         """
         extrinsics = model_output.get("extrinsics", None)
         if extrinsics is not None:
-            extrinsics = extrinsics.squeeze(0).cpu().numpy()  # (N, 4, 4)
+            extrinsics = extrinsics.squeeze(0)  # (N, 4, 4)
         return extrinsics
 
-    def _extract_intrinsics(self, model_output: dict[str, torch.Tensor]) -> np.ndarray | None:
+    def _extract_intrinsics(self, model_output: dict[str, torch.Tensor]) -> torch.Tensor | None:
         """
-        Extract intrinsics tensor from model output and convert to numpy.
+        Extract intrinsics tensor from model output.
 
         Args:
             model_output: Model output dictionary
 
         Returns:
-            Intrinsics array with shape (N, 3, 3) or None
+            Intrinsics tensor with shape (N, 3, 3) or None
         """
         intrinsics = model_output.get("intrinsics", None)
         if intrinsics is not None:
-            intrinsics = intrinsics.squeeze(0).cpu().numpy()  # (N, 3, 3)
+            intrinsics = intrinsics.squeeze(0)  # (N, 3, 3)
         return intrinsics
 
-    def _extract_sky(self, model_output: dict[str, torch.Tensor]) -> np.ndarray | None:
+    def _extract_sky(self, model_output: dict[str, torch.Tensor]) -> torch.Tensor | None:
         """
-        Extract sky tensor from model output and convert to numpy.
+        Extract sky mask from model output.
 
         Args:
             model_output: Model output dictionary
 
         Returns:
-            Sky mask array with shape (N, H, W) or None
+            Boolean sky mask with shape (N, H, W) or None
         """
         sky = model_output.get("sky", None)
         if sky is not None:
-            sky = sky.squeeze(0).cpu().numpy() >= 0.5  # (N, H, W)
+            sky = sky.squeeze(0) >= 0.5  # (N, H, W)
         return sky
 
+    def _extract_images(self, images: torch.Tensor) -> torch.Tensor:
+        """
+        Denormalize model input images to uint8, on their device.
+
+        Args:
+            images: ImageNet-normalized images with shape (1, N, 3, H, W)
+
+        Returns:
+            uint8 images with shape (N, H, W, 3)
+        """
+        mean = images.new_tensor(IMAGENET_MEAN)[:, None, None]
+        std = images.new_tensor(IMAGENET_STD)[:, None, None]
+        images = (images.squeeze(0) * std + mean).clamp_(0, 1).mul_(255).round_()
+        return images.permute(0, 2, 3, 1).to(torch.uint8).contiguous()  # (N, H, W, 3)
+
     def _extract_aux(self, model_output: dict[str, torch.Tensor]) -> AddictDict:
         """
-        Extract auxiliary data from model output and convert to numpy.
+        Extract auxiliary data from model output.
 
         Args:
             model_output: Model output dictionary
 
         Returns:
-            Dictionary containing auxiliary data
+            Dictionary containing auxiliary data, tensors without the batch dimension
         """
         aux = model_output.get("aux", None)
         ret = AddictDict()
         if aux is not None:
             for k in aux.keys():
                 if isinstance(aux[k], torch.Tensor):
-                    ret[k] = aux[k].squeeze(0).cpu().numpy()
+                    ret[k] = aux[k].squeeze(0)
                 else:
                     ret[k] = aux[k]
         return ret
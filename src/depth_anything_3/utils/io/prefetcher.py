@@ -0,0 +1,254 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Prefetching input loader for multi-chunk inference.
+
+A background thread decodes, resizes and normalises upcoming chunks with the
+InputProcessor and copies them to the device (through pinned staging buffers and
+non-blocking copies on a side CUDA stream) while the current chunk runs on the model.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator
+import numpy as np
+import torch
+from PIL import Image
+
+from depth_anything_3.utils.io.input_processor import InputProcessor
+from depth_anything_3.utils.logger import logger
+
+_END = object()
+
+
+@dataclass
+class PreparedChunk:
+    """A preprocessed chunk whose model inputs are (being) copied to the device."""
+
+    index: int
+    image: list[np.ndarray | Image.Image | str]  # raw inputs of the chunk
+    imgs_cpu: torch.Tensor  # (N, 3, H, W)
+    extrinsics: torch.Tensor | None  # (N, 4, 4), processed
+    intrinsics: torch.Tensor | None  # (N, 3, 3), processed
+    imgs: torch.Tensor  # (1, N, 3, H, W) on device
+    ex_t: torch.Tensor | None  # (1, N, 4, 4) on device
+    in_t: torch.Tensor | None  # (1, N, 3, 3) on device
+    copy_event: Any = None  # torch.cuda.Event recorded after the H2D copy
+
+    def model_inputs(self) -> tuple[torch.Tensor, torch.Tensor | None, torch.Tensor | None]:
+        """Make the current stream wait for the H2D copy and return (imgs, ex_t, in_t)."""
+        if self.copy_event is not None:
+            stream = torch.cuda.current_stream(self.imgs.device)
+            stream.wait_event(self.copy_event)
+            for t in (self.imgs, self.ex_t, self.in_t):
+                if t is not None:
+                    t.record_stream(stream)
+        return self.imgs, self.ex_t, self.in_t
+
+
+class PrefetchLoader:
+    """
+    Iterates over chunks of images, preparing up to ``prefetch`` chunks ahead.
+
+    Each chunk is either a list of images or an ``(images, extrinsics, intrinsics)``
+    tuple. The bounded queue caps how many prepared chunks (and their device copies)
+    are alive at once. After iteration, ``get_stats()`` reports how much of the
+    preprocessing and copy time was hidden behind the consumer's compute.
+
+    Args:
+        chunks: Iterable of chunks (consumed lazily)
+        input_processor: InputProcessor used for decode/resize/normalise
+        device: Device the model inputs are copied to
+        process_res: Processing resolution
+        process_res_method: Resize method for processing
+        prefetch: Max number of prepared chunks waiting in the queue
+        num_workers: Preprocessing threads per chunk
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[Any],
+        input_processor: InputProcessor,
+        device: torch.device | str,
+        process_res: int = 504,
+        process_res_method: str = "upper_bound_resize",
+        prefetch: int = 2,
+        num_workers: int = 8,
+    ):
+        self.chunks = chunks
+        self.input_processor = input_processor
+        self.device = torch.device(device)
+        self.process_res = process_res
+        self.process_res_method = process_res_method
+        self.prefetch = max(1, prefetch)
+        self.num_workers = num_workers
+        self.use_cuda = self.device.type == "cuda" and torch.cuda.is_available()
+
+        # Pinned staging buffers, reused round-robin once their copy has completed
+        self._staging: list[tuple[torch.Tensor | None, Any]] = [(None, None)] * (
+            self.prefetch + 2
+        )
+        self._stop = threading.Event()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.num_chunks = 0
+        self.preprocess_time = 0.0
+        self.copy_time = 0.0
+        self.wait_time = 0.0
+        self.total_time = 0.0
+
+    # ------------------------------------------------------------------
+    # Producer
+    # ------------------------------------------------------------------
+    def _stage(self, slot: int, imgs_cpu: torch.Tensor) -> tuple[torch.Tensor, Any]:
+        buffer, event = self._staging[slot]
+        if event is not None:
+            event.synchronize()  # the previous copy out of this buffer must be done
+        if buffer is None or buffer.shape != imgs_cpu.shape or buffer.dtype != imgs_cpu.dtype:
+            buffer = torch.empty(imgs_cpu.shape, dtype=imgs_cpu.dtype, pin_memory=True)
+        buffer.copy_(imgs_cpu)
+        return buffer, event
+
+    def _prepare(self, index: int, chunk: Any, stream: Any) -> PreparedChunk:
+        if isinstance(chunk, tuple):
+            image, extrinsics, intrinsics = chunk
+        else:
+            image, extrinsics, intrinsics = chunk, None, None
+        image = list(image)
+
+        start_time = time.perf_counter()
+        imgs_cpu, ext_cpu, ixt_cpu = self.input_processor(
+            image,
+            extrinsics.copy() if extrinsics is not None else None,
+            intrinsics.copy() if intrinsics is not None else None,
+            self.process_res,
+            self.process_res_method,
+            num_workers=self.num_workers,
+        )
+        self.preprocess_time += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        copy_event = None
+        if self.use_cuda:
+            slot = index % len(self._staging)
+            staged, _ = self._stage(slot, imgs_cpu)
+            with torch.cuda.stream(stream):
+                imgs = staged.to(self.device, non_blocking=True)[None].float()
+                ex_t = (
+                    ext_cpu.pin_memory().to(self.device, non_blocking=True)[None].float()
+                    if ext_cpu is not None
+                    else None
+                )
+                in_t = (
+                    ixt_cpu.pin_memory().to(self.device, non_blocking=True)[None].float()
+                    if ixt_cpu is not None
+                    else None
+                )
+                copy_event = torch.cuda.Event()
+                copy_event.record(stream)
+            self._staging[slot] = (staged, copy_event)
+        else:
+            imgs = imgs_cpu.to(self.device)[None].float()
+            ex_t = ext_cpu.to(self.device)[None].float() if ext_cpu is not None else None
+            in_t = ixt_cpu.to(self.device)[None].float() if ixt_cpu is not None else None
+        self.copy_time += time.perf_counter() - start_time
+
+        return PreparedChunk(
+            index=index,
+            image=image,
+            imgs_cpu=imgs_cpu,
+            extrinsics=ext_cpu,
+            intrinsics=ixt_cpu,
+            imgs=imgs,
+            ex_t=ex_t,
+            in_t=in_t,
+            copy_event=copy_event,
+        )
+
+    def _put(self, out: queue.Queue, item: Any) -> None:
+        """Blocking put that gives up once the consumer has stopped."""
+        while not self._stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce(self, out: queue.Queue) -> None:
+        stream = torch.cuda.Stream(self.device) if self.use_cuda else None
+        try:
+            for index, chunk in enumerate(self.chunks):
+                if self._stop.is_set():
+                    return
+                self._put(out, self._prepare(index, chunk, stream))
+        except Exception as e:  # re-raised in the consumer
+            self._put(out, e)
+            return
+        self._put(out, _END)
+
+    # ------------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------------
+    def __iter__(self) -> Iterator[PreparedChunk]:
+        self.reset_stats()
+        self._stop.clear()
+        out: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        producer = threading.Thread(target=self._produce, args=(out,), daemon=True)
+        start_time = time.perf_counter()
+        producer.start()
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                item = out.get()
+                self.wait_time += time.perf_counter() - wait_start
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                self.num_chunks += 1
+                yield item
+        finally:
+            self._stop.set()
+            producer.join()
+            self.total_time = time.perf_counter() - start_time
+
+    def get_stats(self) -> dict[str, float]:
+        """Input pipeline timings; ``hidden_time`` is the part overlapped with compute."""
+        input_time = self.preprocess_time + self.copy_time
+        hidden_time = max(0.0, input_time - self.wait_time)
+        return {
+            "chunks": self.num_chunks,
+            "preprocess_time": self.preprocess_time,
+            "copy_time": self.copy_time,
+            "wait_time": self.wait_time,
+            "hidden_time": hidden_time,
+            "hidden_fraction": hidden_time / input_time if input_time > 0 else 0.0,
+            "total_time": self.total_time,
+        }
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logger.info(
+            f"Prefetch: {stats['chunks']} chunks, input pipeline "
+            f"{stats['preprocess_time'] + stats['copy_time']:.2f}s "
+            f"(preprocess {stats['preprocess_time']:.2f}s, copy {stats['copy_time']:.2f}s), "
+            f"waited {stats['wait_time']:.2f}s, hidden {stats['hidden_time']:.2f}s "
+            f"({stats['hidden_fraction'] * 100:.0f}%)"
+        )
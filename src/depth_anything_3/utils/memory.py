@@ -7,22 +7,27 @@ the Gradio UI to keep memory-management behavior consistent.
 from __future__ import annotations
 
 import gc
+import os
 
 from typing import Any, Dict, Optional
 
 import torch
 
 
-def get_gpu_memory_info() -> Optional[Dict[str, Any]]:
+def get_gpu_memory_info(device: Optional[torch.device] = None) -> Optional[Dict[str, Any]]:
     """Return a snapshot of current GPU memory usage or None if CUDA not available.
 
     Keys in returned dict: total_gb, allocated_gb, reserved_gb, free_gb, utilization
+
+    Args:
+        device: CUDA device to query (the current device if None).
     """
     if not torch.cuda.is_available():
         return None
 
     try:
-        device = torch.cuda.current_device()
+        if device is None:
+            device = torch.cuda.current_device()
         total_memory = torch.cuda.get_device_properties(device).total_memory
         allocated_memory = torch.cuda.memory_allocated(device)
         reserved_memory = torch.cuda.memory_reserved(device)
@@ -39,6 +44,47 @@ def get_gpu_memory_info() -> Optional[Dict[str, Any]]:
         return None
 
 
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            return int(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_host_memory_info() -> Optional[Dict[str, Any]]:
+    """Return a snapshot of host memory or None if it cannot be read (non-Linux).
+
+    The limit is the smaller of physical memory and the cgroup (container) limit;
+    available memory is what the kernel reports available, capped by the limit minus
+    the resident set size (RSS) of this process.
+
+    Keys in returned dict: total_gb, available_gb, rss_gb
+    """
+    try:
+        meminfo = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                name, value = line.split(":", 1)
+                meminfo[name] = int(value.split()[0]) * 1024
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, KeyError):
+        return None
+
+    total = meminfo["MemTotal"]
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        limit = _read_int(path)
+        if limit is not None and limit < total:
+            total = limit
+    available = min(meminfo.get("MemAvailable", meminfo["MemFree"]), max(total - rss, 0))
+    return {
+        "total_gb": total / 1024 ** 3,
+        "available_gb": available / 1024 ** 3,
+        "rss_gb": rss / 1024 ** 3,
+    }
+
+
 def cleanup_cuda_memory() -> None:
     """Perform a robust GPU cleanup sequence.
 
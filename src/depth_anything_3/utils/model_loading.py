@@ -16,12 +16,90 @@
 Model loading and state dict conversion utilities.
 """
 
-from typing import Dict, Tuple
+from itertools import chain
+from typing import Dict, Tuple, Union
 import torch
 
 from depth_anything_3.utils.logger import logger
 
 
+def load_state_dict_file(
+    model_path: str, device: Union[str, torch.device] = "cpu"
+) -> Dict[str, torch.Tensor]:
+    """
+    Load a checkpoint without reading it into memory up front.
+
+    ``.safetensors`` files and zip-format torch checkpoints are memory-mapped: on CPU
+    the tensors are backed by the OS page cache, which stays warm across restarts and is
+    shared by every process loading the same file.
+
+    Args:
+        model_path: Path to a ``.safetensors`` file or a torch checkpoint
+        device: Device to load the tensors to
+
+    Returns:
+        State dictionary
+    """
+    if model_path.endswith(".safetensors"):
+        from safetensors.torch import load_file
+
+        return load_file(model_path, device=str(device))
+    try:
+        return torch.load(model_path, map_location=device, mmap=True)
+    except RuntimeError:
+        # Legacy (non-zip) checkpoints cannot be memory-mapped
+        return torch.load(model_path, map_location=device)
+
+
+def load_weights(
+    model: torch.nn.Module,
+    state_dict: Dict[str, torch.Tensor],
+    strict: bool = False,
+    device: Union[str, torch.device] = "cpu",
+) -> Tuple[list, list]:
+    """
+    Load a state dict into a model, which may have been built on the meta device.
+
+    Parameters of a meta-device model take the checkpoint tensors as they are (cast to
+    the parameter dtype if needed) instead of copying them into freshly allocated ones.
+    Tensors missing from the checkpoint are then allocated on ``device`` as zeros, and
+    tensors built outside the meta device (non-persistent buffers) are moved to it.
+
+    Args:
+        model: Model instance to load weights into
+        state_dict: State dictionary, see ``load_state_dict_file``
+        strict: Whether missing and unexpected keys are errors
+        device: Device of the tensors that do not come from the checkpoint
+
+    Returns:
+        Tuple of (missed_keys, unexpected_keys)
+    """
+    on_meta = any(t.is_meta for t in chain(model.parameters(), model.buffers()))
+    if not on_meta:
+        return model.load_state_dict(state_dict, strict=strict)
+
+    expected = model.state_dict(keep_vars=True)
+    state_dict = {
+        k: v.to(expected[k].dtype) if k in expected and v.dtype != expected[k].dtype else v
+        for k, v in state_dict.items()
+    }
+    missed, unexpected = model.load_state_dict(state_dict, strict=strict, assign=True)
+    device = torch.device(device)
+    for module in model.modules():
+        for tensors in (module._parameters, module._buffers):
+            for name, t in tensors.items():
+                if t is None or (not t.is_meta and t.device == device):
+                    continue
+                if t.is_meta:
+                    value = torch.zeros_like(t, device=device)
+                else:
+                    value = t.to(device)
+                if isinstance(t, torch.nn.Parameter):
+                    value = torch.nn.Parameter(value, requires_grad=t.requires_grad)
+                tensors[name] = value
+    return missed, unexpected
+
+
 def convert_general_state_dict(state_dict: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
     """
     Convert general model state dict to match current model architecture.
@@ -99,14 +177,14 @@ def load_pretrained_weights(model, model_path: str, is_metric: bool = False) ->
     Returns:
         Tuple of (missed_keys, unexpected_keys)
     """
-    state_dict = torch.load(model_path, map_location="cpu")
+    state_dict = load_state_dict_file(model_path)
 
     if is_metric:
         state_dict = convert_metric_state_dict(state_dict)
     else:
         state_dict = convert_general_state_dict(state_dict)
 
-    missed, unexpected = model.load_state_dict(state_dict, strict=False)
+    missed, unexpected = load_weights(model, state_dict)
     logger.info("Missed keys:", missed)
     logger.info("Unexpected keys:", unexpected)
 
@@ -128,12 +206,12 @@ def load_pretrained_nested_weights(
         Tuple of (missed_keys, unexpected_keys)
     """
     # Load main model weights
-    state_dict0 = torch.load(main_model_path, map_location="cpu")
+    state_dict0 = load_state_dict_file(main_model_path)
     state_dict0 = convert_general_state_dict(state_dict0)
     state_dict0 = {k.replace("model.", "model.da3."): v for k, v in state_dict0.items()}
 
     # Load metric model weights
-    state_dict1 = torch.load(metric_model_path, map_location="cpu")
+    state_dict1 = load_state_dict_file(metric_model_path)
     state_dict1 = convert_metric_state_dict(state_dict1)
     state_dict1 = {k.replace("model.", "model.da3_metric."): v for k, v in state_dict1.items()}
 
@@ -141,7 +219,7 @@ def load_pretrained_nested_weights(
     combined_state_dict = state_dict0.copy()
     combined_state_dict.update(state_dict1)
 
-    missed, unexpected = model.load_state_dict(combined_state_dict, strict=False)
+    missed, unexpected = load_weights(model, combined_state_dict)
 
     print("Missed keys:", missed)
     print("Unexpected keys:", unexpected)
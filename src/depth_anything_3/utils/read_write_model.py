@@ -67,6 +67,7 @@ CAMERA_MODELS = {
 }
 CAMERA_MODEL_IDS = {camera_model.model_id: camera_model for camera_model in CAMERA_MODELS}
 CAMERA_MODEL_NAMES = {camera_model.model_name: camera_model for camera_model in CAMERA_MODELS}
+POINT2D_DTYPE = np.dtype([("xy", "<f8", (2,)), ("point3D_id", "<i8")])
 
 
 def read_next_bytes(fid, num_bytes, format_char_sequence, endian_character="<"):
@@ -322,6 +323,14 @@ def write_images_text(images, path):
             fid.write(" ".join(points_strings) + "\n")
 
 
+def pack_points2D(xys, point3D_ids):
+    """Pack the 2D points of an image as little-endian ``ddq`` records in one call."""
+    records = np.empty(len(point3D_ids), dtype=POINT2D_DTYPE)
+    records["xy"] = np.asarray(xys, dtype=np.float64).reshape(-1, 2)
+    records["point3D_id"] = point3D_ids
+    return records.tobytes()
+
+
 def write_images_binary(images, path_to_model_file):
     """
     see: src/colmap/scene/reconstruction.cc
@@ -339,8 +348,7 @@ def write_images_binary(images, path_to_model_file):
                 write_next_bytes(fid, char.encode("utf-8"), "c")
             write_next_bytes(fid, b"\x00", "c")
             write_next_bytes(fid, len(img.point3D_ids), "Q")
-            for xy, p3d_id in zip(img.xys, img.point3D_ids):
-                write_next_bytes(fid, [*xy, p3d_id], "ddq")
+            fid.write(pack_points2D(img.xys, img.point3D_ids))
 
 
 def read_points3D_text(path):
@@ -459,6 +467,46 @@ def write_points3D_binary(points3D, path_to_model_file):
                 write_next_bytes(fid, [image_id, point2D_id], "ii")
 
 
+def write_points3D_binary_arrays(
+    path_to_model_file, xyz, rgb, image_ids, point2D_idxs, point3D_ids=None, errors=None
+):
+    """
+    Vectorised variant of write_points3D_binary for points with equal track lengths.
+
+    :param xyz: (N, 3) point positions
+    :param rgb: (N, 3) uint8 colors
+    :param image_ids: (N, L) image id of each track element
+    :param point2D_idxs: (N, L) index of the 2D point in its image
+    :param point3D_ids: optional (N,) ids, defaults to 1..N
+    :param errors: optional (N,) reprojection errors, defaults to 0
+    """
+    image_ids = np.asarray(image_ids).reshape(len(xyz), -1)
+    track_length = image_ids.shape[1]
+    records = np.empty(
+        len(xyz),
+        dtype=np.dtype(
+            [
+                ("id", "<u8"),
+                ("xyz", "<f8", (3,)),
+                ("rgb", "u1", (3,)),
+                ("error", "<f8"),
+                ("track_length", "<u8"),
+                ("track", "<i4", (track_length, 2)),
+            ]
+        ),
+    )
+    records["id"] = np.arange(1, len(xyz) + 1) if point3D_ids is None else point3D_ids
+    records["xyz"] = xyz
+    records["rgb"] = rgb
+    records["error"] = 0.0 if errors is None else errors
+    records["track_length"] = track_length
+    records["track"][..., 0] = image_ids
+    records["track"][..., 1] = np.asarray(point2D_idxs).reshape(len(xyz), -1)
+    with open(path_to_model_file, "wb") as fid:
+        write_next_bytes(fid, len(xyz), "Q")
+        fid.write(records.tobytes())
+
+
 def detect_model_format(path, ext):
     if (
         os.path.isfile(os.path.join(path, "cameras" + ext))
@@ -0,0 +1,145 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers for sliding-window (streaming) inference over long image sequences.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Tuple
+import numpy as np
+import torch
+
+from depth_anything_3.specs import Prediction
+from depth_anything_3.utils.alignment import (
+    least_squares_scale_scalar,
+    robust_weighted_estimate_sim3,
+)
+from depth_anything_3.utils.geometry import affine_inverse_np, as_homogeneous
+
+
+def slice_prediction(prediction: Prediction, start: int, end: int | None = None) -> Prediction:
+    """Return the frames ``start:end`` of a prediction (arrays are views, not copies)."""
+    n = prediction.depth.shape[0]
+
+    def _slice(value):
+        if isinstance(value, np.ndarray) and value.ndim > 0 and value.shape[0] == n:
+            return value[start:end]
+        return value
+
+    aux = None
+    if prediction.aux is not None:
+        aux = {k: _slice(v) for k, v in prediction.aux.items()}
+    return replace(
+        prediction,
+        depth=prediction.depth[start:end],
+        sky=_slice(prediction.sky),
+        conf=_slice(prediction.conf),
+        extrinsics=_slice(prediction.extrinsics),
+        intrinsics=_slice(prediction.intrinsics),
+        processed_images=_slice(prediction.processed_images),
+        aux=aux,
+    )
+
+
+def apply_sim3_to_prediction(
+    prediction: Prediction, scale: float, rotation: np.ndarray, translation: np.ndarray
+) -> Prediction:
+    """
+    Move a prediction into another world frame, X' = scale * rotation @ X + translation.
+
+    Depth scales with ``scale``; world-to-camera extrinsics are updated accordingly.
+    The prediction is modified in place and returned.
+    """
+    prediction.depth = prediction.depth * scale
+    if prediction.extrinsics is not None:
+        ext = as_homogeneous(prediction.extrinsics)
+        c2w = affine_inverse_np(ext)
+        c2w_new = c2w.copy()
+        c2w_new[:, :3, :3] = rotation @ c2w[:, :3, :3]
+        c2w_new[:, :3, 3] = scale * c2w[:, :3, 3] @ rotation.T + translation
+        ext_new = affine_inverse_np(c2w_new)
+        prediction.extrinsics = ext_new[:, : prediction.extrinsics.shape[1]].astype(
+            prediction.extrinsics.dtype
+        )
+    return prediction
+
+
+def _overlap_mask(ref_conf: np.ndarray, conf: np.ndarray, conf_thresh_percentile: float):
+    """Pixels confidently predicted in both windows."""
+    combined = np.sqrt(ref_conf * conf)
+    thresh = np.percentile(combined, conf_thresh_percentile)
+    return combined >= thresh, combined
+
+
+def _subsample(num: int, max_points: int) -> np.ndarray:
+    if num <= max_points:
+        return np.arange(num)
+    return np.linspace(0, num - 1, max_points).astype(np.int64)
+
+
+def estimate_overlap_sim3(
+    ref_points: np.ndarray,
+    ref_conf: np.ndarray,
+    points: np.ndarray,
+    conf: np.ndarray,
+    conf_thresh_percentile: float = 40.0,
+    max_points: int = 200_000,
+    device: torch.device | str = "cpu",
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Estimate the Sim(3) mapping a window's overlap point maps onto the previous window's.
+
+    Args:
+        ref_points: Overlap point maps of the previous window, in the stream frame (K, H, W, 3)
+        ref_conf: Their confidences (K, H, W)
+        points: The same frames predicted by the current window (K, H, W, 3)
+        conf: Their confidences (K, H, W)
+        conf_thresh_percentile: Pixels below this percentile of joint confidence are ignored
+        max_points: Max number of correspondences used by the robust estimator
+        device: Device to run the estimator on
+
+    Returns:
+        Tuple of (scale, rotation (3, 3), translation (3,))
+    """
+    mask, weights = _overlap_mask(ref_conf, conf, conf_thresh_percentile)
+    src, tgt, w = points[mask], ref_points[mask], weights[mask]
+    if len(w) < 3:
+        raise ValueError("Not enough confident overlap points for alignment")
+    idx = _subsample(len(w), max_points)
+    return robust_weighted_estimate_sim3(
+        torch.from_numpy(np.ascontiguousarray(src[idx])).to(device),
+        torch.from_numpy(np.ascontiguousarray(tgt[idx])).to(device),
+        torch.from_numpy(np.ascontiguousarray(w[idx])).to(device),
+    )
+
+
+def estimate_overlap_scale(
+    ref_depth: np.ndarray,
+    ref_conf: np.ndarray,
+    depth: np.ndarray,
+    conf: np.ndarray,
+    conf_thresh_percentile: float = 40.0,
+) -> float:
+    """Least-squares depth scale between two windows, used when no poses are predicted."""
+    mask, _ = _overlap_mask(ref_conf, conf, conf_thresh_percentile)
+    if not mask.any():
+        return 1.0
+    scale = least_squares_scale_scalar(
+        torch.from_numpy(ref_depth[mask].astype(np.float32)),
+        torch.from_numpy(depth[mask].astype(np.float32)),
+    )
+    return float(scale)
@@ -0,0 +1,48 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Reading the index of octree tile exports.
+
+Standard library only, so the gallery servers can list tiled scenes without importing
+the exporters (see ``utils/export/tiles.py`` for the layout).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+TILE_INDEX = "index.json"
+
+
+def load_tile_index(tiles_dir: str) -> dict:
+    """Read ``index.json`` of a tile directory."""
+    with open(os.path.join(tiles_dir, TILE_INDEX), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def tile_levels(tiles_dir: str) -> int | None:
+    """Number of LOD levels of a tile directory, or None if it has no valid index."""
+    try:
+        return int(load_tile_index(tiles_dir)["levels"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def has_scene_model(scene_dir: str) -> bool:
+    """Check if a gallery scene has a GLB or octree tiles to show."""
+    return os.path.exists(os.path.join(scene_dir, "scene.glb")) or os.path.exists(
+        os.path.join(scene_dir, "tiles", TILE_INDEX)
+    )
@@ -0,0 +1,255 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batched depth unprojection shared by the exporters, the benchmarks and DA3-Streaming.
+
+A pixel (u, v) with depth d maps to the world point ``d * M @ [u, v, 1] + o``, where
+``M = R_c2w @ K^-1`` and ``o`` is the camera centre. ``M`` and ``o`` are computed once
+per frame in float64; the per-pixel work runs in torch (on CPU or an accelerator) over
+batches of frames with a cached pixel grid, so no per-frame homogeneous arrays are
+built. NumPy inputs are accepted and NumPy outputs returned.
+
+    points = depth_to_world_points(depth, intrinsics, extrinsics)  # (N, H, W, 3)
+    points, colors = depth_to_point_cloud(
+        depth, intrinsics, extrinsics, images=images, conf=conf, conf_thresh=0.5
+    )
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+from typing import Union
+import numpy as np
+import torch
+
+ArrayLike = Union[np.ndarray, torch.Tensor]
+
+_GRID_CACHE: OrderedDict[tuple, torch.Tensor] = OrderedDict()
+_GRID_CACHE_SIZE = 8
+_GRID_CACHE_LOCK = threading.Lock()
+
+
+def pixel_grid(
+    height: int, width: int, device: torch.device | str = "cpu", dtype=torch.float32
+) -> torch.Tensor:
+    """Cached (H, W, 3) grid of homogeneous pixel coordinates (u, v, 1); thread-safe."""
+    key = (height, width, str(device), dtype)
+    with _GRID_CACHE_LOCK:
+        grid = _GRID_CACHE.get(key)
+        if grid is not None:
+            _GRID_CACHE.move_to_end(key)
+            return grid
+    v, u = torch.meshgrid(
+        torch.arange(height, device=device, dtype=dtype),
+        torch.arange(width, device=device, dtype=dtype),
+        indexing="ij",
+    )
+    grid = torch.stack([u, v, torch.ones_like(u)], dim=-1)
+    with _GRID_CACHE_LOCK:
+        # Another thread may have built the same grid meanwhile; keep the first one
+        grid = _GRID_CACHE.setdefault(key, grid)
+        _GRID_CACHE.move_to_end(key)
+        while len(_GRID_CACHE) > _GRID_CACHE_SIZE:
+            _GRID_CACHE.popitem(last=False)
+    return grid
+
+
+def _as_tensor(x: ArrayLike | None, device=None, dtype=None) -> torch.Tensor | None:
+    if x is None:
+        return None
+    if isinstance(x, np.ndarray):
+        x = torch.from_numpy(np.ascontiguousarray(x))
+    return x.to(device=device, dtype=dtype)
+
+
+def camera_to_world_affine(
+    intrinsics: ArrayLike, extrinsics: ArrayLike
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-frame affine map from homogeneous pixels scaled by depth to world points.
+
+    Args:
+        intrinsics: Camera intrinsics (N, 3, 3)
+        extrinsics: World-to-camera extrinsics (N, 3, 4) or (N, 4, 4)
+
+    Returns:
+        Tuple of (M, o): ray matrices ``R_c2w @ K^-1`` (N, 3, 3) and camera centres (N, 3),
+        both float64
+    """
+    if isinstance(intrinsics, torch.Tensor):
+        intrinsics = intrinsics.detach().cpu().numpy()
+    if isinstance(extrinsics, torch.Tensor):
+        extrinsics = extrinsics.detach().cpu().numpy()
+    K = np.asarray(intrinsics, dtype=np.float64)
+    w2c = np.zeros((len(K), 4, 4), dtype=np.float64)
+    w2c[:, :3, :4] = np.asarray(extrinsics, dtype=np.float64)[:, :3, :4]
+    w2c[:, 3, 3] = 1.0
+    c2w = np.linalg.inv(w2c)
+    return c2w[:, :3, :3] @ np.linalg.inv(K), c2w[:, :3, 3]
+
+
+def unproject_affine(
+    depth: ArrayLike,
+    rays_from_pixels: ArrayLike,
+    origins: ArrayLike,
+    device: torch.device | str | None = None,
+) -> ArrayLike:
+    """
+    Dense unprojection ``X = d * M @ [u, v, 1] + o`` for a batch of depth maps.
+
+    Args:
+        depth: Depth maps (N, H, W)
+        rays_from_pixels: Per-frame ray matrices M (N, 3, 3)
+        origins: Per-frame ray origins o (N, 3)
+        device: Optional compute device; defaults to the device of ``depth``
+
+    Returns:
+        World points (N, H, W, 3), float32, NumPy if ``depth`` is NumPy
+    """
+    is_numpy = isinstance(depth, np.ndarray)
+    if device is None:
+        device = "cpu" if is_numpy else depth.device
+    d = _as_tensor(depth, device, torch.float32)
+    M = _as_tensor(rays_from_pixels, device, torch.float32)
+    o = _as_tensor(origins, device, torch.float32)
+    grid = pixel_grid(d.shape[1], d.shape[2], d.device)
+    points = torch.einsum("nij,hwj->nhwi", M, grid)
+    points.mul_(d[..., None]).add_(o[:, None, None, :])
+    return points.cpu().numpy() if is_numpy else points
+
+
+def depth_to_world_points(
+    depth: ArrayLike,
+    intrinsics: ArrayLike,
+    extrinsics: ArrayLike,
+    device: torch.device | str | None = None,
+) -> ArrayLike:
+    """
+    Unproject depth maps into world-space point maps.
+
+    Args:
+        depth: Depth maps (N, H, W), NumPy or torch
+        intrinsics: Camera intrinsics (N, 3, 3)
+        extrinsics: World-to-camera extrinsics (N, 3, 4) or (N, 4, 4)
+        device: Optional compute device; defaults to the device of ``depth``
+
+    Returns:
+        World points (N, H, W, 3), float32, of the same type as ``depth``
+    """
+    M, o = camera_to_world_affine(intrinsics, extrinsics)
+    return unproject_affine(depth, M, o, device=device)
+
+
+def valid_point_mask(
+    depth: ArrayLike,
+    conf: ArrayLike | None = None,
+    conf_thresh: float | None = None,
+    sky_mask: ArrayLike | None = None,
+    mask: ArrayLike | None = None,
+) -> ArrayLike:
+    """Pixels with finite, positive depth, confidence >= threshold, not sky and in ``mask``."""
+    is_numpy = isinstance(depth, np.ndarray)
+    device = "cpu" if is_numpy else depth.device
+    d = _as_tensor(depth, device)
+    valid = torch.isfinite(d) & (d > 0)
+    if conf is not None and conf_thresh is not None:
+        valid &= _as_tensor(conf, device) >= conf_thresh
+    if sky_mask is not None:
+        valid &= ~_as_tensor(sky_mask, device, torch.bool)
+    if mask is not None:
+        valid &= _as_tensor(mask, device, torch.bool)
+    return valid.cpu().numpy() if is_numpy else valid
+
+
+def depth_to_point_cloud(
+    depth: ArrayLike,
+    intrinsics: ArrayLike,
+    extrinsics: ArrayLike,
+    images: ArrayLike | None = None,
+    conf: ArrayLike | None = None,
+    conf_thresh: float | None = None,
+    sky_mask: ArrayLike | None = None,
+    mask: ArrayLike | None = None,
+    device: torch.device | str | None = None,
+    frame_batch: int = 16,
+    return_indices: bool = False,
+) -> tuple[np.ndarray, ...]:
+    """
+    Unproject the valid pixels of depth maps into a flat, coloured point cloud.
+
+    Validity (see ``valid_point_mask``) is evaluated on the compute device in the same
+    pass as the unprojection, ``frame_batch`` frames at a time, so peak memory is bounded
+    by the batch rather than the sequence.
+
+    Args:
+        depth: Depth maps (N, H, W)
+        intrinsics: Camera intrinsics (N, 3, 3)
+        extrinsics: World-to-camera extrinsics (N, 3, 4) or (N, 4, 4)
+        images: Optional uint8 colours (N, H, W, 3)
+        conf: Optional confidence maps (N, H, W), used with ``conf_thresh``
+        conf_thresh: Minimum confidence of kept pixels
+        sky_mask: Optional boolean sky maps (N, H, W); sky pixels are dropped
+        mask: Optional boolean maps (N, H, W) of pixels to keep
+        device: Optional compute device; defaults to the device of ``depth``
+        frame_batch: Frames unprojected per step
+        return_indices: Also return the flat index (into N*H*W) of every point
+
+    Returns:
+        Tuple of (points (M, 3) float32, colors (M, 3) uint8 or None), plus the flat
+        int64 indices if ``return_indices``; points are in frame-major pixel order
+    """
+    if device is None:
+        device = "cpu" if isinstance(depth, np.ndarray) else depth.device
+    N, H, W = depth.shape
+    M, o = camera_to_world_affine(intrinsics, extrinsics)
+
+    def frames(x, begin, end):
+        return None if x is None else _as_tensor(x[begin:end], device)
+
+    pts_all, col_all, idx_all = [], [], []
+    for begin in range(0, N, frame_batch):
+        end = min(begin + frame_batch, N)
+        d = frames(depth, begin, end)
+        valid = valid_point_mask(
+            d,
+            frames(conf, begin, end),
+            conf_thresh,
+            frames(sky_mask, begin, end),
+            frames(mask, begin, end),
+        )
+        if not bool(valid.any()):
+            continue
+        # index_select on flat views is much cheaper than boolean indexing of (B, H, W, 3)
+        idx = torch.nonzero(valid.reshape(-1)).squeeze(1)
+        points = unproject_affine(d, M[begin:end], o[begin:end], device=device)
+        pts_all.append(points.reshape(-1, 3).index_select(0, idx).cpu().numpy())
+        if images is not None:
+            colors = frames(images, begin, end).reshape(-1, 3).index_select(0, idx)
+            col_all.append(colors.to(torch.uint8).cpu().numpy())
+        if return_indices:
+            idx_all.append((idx + begin * H * W).cpu().numpy())
+
+    if len(pts_all) == 0:
+        points = np.zeros((0, 3), dtype=np.float32)
+        colors = np.zeros((0, 3), dtype=np.uint8) if images is not None else None
+        indices = np.zeros((0,), dtype=np.int64)
+    else:
+        points = np.concatenate(pts_all, 0)
+        colors = np.concatenate(col_all, 0) if images is not None else None
+        indices = np.concatenate(idx_all, 0) if return_indices else None
+    if return_indices:
+        return points, colors, indices
+    return points, colors
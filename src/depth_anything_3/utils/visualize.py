@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Optional
 import matplotlib
 import numpy as np
 import torch
@@ -84,21 +85,37 @@ def visualize_depth(
 def vis_depth_map_tensor(
     result: torch.Tensor,  # "*batch height width"
     color_map: str = "Spectral",
+    depth_range: Optional[tuple[float, float]] = None,
 ) -> torch.Tensor:  # "*batch 3 height with"
     """
     Color-map the depth map.
+
+    ``depth_range`` fixes the (near, far) depths mapped to the ends of the color map,
+    e.g. to color frames rendered in chunks consistently; by default it is the 1st and
+    99th percentile of ``result``.
     """
-    far = result.reshape(-1)[:16_000_000].float().quantile(0.99).log().to(result)
-    try:
-        near = result[result > 0][:16_000_000].float().quantile(0.01).log().to(result)
-    except (RuntimeError, ValueError) as e:
-        logger.error(f"No valid depth values found. Reason: {e}")
-        near = torch.zeros_like(far)
+    near, far = depth_range if depth_range is not None else depth_percentile_range(result)
+    near, far = (torch.as_tensor(d).float().log().to(result) for d in (near, far))
     result = result.log()
     result = (result - near) / (far - near)
     return apply_color_map_to_image(result, color_map)
 
 
+def depth_percentile_range(
+    depth: torch.Tensor,  # "*batch height width"
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    1st percentile of the valid depths and 99th percentile of all depths.
+    """
+    far = depth.reshape(-1)[:16_000_000].float().quantile(0.99)
+    try:
+        near = depth[depth > 0][:16_000_000].float().quantile(0.01)
+    except (RuntimeError, ValueError) as e:
+        logger.error(f"No valid depth values found. Reason: {e}")
+        near = torch.ones_like(far)
+    return near, far
+
+
 def apply_color_map(
     x: torch.Tensor,  # " *batch"
     color_map: str = "inferno",
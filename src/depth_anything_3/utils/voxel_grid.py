@@ -0,0 +1,224 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Hashed voxel-grid reduction of point clouds.
+
+Points are bucketed into cubic voxels keyed by a packed int64 hash of their integer
+voxel coordinates. Each occupied voxel keeps a confidence-weighted centroid, the mean
+colour of its points and the index of its most confident point. Points are consumed
+in chunks; each chunk is reduced on its own and merged into the sorted per-voxel
+accumulators with a binary search, so memory scales with the number of occupied voxels
+rather than the number of input points and earlier voxels are never re-sorted.
+Overlapping views of the same surface collapse into one point per voxel, which evens
+out the density. Grids reduced separately (e.g. per chunk) can be merged again by
+passing their weights and counts back to ``add``.
+
+    reducer = VoxelGridReducer(voxel_size=0.01)
+    for points, colors, conf in batches:
+        reducer.add(points, colors, conf)
+    grid = reducer.result()  # grid.points, grid.colors, ...
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import numpy as np
+
+# 21 bits per axis, so keys of voxel coordinates in [-2^20, 2^20) fit in an int64
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+
+
+@dataclass
+class VoxelGrid:
+    """One entry per occupied voxel."""
+
+    points: np.ndarray  # (V, 3) float32, confidence-weighted centroids
+    colors: np.ndarray | None  # (V, 3) uint8, mean colours
+    weights: np.ndarray  # (V,) float64, summed confidence
+    counts: np.ndarray  # (V,) int64, number of points merged
+    indices: np.ndarray  # (V,) int64, input index of the most confident point
+
+
+class VoxelGridReducer:
+    """
+    Streaming voxel-grid downsampler.
+
+    Args:
+        voxel_size: Edge length of the voxels, in the units of the points
+        chunk_size: Points hashed per step inside ``add``
+    """
+
+    def __init__(self, voxel_size: float, chunk_size: int = 1_000_000):
+        if voxel_size <= 0:
+            raise ValueError(f"voxel_size must be positive, got {voxel_size}")
+        self.voxel_size = float(voxel_size)
+        self.chunk_size = chunk_size
+        self.num_points = 0
+        self._keys = np.zeros((0,), dtype=np.int64)
+        self._acc: dict[str, np.ndarray] | None = None
+        self._has_colors: bool | None = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _hash(self, points: np.ndarray) -> np.ndarray:
+        coords = np.floor(points / self.voxel_size).astype(np.int64)
+        if len(coords) and (coords.min() < -_KEY_OFFSET or coords.max() >= _KEY_OFFSET):
+            raise ValueError(
+                f"voxel_size {self.voxel_size} is too small for the extent of the points"
+            )
+        coords += _KEY_OFFSET
+        return (coords[:, 0] << (2 * _KEY_BITS)) | (coords[:, 1] << _KEY_BITS) | coords[:, 2]
+
+    @staticmethod
+    def _reduce(keys, acc):
+        """Sum the accumulators of equal keys and keep the most confident point."""
+        uniq, inv = np.unique(keys, return_inverse=True)
+        n = len(uniq)
+        out = {}
+        for name in ("weight", "count"):
+            out[name] = np.bincount(inv, acc[name], n)
+        for name in ("wxyz", "rgb"):
+            if name in acc:
+                out[name] = np.stack(
+                    [np.bincount(inv, acc[name][:, k], n) for k in range(3)], axis=1
+                )
+        # First entry of each key after sorting by (key, -best_weight)
+        order = np.lexsort((-acc["best_weight"], inv))
+        first = order[np.r_[0, np.flatnonzero(np.diff(inv[order])) + 1]] if n else order
+        out["best_weight"] = acc["best_weight"][first]
+        out["best_index"] = acc["best_index"][first]
+        return uniq, out
+
+    def _merge(self, keys, acc):
+        """Merge reduced (sorted, unique) keys into the sorted accumulators."""
+        if self._acc is None:
+            self._keys, self._acc = keys, acc
+            return
+        pos = np.searchsorted(self._keys, keys)
+        hit = pos < len(self._keys)
+        hit[hit] = self._keys[pos[hit]] == keys[hit]
+        at, new = pos[hit], ~hit
+        for name in ("weight", "count", "wxyz", "rgb"):
+            if name in acc:
+                self._acc[name][at] += acc[name][hit]
+        # Ties keep the point seen first
+        better = acc["best_weight"][hit] > self._acc["best_weight"][at]
+        for name in ("best_weight", "best_index"):
+            self._acc[name][at[better]] = acc[name][hit][better]
+        if new.any():
+            self._keys = np.insert(self._keys, pos[new], keys[new])
+            self._acc = {
+                name: np.insert(value, pos[new], acc[name][new], axis=0)
+                for name, value in self._acc.items()
+            }
+
+    def add(
+        self,
+        points: np.ndarray,
+        colors: np.ndarray | None = None,
+        weights: np.ndarray | None = None,
+        counts: np.ndarray | None = None,
+    ) -> None:
+        """
+        Merge points into the grid.
+
+        Args:
+            points: (N, 3) positions
+            colors: Optional (N, 3) colours; must be given for all calls or none
+            weights: Optional (N,) confidences used for the centroids, default 1
+            counts: Optional (N,) number of input points each row stands for, default 1;
+                with ``weights`` set to their summed confidence, the rows of a reduced
+                grid merge as if its original points were added
+        """
+        if self._has_colors is None:
+            self._has_colors = colors is not None
+        elif self._has_colors != (colors is not None):
+            raise ValueError("colors must be given for all calls to add() or for none")
+
+        for begin in range(0, len(points), self.chunk_size):
+            end = min(begin + self.chunk_size, len(points))
+            p = np.asarray(points[begin:end], dtype=np.float64)
+            w = (
+                np.ones(len(p))
+                if weights is None
+                else np.maximum(np.asarray(weights[begin:end], dtype=np.float64), 1e-12)
+            )
+            n = (
+                np.ones(len(p))
+                if counts is None
+                else np.asarray(counts[begin:end], dtype=np.float64)
+            )
+            acc = {
+                "weight": w,
+                "count": n,
+                "wxyz": p * w[:, None],
+                "best_weight": w,
+                "best_index": np.arange(begin, end, dtype=np.int64) + self.num_points,
+            }
+            if colors is not None:
+                acc["rgb"] = np.asarray(colors[begin:end], dtype=np.float64) * n[:, None]
+            self._merge(*self._reduce(self._hash(p), acc))
+        self.num_points += len(points)
+
+    def result(self) -> VoxelGrid:
+        """Per-voxel points, colours and statistics, ordered by voxel key."""
+        if self._acc is None:
+            return VoxelGrid(
+                points=np.zeros((0, 3), dtype=np.float32),
+                colors=np.zeros((0, 3), dtype=np.uint8) if self._has_colors else None,
+                weights=np.zeros((0,)),
+                counts=np.zeros((0,), dtype=np.int64),
+                indices=np.zeros((0,), dtype=np.int64),
+            )
+        acc = self._acc
+        colors = None
+        if "rgb" in acc:
+            colors = np.clip(np.rint(acc["rgb"] / acc["count"][:, None]), 0, 255)
+            colors = colors.astype(np.uint8)
+        return VoxelGrid(
+            points=(acc["wxyz"] / acc["weight"][:, None]).astype(np.float32),
+            colors=colors,
+            weights=acc["weight"],
+            counts=acc["count"].astype(np.int64),
+            indices=acc["best_index"],
+        )
+
+
+def voxel_downsample(
+    points: np.ndarray,
+    colors: np.ndarray | None = None,
+    weights: np.ndarray | None = None,
+    voxel_size: float = 0.01,
+    chunk_size: int = 1_000_000,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Reduce a point cloud to one point per occupied voxel.
+
+    Args:
+        points: (N, 3) positions
+        colors: Optional (N, 3) uint8 colours, averaged per voxel
+        weights: Optional (N,) confidences for the weighted centroids
+        voxel_size: Edge length of the voxels
+        chunk_size: Points hashed per step
+
+    Returns:
+        Tuple of (points (V, 3) float32, colors (V, 3) uint8 or None)
+    """
+    reducer = VoxelGridReducer(voxel_size, chunk_size=chunk_size)
+    reducer.add(points, colors, weights)
+    grid = reducer.result()
+    return grid.points, grid.colors
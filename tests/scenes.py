@@ -0,0 +1,56 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Synthetic multi-view predictions with known geometry."""
+
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+from depth_anything_3.specs import Prediction
+
+
+def random_sim3(rng: np.random.Generator):
+    """Random (scale, rotation, translation)."""
+    rotation = Rotation.random(random_state=rng.integers(1 << 31)).as_matrix()
+    return float(rng.uniform(0.5, 2.0)), rotation, rng.normal(size=3)
+
+
+def make_prediction(num_frames=6, height=12, width=16, seed=0) -> Prediction:
+    """Prediction of a camera moving along x past a bumpy surface."""
+    rng = np.random.default_rng(seed)
+    intrinsics = np.tile(
+        np.array([[20.0, 0, width / 2], [0, 20.0, height / 2], [0, 0, 1]], np.float32),
+        (num_frames, 1, 1),
+    )
+    extrinsics = np.zeros((num_frames, 3, 4), np.float32)
+    for i in range(num_frames):
+        rotation = Rotation.from_euler("xyz", rng.normal(scale=0.05, size=3)).as_matrix()
+        centre = np.array([0.3 * i, 0.0, 0.0])
+        extrinsics[i, :, :3] = rotation.T
+        extrinsics[i, :, 3] = -rotation.T @ centre
+    v, u = np.mgrid[:height, :width]
+    depth = np.stack(
+        [2.0 + 0.3 * np.sin(u / 3.0 + i) + 0.2 * np.cos(v / 2.0) for i in range(num_frames)]
+    ).astype(np.float32)
+    conf = rng.uniform(1.0, 2.0, size=depth.shape).astype(np.float32)
+    images = rng.integers(0, 256, size=(num_frames, height, width, 3), dtype=np.uint8)
+    return Prediction(
+        depth=depth,
+        is_metric=0,
+        conf=conf,
+        extrinsics=extrinsics,
+        intrinsics=intrinsics,
+        processed_images=images,
+    )
+
@@ -0,0 +1,107 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the micro-batching scheduler."""
+
+from types import SimpleNamespace
+
+import torch
+
+from depth_anything_3.services.batching import MicroBatchScheduler
+from depth_anything_3.services.task_queue import InMemoryTaskQueue
+from depth_anything_3.utils.io.output_processor import OutputProcessor
+
+
+def make_request(num_images=2, process_res=504, extrinsics=None):
+    return SimpleNamespace(
+        image_paths=[f"img_{i}.png" for i in range(num_images)],
+        process_res=process_res,
+        process_res_method="upper_bound_resize",
+        export_feat_layers=[],
+        extrinsics=extrinsics,
+        intrinsics=None,
+    )
+
+
+def enqueue(queue, requests):
+    for task_id in requests:
+        queue.put(task_id, "{}")
+
+
+def test_collect_batches_compatible_tasks_in_queue_order():
+    requests = {
+        "a": make_request(),
+        "b": make_request(process_res=336),
+        "c": make_request(),
+        "d": make_request(),
+    }
+    queue = InMemoryTaskQueue()
+    enqueue(queue, requests)
+    scheduler = MicroBatchScheduler(max_wait=0.0, max_batch_images=16)
+
+    first = queue.pop()
+    batch = scheduler.collect(first, queue, requests.get)
+
+    assert batch == ["a", "c", "d"]
+    assert queue.pending_ids() == ["b"]
+    assert scheduler.get_stats()["max_batch_size"] == 3
+
+
+def test_collect_respects_image_budget():
+    requests = {str(i): make_request(num_images=3) for i in range(5)}
+    queue = InMemoryTaskQueue()
+    enqueue(queue, requests)
+    scheduler = MicroBatchScheduler(max_wait=0.0, max_batch_images=8)
+
+    batch = scheduler.collect(queue.pop(), queue, requests.get)
+
+    assert batch == ["0", "1"]
+    assert len(queue) == 3
+
+
+def test_posed_and_large_requests_run_alone():
+    scheduler = MicroBatchScheduler(max_batch_images=8)
+    assert scheduler.batch_key(make_request(extrinsics=[[0.0]])) is None
+    assert scheduler.batch_key(make_request(num_images=5)) is None
+
+    requests = {"a": make_request(extrinsics=[[0.0]]), "b": make_request(extrinsics=[[0.0]])}
+    queue = InMemoryTaskQueue()
+    enqueue(queue, requests)
+    assert scheduler.collect(queue.pop(), queue, requests.get) == ["a"]
+    assert queue.pending_ids() == ["b"]
+
+
+def test_select_batch_item_keeps_batch_dimension():
+    output = {
+        "depth": torch.arange(2 * 3 * 4.0).view(2, 3, 4),
+        "aux": {"feat": torch.zeros(2, 5)},
+        "is_metric": 1,
+    }
+    item = OutputProcessor().select_batch_item(output, 1)
+    assert item["depth"].shape == (1, 3, 4)
+    assert torch.equal(item["depth"][0], output["depth"][1])
+    assert item["aux"]["feat"].shape == (1, 5)
+    assert item["is_metric"] == 1
+
+
+def test_collect_leaves_tasks_rejected_by_can_start():
+    requests = {task_id: make_request() for task_id in "abc"}
+    queue = InMemoryTaskQueue()
+    enqueue(queue, requests)
+    scheduler = MicroBatchScheduler(max_wait=0.0, max_batch_images=16)
+
+    batch = scheduler.collect(queue.pop(), queue, requests.get, can_start=lambda t: t != "b")
+
+    assert batch == ["a", "c"]
+    assert queue.pending_ids() == ["b"]
@@ -0,0 +1,59 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the benchmark work-queue helpers."""
+
+import os
+
+from depth_anything_3.bench.runner import (
+    cached_result,
+    config_hash,
+    marker_matches,
+    weights_identity,
+    write_marker,
+)
+
+
+def test_markers(tmp_path):
+    key = config_hash(stage="infer", process_res=504)
+    assert key == config_hash(process_res=504, stage="infer")
+    assert key != config_hash(stage="infer", process_res=756)
+
+    path = str(tmp_path / "exports" / "metrics.json")
+    assert not marker_matches(path, key)
+    write_marker(path, hash=key, result={"fscore": 0.5})
+    assert marker_matches(path, key)
+    assert cached_result(path, key) == {"fscore": 0.5}
+    assert cached_result(path, "other") is None
+
+
+def test_weights_identity(tmp_path):
+    assert weights_identity("depth-anything/DA3-LARGE") == "depth-anything/DA3-LARGE"
+    assert weights_identity(None) is None
+
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    (model_dir / "config.json").write_text("{}")
+    weights = model_dir / "model.safetensors"
+    weights.write_bytes(b"\0" * 16)
+    first = weights_identity(str(model_dir))
+    assert first == weights_identity(str(model_dir))
+    assert first.startswith(str(model_dir))
+
+    weights.write_bytes(b"\0" * 32)
+    assert weights_identity(str(model_dir)) != first
+    stat = weights.stat()
+    second = weights_identity(str(weights))
+    os.utime(weights, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert weights_identity(str(weights)) != second
@@ -0,0 +1,104 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the columnar on-disk chunk store."""
+
+import os
+
+import numpy as np
+import pytest
+from loop_utils.chunk_store import MANIFEST, PREDICTION_FIELDS, ChunkStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ChunkStore(str(tmp_path / "chunks"))
+
+
+def test_prediction_round_trip(store, prediction):
+    store.save_prediction("chunk_0", prediction, meta={"range": [0, 6]})
+    chunk = store.load("chunk_0")
+
+    assert chunk.meta == {"range": [0, 6]}
+    assert set(chunk.keys()) == set(PREDICTION_FIELDS)
+    assert len(chunk) == 6
+    for key in PREDICTION_FIELDS:
+        stored = getattr(chunk, key)
+        assert isinstance(stored, np.memmap)
+        assert stored.dtype == getattr(prediction, key).dtype
+        np.testing.assert_array_equal(stored, getattr(prediction, key))
+    np.testing.assert_array_equal(chunk.frames("depth", 2, 4), prediction.depth[2:4])
+    with pytest.raises(AttributeError):
+        chunk.sky
+
+
+def test_load_subset_skips_none_and_empty(store):
+    store.save("c", {"a": np.arange(6.0).reshape(3, 2), "b": None, "e": np.zeros((0, 3))})
+    chunk = store.load("c", keys=["a", "e"])
+
+    assert "b" not in chunk
+    assert chunk.e.shape == (0, 3)
+    np.testing.assert_array_equal(chunk.a, np.arange(6.0).reshape(3, 2))
+    assert set(store.load("c", keys=["a"]).keys()) == {"a"}
+
+
+def test_memmaps_are_read_only(store, prediction):
+    store.save_prediction("c", prediction)
+    with pytest.raises(ValueError):
+        store.load("c").depth[0, 0, 0] = 0
+
+
+def test_create_fills_in_place(store):
+    arrays = store.create("c", {"points": ((4, 3), np.float32), "ids": ((4,), "int64")})
+    assert not np.any(arrays["points"])
+    arrays["points"][:] = np.arange(12).reshape(4, 3)
+    arrays["ids"][:] = [3, 1, 4, 1]
+    # Not complete until committed
+    assert not store.exists("c")
+    store.commit("c")
+    assert store.exists("c")
+
+    chunk = store.load("c")
+    assert chunk.ids.dtype == np.int64
+    np.testing.assert_array_equal(chunk.points, np.arange(12).reshape(4, 3))
+    np.testing.assert_array_equal(chunk.ids, [3, 1, 4, 1])
+
+
+def test_create_over_existing_chunk_is_incomplete_until_commit(store, prediction):
+    store.save_prediction("c", prediction)
+    arrays = store.create("c", {"points": ((2, 3), np.float32)})
+    assert not store.exists("c")
+    arrays["points"][:] = 1
+    store.commit("c")
+    assert list(store.load("c").keys()) == ["points"]
+    np.testing.assert_array_equal(store.load("c").points, np.ones((2, 3)))
+
+
+def test_exists_needs_manifest(store, prediction):
+    assert not store.exists("c")
+    store.save_prediction("c", prediction)
+    assert store.exists("c")
+    os.remove(os.path.join(store.root, "c", MANIFEST))
+    assert not store.exists("c")
+
+
+def test_clear_reports_freed_bytes(store, prediction):
+    store.save_prediction("a", prediction)
+    store.save_prediction("b", prediction)
+    size = store.nbytes()
+    assert size > 2 * prediction.depth.nbytes
+
+    assert store.clear() == size
+    assert store.nbytes() == 0
+    assert os.listdir(store.root) == []
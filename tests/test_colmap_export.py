@@ -0,0 +1,113 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Round-trip tests of the COLMAP exporter through ``read_model``."""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+
+from depth_anything_3.utils.export.colmap import export_to_colmap
+from depth_anything_3.utils.read_write_model import read_model
+
+# Original images are twice the processed resolution
+SCALE = 2
+
+
+@pytest.fixture
+def image_paths(tmp_path, prediction):
+    n, h, w = prediction.depth.shape
+    paths = []
+    for i in range(n):
+        path = str(tmp_path / f"frame_{i:03d}.png")
+        PILImage.new("RGB", (w * SCALE, h * SCALE)).save(path)
+        paths.append(path)
+    return paths
+
+
+def export(prediction, image_paths, tmp_path, **kwargs):
+    export_dir = str(tmp_path / "sparse")
+    export_to_colmap(prediction, export_dir, image_paths, **kwargs)
+    return read_model(export_dir, ext=".bin")
+
+
+def confident_pixels(prediction, percentile=40.0):
+    conf = prediction.conf
+    return conf >= np.percentile(conf, percentile)
+
+
+def check_observations(prediction, images, points3D):
+    """Every point is seen by exactly one image, at the pixel it was unprojected from."""
+    _, h, w = prediction.depth.shape
+    seen = set()
+    for point_id, point in points3D.items():
+        assert len(point.image_ids) == 1 and len(point.point2D_idxs) == 1
+        image = images[point.image_ids[0]]
+        idx = point.point2D_idxs[0]
+        assert image.point3D_ids[idx] == point_id
+        seen.add(point_id)
+
+        # Back to the processed resolution, then unproject with the prediction
+        frame = image.id - 1
+        x, y = image.xys[idx] / SCALE
+        assert x == int(x) and y == int(y) and 0 <= x < w and 0 <= y < h
+        K = prediction.intrinsics[frame].astype(np.float64)
+        E = prediction.extrinsics[frame].astype(np.float64)
+        ray = np.linalg.solve(K, [x, y, 1.0]) * prediction.depth[frame, int(y), int(x)]
+        np.testing.assert_allclose(E[:, :3].T @ (ray - E[:, 3]), point.xyz, atol=1e-4)
+    assert seen == {pid for image in images.values() for pid in image.point3D_ids}
+
+
+def test_roundtrip(prediction, image_paths, tmp_path):
+    n, h, w = prediction.depth.shape
+    cameras, images, points3D = export(prediction, image_paths, tmp_path)
+
+    assert len(cameras) == len(images) == n
+    assert len(points3D) == confident_pixels(prediction).sum()
+    for i in range(n):
+        camera, image = cameras[i + 1], images[i + 1]
+        assert (camera.model, camera.width, camera.height) == ("PINHOLE", w * SCALE, h * SCALE)
+        K = prediction.intrinsics[i]
+        np.testing.assert_allclose(
+            camera.params, np.array([K[0, 0], K[1, 1], K[0, 2], K[1, 2]]) * SCALE, rtol=1e-6
+        )
+        assert image.camera_id == i + 1
+        assert image.name == os.path.basename(image_paths[i])
+        np.testing.assert_allclose(image.qvec2rotmat(), prediction.extrinsics[i, :, :3], atol=1e-6)
+        np.testing.assert_allclose(image.tvec, prediction.extrinsics[i, :, 3], atol=1e-6)
+        assert len(image.point3D_ids) == confident_pixels(prediction)[i].sum()
+    check_observations(prediction, images, points3D)
+
+    # Colours come from the processed images
+    for point in points3D.values():
+        image = images[point.image_ids[0]]
+        x, y = (image.xys[point.point2D_idxs[0]] / SCALE).astype(int)
+        np.testing.assert_array_equal(point.rgb, prediction.processed_images[image.id - 1, y, x])
+
+
+def test_num_max_points(prediction, image_paths, tmp_path):
+    _, images, points3D = export(prediction, image_paths, tmp_path, num_max_points=50)
+    assert len(points3D) == 50
+    assert sum(len(image.point3D_ids) for image in images.values()) == 50
+    check_observations(prediction, images, points3D)
+
+
+def test_voxel_size(prediction, image_paths, tmp_path):
+    _, images, points3D = export(prediction, image_paths, tmp_path, voxel_size=0.2)
+    assert 0 < len(points3D) < confident_pixels(prediction).sum()
+    for point in points3D.values():
+        assert len(point.image_ids) == 1
+        assert images[point.image_ids[0]].point3D_ids[point.point2D_idxs[0]] == point.id
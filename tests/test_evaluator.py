@@ -0,0 +1,65 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the config hashes under which benchmark outputs are cached."""
+
+import os
+
+import pytest
+
+# The benchmark metrics need a working open3d
+pytest.importorskip("open3d", exc_type=ImportError)
+
+from depth_anything_3.bench.dataset import Dataset  # noqa: E402
+from depth_anything_3.bench.evaluator import Evaluator  # noqa: E402
+from depth_anything_3.bench.registries import MV_REGISTRY  # noqa: E402
+
+
+@MV_REGISTRY.register(name="toy")
+class ToyDataset(Dataset):
+    SCENES = ["scene"]
+    voxel_length = 0.01
+    eval_threshold = 0.05
+
+
+@pytest.fixture
+def evaluator(tmp_path):
+    return Evaluator(work_dir=str(tmp_path / "work"), datas=["toy"], num_fusion_workers=1)
+
+
+def recon_key(evaluator):
+    export_dir = evaluator._export_dir("toy", "scene", posed=False)
+    result_path = os.path.join(export_dir, "exports", "mini_npz", "results.npz")
+    os.makedirs(os.path.dirname(result_path), exist_ok=True)
+    if not os.path.exists(result_path):
+        open(result_path, "wb").close()
+    return evaluator._recon_job_args("toy", "scene", "recon_unposed")[-1]
+
+
+def test_infer_hash_covers_process_res(evaluator):
+    key = evaluator._infer_hash("toy", "scene", False, "model", "mini_npz")
+    evaluator.process_res = 756
+    assert evaluator._infer_hash("toy", "scene", False, "model", "mini_npz") != key
+
+
+def test_recon_key_covers_dataset_settings(evaluator, monkeypatch):
+    key = recon_key(evaluator)
+    assert recon_key(evaluator) == key
+    for name, value in (("voxel_length", 0.02), ("eval_threshold", 0.1)):
+        with monkeypatch.context() as m:
+            m.setattr(ToyDataset, name, value)
+            assert recon_key(evaluator) != key
+    with monkeypatch.context() as m:
+        m.setattr(ToyDataset, "consist_dist_thresh", 0.05)
+        assert recon_key(evaluator) != key
@@ -0,0 +1,90 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the batched multi-view consistency fusion."""
+
+import numpy as np
+import pytest
+import torch
+
+from depth_anything_3.bench import fusion
+from depth_anything_3.bench.fusion import (
+    consistency_masks,
+    fuse_consistent_points,
+    projection_matrices,
+)
+
+HEIGHT, WIDTH, PLANE_Z = 12, 16, 5.0
+
+
+@pytest.fixture
+def plane_views():
+    """Fronto-parallel cameras shifted sideways in front of the plane z = PLANE_Z."""
+    centres = np.array([[0.0, 0, 0], [0.2, 0, 0], [0, 0.2, 0], [0.2, 0.2, 0.5]])
+    intrinsics = np.tile(
+        np.array([[20.0, 0, WIDTH / 2], [0, 20.0, HEIGHT / 2], [0, 0, 1]], np.float32),
+        (len(centres), 1, 1),
+    )
+    extrinsics = np.tile(np.eye(4, dtype=np.float32), (len(centres), 1, 1))
+    extrinsics[:, :3, 3] = -centres
+    depths = np.stack(
+        [np.full((HEIGHT, WIDTH), PLANE_Z - c[2], np.float32) for c in centres]
+    )
+    return depths, projection_matrices(intrinsics, extrinsics)
+
+
+def test_plane_is_consistent(plane_views):
+    depths, proj = plane_views
+    masks = consistency_masks(depths, proj, dist_thresh=0.01, num_consist=2, device="cpu")
+    # Cameras overlap almost entirely; only border pixels may miss their neighbours
+    assert masks.mean() > 0.8
+
+    points = fuse_consistent_points(depths, proj, 0.01, num_consist=2, device="cpu")
+    assert len(points) == masks.sum()
+    np.testing.assert_allclose(points[:, 2], PLANE_Z, atol=1e-4)
+
+
+def test_inconsistent_view_is_dropped(plane_views):
+    depths, proj = plane_views
+    depths[1] *= 1.5
+    depths[2, :3] = 0
+    masks = consistency_masks(depths, proj, dist_thresh=0.01, num_consist=2, device="cpu")
+
+    assert not masks[1].any()
+    assert not masks[2, :3].any()
+    assert masks[0].mean() > 0.8
+    # Every view is consistent with itself
+    assert consistency_masks(depths, proj, 0.01, 1, device="cpu")[1].all()
+
+
+def test_batching_does_not_change_results(plane_views):
+    depths, proj = plane_views
+    depths = depths + np.random.default_rng(0).normal(scale=0.005, size=depths.shape)
+    depths = depths.astype(np.float32)
+    one_view = fusion._FLOATS_PER_PIXEL * 4 * HEIGHT * WIDTH
+    results = [
+        fuse_consistent_points(depths, proj, 0.01, 3, device="cpu", memory_budget=budget)
+        for budget in (one_view, 3 * one_view, None)
+    ]
+    for result in results[1:]:
+        np.testing.assert_allclose(result, results[0], atol=1e-6)
+
+
+def test_reference_batch_size():
+    one_view = fusion._FLOATS_PER_PIXEL * 4 * HEIGHT * WIDTH
+    cpu = torch.device("cpu")
+    assert fusion._reference_batch_size(HEIGHT, WIDTH, cpu, 5 * one_view) == 5
+    assert fusion._reference_batch_size(HEIGHT, WIDTH, cpu, 1) == 1
+    default = fusion._reference_batch_size(HEIGHT, WIDTH, cpu, None)
+    assert default == fusion.FUSION_MEMORY_BUDGET // one_view
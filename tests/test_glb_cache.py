@@ -0,0 +1,118 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the incremental GLB re-export cache."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from scenes import make_prediction
+
+from depth_anything_3.utils.export.glb import (
+    ConfSortedPoints,
+    GLBExportCache,
+    export_to_glb,
+    get_conf_thresh,
+)
+from depth_anything_3.utils.unprojection import depth_to_point_cloud
+
+# Each export changes one option of the previous one, or repeats it
+OPTION_SEQUENCE = [
+    {},
+    {"conf_thresh_percentile": 70.0},
+    {"conf_thresh_percentile": 70.0, "show_cameras": False},
+    {"conf_thresh_percentile": 70.0, "camera_size": 0.1},
+    {"conf_thresh_percentile": 70.0, "filter_black_bg": True},
+    {"conf_thresh_percentile": 70.0, "filter_black_bg": True, "filter_white_bg": True},
+    {"filter_white_bg": True, "conf_thresh": 1.6},
+    {"filter_white_bg": True, "voxel_size": 0.05},
+    {"num_max_points": 300},
+    {"num_max_points": 300, "show_cameras": False},
+    {},
+]
+
+
+def make_scene(seed=0):
+    """Prediction with black and white background pixels for the filters to remove."""
+    prediction = make_prediction(num_frames=4, height=12, width=16, seed=seed)
+    prediction.processed_images[:, :3] = 0
+    prediction.processed_images[:, -3:] = 255
+    return prediction
+
+
+def export(prediction, path, options, cache=None):
+    np.random.seed(0)
+    return export_to_glb(prediction, str(path), export_depth_vis=False, cache=cache, **options)
+
+
+def test_cached_reexports_match_fresh_exports(tmp_path):
+    prediction, cache = make_scene(), GLBExportCache()
+    conf = prediction.conf.copy()
+    for i, options in enumerate(OPTION_SEQUENCE):
+        cached = export(prediction, tmp_path / f"cached_{i}", options, cache)
+        fresh = export(make_scene(), tmp_path / f"fresh_{i}", options)
+        with open(cached, "rb") as a, open(fresh, "rb") as b:
+            assert a.read() == b.read(), options
+    # The background filters work on a copy of the confidences
+    np.testing.assert_array_equal(prediction.conf, conf)
+
+
+def test_cache_rebuilds_only_changed_entries():
+    prediction, cache = make_scene(), GLBExportCache()
+    builds = []
+
+    def get(name, key, prediction=prediction):
+        return cache.get(prediction, name, key, lambda: builds.append(name) or len(builds))
+
+    assert get("a", (1,)) == 1 and get("b", (1,)) == 2
+    assert get("a", (1,)) == 1 and get("b", (1,)) == 2
+    assert get("a", (2,)) == 3 and get("b", (1,)) == 2
+    # An equal but different prediction object starts over
+    other = make_scene()
+    assert get("b", (1,), other) == 4 and get("a", (2,), other) == 5
+    assert builds == ["a", "b", "a", "b", "a"]
+
+
+@pytest.mark.parametrize("filter_black_bg,filter_white_bg", [(False, False), (True, True)])
+@pytest.mark.parametrize("conf_thresh", [0.0, 1.3, 1.6, 3.0])
+def test_conf_sorted_points_select(filter_black_bg, filter_white_bg, conf_thresh):
+    prediction = make_scene()
+    sorted_points = ConfSortedPoints.from_prediction(
+        prediction, filter_black_bg=filter_black_bg, filter_white_bg=filter_white_bg
+    )
+
+    conf = prediction.conf.copy()
+    if filter_black_bg:
+        conf[(prediction.processed_images < 16).all(axis=-1)] = 1.0
+    if filter_white_bg:
+        conf[(prediction.processed_images >= 240).all(axis=-1)] = 1.0
+    threshold = get_conf_thresh(SimpleNamespace(conf=conf), None, conf_thresh)
+    assert sorted_points.conf_thresh(conf_thresh) == pytest.approx(threshold)
+
+    points, colors, weights = sorted_points.select(threshold)
+    expected_points, expected_colors = depth_to_point_cloud(
+        prediction.depth,
+        prediction.intrinsics,
+        prediction.extrinsics,
+        images=prediction.processed_images,
+        conf=conf,
+        conf_thresh=threshold,
+    )
+    assert np.all(weights >= threshold) and np.all(np.diff(weights) >= 0)
+    # Same set of points, in confidence instead of pixel order
+    order = np.lexsort(points.T)
+    expected_order = np.lexsort(expected_points.T)
+    np.testing.assert_array_equal(points[order], expected_points[expected_order])
+    np.testing.assert_array_equal(colors[order], expected_colors[expected_order])
@@ -0,0 +1,106 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the pipelined 3DGS video export, with rendering replaced by synthetic chunks."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from depth_anything_3.utils.export import gs
+
+
+def fake_chunks(fail_after=None):
+    def iter_render_chunks(gaussians, extrinsics, intrinsics, image_shape, chunk_size, **_):
+        b, v = extrinsics.shape[:2]
+        for s in range(0, v, chunk_size):
+            if fail_after is not None and s >= fail_after:
+                raise RuntimeError("render failed")
+            e = min(s + chunk_size, v)
+            depth = torch.rand(b, e - s, *image_shape) + 1
+            yield s, torch.rand(b, e - s, 3, *image_shape), depth
+
+    return iter_render_chunks
+
+
+@pytest.fixture
+def gs_prediction(prediction):
+    prediction.gaussians = SimpleNamespace(means=torch.zeros(1, 1, 3))
+    return prediction
+
+
+def export(prediction, path):
+    gs.export_to_gs_video(
+        prediction,
+        str(path),
+        chunk_size=2,
+        trj_mode="original",
+        vis_depth=None,
+        enable_tqdm=False,
+        output_name="video",
+    )
+
+
+def test_export_writes_video(tmp_path, gs_prediction, monkeypatch):
+    monkeypatch.setattr(gs, "iter_render_chunks", fake_chunks())
+    export(gs_prediction, tmp_path)
+    assert os.path.getsize(tmp_path / "gs_video" / "video.mp4") > 0
+
+
+def test_render_error_is_not_masked_by_encoder_error(tmp_path, gs_prediction, monkeypatch):
+    monkeypatch.setattr(gs, "iter_render_chunks", fake_chunks(fail_after=2))
+
+    def failing_encode(self, *args):
+        raise ValueError("encode failed")
+
+    monkeypatch.setattr(gs._VideoEncoderThread, "_encode", failing_encode)
+    with pytest.raises(RuntimeError, match="render failed"):
+        export(gs_prediction, tmp_path)
+
+
+def test_encoder_error_is_raised_on_finish(tmp_path, gs_prediction, monkeypatch):
+    monkeypatch.setattr(gs, "iter_render_chunks", fake_chunks())
+
+    def failing_encode(self, *args):
+        raise ValueError("encode failed")
+
+    monkeypatch.setattr(gs._VideoEncoderThread, "_encode", failing_encode)
+    with pytest.raises(ValueError, match="encode failed"):
+        export(gs_prediction, tmp_path)
+
+
+def test_encoder_releases_staging_slots(tmp_path):
+    encoder = gs._VideoEncoderThread(
+        [str(tmp_path / "a.mp4")], fps=4, ffmpeg_params=[], vis_depth=None, depth_range=None
+    )
+    encoder.start()
+    released = []
+    color = torch.zeros(1, 2, 3, 16, 16, dtype=torch.uint8)
+    encoder.put(color, torch.ones(1, 2, 16, 16), None, lambda: released.append(0))
+    # A chunk that fails to encode still hands its slot back, as do the ones after it
+    encoder.put(None, None, None, lambda: released.append(1))
+    encoder.put(color, torch.ones(1, 2, 16, 16), None, lambda: released.append(2))
+    with pytest.raises(TypeError):
+        encoder.finish()
+    assert released == [0, 1, 2]
+
+
+def test_staging_ring_passes_cpu_chunks_through():
+    ring = gs._PinnedStagingRing(2)
+    depth = torch.ones(1, 2, 4, 4)
+    color, host_depth, event, release = ring.copy(torch.full((1, 2, 3, 4, 4), 0.5), depth)
+    assert color.dtype == torch.uint8 and int(color[0, 0, 0, 0, 0]) == 127
+    assert host_depth is depth and event is None and release is None
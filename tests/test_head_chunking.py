@@ -0,0 +1,152 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the adaptive view chunking of the DPT / DualDPT heads."""
+
+import pytest
+import torch
+
+from depth_anything_3.model.dpt import DPT
+from depth_anything_3.model.dualdpt import DualDPT
+from depth_anything_3.model.utils import head_chunking
+from depth_anything_3.model.utils.head_chunking import (
+    DEFAULT_HEAD_CHUNK,
+    MAX_HEAD_CHUNK,
+    run_head_chunks,
+)
+
+H, W = 28, 42
+FEATURES = 16
+
+
+class _Head(torch.nn.Module):
+    """Stand-in exposing the attribute the CPU estimate reads."""
+
+    def __init__(self):
+        super().__init__()
+        self.scratch = torch.nn.Module()
+        self.scratch.output_conv1 = torch.nn.Conv2d(FEATURES, 1, 1)
+
+
+def _recorder():
+    calls = []
+
+    def run(s0, s1):
+        calls.append((s0, s1))
+        return {"x": torch.arange(s0, s1)}
+
+    return run, calls
+
+
+def _free(monkeypatch, free):
+    monkeypatch.setattr(head_chunking, "_free_bytes", lambda device: free)
+
+
+def _per_view():
+    return 4 * head_chunking._CPU_FLOATS_PER_PIXEL_FEATURE * FEATURES * H * W
+
+
+@pytest.mark.parametrize(
+    "chunk_size,expected",
+    [
+        (None, [(0, 7)]),
+        (7, [(0, 7)]),
+        (100, [(0, 7)]),
+        (3, [(0, 3), (3, 6), (6, 7)]),
+        (1, [(i, i + 1) for i in range(7)]),
+    ],
+)
+def test_fixed_chunk_sizes_cover_views_in_order(chunk_size, expected):
+    run, calls = _recorder()
+    outputs = run_head_chunks(_Head(), run, 7, chunk_size, H, W, torch.zeros(1))
+    assert calls == expected
+    assert torch.equal(torch.cat([o["x"] for o in outputs]), torch.arange(7))
+
+
+def test_auto_decodes_first_view_alone_and_caches(monkeypatch):
+    # Room for exactly three views in the usable share of free memory
+    _free(monkeypatch, 3 * _per_view() / head_chunking.HEAD_MEMORY_FRACTION)
+    head, ref = _Head(), torch.zeros(1)
+    run, calls = _recorder()
+    outputs = run_head_chunks(head, run, 8, "auto", H, W, ref)
+    assert calls == [(0, 1), (1, 4), (4, 7), (7, 8)]
+    assert torch.equal(torch.cat([o["x"] for o in outputs]), torch.arange(8))
+    assert head._auto_chunk_sizes == {(H, W, ref.device, ref.dtype): 3}
+
+    # Cached: no lone first view, and free memory is not read again
+    _free(monkeypatch, None)
+    run, calls = _recorder()
+    run_head_chunks(head, run, 8, "auto", H, W, ref)
+    assert calls == [(0, 3), (3, 6), (6, 8)]
+
+
+def test_auto_cache_is_keyed_by_resolution_and_dtype(monkeypatch):
+    _free(monkeypatch, None)
+    head = _Head()
+    run, _ = _recorder()
+    run_head_chunks(head, run, 2, "auto", H, W, torch.zeros(1))
+    run_head_chunks(head, run, 2, "auto", 2 * H, W, torch.zeros(1))
+    run_head_chunks(head, run, 2, "auto", H, W, torch.zeros(1, dtype=torch.float16))
+    assert len(head._auto_chunk_sizes) == 3
+
+
+@pytest.mark.parametrize(
+    "free,expected",
+    [(None, DEFAULT_HEAD_CHUNK), (0.0, 1), (1e18, MAX_HEAD_CHUNK)],
+)
+def test_auto_chunk_size_is_clamped(monkeypatch, free, expected):
+    _free(monkeypatch, free)
+    head = _Head()
+    run, calls = _recorder()
+    run_head_chunks(head, run, 2, "auto", H, W, torch.zeros(1))
+    assert calls == [(0, 1), (1, 2)]
+    assert list(head._auto_chunk_sizes.values()) == [expected]
+
+
+def test_auto_single_view(monkeypatch):
+    _free(monkeypatch, None)
+    run, calls = _recorder()
+    outputs = run_head_chunks(_Head(), run, 1, "auto", H, W, torch.zeros(1))
+    assert calls == [(0, 1)]
+    assert len(outputs) == 1
+
+
+def _feats(dim, num_views, seed=0):
+    g = torch.Generator().manual_seed(seed)
+    tokens = (H // 14) * (W // 14)
+    return [(torch.randn(1, num_views, tokens, dim, generator=g),) for _ in range(4)]
+
+
+@pytest.mark.parametrize(
+    "make_head",
+    [
+        lambda: DPT(32, output_dim=2, features=FEATURES, out_channels=(8, 16, 32, 32)),
+        lambda: DualDPT(32, features=FEATURES, out_channels=(8, 16, 32, 32)),
+    ],
+    ids=["dpt", "dualdpt"],
+)
+@pytest.mark.parametrize("chunk_size", [2, "auto"])
+def test_chunked_head_matches_single_pass(monkeypatch, make_head, chunk_size):
+    # Force several chunks under "auto" as well
+    _free(monkeypatch, 2 * _per_view() / head_chunking.HEAD_MEMORY_FRACTION)
+    torch.manual_seed(0)
+    head = make_head().eval()
+    feats = _feats(32, 5)
+    with torch.no_grad():
+        full = head(feats, H, W, patch_start_idx=0, chunk_size=None)
+        chunked = head(feats, H, W, patch_start_idx=0, chunk_size=chunk_size)
+    assert full.keys() == chunked.keys()
+    for key in full:
+        assert chunked[key].shape[:2] == (1, 5)
+        torch.testing.assert_close(chunked[key], full[key], rtol=1e-4, atol=1e-5)
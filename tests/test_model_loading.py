@@ -0,0 +1,63 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of loading checkpoints into models built on the meta device."""
+
+from itertools import chain
+
+import torch
+
+from depth_anything_3.api import DepthAnything3
+from depth_anything_3.utils.model_loading import load_weights
+
+
+class _Module(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = torch.nn.Linear(3, 2)
+        self.register_buffer("stats", torch.zeros(2))
+        # Built off the meta device and missing from the state dict, like sh_mask
+        self.register_buffer("mask", torch.arange(4.0, device="cpu"), persistent=False)
+
+
+def test_load_weights_assigns_and_fills():
+    reference = _Module()
+    with torch.device("meta"):
+        model = _Module()
+    state_dict = {"linear.weight": reference.linear.weight.detach().double()}
+    missed, unexpected = load_weights(model, state_dict)
+
+    assert sorted(missed) == ["linear.bias", "stats"] and unexpected == []
+    assert model.linear.weight.dtype == torch.float32
+    torch.testing.assert_close(model.linear.weight, reference.linear.weight)
+    assert isinstance(model.linear.bias, torch.nn.Parameter)
+    assert not torch.any(model.linear.bias) and not torch.any(model.stats)
+    torch.testing.assert_close(model.mask, torch.arange(4.0))
+
+
+def test_load_weights_moves_every_tensor_to_the_device():
+    with torch.device("meta"):
+        model = _Module()
+    load_weights(model, {}, device="meta")
+    assert all(t.is_meta for t in chain(model.parameters(), model.buffers()))
+
+
+def test_gs_preset_tensors_follow_the_load_device():
+    # The meta device stands in for an accelerator: it needs no memory for the weights
+    with torch.device("meta"):
+        model = DepthAnything3(model_name="da3-giant")
+    assert model.model.gs_adapter.sh_mask.device.type == "cpu"
+    load_weights(model, {}, device="meta")
+    devices = {t.device.type for t in chain(model.parameters(), model.buffers())}
+    assert devices == {"meta"}
@@ -0,0 +1,93 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the nearest-neighbour backends against SciPy's cKDTree."""
+
+import numpy as np
+import pytest
+from scipy.spatial import cKDTree
+
+from depth_anything_3.bench import nn_search
+from depth_anything_3.bench.nn_search import chamfer_metrics, nn_distances
+
+MAX_DIST = 0.05
+
+
+@pytest.fixture
+def clouds():
+    rng = np.random.default_rng(0)
+    # Far from the origin, so float32 backends must keep precision
+    reference = rng.uniform(0, 1, size=(4000, 3)) + 1000.0
+    query = np.concatenate(
+        [
+            reference[:1500] + rng.normal(scale=0.01, size=(1500, 3)),
+            rng.uniform(0, 1, size=(1500, 3)) + 1000.0,
+            rng.uniform(0, 1, size=(200, 3)) + 1005.0,
+        ]
+    )
+    return reference, query
+
+
+@pytest.mark.parametrize("method", ["brute", "grid", "kdtree", "auto"])
+@pytest.mark.parametrize("max_dist", [None, MAX_DIST])
+def test_matches_ckdtree(clouds, method, max_dist):
+    reference, query = clouds
+    if method == "grid" and max_dist is None:
+        with pytest.raises(ValueError):
+            nn_distances(reference, query, max_dist, method, device="cpu")
+        return
+    expected, _ = cKDTree(reference).query(query)
+    if max_dist is not None:
+        expected[expected > max_dist] = np.inf
+
+    timings = {}
+    dist = nn_distances(reference, query, max_dist, method, device="cpu", timings=timings)
+
+    assert dist.shape == (len(query),)
+    assert timings["method"] == ("brute" if method == "auto" else method)
+    np.testing.assert_array_equal(np.isinf(dist), np.isinf(expected))
+    finite = np.isfinite(expected)
+    np.testing.assert_allclose(dist[finite], expected[finite], atol=1e-5)
+
+
+def test_auto_falls_back_to_kdtree(clouds, monkeypatch):
+    monkeypatch.setattr(nn_search, "BRUTE_FORCE_PAIRS", 0)
+    timings = {}
+    nn_distances(*clouds, max_dist=MAX_DIST, device="cpu", timings=timings)
+    assert timings["method"] == "kdtree"
+
+
+def test_chamfer_metrics(clouds):
+    reference, query = clouds
+    metrics = chamfer_metrics(query, reference, threshold=0.02, device="cpu")
+    d_pred, _ = cKDTree(reference).query(query)
+    d_gt, _ = cKDTree(query).query(reference)
+    precision, recall = np.mean(d_pred < 0.02), np.mean(d_gt < 0.02)
+
+    assert metrics["acc"] == pytest.approx(d_pred.mean())
+    assert metrics["comp"] == pytest.approx(d_gt.mean())
+    assert metrics["precision"] == pytest.approx(precision)
+    assert metrics["recall"] == pytest.approx(recall)
+    assert metrics["fscore"] == pytest.approx(2 * precision * recall / (precision + recall))
+
+    truncated = chamfer_metrics(query, reference, 0.02, max_dist=MAX_DIST, device="cpu")
+    assert truncated["acc"] == pytest.approx(d_pred[d_pred <= MAX_DIST].mean())
+    with pytest.raises(ValueError):
+        chamfer_metrics(query, reference, 0.02, max_dist=0.01)
+
+
+def test_empty_inputs():
+    assert len(nn_distances(np.zeros((0, 3)), np.ones((4, 3)))) == 0
+    metrics = chamfer_metrics(np.zeros((0, 3)), np.ones((4, 3)), threshold=0.1)
+    assert metrics["fscore"] == 0.0 and metrics["acc"] == float("inf")
@@ -0,0 +1,119 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the conversion of model outputs to Prediction objects."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+from depth_anything_3.api import DepthAnything3
+from depth_anything_3.utils.io.output_processor import (
+    IMAGENET_MEAN,
+    IMAGENET_STD,
+    OutputProcessor,
+)
+
+N, H, W = 3, 10, 14
+
+
+def make_output(seed=0):
+    g = torch.Generator().manual_seed(seed)
+    return {
+        "depth": torch.rand(1, N, H, W, 1, generator=g) * 10 + 0.1,
+        "depth_conf": torch.rand(1, N, H, W, generator=g) + 1,
+        "extrinsics": torch.randn(1, N, 3, 4, generator=g),
+        "intrinsics": torch.randn(1, N, 3, 3, generator=g),
+        "sky": torch.rand(1, N, H, W, generator=g),
+    }
+
+
+def make_images(seed=0):
+    g = torch.Generator().manual_seed(seed)
+    pixels = torch.randint(0, 256, (1, N, 3, H, W), generator=g, dtype=torch.uint8)
+    mean = torch.tensor(IMAGENET_MEAN)[:, None, None]
+    std = torch.tensor(IMAGENET_STD)[:, None, None]
+    return pixels, (pixels.float() / 255 - mean) / std
+
+
+def test_float32_output():
+    output = make_output()
+    pred = OutputProcessor()(output)
+    assert pred.depth.dtype == np.float32 and pred.conf.dtype == np.float32
+    np.testing.assert_array_equal(pred.depth, output["depth"][0, ..., 0].numpy())
+    np.testing.assert_array_equal(pred.conf, output["depth_conf"][0].numpy())
+    assert pred.sky.dtype == bool
+    np.testing.assert_array_equal(pred.sky, output["sky"][0].numpy() >= 0.5)
+    assert pred.processed_images is None
+
+
+def test_float16_output_casts_depth_and_conf_only():
+    output = make_output()
+    pred = OutputProcessor(depth_dtype=torch.float16)(output)
+    assert pred.depth.dtype == np.float16 and pred.depth.shape == (N, H, W)
+    assert pred.conf.dtype == np.float16 and pred.conf.shape == (N, H, W)
+    np.testing.assert_allclose(pred.depth, output["depth"][0, ..., 0].numpy(), rtol=1e-3)
+    np.testing.assert_allclose(pred.conf, output["depth_conf"][0].numpy(), rtol=1e-3)
+    assert pred.extrinsics.dtype == np.float32
+    assert pred.intrinsics.dtype == np.float32
+    np.testing.assert_array_equal(pred.extrinsics, output["extrinsics"][0].numpy())
+
+
+def test_processed_images_roundtrip_to_uint8():
+    pixels, images = make_images()
+    pred = OutputProcessor(depth_dtype=torch.float16)(make_output(), images)
+    assert pred.processed_images.dtype == np.uint8
+    np.testing.assert_array_equal(pred.processed_images, pixels[0].permute(0, 2, 3, 1).numpy())
+
+
+def test_set_output_dtype():
+    api = SimpleNamespace(output_processor=OutputProcessor())
+    DepthAnything3.set_output_dtype(api, "float16")
+    assert api.output_processor.depth_dtype is torch.float16
+    DepthAnything3.set_output_dtype(api, torch.float32)
+    assert api.output_processor.depth_dtype is torch.float32
+    with pytest.raises(ValueError):
+        DepthAnything3.set_output_dtype(api, "bfloat16")
+
+
+@pytest.mark.parametrize("staging_bytes", [7, 64, 1 << 20])
+def test_staged_copy_matches_and_reuses_bounded_buffer(staging_bytes):
+    # Byte sizes that do not line up with the staging windows
+    tensors = [torch.rand(5, 3), torch.rand(4, dtype=torch.float64), torch.rand(9) > 0.5]
+    packed = torch.cat([t.reshape(-1).view(torch.uint8) for t in tensors])
+    processor = OutputProcessor(staging_bytes=staging_bytes)
+    for _ in range(2):
+        arrays = [np.empty(tuple(t.shape), dtype=t.numpy().dtype) for t in tensors]
+        processor._copy_to_host(packed, [a.reshape(-1).view(np.uint8) for a in arrays])
+        for array, tensor in zip(arrays, tensors):
+            np.testing.assert_array_equal(array, tensor.numpy())
+        staging = processor._staging
+        assert staging.numel() == min(packed.numel(), staging_bytes)
+    processor._copy_to_host(packed[:5], [np.empty(5, dtype=np.uint8)])
+    assert processor._staging is staging
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires CUDA")
+def test_cuda_output_is_pageable():
+    output = {k: v.cuda() for k, v in make_output().items()}
+    _, images = make_images()
+    processor = OutputProcessor(depth_dtype=torch.float16, staging_bytes=100)
+    pred = processor(output, images.cuda())
+    assert pred.depth.dtype == np.float16
+    np.testing.assert_array_equal(pred.sky, output["sky"][0].cpu().numpy() >= 0.5)
+    np.testing.assert_allclose(pred.conf, output["depth_conf"][0].cpu().numpy(), rtol=1e-3)
+    assert processor._staging.is_pinned() and processor._staging.numel() == 100
+    assert not torch.from_numpy(pred.depth).is_pinned()
@@ -0,0 +1,97 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the Gradio app's persistent prediction cache."""
+
+import os
+
+import numpy as np
+import pytest
+import torch
+
+# The app package imports Gradio
+pytest.importorskip("gradio")
+
+from depth_anything_3.app.modules.prediction_cache import PredictionCache  # noqa: E402
+from depth_anything_3.specs import Gaussians  # noqa: E402
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PredictionCache(str(tmp_path / "cache"), max_entries=2)
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"{i}.png"
+        path.write_bytes(bytes([i]) * 64)
+        paths.append(str(path))
+    return paths
+
+
+def test_key_covers_contents_order_and_params(cache, image_paths):
+    key = cache.key(image_paths, model="a", method="upper_bound_resize")
+    assert key == cache.key(image_paths, method="upper_bound_resize", model="a")
+    assert key != cache.key(image_paths[::-1], model="a", method="upper_bound_resize")
+    assert key != cache.key(image_paths, model="b", method="upper_bound_resize")
+    with open(image_paths[0], "ab") as f:
+        f.write(b"\1")
+    assert key != cache.key(image_paths, model="a", method="upper_bound_resize")
+
+
+def test_round_trip(cache, prediction):
+    prediction.scale_factor = 2.5
+    prediction.gaussians = Gaussians(
+        means=torch.randn(1, 5, 3),
+        scales=torch.rand(1, 5, 3),
+        rotations=torch.randn(1, 5, 4),
+        harmonics=torch.randn(1, 5, 3, 1),
+        opacities=torch.rand(1, 5),
+    )
+    assert cache.load("missing") is None
+    cache.save("k", prediction)
+    loaded = cache.load("k")
+
+    assert loaded.is_metric == prediction.is_metric
+    assert loaded.scale_factor == 2.5
+    assert loaded.sky is None
+    for name in ("depth", "conf", "extrinsics", "intrinsics", "processed_images"):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(prediction, name))
+    for name in ("means", "scales", "rotations", "harmonics", "opacities"):
+        torch.testing.assert_close(
+            getattr(loaded.gaussians, name), getattr(prediction.gaussians, name)
+        )
+
+    # Copy-on-write: in-place edits do not reach the cache
+    loaded.depth[:] = 0
+    np.testing.assert_array_equal(cache.load("k").depth, prediction.depth)
+
+
+def test_evicts_least_recently_used(cache, prediction):
+    for i, key in enumerate(("a", "b")):
+        cache.save(key, prediction)
+        meta = os.path.join(cache.cache_dir, key, "meta.json")
+        os.utime(meta, (i, i))
+    assert cache.load("a") is not None  # now the most recently used
+    cache.save("c", prediction)
+
+    assert sorted(os.listdir(cache.cache_dir)) == ["a", "c"]
+
+
+def test_unreadable_entry_is_a_miss(cache, prediction):
+    cache.save("k", prediction)
+    os.remove(os.path.join(cache.cache_dir, "k", "depth.npy"))
+    assert cache.load("k") is None
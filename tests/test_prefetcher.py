@@ -0,0 +1,98 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the prefetching input loader."""
+
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from depth_anything_3.utils.io.input_processor import InputProcessor
+from depth_anything_3.utils.io.prefetcher import PrefetchLoader
+
+
+def make_chunks(num_chunks, num_images=2, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        [rng.integers(0, 256, (60, 80, 3), dtype=np.uint8) for _ in range(num_images)]
+        for _ in range(num_chunks)
+    ]
+
+
+def test_prefetched_chunks_match_direct_preprocessing():
+    chunks = make_chunks(3)
+    extrinsics = np.tile(np.eye(4, dtype=np.float32), (2, 1, 1))
+    extrinsics[:, 0, 3] = [0.0, 1.0]
+    intrinsics = np.tile(
+        np.array([[50.0, 0, 40], [0, 50.0, 30], [0, 0, 1]], np.float32), (2, 1, 1)
+    )
+    inputs = [chunks[0], (chunks[1], extrinsics, intrinsics), chunks[2]]
+    processor = InputProcessor()
+
+    loader = PrefetchLoader(inputs, processor, "cpu", process_res=56, prefetch=2)
+    prepared = list(loader)
+
+    assert [p.index for p in prepared] == [0, 1, 2]
+    for chunk, item in zip(inputs, prepared):
+        images, ext, ixt = chunk if isinstance(chunk, tuple) else (chunk, None, None)
+        expected, expected_ext, _ = processor(
+            images,
+            ext.copy() if ext is not None else None,
+            ixt.copy() if ixt is not None else None,
+            56,
+            "upper_bound_resize",
+        )
+        imgs, ex_t, in_t = item.model_inputs()
+        assert torch.equal(imgs[0], expected.float())
+        assert (ex_t is None) == (ext is None) and (in_t is None) == (ixt is None)
+        if ext is not None:
+            assert torch.equal(ex_t[0], expected_ext.float())
+    assert loader.get_stats()["chunks"] == 3
+
+
+def test_prefetch_depth_is_bounded():
+    produced = []
+
+    def chunks():
+        for index, chunk in enumerate(make_chunks(8, num_images=1)):
+            produced.append(index)
+            yield chunk
+
+    loader = PrefetchLoader(chunks(), InputProcessor(), "cpu", process_res=56, prefetch=2)
+    for item in loader:
+        time.sleep(0.1)
+        # The queue holds at most `prefetch` chunks, plus one being prepared
+        assert len(produced) <= item.index + 1 + 2 + 1
+
+
+def test_producer_errors_reach_the_consumer():
+    def chunks():
+        yield make_chunks(1)[0]
+        raise OSError("unreadable image")
+
+    loader = PrefetchLoader(chunks(), InputProcessor(), "cpu", process_res=56)
+    items = []
+    with pytest.raises(OSError, match="unreadable image"):
+        for item in loader:
+            items.append(item)
+    assert len(items) == 1
+
+
+def test_early_exit_stops_the_producer():
+    loader = PrefetchLoader(make_chunks(20), InputProcessor(), "cpu", process_res=56, prefetch=1)
+    for item in loader:
+        break
+    assert loader.num_chunks == 1
@@ -0,0 +1,105 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the preprocessed-image cache."""
+
+import os
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from depth_anything_3.utils.io.input_processor import InputProcessor, PreprocessCache
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for i, size in enumerate([(90, 120), (120, 90), (100, 100)]):
+        path = str(tmp_path / f"{i}.png")
+        Image.fromarray(rng.integers(0, 256, (*size, 3), dtype=np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
+def intrinsics(num):
+    return np.tile(np.array([[80.0, 0, 60], [0, 80.0, 45], [0, 0, 1]], np.float32), (num, 1, 1))
+
+
+@pytest.mark.parametrize("method", ["upper_bound_resize", "lower_bound_crop"])
+def test_cache_hit_matches_miss(image_paths, method):
+    ixt = intrinsics(len(image_paths))
+    expected = InputProcessor()(image_paths[:1], None, ixt[:1].copy(), 112, method)
+    cache = PreprocessCache()
+    processor = InputProcessor(cache)
+
+    miss = processor(image_paths[:1], None, ixt[:1].copy(), 112, method)
+    hit = processor(image_paths[:1], None, ixt[:1].copy(), 112, method)
+    # An entry filled without intrinsics still serves calls with intrinsics
+    processor(image_paths[1:], None, None, 112, method)
+    hit_no_ixt_fill = processor(image_paths[1:], None, ixt[1:].copy(), 112, method)
+    reference = InputProcessor()(image_paths[1:], None, ixt[1:].copy(), 112, method)
+
+    for result in (miss, hit):
+        assert torch.equal(result[0], expected[0])
+        np.testing.assert_allclose(result[2], expected[2], rtol=1e-6)
+    assert torch.equal(hit_no_ixt_fill[0], reference[0])
+    np.testing.assert_allclose(hit_no_ixt_fill[2], reference[2], rtol=1e-6)
+    stats = cache.get_stats()
+    assert stats["hits"] == 3 and stats["misses"] == 3
+
+
+def test_modified_file_is_a_miss(image_paths):
+    cache = PreprocessCache()
+    processor = InputProcessor(cache)
+    processor(image_paths[:1], process_res=112)
+    stat = os.stat(image_paths[0])
+    Image.new("RGB", (120, 90), (255, 0, 0)).save(image_paths[0])
+    os.utime(image_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    result = processor(image_paths[:1], process_res=112)
+    assert cache.get_stats()["misses"] == 2
+    assert torch.equal(result[0], InputProcessor()(image_paths[:1], process_res=112)[0])
+
+
+def test_evicted_entries_spill_and_come_back(image_paths, tmp_path):
+    spill_dir = str(tmp_path / "spill")
+    one_image = InputProcessor()(image_paths[:1], process_res=112)[0][0]
+    cache = PreprocessCache(max_bytes=one_image.nbytes * 1.5, spill_dir=spill_dir)
+    processor = InputProcessor(cache)
+
+    first = processor(image_paths[:1], process_res=112)[0]
+    processor(image_paths[2:], process_res=112)
+    assert cache.get_stats()["spilled_entries"] == 1
+    assert len(os.listdir(spill_dir)) == 1
+
+    again = processor(image_paths[:1], process_res=112)[0]
+    assert torch.equal(again, first)
+    stats = cache.get_stats()
+    assert stats["spill_hits"] == 1 and stats["entries"] == 1
+
+
+def test_spill_store_is_capped(image_paths, tmp_path):
+    spill_dir = str(tmp_path / "spill")
+    one_image = InputProcessor()(image_paths[:1], process_res=112)[0][0]
+    cache = PreprocessCache(
+        max_bytes=one_image.nbytes, spill_dir=spill_dir, max_spill_bytes=one_image.nbytes
+    )
+    processor = InputProcessor(cache)
+    for path in image_paths:
+        processor([path], process_res=112)
+    assert cache.get_stats()["spill_bytes"] <= one_image.nbytes
+    assert len(os.listdir(spill_dir)) == cache.get_stats()["spilled_entries"]
@@ -0,0 +1,126 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Round-trip tests of the streaming PLY and GLB writers."""
+
+import numpy as np
+import pytest
+import trimesh
+from plyfile import PlyData
+from scipy.spatial import cKDTree
+
+from depth_anything_3.utils.export.stream_writers import (
+    StreamingGLBWriter,
+    StreamingPLYWriter,
+    read_glb,
+)
+
+
+@pytest.fixture
+def cloud():
+    rng = np.random.default_rng(0)
+    points = rng.normal(scale=[5.0, 1.0, 0.1], size=(1000, 3)) + [10.0, 0, 2]
+    colors = rng.integers(0, 256, size=(1000, 3), dtype=np.uint8)
+    return points.astype(np.float32), colors
+
+
+def load_glb_points(path):
+    """World-space points and RGB colours of all point primitives, via trimesh."""
+    scene = trimesh.load(path)
+    points, colors = [], []
+    for name in scene.graph.nodes_geometry:
+        transform, geometry = scene.graph[name]
+        cloud = scene.geometry[geometry]
+        if isinstance(cloud, trimesh.PointCloud):
+            points.append(trimesh.transform_points(cloud.vertices, transform))
+            colors.append(cloud.colors[:, :3])
+    return np.concatenate(points), np.concatenate(colors)
+
+
+def assert_same_cloud(points, colors, expected_points, expected_colors, atol):
+    assert len(points) == len(expected_points)
+    dist, idx = cKDTree(points).query(expected_points)
+    assert dist.max() <= atol
+    np.testing.assert_array_equal(colors[idx], expected_colors)
+
+
+def test_ply_round_trip(tmp_path, cloud):
+    points, colors = cloud
+    path = str(tmp_path / "cloud.ply")
+    with StreamingPLYWriter(path) as writer:
+        for begin in range(0, len(points), 300):
+            writer.write(points[begin : begin + 300], colors[begin : begin + 300])
+    assert writer.count == len(points)
+
+    vertex = PlyData.read(path)["vertex"]
+    np.testing.assert_array_equal(np.stack([vertex[k] for k in "xyz"], -1), points)
+    np.testing.assert_array_equal(
+        np.stack([vertex[k] for k in ("red", "green", "blue")], -1), colors
+    )
+
+
+def test_empty_ply(tmp_path):
+    path = str(tmp_path / "empty.ply")
+    StreamingPLYWriter(path).close()
+    assert PlyData.read(path)["vertex"].count == 0
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_glb_round_trip(tmp_path, cloud, quantize):
+    points, colors = cloud
+    path = str(tmp_path / "cloud.glb")
+    # A small JSON reservation forces the binary chunk to be shifted on close
+    with StreamingGLBWriter(path, quantize=quantize, chunk_size=256, json_reserve=64) as writer:
+        writer.write_points(points[:700], colors[:700])
+        writer.write_points(points[700:], colors[700:])
+    assert writer.num_points == len(points)
+
+    gltf, _ = read_glb(path)
+    assert len(gltf["meshes"]) == 5
+    assert ("KHR_mesh_quantization" in gltf.get("extensionsRequired", [])) == quantize
+    # int16 positions resolve each chunk's extent into 2 * 32767 steps
+    atol = 5e-4 * np.ptp(points, axis=0).max() if quantize else 1e-6
+    assert_same_cloud(*load_glb_points(path), points, colors, atol)
+
+
+def test_glb_lines_groups_and_append(tmp_path, cloud):
+    points, colors = cloud
+    tile = str(tmp_path / "tile.glb")
+    with StreamingGLBWriter(tile, quantize=True) as writer:
+        writer.write_points(points[:100], colors[:100])
+
+    path = str(tmp_path / "scene.glb")
+    with StreamingGLBWriter(path) as writer:
+        writer.write_points(points[100:], colors[100:])
+        first = writer.num_nodes
+        writer.write_lines(np.zeros((4, 2, 3)) + [[0, 0, 0], [1, 1, 1]], [255, 0, 0])
+        writer.group_nodes("cameras", first)
+        writer.append_glb(tile)
+        writer.extras = {"source": "test"}
+
+    gltf, data = read_glb(path)
+    assert len(data) == gltf["buffers"][0]["byteLength"]
+    assert gltf["scenes"][0]["extras"] == {"source": "test"}
+    assert "KHR_mesh_quantization" in gltf["extensionsUsed"]
+    cameras = [node for node in gltf["nodes"] if node.get("name") == "cameras"]
+    assert len(cameras) == 1 and len(cameras[0]["children"]) == 1
+    assert writer.num_points == len(points)
+    assert_same_cloud(*load_glb_points(path), points, colors, 5e-3)
+
+
+def test_read_glb_rejects_other_files(tmp_path):
+    path = tmp_path / "not.glb"
+    path.write_bytes(b"\0" * 32)
+    with pytest.raises(ValueError):
+        read_glb(str(path))
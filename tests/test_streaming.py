@@ -0,0 +1,136 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of sliding-window streaming inference and its Sim(3) alignment."""
+
+import copy
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+from scenes import make_prediction, random_sim3
+
+from depth_anything_3.api import DepthAnything3
+from depth_anything_3.utils.alignment import (
+    robust_weighted_estimate_sim3,
+    weighted_estimate_sim3,
+)
+from depth_anything_3.utils.streaming import (
+    apply_sim3_to_prediction,
+    estimate_overlap_sim3,
+    slice_prediction,
+)
+from depth_anything_3.utils.unprojection import depth_to_world_points
+
+
+def world_points(prediction):
+    return depth_to_world_points(prediction.depth, prediction.intrinsics, prediction.extrinsics)
+
+
+def inverse_sim3(scale, rotation, translation):
+    return 1.0 / scale, rotation.T, -rotation.T @ translation / scale
+
+
+def test_weighted_sim3_is_exact_on_clean_points():
+    rng = np.random.default_rng(0)
+    scale, rotation, translation = random_sim3(rng)
+    src = rng.normal(size=(500, 3))
+    tgt = scale * src @ rotation.T + translation
+
+    s, R, t = robust_weighted_estimate_sim3(
+        torch.from_numpy(src), torch.from_numpy(tgt), torch.ones(500)
+    )
+    assert abs(s - scale) < 1e-4
+    np.testing.assert_allclose(R, rotation, atol=1e-4)
+    np.testing.assert_allclose(t, translation, atol=1e-4)
+
+
+def test_robust_sim3_downweights_outliers():
+    rng = np.random.default_rng(0)
+    scale, rotation, translation = random_sim3(rng)
+    src = torch.from_numpy(rng.normal(size=(500, 3)))
+    tgt = scale * src @ torch.from_numpy(rotation).T + torch.from_numpy(translation)
+    tgt[:50] += torch.from_numpy(rng.normal(scale=5.0, size=(50, 3)))
+
+    robust_scale = robust_weighted_estimate_sim3(src, tgt, torch.ones(500))[0]
+    plain_scale = float(weighted_estimate_sim3(src.float(), tgt.float(), torch.ones(500))[0])
+    assert abs(robust_scale - scale) < 0.25 * abs(plain_scale - scale)
+
+
+def test_apply_sim3_transforms_world_points(prediction):
+    scale, rotation, translation = random_sim3(np.random.default_rng(1))
+    before = world_points(prediction)
+    moved = apply_sim3_to_prediction(copy.deepcopy(prediction), scale, rotation, translation)
+    np.testing.assert_allclose(
+        world_points(moved), scale * before @ rotation.T + translation, atol=1e-4
+    )
+
+
+def test_estimate_overlap_sim3(prediction):
+    scale, rotation, translation = random_sim3(np.random.default_rng(2))
+    ref_points = world_points(prediction)
+    points = (ref_points - translation) @ rotation / scale
+    s, R, t = estimate_overlap_sim3(ref_points, prediction.conf, points, prediction.conf)
+    assert abs(s - scale) < 1e-3
+    np.testing.assert_allclose(R, rotation, atol=1e-3)
+    np.testing.assert_allclose(t, translation, atol=1e-3)
+
+
+def test_slice_prediction_returns_views(prediction):
+    part = slice_prediction(prediction, 2, 5)
+    assert part.depth.shape[0] == 3 and part.extrinsics.shape[0] == 3
+    assert np.shares_memory(part.depth, prediction.depth)
+    np.testing.assert_array_equal(part.processed_images, prediction.processed_images[2:5])
+
+
+def test_inference_stream_aligns_windows_to_the_first(prediction):
+    """Each window is predicted in its own random frame; the stream undoes that."""
+    rng = np.random.default_rng(3)
+
+    def inference_chunks(windows, **kwargs):
+        for index, frames in enumerate(windows):
+            window = slice_prediction(prediction, frames[0], frames[-1] + 1)
+            window = copy.deepcopy(window)
+            if index > 0:
+                apply_sim3_to_prediction(window, *inverse_sim3(*random_sim3(rng)))
+            yield window
+
+    model = SimpleNamespace(inference_chunks=inference_chunks, _get_model_device=lambda: "cpu")
+    frames = list(
+        DepthAnything3.inference_stream(model, iter(range(6)), window=4, overlap=2)
+    )
+
+    assert [f.index for f in frames] == list(range(6))
+    assert [f.window_index for f in frames] == [0, 0, 0, 0, 1, 1]
+    np.testing.assert_allclose(np.stack([f.depth for f in frames]), prediction.depth, rtol=1e-3)
+    np.testing.assert_allclose(
+        np.stack([f.extrinsics for f in frames]), prediction.extrinsics, atol=1e-3
+    )
+
+
+def test_inference_stream_windows_do_not_repeat_overlap():
+    prediction = make_prediction(num_frames=7)
+
+    def inference_chunks(windows, **kwargs):
+        for frames in windows:
+            yield copy.deepcopy(slice_prediction(prediction, frames[0], frames[-1] + 1))
+
+    model = SimpleNamespace(inference_chunks=inference_chunks, _get_model_device=lambda: "cpu")
+    windows = list(
+        DepthAnything3.inference_stream(
+            model, iter(range(7)), window=4, overlap=1, yield_windows=True
+        )
+    )
+    assert [w.frame_indices for w in windows] == [[0, 1, 2, 3], [4, 5, 6]]
+    assert windows[1].prediction.depth.shape[0] == 3
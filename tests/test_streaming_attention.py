@@ -0,0 +1,96 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the tiled streaming-softmax attention against SDPA."""
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+from depth_anything_3.model.dinov2.layers.attention import (
+    Attention,
+    attention_score_bytes,
+    attention_tile_sizes,
+    set_attention_memory_budget,
+    streaming_attention,
+)
+
+B, H, NQ, NK, D = 2, 3, 150, 230, 16
+# Small enough for 64 x 64 tiles, so every call spans several query and key tiles
+TINY_BUDGET = 1
+
+
+@pytest.fixture
+def qkv():
+    torch.manual_seed(0)
+    return torch.randn(B, H, NQ, D), torch.randn(B, H, NK, D), torch.randn(B, H, NK, D)
+
+
+def key_padding_mask():
+    mask = torch.ones(B, 1, 1, NK, dtype=torch.bool)
+    mask[0, ..., 100:] = False
+    mask[1, ..., :70] = False
+    return mask
+
+
+def random_mask():
+    mask = torch.rand(B, H, NQ, NK) > 0.5
+    mask[..., 0] = True  # every query attends to at least one key
+    return mask
+
+
+@pytest.mark.parametrize("mask_fn", [None, key_padding_mask, random_mask])
+@pytest.mark.parametrize("budget", [TINY_BUDGET, 1 << 30])
+def test_matches_sdpa(qkv, mask_fn, budget):
+    q, k, v = qkv
+    mask = mask_fn() if mask_fn is not None else None
+    expected = F.scaled_dot_product_attention(q, k, v, attn_mask=mask)
+    out = streaming_attention(q, k, v, attn_mask=mask, memory_budget=budget)
+    torch.testing.assert_close(out, expected, atol=1e-5, rtol=1e-5)
+
+
+def test_half_precision_output(qkv):
+    q, k, v = (t.to(torch.bfloat16) for t in qkv)
+    out = streaming_attention(q, k, v, memory_budget=TINY_BUDGET)
+    expected = F.scaled_dot_product_attention(*(t.float() for t in (q, k, v)))
+    assert out.dtype == torch.bfloat16
+    torch.testing.assert_close(out.float(), expected, atol=3e-2, rtol=3e-2)
+
+
+def test_tile_sizes_fit_budget():
+    budget = attention_score_bytes(1, 4, 1000, 1000) // 10
+    query_tile, key_tile = attention_tile_sizes(1, 4, 1000, 1000, budget)
+    assert attention_score_bytes(1, 4, query_tile, key_tile) <= budget
+    assert attention_tile_sizes(1, 4, 1000, 1000, 0) == (64, 64)
+    assert attention_tile_sizes(1, 4, 10, 20, 1 << 30) == (10, 20)
+
+
+@pytest.mark.parametrize("masked", [False, True])
+def test_attention_layer_budget(masked):
+    torch.manual_seed(0)
+    layer = Attention(32, num_heads=2, qkv_bias=True, fused_attn=False).eval()
+    x = torch.randn(2, 100, 32)
+    mask = None
+    if masked:
+        mask = torch.ones(2, 100, 100, dtype=torch.bool)
+        mask[:, :, 80:] = False
+    with torch.no_grad():
+        reference = F.scaled_dot_product_attention(
+            *layer.qkv(x).reshape(2, 100, 3, 2, 16).permute(2, 0, 3, 1, 4),
+            attn_mask=mask[:, None] if masked else None,
+        )
+        reference = layer.proj(reference.transpose(1, 2).reshape(2, 100, 32))
+        assert set_attention_memory_budget(layer, TINY_BUDGET) == 1
+        out = layer(x, attn_mask=mask)
+    torch.testing.assert_close(out, reference, atol=1e-5, rtol=1e-5)
@@ -0,0 +1,168 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the task queues and admission control."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from depth_anything_3.services.task_queue import (
+    AdmissionController,
+    InMemoryTaskQueue,
+    SQLiteTaskQueue,
+    TaskQueue,
+)
+from depth_anything_3.utils.memory import estimate_memory_requirement
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_queue(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return InMemoryTaskQueue(**kwargs)
+        return SQLiteTaskQueue(str(tmp_path / "queue.db"), **kwargs)
+
+    return make
+
+
+def make_request(num_images=4, process_res=504, client_id=None):
+    return SimpleNamespace(
+        image_paths=["img.png"] * num_images, process_res=process_res, client_id=client_id
+    )
+
+
+def test_task_queue_is_abstract():
+    with pytest.raises(TypeError):
+        TaskQueue()
+
+
+def test_priority_then_fifo_order(make_queue):
+    queue = make_queue(aging_seconds=0)
+    queue.put("n1", "{}", "normal")
+    queue.put("l1", "{}", "low")
+    queue.put("h1", "{}", "high")
+    queue.put("n2", "{}", "normal")
+    assert queue.pending_ids() == ["h1", "n1", "n2", "l1"]
+    assert queue.depth_by_priority() == {"high": 1, "normal": 2, "low": 1}
+    assert [queue.pop() for _ in range(5)] == ["h1", "n1", "n2", "l1", None]
+
+
+def test_aging_promotes_old_tasks(make_queue):
+    queue = make_queue(aging_seconds=10)
+    now = time.time()
+    queue.put("old_low", "{}", "low", created_at=now - 25)
+    queue.put("new_normal", "{}", "normal", created_at=now)
+    assert queue.pop() == "old_low"
+
+
+def test_take_keeps_unmatched_tasks(make_queue):
+    queue = make_queue()
+    for task_id in "abcd":
+        queue.put(task_id, "{}")
+    assert queue.take(lambda t: t in "bd", 5) == ["b", "d"]
+    assert queue.pending_ids() == ["a", "c"]
+    assert queue.remove("a") and not queue.remove("b")
+    assert queue.count() == 1
+
+
+def test_sqlite_recovers_running_tasks(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = SQLiteTaskQueue(path)
+    queue.put("a", '{"x": 1}', "high", client_id="c")
+    queue.put("b", "{}")
+    assert queue.pop() == "a"
+    queue.put("c", "{}")
+    queue.complete("c")
+
+    recovered = SQLiteTaskQueue(path).recover()
+    assert [(t, p, prio, c) for t, p, prio, c, _ in recovered] == [
+        ("a", '{"x": 1}', "high", "c"),
+        ("b", "{}", "normal", None),
+    ]
+
+
+def test_admission_queue_depth_and_client_quota():
+    admission = AdmissionController(
+        memory_budget_gb=1000, max_pending_per_client=1, max_queue_depth=2
+    )
+    queue = InMemoryTaskQueue()
+    assert admission.admit(make_request(client_id="a"), queue, "normal")[0]
+    queue.put("t1", "{}", client_id="a")
+    admitted, _, status, _ = admission.admit(make_request(client_id="a"), queue, "normal")
+    assert not admitted and status == 429
+    queue.put("t2", "{}", client_id="b")
+    admitted, _, status, _ = admission.admit(make_request(client_id="c"), queue, "normal")
+    assert not admitted and status == 503
+    assert admission.get_stats(queue)["rejected"]["queue_full"] == 1
+
+
+@pytest.mark.parametrize("policy", ["reject", "defer"])
+def test_tasks_over_the_budget_are_rejected(policy):
+    request = make_request(num_images=100)
+    admission = AdmissionController(
+        memory_budget_gb=estimate_memory_requirement(50, 504), memory_policy=policy
+    )
+    admitted, _, status, _ = admission.admit(request, InMemoryTaskQueue(), "normal")
+    assert not admitted and status == 413
+
+
+def test_defer_holds_tasks_until_memory_fits():
+    request = make_request(num_images=20)
+    required = estimate_memory_requirement(20, 504)
+    admission = AdmissionController(memory_budget_gb=1.5 * required, memory_policy="defer")
+
+    assert admission.try_reserve("a", request)
+    # Admitted, but held back from dispatch while "a" runs
+    admitted, priority, _, message = admission.admit(request, InMemoryTaskQueue(), "low")
+    assert admitted and priority == "low" and "deferred" in message
+    assert not admission.try_reserve("b", request)
+    admission.release("a")
+    assert admission.try_reserve("b", request)
+    assert admission.get_stats(InMemoryTaskQueue())["reserved_gb"] == round(required, 2)
+
+
+def test_reject_policy_does_not_hold_tasks():
+    request = make_request(num_images=20)
+    admission = AdmissionController(
+        memory_budget_gb=estimate_memory_requirement(20, 504), memory_policy="reject"
+    )
+    assert admission.try_reserve("a", request)
+    assert admission.try_reserve("b", request)
+
+
+def test_concurrent_admission_respects_queue_depth():
+    admission = AdmissionController(memory_budget_gb=1000, max_queue_depth=5)
+    queue = InMemoryTaskQueue()
+    barrier = threading.Barrier(16)
+    results = []
+
+    def submit(i):
+        def enqueue():
+            # Widen the window between the depth check and the enqueue
+            time.sleep(0.01)
+            queue.put(f"t{i}", "{}")
+
+        barrier.wait()
+        results.append(admission.admit(make_request(), queue, "normal", enqueue=enqueue)[0])
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(results) == 5
+    assert len(queue) == 5
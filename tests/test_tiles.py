@@ -0,0 +1,118 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the LOD octree tiles."""
+
+import os
+
+import numpy as np
+import pytest
+import trimesh
+
+from depth_anything_3.utils.export.tiles import (
+    build_lod_glb,
+    build_octree_tiles,
+    export_to_tiles,
+)
+from depth_anything_3.utils.tile_index import has_scene_model, load_tile_index, tile_levels
+
+
+@pytest.fixture
+def cloud():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 1, size=(5000, 3)) * [4.0, 2.0, 1.0]
+    colors = rng.integers(0, 256, size=(5000, 3), dtype=np.uint8)
+    return points.astype(np.float32), colors
+
+
+def glb_points(path):
+    """(N, 3) points of a GLB written without quantization (no node transforms)."""
+    scene = trimesh.load(path)
+    clouds = [g for g in scene.geometry.values() if isinstance(g, trimesh.PointCloud)]
+    if not clouds:
+        return np.zeros((0, 3))
+    return np.concatenate([g.vertices for g in clouds])
+
+
+def sorted_rows(points):
+    points = np.asarray(points, dtype=np.float32)
+    return points[np.lexsort(points.T[::-1])]
+
+
+def test_tiles_partition_the_cloud(tmp_path, cloud):
+    points, colors = cloud
+    points_with_nan = np.concatenate([points, np.full((3, 3), np.nan, np.float32)])
+    colors_with_nan = np.concatenate([colors, np.zeros((3, 3), np.uint8)])
+    index = build_octree_tiles(
+        points_with_nan,
+        colors_with_nan,
+        str(tmp_path),
+        max_points_per_tile=500,
+        grid=4,
+        quantize=False,
+    )
+
+    assert index == load_tile_index(str(tmp_path))
+    assert index["num_points"] == len(points)
+    assert index["levels"] == tile_levels(str(tmp_path)) > 1
+    assert sum(node["count"] for node in index["nodes"]) == len(points)
+
+    names = {node["name"] for node in index["nodes"]}
+    tiles = []
+    for node in index["nodes"]:
+        assert all(child in names and child[:-1] == node["name"] for child in node["children"])
+        p = glb_points(os.path.join(tmp_path, node["url"]))
+        assert len(p) == node["count"]
+        lo, hi = np.array(node["bounds"])
+        assert np.all(p >= lo - 1e-5) and np.all(p <= hi + 1e-5)
+        if node["children"]:
+            # Inner nodes keep at most one point per lattice cell
+            assert node["count"] <= 4**3
+        tiles.append(p)
+    np.testing.assert_array_equal(sorted_rows(np.concatenate(tiles)), sorted_rows(points))
+
+
+def test_lod_glb_adds_levels(tmp_path, cloud):
+    points, colors = cloud
+    index = build_octree_tiles(points, colors, str(tmp_path), max_points_per_tile=500, grid=4)
+    for level in range(index["levels"]):
+        path = build_lod_glb(str(tmp_path), level)
+        assert build_lod_glb(str(tmp_path), level) == path
+        expected = sum(n["count"] for n in index["nodes"] if n["level"] <= level)
+        scene = trimesh.load(path)
+        loaded = sum(len(g.vertices) for g in scene.geometry.values())
+        assert loaded == expected
+    assert loaded == len(points)
+    with pytest.raises(ValueError):
+        build_lod_glb(str(tmp_path), index["levels"])
+
+
+def test_rebuild_removes_stale_tiles(tmp_path, cloud):
+    points, colors = cloud
+    build_octree_tiles(points, colors, str(tmp_path), max_points_per_tile=500, grid=4)
+    build_lod_glb(str(tmp_path), 0)
+    index = build_octree_tiles(points[:100], colors[:100], str(tmp_path))
+
+    assert index["levels"] == 1
+    assert sorted(os.listdir(tmp_path)) == ["index.json", "lod", "r.glb"]
+    assert os.listdir(tmp_path / "lod") == []
+    assert tile_levels(str(tmp_path / "missing")) is None
+
+
+def test_export_to_tiles(tmp_path, prediction):
+    index_path = export_to_tiles(prediction, str(tmp_path), max_points_per_tile=200, grid=4)
+    index = load_tile_index(os.path.dirname(index_path))
+    assert index["num_points"] > 0
+    assert has_scene_model(str(tmp_path)) and not has_scene_model(str(tmp_path / "missing"))
+    assert np.array(index["extras"]["hf_alignment"]).shape == (4, 4)
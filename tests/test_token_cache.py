@@ -0,0 +1,108 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of backbone token reuse between overlapping chunks."""
+
+import pytest
+import torch
+
+from depth_anything_3.model.dinov2.vision_transformer import DinoVisionTransformer
+from depth_anything_3.model.utils.token_cache import OverlapTokenCache
+
+LAYERS = [3, 5]
+
+
+def tiny_vit(alt_start=2, seed=0):
+    torch.manual_seed(seed)
+    return DinoVisionTransformer(
+        img_size=28,
+        patch_size=14,
+        embed_dim=32,
+        depth=6,
+        num_heads=2,
+        alt_start=alt_start,
+        qknorm_start=alt_start,
+        rope_start=alt_start,
+    ).eval()
+
+
+def forward(model, x, cache=None):
+    with torch.no_grad():
+        outputs, _ = model.get_intermediate_layers(x, LAYERS, token_cache=cache)
+    return [feat for feat, _ in outputs]
+
+
+@pytest.fixture
+def frames():
+    torch.manual_seed(1)
+    return torch.randn(1, 6, 3, 28, 28)
+
+
+@pytest.mark.parametrize("alt_start", [2, -1])
+def test_prefix_reuse_matches_full_pass(frames, alt_start):
+    model = tiny_vit(alt_start)
+    cache = OverlapTokenCache("prefix")
+    cache.set_frames([0, 1, 2, 3], keep_ids=[2, 3])
+    forward(model, frames[:, :4], cache)
+    cache.set_frames([2, 3, 4, 5], keep_ids=[4, 5])
+    reused = forward(model, frames[:, 2:], cache)
+    full = forward(model, frames[:, 2:])
+
+    for a, b in zip(reused, full):
+        torch.testing.assert_close(a, b, atol=1e-5, rtol=1e-5)
+    stats = cache.get_stats()
+    assert stats["frames"] == 8
+    assert stats["reused_frames"] == 2
+    assert 0 < stats["saved_fraction"] < 1
+
+
+def test_local_reuse_skips_more_blocks(frames):
+    stats = {}
+    for mode in ("prefix", "local"):
+        model = tiny_vit()
+        cache = OverlapTokenCache(mode)
+        cache.set_frames([0, 1, 2, 3], keep_ids=[2, 3])
+        forward(model, frames[:, :4], cache)
+        cache.set_frames([2, 3, 4, 5])
+        out = forward(model, frames[:, 2:], cache)
+        assert all(torch.isfinite(o).all() for o in out)
+        stats[mode] = cache.get_stats()
+    assert stats["local"]["saved_flops"] > stats["prefix"]["saved_flops"]
+
+
+def test_nested_backbones_count_once(frames):
+    """Two backbones sharing the cache (as in the nested model) record one chunk each."""
+    single = OverlapTokenCache("prefix")
+    nested = OverlapTokenCache("prefix")
+    main, metric = tiny_vit(), tiny_vit(-1, seed=1)
+    for ids, keep in (([0, 1, 2, 3], [2, 3]), ([2, 3, 4, 5], [4, 5])):
+        x = frames[:, ids[0] : ids[0] + 4]
+        single.set_frames(ids, keep)
+        forward(main, x, single)
+        nested.set_frames(ids, keep)
+        forward(main, x, nested)
+        metric_reused = forward(metric, x, nested)
+        torch.testing.assert_close(metric_reused[-1], forward(metric, x)[-1])
+
+    assert nested.get_stats() == single.get_stats()
+    assert nested.get_stats()["reused_frames"] == 2
+
+
+def test_mismatched_views_do_not_bind(frames):
+    model = tiny_vit()
+    cache = OverlapTokenCache("prefix")
+    cache.set_frames([0, 1, 2])
+    assert cache.bind(model, frames[:, :4]) is None
+    with pytest.raises(ValueError):
+        OverlapTokenCache("global")
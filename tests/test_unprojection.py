@@ -0,0 +1,113 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of batched depth unprojection."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from depth_anything_3.utils import unprojection
+from depth_anything_3.utils.unprojection import (
+    depth_to_point_cloud,
+    depth_to_world_points,
+    pixel_grid,
+)
+
+
+def reference_points(prediction):
+    """Per-pixel ``R_c2w @ (d * K^-1 [u, v, 1]) + c``, one frame at a time."""
+    N, H, W = prediction.depth.shape
+    v, u = np.mgrid[:H, :W]
+    pix = np.stack([u, v, np.ones_like(u)], -1).reshape(-1, 3).astype(np.float64)
+    out = []
+    for i in range(N):
+        rays = pix @ np.linalg.inv(prediction.intrinsics[i]).T
+        cam = rays * prediction.depth[i].reshape(-1, 1)
+        w2c = np.eye(4)
+        w2c[:3] = prediction.extrinsics[i]
+        c2w = np.linalg.inv(w2c)
+        out.append((cam @ c2w[:3, :3].T + c2w[:3, 3]).reshape(H, W, 3))
+    return np.stack(out)
+
+
+def test_world_points_match_reference(prediction):
+    points = depth_to_world_points(prediction.depth, prediction.intrinsics, prediction.extrinsics)
+    assert points.dtype == np.float32
+    np.testing.assert_allclose(points, reference_points(prediction), atol=1e-4)
+
+    extrinsics = np.tile(np.eye(4, dtype=np.float32), (len(prediction.depth), 1, 1))
+    extrinsics[:, :3] = prediction.extrinsics
+    points_t = depth_to_world_points(
+        torch.from_numpy(prediction.depth), prediction.intrinsics, extrinsics
+    )
+    assert isinstance(points_t, torch.Tensor)
+    np.testing.assert_allclose(points_t.numpy(), points, atol=1e-5)
+
+
+def test_point_cloud_masks_and_order(prediction):
+    depth = prediction.depth.copy()
+    depth[0, 0, 0] = np.nan
+    depth[1, 2, 3] = -1.0
+    sky = np.zeros(depth.shape, bool)
+    sky[2, :2] = True
+    keep = np.ones(depth.shape, bool)
+    keep[3, :, :4] = False
+    valid = np.isfinite(depth) & (depth > 0) & (prediction.conf >= 1.5) & ~sky & keep
+
+    points, colors, indices = depth_to_point_cloud(
+        depth,
+        prediction.intrinsics,
+        prediction.extrinsics,
+        images=prediction.processed_images,
+        conf=prediction.conf,
+        conf_thresh=1.5,
+        sky_mask=sky,
+        mask=keep,
+        frame_batch=4,
+        return_indices=True,
+    )
+
+    np.testing.assert_array_equal(indices, np.flatnonzero(valid))
+    prediction.depth = np.where(np.isfinite(depth), depth, 1.0)
+    np.testing.assert_allclose(points, reference_points(prediction)[valid], atol=1e-4)
+    np.testing.assert_array_equal(colors, prediction.processed_images[valid])
+
+
+def test_point_cloud_without_valid_pixels(prediction):
+    points, colors = depth_to_point_cloud(
+        np.zeros_like(prediction.depth),
+        prediction.intrinsics,
+        prediction.extrinsics,
+        images=prediction.processed_images,
+    )
+    assert points.shape == (0, 3) and colors.shape == (0, 3)
+
+
+def test_pixel_grid_cache_is_bounded_and_thread_safe():
+    unprojection._GRID_CACHE.clear()
+    sizes = [(h, w) for h in range(4, 8) for w in range(4, 8)]
+
+    def build(size):
+        grid = pixel_grid(*size)
+        assert grid.shape == (*size, 3)
+        assert grid[-1, -1].tolist() == [size[1] - 1, size[0] - 1, 1]
+        return grid
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(build, sizes * 8))
+
+    assert len(unprojection._GRID_CACHE) == unprojection._GRID_CACHE_SIZE
+    assert pixel_grid(7, 7) is pixel_grid(7, 7)
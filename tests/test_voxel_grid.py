@@ -0,0 +1,131 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the streaming voxel-grid reduction."""
+
+from collections import defaultdict
+
+import numpy as np
+import pytest
+from loop_utils.sim3utils import (
+    merge_ply_files,
+    read_ply_vertices,
+    save_confident_pointcloud_batch,
+)
+
+from depth_anything_3.utils.voxel_grid import VoxelGridReducer, voxel_downsample
+
+VOXEL = 0.25
+
+
+@pytest.fixture
+def cloud():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1, 1, size=(3000, 3)).astype(np.float32)
+    colors = rng.integers(0, 256, size=(3000, 3), dtype=np.uint8)
+    weights = rng.uniform(0.1, 2.0, size=3000)
+    return points, colors, weights
+
+
+def brute_force(points, colors, weights):
+    """Dict of voxel coordinates -> (centroid, mean colour, count, index of best point)."""
+    voxels = defaultdict(list)
+    for i, p in enumerate(points):
+        voxels[tuple(np.floor(p / VOXEL).astype(int))].append(i)
+    out = {}
+    for key, idx in voxels.items():
+        w = weights[idx]
+        out[key] = (
+            (points[idx] * w[:, None]).sum(0) / w.sum(),
+            np.rint(colors[idx].mean(0)),
+            len(idx),
+            idx[int(np.argmax(w))],
+        )
+    return out
+
+
+@pytest.mark.parametrize("chunk_size,num_calls", [(1_000_000, 1), (257, 1), (100, 5)])
+def test_matches_brute_force(cloud, chunk_size, num_calls):
+    points, colors, weights = cloud
+    reducer = VoxelGridReducer(VOXEL, chunk_size=chunk_size)
+    for idx in np.array_split(np.arange(len(points)), num_calls):
+        reducer.add(points[idx], colors[idx], weights[idx])
+    grid = reducer.result()
+    expected = brute_force(points, colors, weights)
+
+    assert len(reducer) == len(grid.points) == len(expected)
+    assert grid.counts.sum() == reducer.num_points == len(points)
+    for i, key in enumerate(map(tuple, np.floor(grid.points / VOXEL).astype(int))):
+        centroid, color, count, best = expected[key]
+        np.testing.assert_allclose(grid.points[i], centroid, atol=1e-5)
+        np.testing.assert_array_equal(grid.colors[i], color)
+        assert grid.counts[i] == count
+        assert grid.indices[i] == best
+
+
+def test_merging_reduced_grids_uses_counts(cloud):
+    points, colors, weights = cloud
+    full = VoxelGridReducer(VOXEL)
+    full.add(points, colors, weights)
+    merged = VoxelGridReducer(VOXEL)
+    for idx in np.array_split(np.arange(len(points)), 3):
+        part = VoxelGridReducer(VOXEL)
+        part.add(points[idx], colors[idx], weights[idx])
+        grid = part.result()
+        merged.add(grid.points, grid.colors, grid.weights, grid.counts)
+
+    a, b = full.result(), merged.result()
+    np.testing.assert_allclose(b.points, a.points, atol=1e-5)
+    np.testing.assert_allclose(b.colors, a.colors, atol=1)
+    np.testing.assert_array_equal(b.counts, a.counts)
+    np.testing.assert_allclose(b.weights, a.weights)
+
+
+def test_downsample_without_colors():
+    points = np.array([[0.01, 0, 0], [0.02, 0, 0], [0.3, 0, 0]], np.float32)
+    down, colors = voxel_downsample(points, voxel_size=VOXEL)
+    assert colors is None
+    np.testing.assert_allclose(down, [[0.015, 0, 0], [0.3, 0, 0]], atol=1e-6)
+    assert len(voxel_downsample(points[:0], voxel_size=VOXEL)[0]) == 0
+
+
+def test_invalid_arguments(cloud):
+    points, colors, _ = cloud
+    with pytest.raises(ValueError):
+        VoxelGridReducer(0)
+    reducer = VoxelGridReducer(VOXEL)
+    reducer.add(points, colors)
+    with pytest.raises(ValueError):
+        reducer.add(points)
+    with pytest.raises(ValueError):
+        VoxelGridReducer(1e-9).add(points)
+
+
+def test_merge_ply_files_weights_voxel_centroids(tmp_path, cloud):
+    points, colors, weights = cloud
+    full = VoxelGridReducer(VOXEL)
+    full.add(points, colors, weights)
+    for i, idx in enumerate(np.array_split(np.arange(len(points)), 3)):
+        save_confident_pointcloud_batch(
+            points[idx],
+            colors[idx],
+            weights[idx],
+            str(tmp_path / f"{i}_pcd.ply"),
+            conf_threshold=0.0,
+            voxel_size=VOXEL,
+        )
+    merge_ply_files(str(tmp_path), str(tmp_path / "combined.ply"), voxel_size=VOXEL)
+
+    merged = read_ply_vertices(str(tmp_path / "combined.ply"))
+    np.testing.assert_allclose(merged["xyz"], full.result().points, atol=1e-5)
@@ -0,0 +1,107 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the multi-process model worker pool, with CPU stub models."""
+
+import os
+import signal
+import time
+
+import pytest
+
+from depth_anything_3.services.worker_pool import WorkerPool
+
+
+class SleepModel:
+    """Stub model; each image path is the number of seconds its inference takes."""
+
+    def inference(self, image, **kwargs):
+        time.sleep(sum(float(path) for path in image))
+
+
+def load_sleep_model(model_dir, device):
+    return SleepModel()
+
+
+def make_request(seconds, num_images=1):
+    return {
+        "image_paths": [str(seconds / num_images)] * num_images,
+        "export_format": "mini_npz",
+        "process_res": 504,
+        "process_res_method": "upper_bound_resize",
+        "export_feat_layers": [],
+        "align_to_input_ext_scale": True,
+        "conf_thresh_percentile": 40.0,
+        "num_max_points": 1000,
+        "show_cameras": True,
+        "feat_vis_fps": 15,
+    }
+
+
+def wait_until(condition, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool("stub", ["cpu"], 2, loader=load_sleep_model, max_restart_backoff=1.0)
+    pool.start()
+    assert wait_until(lambda: all(w["ready"] for w in pool.get_stats())), pool.get_stats()
+    yield pool
+    pool.shutdown(timeout=5.0)
+
+
+def test_jobs_go_to_least_loaded_worker(pool):
+    first = pool.submit([make_request(1.0, num_images=4)])
+    second = pool.submit([make_request(1.0, num_images=2)])
+    assert first.worker_id != second.worker_id
+    # Worker of `second` has fewer in-flight images
+    third = pool.submit([make_request(0.1)])
+    assert third.worker_id == second.worker_id
+
+    for future in (first, second, third):
+        assert future.result(timeout=30)[0]["success"]
+
+    stats = pool.get_stats()
+    assert sum(w["completed_jobs"] for w in stats) == 3
+    assert all(w["inflight_jobs"] == 0 for w in stats)
+    assert all(w["busy_time"] > 0 and w["utilization_percent"] > 0 for w in stats)
+
+
+def test_killed_worker_fails_inflight_job_and_restarts_with_backoff(pool):
+    future = pool.submit([make_request(30.0)])
+    victim = pool.get_stats()[future.worker_id]
+    assert wait_until(lambda: pool.get_stats()[future.worker_id]["inflight_jobs"] == 1)
+
+    os.kill(victim["pid"], signal.SIGKILL)
+    with pytest.raises(RuntimeError, match="crashed"):
+        future.result(timeout=30)
+    crashed_at = time.time()
+
+    # Not respawned before the backoff expires, then ready again in a new process
+    assert not pool.get_stats()[future.worker_id]["alive"]
+    assert wait_until(lambda: pool.get_stats()[future.worker_id]["ready"])
+    restarted = pool.get_stats()[future.worker_id]
+    assert time.time() - crashed_at >= 0.5
+    assert restarted["restarts"] == 1
+    assert restarted["pid"] != victim["pid"]
+    assert restarted["failed_jobs"] == 1
+
+    # The restarted worker serves new jobs
+    assert pool.submit([make_request(0.0)]).result(timeout=30)[0]["success"]